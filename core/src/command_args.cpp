@@ -19,6 +19,8 @@ void CommandArgsParser::defineAll() {
         define('r', "root", "Root directory, where all config files are stored", std::filesystem::absolute(root).string());
         define('s', "server", "Run in server mode");
         define('\0', "autostart", "Automatically start the SDR after loading");
+        define('\0', "dsp_pool", "Run the DSP blocks on a pool of worker threads instead of one thread per block");
+        define('\0', "dsp_workers", "Number of DSP pool worker threads, the number of cores if 0", 0);
 }
 
 int CommandArgsParser::parse(int argc, char* argv[]) {
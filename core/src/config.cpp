@@ -4,6 +4,10 @@
 
 #include <filesystem>
 
+const std::chrono::milliseconds AUTOSAVE_POLL_INTERVAL(250);
+const std::chrono::milliseconds AUTOSAVE_DEBOUNCE(500);
+const std::chrono::milliseconds AUTOSAVE_MAX_DELAY(5000);
+
 ConfigManager::ConfigManager() {
 }
 
@@ -46,12 +50,105 @@ void ConfigManager::load(json def, bool lock) {
 
 void ConfigManager::save(bool lock) {
     if (lock) { mtx.lock(); }
-    std::ofstream file(path.c_str());
-    file << conf.dump(4);
-    file.close();
+    changed = false;
+    updateEntries();
+    writeFile();
     if (lock) { mtx.unlock(); }
 }
 
+bool ConfigManager::updateEntries() {
+    // Only objects are split into entries
+    if (!conf.is_object()) {
+        bool modified = !entriesValid || conf != savedConf;
+        savedConf = conf;
+        savedEntries.clear();
+        entriesValid = true;
+        return modified;
+    }
+    if (!savedConf.is_object()) {
+        savedConf = json::object();
+        savedEntries.clear();
+        entriesValid = false;
+    }
+    bool modified = !entriesValid;
+
+    // Drop the removed entries
+    for (auto it = savedEntries.begin(); it != savedEntries.end();) {
+        if (conf.contains(it->first)) {
+            it++;
+            continue;
+        }
+        savedConf.erase(it->first);
+        it = savedEntries.erase(it);
+        modified = true;
+    }
+
+    // Serialize the entries that changed, comparing is much cheaper than serializing
+    for (auto it = conf.begin(); it != conf.end(); it++) {
+        auto saved = savedConf.find(it.key());
+        if (saved != savedConf.end() && *saved == it.value()) { continue; }
+
+        // Indent the entry to its level in the file, JSON strings can't contain raw newlines
+        std::string str = it.value().dump(4);
+        std::string& entry = savedEntries[it.key()];
+        entry.clear();
+        for (char c : str) {
+            entry += c;
+            if (c == '\n') { entry += "    "; }
+        }
+        savedConf[it.key()] = it.value();
+        modified = true;
+    }
+
+    entriesValid = true;
+    return modified;
+}
+
+bool ConfigManager::writeFile() {
+    // Write to a temporary file and rename it over the config so that it's never left half written
+    std::string tmpPath = path + ".tmp";
+    {
+        std::ofstream file(tmpPath.c_str());
+        if (!file.is_open()) {
+            flog::error("Could not open '{0}' to save the config", tmpPath);
+            return false;
+        }
+
+        // Same output as conf.dump(4)
+        if (!savedConf.is_object()) {
+            file << savedConf.dump(4);
+        }
+        else if (savedEntries.empty()) {
+            file << "{}";
+        }
+        else {
+            file << "{\n";
+            for (auto it = savedEntries.begin(); it != savedEntries.end(); it++) {
+                if (it != savedEntries.begin()) { file << ",\n"; }
+                file << "    " << json(it->first).dump() << ": " << it->second;
+            }
+            file << "\n}";
+        }
+
+        file.flush();
+        if (!file.good()) {
+            flog::error("Could not write the config to '{0}'", tmpPath);
+            file.close();
+            std::filesystem::remove(tmpPath);
+            return false;
+        }
+    }
+
+    std::error_code ec;
+    std::filesystem::rename(tmpPath, path, ec);
+    if (ec) {
+        flog::error("Could not replace config file '{0}': {1}", path, ec.message());
+        std::filesystem::remove(tmpPath, ec);
+        return false;
+    }
+    return true;
+}
+
 void ConfigManager::enableAutoSave() {
     if (autoSaveEnabled) { return; }
     autoSaveEnabled = true;
@@ -75,7 +172,12 @@ void ConfigManager::acquire() {
 }
 
 void ConfigManager::release(bool modified) {
-    changed |= modified;
+    if (modified) {
+        auto now = std::chrono::steady_clock::now();
+        if (!changed) { firstChange = now; }
+        lastChange = now;
+        changed = true;
+    }
     mtx.unlock();
 }
 
@@ -87,15 +189,20 @@ void ConfigManager::autoSaveWorker() {
             continue;
         }
         if (changed) {
-            changed = false;
-            save(false);
+            // Wait for a burst of changes to end before saving, but not for too long
+            auto now = std::chrono::steady_clock::now();
+            if (now - lastChange >= AUTOSAVE_DEBOUNCE || now - firstChange >= AUTOSAVE_MAX_DELAY) {
+                changed = false;
+                // Skip the write if the changes didn't change anything
+                if (updateEntries()) { writeFile(); }
+            }
         }
         mtx.unlock();
 
         // Sleep but listen for wakeup call
         {
             std::unique_lock<std::mutex> lock(termMtx);
-            termCond.wait_for(lock, std::chrono::milliseconds(1000), [this]() { return termFlag; });
+            termCond.wait_for(lock, AUTOSAVE_POLL_INTERVAL, [this]() { return termFlag; });
         }
     }
 }
\ No newline at end of file
@@ -4,6 +4,8 @@
 #include <string>
 #include <mutex>
 #include <condition_variable>
+#include <chrono>
+#include <map>
 
 using nlohmann::json;
 
@@ -24,8 +26,20 @@ public:
 private:
     void autoSaveWorker();
 
+    // Serialize the top level entries that changed since the last write, returns false if none did
+    bool updateEntries();
+    bool writeFile();
+
     std::string path = "";
     volatile bool changed = false;
+    std::chrono::steady_clock::time_point firstChange;
+    std::chrono::steady_clock::time_point lastChange;
+
+    // Contents of the file as last written, as a copy of the config and per top level entry
+    json savedConf;
+    std::map<std::string, std::string> savedEntries;
+    bool entriesValid = false;
+
     volatile bool autoSaveEnabled = false;
     std::thread autoSaveThread;
     std::mutex mtx;
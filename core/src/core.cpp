@@ -1,4 +1,5 @@
 #include <server.h>
+#include <headless.h>
 #include "imgui.h"
 #include <stdio.h>
 #include <gui/main_window.h>
@@ -19,6 +20,7 @@
 #include <stb_image_resize.h>
 #include <gui/gui.h>
 #include <signal_path/signal_path.h>
+#include <dsp/scheduler.h>
 
 #ifdef _WIN32
 #include <Windows.h>
@@ -41,6 +43,13 @@ namespace core {
     void setInputSampleRate(double samplerate) {
         // Forward this to the server
         if (args["server"].b()) { server::setInputSampleRate(samplerate); return; }
+
+        // Without a GUI, only the IQ frontend needs updating
+        if (headless::isActive()) {
+            sigpath::iqFrontEnd.setSampleRate(samplerate);
+            flog::info("New DSP samplerate: {0} (source samplerate is {1})", sigpath::iqFrontEnd.getEffectiveSamplerate(), samplerate);
+            return;
+        }
         
         // Update IQ frontend input samplerate and get effective samplerate
         sigpath::iqFrontEnd.setSampleRate(samplerate);
@@ -57,38 +66,8 @@ namespace core {
     }
 };
 
-// main
-int sdrpp_main(int argc, char* argv[]) {
-    flog::info("SDR++ v" VERSION_STR);
-
-#ifdef IS_MACOS_BUNDLE
-    // If this is a MacOS .app, CD to the correct directory
-    auto execPath = std::filesystem::absolute(argv[0]);
-    chdir(execPath.parent_path().string().c_str());
-#endif
-
-    // Define command line options and parse arguments
-    core::args.defineAll();
-    if (core::args.parse(argc, argv) < 0) { return -1; } 
-
-    // Show help and exit if requested
-    if (core::args["help"].b()) {
-        core::args.showHelp();
-        return 0;
-    }
-
-    bool serverMode = (bool)core::args["server"];
-
-#ifdef _WIN32
-    // Free console if the user hasn't asked for a console and not in server mode
-    if (!core::args["con"].b() && !serverMode) { FreeConsole(); }
-
-    // Set error mode to avoid abnoxious popups
-    SetErrorMode(SEM_NOOPENFILEERRORBOX | SEM_NOGPFAULTERRORBOX | SEM_FAILCRITICALERRORS);
-#endif
-
+int core::loadConfig(std::string root, bool autoSave) {
     // Check root directory
-    std::string root = (std::string)core::args["root"];
     if (!std::filesystem::exists(root)) {
         flog::warn("Root directory {0} does not exist, creating it", root);
         if (!std::filesystem::create_directories(root)) {
@@ -283,7 +262,7 @@ int sdrpp_main(int argc, char* argv[]) {
     flog::info("Loading config");
     core::configManager.setPath(root + "/config.json");
     core::configManager.load(defConfig);
-    core::configManager.enableAutoSave();
+    if (autoSave) { core::configManager.enableAutoSave(); }
     core::configManager.acquire();
 
     // Android can't load just any .so file. This means we have to hardcode the name of the modules
@@ -348,10 +327,53 @@ int sdrpp_main(int argc, char* argv[]) {
         core::configManager.conf["moduleInstances"][_name] = newMod;
     }
 
+    core::configManager.release(true);
+    return 0;
+}
+
+// main
+int sdrpp_main(int argc, char* argv[]) {
+    flog::info("SDR++ v" VERSION_STR);
+
+#ifdef IS_MACOS_BUNDLE
+    // If this is a MacOS .app, CD to the correct directory
+    auto execPath = std::filesystem::absolute(argv[0]);
+    chdir(execPath.parent_path().string().c_str());
+#endif
+
+    // Define command line options and parse arguments
+    core::args.defineAll();
+    if (core::args.parse(argc, argv) < 0) { return -1; } 
+
+    // Show help and exit if requested
+    if (core::args["help"].b()) {
+        core::args.showHelp();
+        return 0;
+    }
+
+    // Must be set before any DSP block is started
+    if (core::args["dsp_pool"].b()) {
+        dsp::scheduler::setMode(dsp::scheduler::Mode::POOL, (int)core::args["dsp_workers"]);
+    }
+
+    bool serverMode = (bool)core::args["server"];
+
+#ifdef _WIN32
+    // Free console if the user hasn't asked for a console and not in server mode
+    if (!core::args["con"].b() && !serverMode) { FreeConsole(); }
+
+    // Set error mode to avoid abnoxious popups
+    SetErrorMode(SEM_NOOPENFILEERRORBOX | SEM_NOGPFAULTERRORBOX | SEM_FAILCRITICALERRORS);
+#endif
+
+    // Check root directory and load config
+    std::string root = (std::string)core::args["root"];
+    if (core::loadConfig(root, true) < 0) { return -1; }
+
     // Load UI scaling
+    core::configManager.acquire();
     style::uiScale = core::configManager.conf["uiScale"];
-
-    core::configManager.release(true);
+    core::configManager.release();
 
     if (serverMode) { return server::main(); }
 
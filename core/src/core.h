@@ -11,6 +11,9 @@ namespace core {
     SDRPP_EXPORT CommandArgsParser args;
 
     void setInputSampleRate(double samplerate);
+
+    // Create the root directory if needed, then load and repair its config.json
+    int loadConfig(std::string root, bool autoSave = true);
 };
 
 int sdrpp_main(int argc, char* argv[]);
\ No newline at end of file
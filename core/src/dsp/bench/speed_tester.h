@@ -30,8 +30,19 @@ namespace dsp::bench {
 
         double benchmark(int durationMs, int bufferSize) {
             assert(_init);
+            prepare(bufferSize);
 
-            // Allocate and fill buffer
+            // Run test
+            start();
+            std::this_thread::sleep_for(std::chrono::milliseconds(durationMs));
+            stop();
+            buffer::free(randBuf);
+            return (double)sampCount * 1000.0 / (double)durationMs;
+        }
+
+    protected:
+        // Allocate and fill the input buffer
+        void prepare(int bufferSize) {
             inCount = bufferSize;
             randBuf = buffer::alloc<I>(inCount);
             for (int i = 0; i < inCount; i++) {
@@ -46,16 +57,8 @@ namespace dsp::bench {
                     randBuf[i] = rand();
                 }
             }
-
-            // Run test
-            start();
-            std::this_thread::sleep_for(std::chrono::milliseconds(durationMs));
-            stop();
-            buffer::free(randBuf);
-            return (double)sampCount * 1000.0 / (double)durationMs;
         }
 
-    protected:
         void start() {
             if (running) { return; }
             running = true;
@@ -0,0 +1,480 @@
+#include "suite.h"
+#include "speed_tester.h"
+#include "../metrics.h"
+#include "../processor.h"
+#include "../filter/fir.h"
+#include "../multirate/rational_resampler.h"
+#include "../demod/fm.h"
+#include "../demod/broadcast_fm.h"
+#include "../demod/am.h"
+#include "../demod/ssb.h"
+#include "../channel/rx_vfo.h"
+#include "../routing/splitter.h"
+#include "../sink/null_sink.h"
+#include "../scheduler.h"
+#include "../taps/windowed_sinc.h"
+#include "../window/nuttall.h"
+#include <fftw3.h>
+#include <chrono>
+#include <thread>
+#include <algorithm>
+#include <map>
+#include <memory>
+#include <stdexcept>
+#include <stdio.h>
+#include <math.h>
+#ifdef _WIN32
+#include <Windows.h>
+#else
+#include <sys/resource.h>
+#endif
+
+namespace dsp::bench {
+    // Windowed power spectrum of consecutive frames, like the FFT of the IQ front end
+    class PowerSpectrum : public Processor<complex_t, float> {
+        using base_type = Processor<complex_t, float>;
+    public:
+        PowerSpectrum() {}
+
+        ~PowerSpectrum() {
+            if (!base_type::_block_init) { return; }
+            base_type::stop();
+            fftwf_destroy_plan(plan);
+            fftwf_free(fftIn);
+            fftwf_free(fftOut);
+            buffer::free(window);
+            buffer::free(frame);
+        }
+
+        void init(stream<complex_t>* in, int fftSize) {
+            _fftSize = fftSize;
+            window = buffer::alloc<float>(fftSize);
+            for (int i = 0; i < fftSize; i++) { window[i] = window::nuttall(i, fftSize); }
+            frame = buffer::alloc<complex_t>(fftSize);
+            fftIn = (fftwf_complex*)fftwf_malloc(fftSize * sizeof(fftwf_complex));
+            fftOut = (fftwf_complex*)fftwf_malloc(fftSize * sizeof(fftwf_complex));
+            plan = fftwf_plan_dft_1d(fftSize, fftIn, fftOut, FFTW_FORWARD, FFTW_ESTIMATE);
+
+            // A single call can complete one more frame than it has input samples
+            out.setBufferSize(STREAM_BUFFER_SIZE + fftSize);
+            base_type::init(in);
+        }
+
+        int process(int count, const complex_t* in, float* out) {
+            int outCount = 0;
+            while (count) {
+                int toCopy = std::min<int>(count, _fftSize - filled);
+                memcpy(&frame[filled], in, toCopy * sizeof(complex_t));
+                filled += toCopy;
+                in += toCopy;
+                count -= toCopy;
+                if (filled < _fftSize) { break; }
+
+                volk_32fc_32f_multiply_32fc((lv_32fc_t*)fftIn, (lv_32fc_t*)frame, window, _fftSize);
+                fftwf_execute(plan);
+                volk_32fc_s32f_power_spectrum_32f(&out[outCount], (lv_32fc_t*)fftOut, _fftSize, _fftSize);
+                outCount += _fftSize;
+                filled = 0;
+            }
+            return outCount;
+        }
+
+        DEFAULT_MULTIRATE_PROC_RUN
+
+    private:
+        int _fftSize;
+        int filled = 0;
+        float* window;
+        complex_t* frame;
+        fftwf_complex* fftIn;
+        fftwf_complex* fftOut;
+        fftwf_plan plan;
+    };
+
+    static uint64_t (*heapCounter)() = NULL;
+
+    void setHeapCounter(uint64_t (*counter)()) {
+        heapCounter = counter;
+    }
+
+    // CPU time used by all threads of the process
+    static double processCpuSeconds() {
+#ifdef _WIN32
+        FILETIME creation, exit, kernel, user;
+        if (!GetProcessTimes(GetCurrentProcess(), &creation, &exit, &kernel, &user)) { return 0.0; }
+        ULARGE_INTEGER k, u;
+        k.LowPart = kernel.dwLowDateTime;
+        k.HighPart = kernel.dwHighDateTime;
+        u.LowPart = user.dwLowDateTime;
+        u.HighPart = user.dwHighDateTime;
+        return (double)(k.QuadPart + u.QuadPart) * 100e-9;
+#else
+        struct rusage usage;
+        if (getrusage(RUSAGE_SELF, &usage)) { return 0.0; }
+        return (double)(usage.ru_utime.tv_sec + usage.ru_stime.tv_sec) + (double)(usage.ru_utime.tv_usec + usage.ru_stime.tv_usec) * 1e-6;
+#endif
+    }
+
+    // Speed tester that only measures once the block has output its first buffer, so that starting
+    // the threads and allocations made on the first run aren't counted in every case. The measure
+    // starts and ends when the writer swaps a buffer, for blocks slower than the duration.
+    template <class I, class O>
+    class CaseTester : public SpeedTester<I, O> {
+    public:
+        CaseTester(stream<I>* in, stream<O>* out) : SpeedTester<I, O>(in, out) {}
+
+        void measure(const Case& benchCase, int durationMs, Result& res) {
+            this->prepare(benchCase.bufferSize);
+            this->start();
+            auto deadline = std::chrono::steady_clock::now() + std::chrono::milliseconds(durationMs) + std::chrono::seconds(10);
+            waitFor(this->_out->counters.buffers, 0, deadline);
+            waitFor(this->_in->counters.buffers, this->_in->counters.buffers.load(), deadline);
+
+            uint64_t samples = this->_in->counters.samples.load();
+            uint64_t buffers = this->_in->counters.buffers.load();
+            uint64_t bufferAllocs = metrics::getAllocations();
+            uint64_t heapAllocs = heapCounter ? heapCounter() : 0;
+            double cpu = processCpuSeconds();
+            auto start = std::chrono::steady_clock::now();
+
+            std::this_thread::sleep_for(std::chrono::milliseconds(durationMs));
+            waitFor(this->_in->counters.buffers, buffers, deadline);
+
+            double wall = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+            res.cpuPercent = (wall > 0.0) ? 100.0 * (processCpuSeconds() - cpu) / wall : 0.0;
+            res.bufferAllocations = metrics::getAllocations() - bufferAllocs;
+            res.heapAllocations = heapCounter ? (int64_t)(heapCounter() - heapAllocs) : -1;
+            res.buffers = this->_in->counters.buffers.load() - buffers;
+            res.samplesPerSecond = (wall > 0.0) ? (double)(this->_in->counters.samples.load() - samples) / wall : 0.0;
+
+            this->stop();
+            buffer::free(this->randBuf);
+        }
+
+    private:
+        // Wait until a counter is greater than a value
+        static void waitFor(const std::atomic<uint64_t>& counter, uint64_t value, std::chrono::steady_clock::time_point deadline) {
+            while (counter.load() <= value && std::chrono::steady_clock::now() < deadline) {
+                std::this_thread::sleep_for(std::chrono::microseconds(100));
+            }
+        }
+    };
+
+    // Run a Processor block, initialized with the input stream and the given arguments
+    template <class B, class I, class O, class... Args>
+    static void measureBlock(const Case& benchCase, int durationMs, Result& res, Args... args) {
+        stream<I> in;
+        B block;
+        block.init(&in, args...);
+        block.start();
+        CaseTester<I, O> tester(&in, &block.out);
+        tester.measure(benchCase, durationMs, res);
+        block.stop();
+    }
+
+    // Parallel VFOs with an FM demodulator each, fed from one splitter like the VFOs of the IQ front end.
+    // The splitter also feeds the output stream of the speed tester.
+    class Chains {
+    public:
+        Chains(stream<complex_t>* in, stream<complex_t>* out, int count, double samplerate, double demodSamplerate) {
+            split.init(in);
+            split.bindStream(out);
+            for (int i = 0; i < count; i++) {
+                auto chain = std::make_unique<Chain>();
+                double offset = samplerate * 0.9 * (((double)i + 0.5) / (double)count - 0.5);
+                chain->vfo.init(&chain->in, samplerate, demodSamplerate, 12500.0, offset);
+                chain->demod.init(&chain->vfo.out, demodSamplerate, 12500.0, true, false);
+                chain->sink.init(&chain->demod.out);
+                split.bindStream(&chain->in);
+                chains.push_back(std::move(chain));
+            }
+        }
+
+        void start() {
+            for (auto& chain : chains) {
+                chain->sink.start();
+                chain->demod.start();
+                chain->vfo.start();
+            }
+            split.start();
+        }
+
+        void stop() {
+            split.stop();
+            for (auto& chain : chains) {
+                chain->vfo.stop();
+                chain->demod.stop();
+                chain->sink.stop();
+            }
+        }
+
+    private:
+        struct Chain {
+            stream<complex_t> in;
+            channel::RxVFO vfo;
+            demod::FM<float> demod;
+            sink::Null<float> sink;
+        };
+
+        routing::Splitter<complex_t> split;
+        std::vector<std::unique_ptr<Chain>> chains;
+    };
+
+    static void measureChains(const Case& benchCase, int durationMs, double samplerate, double demodSamplerate, Result& res) {
+        // The mode applies to the blocks started while it's set
+        scheduler::Mode mode = scheduler::getMode();
+        int workers = scheduler::getWorkerCount();
+        scheduler::setMode((benchCase.scheduler == "pool") ? scheduler::Mode::POOL : scheduler::Mode::THREAD_PER_BLOCK, workers);
+
+        stream<complex_t> in;
+        stream<complex_t> out;
+        Chains chains(&in, &out, (int)benchCase.param, samplerate, demodSamplerate);
+        chains.start();
+        scheduler::setMode(mode, workers);
+
+        CaseTester<complex_t, complex_t> tester(&in, &out);
+        tester.measure(benchCase, durationMs, res);
+        chains.stop();
+    }
+
+    static std::string caseName(const std::string& block, const char* param, double value, int bufferSize) {
+        char buf[128];
+        if (param) {
+            snprintf(buf, sizeof(buf), "%s/%s=%g/buffer=%d", block.c_str(), param, value, bufferSize);
+        }
+        else {
+            snprintf(buf, sizeof(buf), "%s/buffer=%d", block.c_str(), bufferSize);
+        }
+        return buf;
+    }
+
+    static bool isDemod(const std::string& block) {
+        return block == "fm" || block == "wfm" || block == "am" || block == "usb" || block == "lsb";
+    }
+
+    std::vector<Case> listCases(const Config& config) {
+        auto enabled = [&](const std::string& block) {
+            return config.blocks.empty() || std::find(config.blocks.begin(), config.blocks.end(), block) != config.blocks.end();
+        };
+
+        std::vector<Case> cases;
+        for (int bufferSize : config.bufferSizes) {
+            if (enabled("fir")) {
+                for (int taps : config.firTaps) {
+                    cases.push_back({ caseName("fir", "taps", taps, bufferSize), "fir", (double)taps, bufferSize });
+                }
+            }
+            if (enabled("resampler")) {
+                for (double rate : config.resamplerRates) {
+                    cases.push_back({ caseName("resampler", "rate", rate, bufferSize), "resampler", rate, bufferSize });
+                }
+            }
+            if (enabled("fft")) {
+                for (int size : config.fftSizes) {
+                    cases.push_back({ caseName("fft", "size", size, bufferSize), "fft", (double)size, bufferSize });
+                }
+            }
+            for (const auto& demod : config.demods) {
+                if (!enabled(demod)) { continue; }
+                cases.push_back({ caseName(demod, NULL, 0, bufferSize), demod, 0.0, bufferSize });
+            }
+            if (enabled("chains")) {
+                for (int count : config.chainCounts) {
+                    for (const auto& sched : config.schedulers) {
+                        char name[128];
+                        snprintf(name, sizeof(name), "chains/count=%d/scheduler=%s/buffer=%d", count, sched.c_str(), bufferSize);
+                        cases.push_back({ name, "chains", (double)count, bufferSize, sched });
+                    }
+                }
+            }
+        }
+        return cases;
+    }
+
+    Result runCase(const Case& benchCase, const Config& config) {
+        int durationMs = config.durationMs;
+        double samplerate = config.samplerate;
+        double demodSamplerate = config.demodSamplerate;
+        if (benchCase.bufferSize < 1 || benchCase.bufferSize > STREAM_BUFFER_SIZE) {
+            throw std::runtime_error("Invalid buffer size for " + benchCase.name);
+        }
+        if (durationMs < 1) { throw std::runtime_error("Invalid benchmark duration"); }
+
+        Result res;
+        res.benchCase = benchCase;
+        const std::string& block = benchCase.block;
+
+        if (block == "fir") {
+            int count = (int)benchCase.param;
+            if (count < 1 || count > 64000) { throw std::runtime_error("Invalid tap count for " + benchCase.name); }
+            tap<float> taps = taps::windowedSinc<float>(count, samplerate / 4.0, samplerate, window::nuttall);
+            measureBlock<filter::FIR<complex_t, float>, complex_t, complex_t>(benchCase, durationMs, res, taps);
+            taps::free(taps);
+        }
+        else if (block == "resampler") {
+            double rate = benchCase.param;
+            if (rate <= 0.0 || (double)benchCase.bufferSize * rate / samplerate > STREAM_BUFFER_SIZE) {
+                throw std::runtime_error("Invalid output samplerate for " + benchCase.name);
+            }
+            measureBlock<multirate::RationalResampler<complex_t>, complex_t, complex_t>(benchCase, durationMs, res, samplerate, rate);
+        }
+        else if (block == "fft") {
+            int size = (int)benchCase.param;
+            if (size < 2 || size > STREAM_BUFFER_SIZE) { throw std::runtime_error("Invalid FFT size for " + benchCase.name); }
+            measureBlock<PowerSpectrum, complex_t, float>(benchCase, durationMs, res, size);
+        }
+        else if (block == "fm") {
+            measureBlock<demod::FM<float>, complex_t, float>(benchCase, durationMs, res, demodSamplerate, 12500.0, true, false);
+        }
+        else if (block == "wfm") {
+            measureBlock<demod::BroadcastFM, complex_t, stereo_t>(benchCase, durationMs, res, 75000.0, demodSamplerate, true, true);
+        }
+        else if (block == "am") {
+            measureBlock<demod::AM<float>, complex_t, float>(benchCase, durationMs, res, demod::AM<float>::AGCMode::CARRIER, 10000.0,
+                                                               50.0 / demodSamplerate, 5.0 / demodSamplerate, 100.0 / demodSamplerate, demodSamplerate);
+        }
+        else if (block == "usb" || block == "lsb") {
+            auto mode = (block == "usb") ? demod::SSB<float>::USB : demod::SSB<float>::LSB;
+            measureBlock<demod::SSB<float>, complex_t, float>(benchCase, durationMs, res, mode, 2800.0, demodSamplerate,
+                                                                50.0 / demodSamplerate, 5.0 / demodSamplerate);
+        }
+        else if (block == "chains") {
+            int count = (int)benchCase.param;
+            if (count < 1 || count > 1000) { throw std::runtime_error("Invalid chain count for " + benchCase.name); }
+            if (benchCase.scheduler != "threads" && benchCase.scheduler != "pool") {
+                throw std::runtime_error("Unknown scheduler for " + benchCase.name);
+            }
+            measureChains(benchCase, durationMs, samplerate, demodSamplerate, res);
+        }
+        else {
+            throw std::runtime_error("Unknown benchmark block '" + block + "'");
+        }
+
+        return res;
+    }
+
+    std::vector<Result> runAll(const Config& config, std::function<void(const Result&)> progress) {
+        std::vector<Result> results;
+        for (const auto& benchCase : listCases(config)) {
+            results.push_back(runCase(benchCase, config));
+            if (progress) { progress(results.back()); }
+        }
+        return results;
+    }
+
+    Config Config::fromJson(const nlohmann::json& json) {
+        if (!json.is_object()) { throw std::runtime_error("Benchmark config must be an object"); }
+
+        Config config;
+        try {
+            for (auto it = json.begin(); it != json.end(); it++) {
+                const std::string& key = it.key();
+                if (key == "duration_ms") { config.durationMs = it.value(); }
+                else if (key == "buffer_sizes") { config.bufferSizes = it.value().get<std::vector<int>>(); }
+                else if (key == "samplerate") { config.samplerate = it.value(); }
+                else if (key == "demod_samplerate") { config.demodSamplerate = it.value(); }
+                else if (key == "fir_taps") { config.firTaps = it.value().get<std::vector<int>>(); }
+                else if (key == "resampler_rates") { config.resamplerRates = it.value().get<std::vector<double>>(); }
+                else if (key == "fft_sizes") { config.fftSizes = it.value().get<std::vector<int>>(); }
+                else if (key == "demods") { config.demods = it.value().get<std::vector<std::string>>(); }
+                else if (key == "chain_counts") { config.chainCounts = it.value().get<std::vector<int>>(); }
+                else if (key == "schedulers") { config.schedulers = it.value().get<std::vector<std::string>>(); }
+                else if (key == "blocks") { config.blocks = it.value().get<std::vector<std::string>>(); }
+                else { throw std::runtime_error("Unknown benchmark option '" + key + "'"); }
+            }
+        }
+        catch (const nlohmann::json::exception& e) {
+            throw std::runtime_error(std::string("Invalid benchmark config: ") + e.what());
+        }
+
+        if (config.samplerate <= 0.0 || config.demodSamplerate <= 0.0) { throw std::runtime_error("Invalid benchmark samplerate"); }
+        for (const auto& demod : config.demods) {
+            if (!isDemod(demod)) { throw std::runtime_error("Unknown demodulator '" + demod + "'"); }
+        }
+        for (const auto& sched : config.schedulers) {
+            if (sched != "threads" && sched != "pool") { throw std::runtime_error("Unknown scheduler '" + sched + "'"); }
+        }
+        return config;
+    }
+
+    nlohmann::json Config::toJson() const {
+        return {
+            { "duration_ms", durationMs },
+            { "buffer_sizes", bufferSizes },
+            { "samplerate", samplerate },
+            { "demod_samplerate", demodSamplerate },
+            { "fir_taps", firTaps },
+            { "resampler_rates", resamplerRates },
+            { "fft_sizes", fftSizes },
+            { "demods", demods },
+            { "chain_counts", chainCounts },
+            { "schedulers", schedulers },
+            { "blocks", blocks }
+        };
+    }
+
+    nlohmann::json toJson(const Config& config, const std::vector<Result>& results) {
+        nlohmann::json cases = nlohmann::json::array();
+        for (const auto& res : results) {
+            nlohmann::json entry = {
+                { "name", res.benchCase.name },
+                { "block", res.benchCase.block },
+                { "param", res.benchCase.param },
+                { "buffer_size", res.benchCase.bufferSize },
+                { "samples_per_second", res.samplesPerSecond },
+                { "buffers", res.buffers },
+                { "cpu_percent", res.cpuPercent },
+                { "buffer_allocations", res.bufferAllocations },
+                { "heap_allocations", nullptr }
+            };
+            if (res.heapAllocations >= 0) { entry["heap_allocations"] = res.heapAllocations; }
+            if (!res.benchCase.scheduler.empty()) { entry["scheduler"] = res.benchCase.scheduler; }
+            cases.push_back(entry);
+        }
+        return {
+            { "version", 1 },
+            { "config", config.toJson() },
+            { "results", cases }
+        };
+    }
+
+    // Allocations per buffer, heap allocations are only counted if both reports have them
+    static double allocationsPerBuffer(const nlohmann::json& res, bool heap) {
+        double allocs = res.value("buffer_allocations", 0.0);
+        if (heap) { allocs += res["heap_allocations"].get<double>(); }
+        return allocs / std::max<double>(res.value("buffers", 1.0), 1.0);
+    }
+
+    std::vector<Regression> compare(const nlohmann::json& report, const nlohmann::json& baseline, double threshold) {
+        if (!report.contains("results") || !baseline.contains("results")) {
+            throw std::runtime_error("Benchmark reports must have results");
+        }
+
+        std::map<std::string, const nlohmann::json*> before;
+        for (const auto& res : baseline["results"]) {
+            before[res.at("name").get<std::string>()] = &res;
+        }
+
+        std::vector<Regression> regressions;
+        for (const auto& res : report["results"]) {
+            std::string name = res.at("name");
+            auto it = before.find(name);
+            if (it == before.end()) { continue; }
+            const nlohmann::json& base = *it->second;
+
+            double speed = res.at("samples_per_second");
+            double baseSpeed = base.at("samples_per_second");
+            if (speed < baseSpeed * (1.0 - threshold)) {
+                regressions.push_back({ name, "samples_per_second", baseSpeed, speed });
+            }
+
+            bool heap = res.value("heap_allocations", nlohmann::json()).is_number() && base.value("heap_allocations", nlohmann::json()).is_number();
+            double allocs = allocationsPerBuffer(res, heap);
+            double baseAllocs = allocationsPerBuffer(base, heap);
+            if (allocs >= baseAllocs + 0.5) {
+                regressions.push_back({ name, "allocations_per_buffer", baseAllocs, allocs });
+            }
+        }
+        return regressions;
+    }
+}
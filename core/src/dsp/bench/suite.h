@@ -0,0 +1,97 @@
+#pragma once
+#include <string>
+#include <vector>
+#include <functional>
+#include <stdint.h>
+#include <json.hpp>
+
+// Throughput benchmarks of the core DSP blocks. Each case runs one block between the writer and
+// reader threads of a SpeedTester, like it would run in a flowgraph, and records its throughput,
+// the CPU usage of the process and the allocations made while it ran.
+
+namespace dsp::bench {
+    struct Config {
+        // Duration of each case
+        int durationMs = 250;
+
+        // Samples per buffer written to the block, every case is run with each of them
+        std::vector<int> bufferSizes = { 1024, 65536 };
+
+        // Input samplerate of the FIR, resampler and FFT cases
+        double samplerate = 2.4e6;
+
+        // Input samplerate of the demodulator cases
+        double demodSamplerate = 250e3;
+
+        std::vector<int> firTaps = { 32, 128, 512, 2048 };
+        std::vector<double> resamplerRates = { 48e3, 250e3, 1e6, 3.2e6 };
+        std::vector<int> fftSizes = { 1024, 8192, 65536 };
+        std::vector<std::string> demods = { "fm", "wfm", "am", "usb", "lsb" };
+
+        // Flowgraphs of parallel chains (VFO, FM demodulator and sink) fed from one splitter,
+        // run with each scheduler mode ("threads" or "pool", see dsp/scheduler.h)
+        std::vector<int> chainCounts = { 10, 100 };
+        std::vector<std::string> schedulers = { "threads", "pool" };
+
+        // Only run cases of these blocks ("fir", "resampler", "fft", "chains" or a demodulator), all if empty
+        std::vector<std::string> blocks;
+
+        // Throws std::runtime_error on unknown keys or invalid values
+        static Config fromJson(const nlohmann::json& json);
+        nlohmann::json toJson() const;
+    };
+
+    struct Case {
+        // Unique name used to match results with a baseline, eg. "fir/taps=128/buffer=65536"
+        std::string name;
+        std::string block;
+
+        // Tap count, output samplerate, FFT size or chain count, 0 for demodulators
+        double param;
+        int bufferSize;
+
+        // Scheduler mode of the chain cases, empty for the others
+        std::string scheduler;
+    };
+
+    struct Result {
+        Case benchCase;
+        double samplesPerSecond;
+        uint64_t buffers;
+
+        // CPU time of the whole process (writer, block and reader threads) over wall time
+        double cpuPercent;
+
+        // Buffers allocated with buffer::alloc() while the case ran
+        uint64_t bufferAllocations;
+
+        // Heap allocations while the case ran, -1 unless a heap counter was set
+        int64_t heapAllocations;
+    };
+
+    struct Regression {
+        std::string name;
+        std::string metric;
+        double baseline;
+        double current;
+    };
+
+    // Count heap allocations with the given function, for programs that replace operator new
+    void setHeapCounter(uint64_t (*counter)());
+
+    std::vector<Case> listCases(const Config& config);
+
+    // Run a case with the duration and samplerates of a config, throws std::runtime_error if it's invalid
+    Result runCase(const Case& benchCase, const Config& config);
+
+    // Run all cases of a config, calling progress after each of them
+    std::vector<Result> runAll(const Config& config, std::function<void(const Result&)> progress = NULL);
+
+    // Report with the config and the results of all cases
+    nlohmann::json toJson(const Config& config, const std::vector<Result>& results);
+
+    // Compare two reports. A case regresses when its throughput dropped by more than threshold
+    // (eg. 0.1 for 10%) or when it makes at least one more allocation every two buffers.
+    // Cases missing from one of the reports are ignored.
+    std::vector<Regression> compare(const nlohmann::json& report, const nlohmann::json& baseline, double threshold);
+}
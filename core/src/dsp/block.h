@@ -3,7 +3,9 @@
 #include <thread>
 #include <vector>
 #include <algorithm>
+#include <typeinfo>
 #include "stream.h"
+#include "scheduler.h"
 #include "types.h"
 
 namespace dsp {
@@ -15,12 +17,15 @@ namespace dsp {
         virtual int run() { return -1; }
     };
 
-    class block : public generic_block {
+    class block : public generic_block, public scheduler::Task {
     public:
         virtual ~block() {
-            if (!_block_init) { return; }
-            stop();
-            _block_init = false;
+            // The worker registers the metrics from its thread, so it must be joined before unregistering
+            if (_block_init) {
+                stop();
+                _block_init = false;
+            }
+            metrics::unregisterBlock(&counters);
         }
 
         virtual void start() {
@@ -63,12 +68,69 @@ namespace dsp {
 
         virtual int run() = 0;
 
+        // Name shown in the metrics
+        void setMetricsName(const std::string& name) {
+            metrics::setName(&counters, name);
+        }
+
+        metrics::BlockCounters counters;
+
+        // Pooled mode, see scheduler.h
+        bool schedulerReady() {
+            for (auto& in : inputs) {
+                if (!in->readable()) { return false; }
+            }
+            for (auto& out : outputs) {
+                if (!out->writable()) { return false; }
+            }
+            return true;
+        }
+
+        bool schedulerRun() {
+            return measuredRun() >= 0;
+        }
+
     protected:
+        void registerMetrics() {
+            std::vector<metrics::StreamCounters*> inCounters;
+            std::vector<metrics::StreamCounters*> outCounters;
+            for (auto& in : inputs) { inCounters.push_back(&in->counters); }
+            for (auto& out : outputs) { outCounters.push_back(&out->counters); }
+            metrics::registerBlock(&counters, typeid(*this).name(), inCounters, outCounters);
+        }
+
+        int measuredRun() {
+            uint64_t start = metrics::now();
+            uint64_t waitStart = metrics::getThreadWait();
+            int count = run();
+            if (count < 0) { return count; }
+
+            // Time spent in run() minus the time waited on streams
+            uint64_t wait = metrics::getThreadWait() - waitStart;
+            uint64_t busy = (metrics::now() - start) - wait;
+            counters.runs.fetch_add(1, std::memory_order_relaxed);
+            counters.samples.fetch_add(count, std::memory_order_relaxed);
+            counters.busyNs.fetch_add(busy, std::memory_order_relaxed);
+            counters.waitNs.fetch_add(wait, std::memory_order_relaxed);
+            metrics::updateMax(counters.busyMaxNs, busy);
+            return count;
+        }
+
         void workerLoop() {
-            while (run() >= 0) {}
+            registerMetrics();
+            while (measuredRun() >= 0);
         }
 
         virtual void doStart() {
+            // Sources have nothing to wait on so they keep their thread
+            if (scheduler::getMode() == scheduler::Mode::POOL && allowPool && !inputs.empty()) {
+                registerMetrics();
+                for (auto& in : inputs) { in->setReaderTask(this); }
+                for (auto& out : outputs) { out->setWriterTask(this); }
+                pooled = true;
+                scheduler::attach(this);
+                return;
+            }
             workerThread = std::thread(&block::workerLoop, this);
         }
 
@@ -80,6 +142,13 @@ namespace dsp {
                 out->stopWriter();
             }
 
+            if (pooled) {
+                scheduler::detach(this);
+                for (auto& in : inputs) { in->clearReaderTask(this); }
+                for (auto& out : outputs) { out->clearWriterTask(this); }
+                pooled = false;
+            }
+
             // TODO: Make sure this isn't needed, I don't know why it stops
             if (workerThread.joinable()) {
                 workerThread.join();
@@ -128,5 +197,9 @@ namespace dsp {
         bool tempStopped = false;
         int tempStopDepth = 0;
         std::thread workerThread;
+
+        // Set to false by blocks that must keep their own thread in pooled mode, because run() waits on something else than streams
+        bool allowPool = true;
+        bool pooled = false;
     };
 }
\ No newline at end of file
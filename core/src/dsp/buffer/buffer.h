@@ -1,10 +1,12 @@
 #pragma once
 #include <volk/volk.h>
 #include <string.h>
+#include "../metrics.h"
 
 namespace dsp::buffer {
     template<class T>
     inline T* alloc(int count) {
+        metrics::countAllocation();
         return (T*)volk_malloc(count * sizeof(T), volk_get_alignment());
     }
 
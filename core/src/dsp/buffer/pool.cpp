@@ -0,0 +1,150 @@
+#include "pool.h"
+#include "buffer.h"
+#include <algorithm>
+#include <mutex>
+#ifdef __linux__
+#include <sys/mman.h>
+#include <unistd.h>
+#endif
+
+namespace dsp::buffer::pool {
+    // Cached buffers from this size have their memory pages given back to the system
+    static const size_t RELEASE_PAGES_SIZE = 256 * 1024;
+    static const int CLASS_COUNT = 48;
+
+    struct SizeClass {
+        std::vector<void*> cached;
+        uint64_t inUse = 0;
+    };
+
+    struct Pool {
+        std::mutex mtx;
+        SizeClass classes[CLASS_COUNT];
+        uint64_t inUseBytes = 0;
+        uint64_t cachedBytes = 0;
+        uint64_t peakInUseBytes = 0;
+        uint64_t hits = 0;
+        uint64_t misses = 0;
+        size_t cacheLimit = 64 * 1024 * 1024;
+    };
+
+    // Never destroyed, streams of global objects release their buffers after static destruction
+    static Pool& pool() {
+        static Pool* p = new Pool;
+        return *p;
+    }
+
+    static int classIndex(size_t bytes) {
+        int id = 0;
+        while (id < CLASS_COUNT - 1 && (MIN_CLASS_SIZE << id) < bytes) { id++; }
+        return id;
+    }
+
+    static void releasePages(void* buffer, size_t bytes) {
+#ifdef __linux__
+        if (bytes < RELEASE_PAGES_SIZE) { return; }
+        uintptr_t page = sysconf(_SC_PAGESIZE);
+        uintptr_t start = ((uintptr_t)buffer + page - 1) & ~(page - 1);
+        uintptr_t end = ((uintptr_t)buffer + bytes) & ~(page - 1);
+        if (end > start) { madvise((void*)start, end - start, MADV_DONTNEED); }
+#endif
+    }
+
+    // Must be called with the pool locked
+    static void evict(Pool& p, size_t limit) {
+        for (int id = CLASS_COUNT - 1; id >= 0 && p.cachedBytes > limit; id--) {
+            auto& cached = p.classes[id].cached;
+            while (!cached.empty() && p.cachedBytes > limit) {
+                buffer::free(cached.back());
+                cached.pop_back();
+                p.cachedBytes -= MIN_CLASS_SIZE << id;
+            }
+        }
+    }
+
+    size_t classSize(size_t bytes) {
+        return MIN_CLASS_SIZE << classIndex(bytes);
+    }
+
+    void* acquire(size_t bytes) {
+        int id = classIndex(bytes);
+        size_t size = MIN_CLASS_SIZE << id;
+        Pool& p = pool();
+        void* buffer = NULL;
+        {
+            std::lock_guard<std::mutex> lck(p.mtx);
+            SizeClass& sc = p.classes[id];
+            if (!sc.cached.empty()) {
+                buffer = sc.cached.back();
+                sc.cached.pop_back();
+                p.cachedBytes -= size;
+                p.hits++;
+            }
+            else {
+                p.misses++;
+            }
+            sc.inUse++;
+            p.inUseBytes += size;
+            p.peakInUseBytes = std::max<uint64_t>(p.peakInUseBytes, p.inUseBytes);
+        }
+        if (!buffer) { buffer = buffer::alloc<uint8_t>(size); }
+        return buffer;
+    }
+
+    void release(void* buffer, size_t bytes) {
+        if (!buffer) { return; }
+        int id = classIndex(bytes);
+        size_t size = MIN_CLASS_SIZE << id;
+        Pool& p = pool();
+        {
+            std::lock_guard<std::mutex> lck(p.mtx);
+            SizeClass& sc = p.classes[id];
+            sc.inUse--;
+            p.inUseBytes -= size;
+            if (p.cachedBytes + size <= p.cacheLimit) {
+                releasePages(buffer, size);
+                sc.cached.push_back(buffer);
+                p.cachedBytes += size;
+                return;
+            }
+        }
+        buffer::free(buffer);
+    }
+
+    void setCacheLimit(size_t bytes) {
+        Pool& p = pool();
+        std::lock_guard<std::mutex> lck(p.mtx);
+        p.cacheLimit = bytes;
+        evict(p, bytes);
+    }
+
+    size_t getCacheLimit() {
+        Pool& p = pool();
+        std::lock_guard<std::mutex> lck(p.mtx);
+        return p.cacheLimit;
+    }
+
+    void trim() {
+        Pool& p = pool();
+        std::lock_guard<std::mutex> lck(p.mtx);
+        evict(p, 0);
+    }
+
+    Stats getStats() {
+        Pool& p = pool();
+        std::lock_guard<std::mutex> lck(p.mtx);
+        Stats stats;
+        stats.inUseBytes = p.inUseBytes;
+        stats.cachedBytes = p.cachedBytes;
+        stats.peakInUseBytes = p.peakInUseBytes;
+        stats.hits = p.hits;
+        stats.misses = p.misses;
+        stats.cacheLimit = p.cacheLimit;
+        for (int id = 0; id < CLASS_COUNT; id++) {
+            const SizeClass& sc = p.classes[id];
+            if (!sc.inUse && sc.cached.empty()) { continue; }
+            stats.classes.push_back({ MIN_CLASS_SIZE << id, sc.inUse, sc.cached.size() });
+        }
+        return stats;
+    }
+}
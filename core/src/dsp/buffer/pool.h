@@ -0,0 +1,47 @@
+#pragma once
+#include <stddef.h>
+#include <stdint.h>
+#include <vector>
+
+// Shared pool of sample buffers, used for the buffers of the streams.
+// Sizes are rounded up to a power of two (the size class) of at least MIN_CLASS_SIZE bytes. Released
+// buffers are kept per size class and reused by the next buffer of the same class, as long as all
+// cached buffers fit in the cache limit. The memory pages of large cached buffers are given back to
+// the system, so they only take address space until they're reused.
+
+namespace dsp::buffer::pool {
+    const size_t MIN_CLASS_SIZE = 4096;
+
+    struct ClassStats {
+        size_t size;
+        uint64_t inUse;
+        uint64_t cached;
+    };
+
+    // Sizes are in bytes, only the size classes with buffers are listed
+    struct Stats {
+        uint64_t inUseBytes;
+        uint64_t cachedBytes;
+        uint64_t peakInUseBytes;
+        uint64_t hits;
+        uint64_t misses;
+        size_t cacheLimit;
+        std::vector<ClassStats> classes;
+    };
+
+    // Size of the buffers of the size class of a given size
+    size_t classSize(size_t bytes);
+
+    // Aligned buffer of at least the given size, to be given back with release() with the same size
+    void* acquire(size_t bytes);
+    void release(void* buffer, size_t bytes);
+
+    // Maximum total size of the cached buffers, the extra ones are freed
+    void setCacheLimit(size_t bytes);
+    size_t getCacheLimit();
+
+    // Free all cached buffers
+    void trim();
+
+    Stats getStats();
+}
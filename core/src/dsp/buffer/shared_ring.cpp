@@ -0,0 +1,283 @@
+#include "shared_ring.h"
+#include <algorithm>
+#include <chrono>
+#include <thread>
+#include <stdexcept>
+#include <string.h>
+#ifdef _WIN32
+#include <Windows.h>
+#else
+#include <unistd.h>
+#endif
+
+#define SHARED_RING_MAGIC "SDRPPIQ"
+
+namespace dsp::buffer {
+    static uint64_t toBits(double value) {
+        uint64_t bits;
+        memcpy(&bits, &value, sizeof(bits));
+        return bits;
+    }
+
+    static double fromBits(uint64_t bits) {
+        double value;
+        memcpy(&value, &bits, sizeof(value));
+        return value;
+    }
+
+    static uint32_t processId() {
+#ifdef _WIN32
+        return GetCurrentProcessId();
+#else
+        return getpid();
+#endif
+    }
+
+    SharedRingWriter::~SharedRingWriter() {
+        close();
+    }
+
+    void SharedRingWriter::create(std::string name, uint64_t capacity) {
+        close();
+
+        // Power of two so that the cursors can wrap around without a division
+        uint64_t size = 1;
+        while (size < capacity) { size <<= 1; }
+        uint64_t dataOffset = (sizeof(shared_ring::Header) + 63) & ~(uint64_t)63;
+        if (!shm.create(name, dataOffset + size * sizeof(complex_t))) {
+            throw std::runtime_error("Could not create the shared memory '" + name + "'");
+        }
+
+        header = (shared_ring::Header*)shm.data();
+        memset((void*)header, 0, dataOffset);
+        header->version = shared_ring::VERSION;
+        header->sampleSize = sizeof(complex_t);
+        header->capacity = size;
+        header->dataOffset = dataOffset;
+        header->running.store(1);
+
+        // Readers only accept the ring once the magic is there
+        std::atomic_thread_fence(std::memory_order_release);
+        memcpy(header->magic, SHARED_RING_MAGIC, sizeof(header->magic));
+
+        ring = (complex_t*)(shm.data() + dataOffset);
+        this->capacity = size;
+        _name = name;
+    }
+
+    void SharedRingWriter::close() {
+        if (!header) { return; }
+        header->running.store(0, std::memory_order_release);
+        shm.close();
+        header = NULL;
+        ring = NULL;
+        capacity = 0;
+    }
+
+    void SharedRingWriter::write(const complex_t* data, int count) {
+        if (!header || count <= 0) { return; }
+
+        // Only the last samples of a write larger than the ring are kept
+        uint64_t end = header->written.load(std::memory_order_relaxed) + count;
+        if ((uint64_t)count > capacity) {
+            data += count - capacity;
+            count = capacity;
+        }
+        uint64_t start = end - count;
+
+        // Readers check reserved after reading to know if the samples changed under them
+        header->reserved.store(end, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_release);
+
+        uint64_t offset = start & (capacity - 1);
+        uint64_t first = std::min<uint64_t>(count, capacity - offset);
+        memcpy(&ring[offset], data, first * sizeof(complex_t));
+        if (first < (uint64_t)count) {
+            memcpy(ring, &data[first], (count - first) * sizeof(complex_t));
+        }
+
+        header->written.store(end, std::memory_order_release);
+    }
+
+    void SharedRingWriter::setSamplerate(double samplerate) {
+        if (!header) { return; }
+        header->samplerate.store(toBits(samplerate));
+    }
+
+    void SharedRingWriter::setFrequency(double frequency) {
+        if (!header) { return; }
+        header->frequency.store(toBits(frequency));
+    }
+
+    uint64_t SharedRingWriter::getWrittenSamples() {
+        if (!header) { return 0; }
+        return header->written.load();
+    }
+
+    std::vector<shared_ring::ReaderInfo> SharedRingWriter::getReaders() {
+        std::vector<shared_ring::ReaderInfo> readers;
+        if (!header) { return readers; }
+        uint64_t written = header->written.load();
+        for (int i = 0; i < shared_ring::MAX_READERS; i++) {
+            shared_ring::ReaderSlot& slot = header->readers[i];
+            if (!slot.active.load()) { continue; }
+            uint64_t cursor = slot.cursor.load();
+            readers.push_back({
+                i,
+                slot.pid.load(),
+                (written > cursor) ? (written - cursor) : 0,
+                slot.overruns.load(),
+                slot.droppedSamples.load()
+            });
+        }
+        return readers;
+    }
+
+    SharedRingReader::~SharedRingReader() {
+        close();
+    }
+
+    void SharedRingReader::open(std::string name) {
+        close();
+        if (!shm.open(name)) {
+            throw std::runtime_error("Could not open the shared memory '" + name + "'");
+        }
+
+        shared_ring::Header* hdr = (shared_ring::Header*)shm.data();
+        bool valid = shm.size() >= sizeof(shared_ring::Header) && !memcmp(hdr->magic, SHARED_RING_MAGIC, sizeof(hdr->magic));
+        std::atomic_thread_fence(std::memory_order_acquire);
+        if (!valid || hdr->version != shared_ring::VERSION || hdr->sampleSize != sizeof(complex_t) ||
+            !hdr->capacity || (hdr->capacity & (hdr->capacity - 1)) || shm.size() < hdr->dataOffset + hdr->capacity * sizeof(complex_t)) {
+            shm.close();
+            throw std::runtime_error("'" + name + "' is not a compatible sample ring");
+        }
+
+        header = hdr;
+        ring = (const complex_t*)(shm.data() + hdr->dataOffset);
+        capacity = hdr->capacity;
+        cursor = header->written.load(std::memory_order_acquire);
+        acquiredStart = cursor;
+        acquired = 0;
+        overruns = 0;
+        droppedSamples = 0;
+        readSamples = 0;
+
+        // Take a reader slot. Without a free one the reader still works, the writer just can't see it.
+        for (int i = 0; i < shared_ring::MAX_READERS; i++) {
+            uint32_t expected = 0;
+            if (header->readers[i].active.compare_exchange_strong(expected, 1)) {
+                slot = &header->readers[i];
+                slot->pid.store(processId());
+                slot->overruns.store(0);
+                slot->droppedSamples.store(0);
+                publish();
+                break;
+            }
+        }
+    }
+
+    void SharedRingReader::close() {
+        if (!header) { return; }
+        if (slot) {
+            slot->active.store(0);
+            slot = NULL;
+        }
+        shm.close();
+        header = NULL;
+        ring = NULL;
+        capacity = 0;
+    }
+
+    void SharedRingReader::leak() {
+        if (slot) {
+            slot->active.store(0);
+            slot = NULL;
+        }
+        shm.leak();
+        header = NULL;
+        ring = NULL;
+        capacity = 0;
+    }
+
+    int SharedRingReader::acquire(int maxCount, double timeoutMs) {
+        if (!header) { throw std::runtime_error("Reader is not open"); }
+        release();
+
+        // Poll, the writer doesn't signal other processes
+        auto deadline = std::chrono::steady_clock::now() + std::chrono::duration<double, std::milli>(std::max<double>(timeoutMs, 0.0));
+        uint64_t written = header->written.load(std::memory_order_acquire);
+        while (written == cursor) {
+            if (!header->running.load()) {
+                // The writer may have written a last buffer before closing
+                written = header->written.load(std::memory_order_acquire);
+                if (written == cursor) { return -1; }
+                break;
+            }
+            if (timeoutMs >= 0 && std::chrono::steady_clock::now() >= deadline) { return 0; }
+            std::this_thread::sleep_for(std::chrono::microseconds(500));
+            written = header->written.load(std::memory_order_acquire);
+        }
+
+        // Skip what was overwritten, and half of the ring more so that the reader has a chance to catch up
+        uint64_t reserved = header->reserved.load(std::memory_order_relaxed);
+        if (reserved > cursor + capacity) {
+            uint64_t resume = reserved - capacity;
+            if (written - resume > capacity / 2) { resume = written - capacity / 2; }
+            overruns++;
+            droppedSamples += resume - cursor;
+            cursor = resume;
+        }
+
+        uint64_t offset = cursor & (capacity - 1);
+        uint64_t count = std::min<uint64_t>(std::min<uint64_t>(written - cursor, capacity - offset), std::max<int>(maxCount, 0));
+        acquiredStart = cursor;
+        acquired = count;
+        return count;
+    }
+
+    bool SharedRingReader::release() {
+        if (!header || !acquired) { return true; }
+
+        // Samples that were being overwritten while in use can't be trusted
+        std::atomic_thread_fence(std::memory_order_acquire);
+        bool valid = header->reserved.load(std::memory_order_relaxed) <= acquiredStart + capacity;
+        if (valid) {
+            readSamples += acquired;
+        }
+        else {
+            overruns++;
+            droppedSamples += acquired;
+        }
+        cursor = acquiredStart + acquired;
+        acquired = 0;
+        publish();
+        return valid;
+    }
+
+    uint64_t SharedRingReader::getAvailable() {
+        if (!header) { return 0; }
+        return header->written.load() - cursor;
+    }
+
+    double SharedRingReader::getSamplerate() {
+        if (!header) { return 0.0; }
+        return fromBits(header->samplerate.load());
+    }
+
+    double SharedRingReader::getFrequency() {
+        if (!header) { return 0.0; }
+        return fromBits(header->frequency.load());
+    }
+
+    bool SharedRingReader::isWriterRunning() {
+        if (!header) { return false; }
+        return header->running.load();
+    }
+
+    void SharedRingReader::publish() {
+        if (!slot) { return; }
+        slot->cursor.store(cursor);
+        slot->overruns.store(overruns);
+        slot->droppedSamples.store(droppedSamples);
+    }
+}
@@ -0,0 +1,148 @@
+#pragma once
+#include <atomic>
+#include <string>
+#include <vector>
+#include <stdint.h>
+#include "../types.h"
+#include "../../utils/shared_memory.h"
+
+// Ring of complex samples in named shared memory, written by one process and read by any number
+// of others without copies. The writer never waits for the readers: each reader keeps its own
+// cursor and detects when samples were overwritten before it was done with them (an overrun).
+
+namespace dsp::buffer {
+    namespace shared_ring {
+        const uint32_t VERSION = 1;
+        const int MAX_READERS = 32;
+
+        // Cursor of a reader, published so the writer can report how far behind each reader is
+        struct ReaderSlot {
+            std::atomic<uint32_t> active;
+            std::atomic<uint32_t> pid;
+            std::atomic<uint64_t> cursor;
+            std::atomic<uint64_t> overruns;
+            std::atomic<uint64_t> droppedSamples;
+        };
+
+        struct Header {
+            char magic[8];
+            uint32_t version;
+            uint32_t sampleSize;
+            uint64_t capacity;
+            uint64_t dataOffset;
+
+            // Doubles stored as their bits
+            std::atomic<uint64_t> samplerate;
+            std::atomic<uint64_t> frequency;
+
+            // Total samples written. reserved is raised before samples are copied into the ring
+            // and written once they can be read.
+            std::atomic<uint64_t> reserved;
+            std::atomic<uint64_t> written;
+
+            std::atomic<uint32_t> running;
+            ReaderSlot readers[MAX_READERS];
+        };
+
+        struct ReaderInfo {
+            int slot;
+            uint32_t pid;
+            uint64_t lag;
+            uint64_t overruns;
+            uint64_t droppedSamples;
+        };
+    }
+
+    class SharedRingWriter {
+    public:
+        SharedRingWriter() {}
+        ~SharedRingWriter();
+
+        // Create the ring, capacity is rounded up to a power of two samples.
+        // Throws std::runtime_error if the shared memory can't be created.
+        void create(std::string name, uint64_t capacity);
+
+        // Mark the ring as closed and remove its name, readers can still read what's left
+        void close();
+
+        bool isOpen() { return header != NULL; }
+
+        // Never blocks, the oldest samples are overwritten
+        void write(const complex_t* data, int count);
+
+        void setSamplerate(double samplerate);
+        void setFrequency(double frequency);
+
+        std::string getName() { return _name; }
+        uint64_t getCapacity() { return capacity; }
+        uint64_t getWrittenSamples();
+
+        // Readers currently attached to the ring
+        std::vector<shared_ring::ReaderInfo> getReaders();
+
+    private:
+        SharedMemory shm;
+        shared_ring::Header* header = NULL;
+        complex_t* ring = NULL;
+        uint64_t capacity = 0;
+        std::string _name;
+    };
+
+    class SharedRingReader {
+    public:
+        SharedRingReader() {}
+        ~SharedRingReader();
+
+        // Throws std::runtime_error if the ring doesn't exist or isn't a sample ring.
+        // Reading starts with the next samples written.
+        void open(std::string name);
+        void close();
+
+        // Keep the ring mapped after close(), for when views over data() may still be in use
+        void leak();
+
+        bool isOpen() { return header != NULL; }
+
+        // Wait at most timeoutMs (forever if negative) for samples and acquire up to maxCount of
+        // them, starting at data() + getOffset(). Fewer samples are acquired at the end of the ring.
+        // Samples the writer already overwrote are skipped and counted as an overrun.
+        // Returns the number of samples acquired, 0 on timeout or -1 once the writer closed the
+        // ring and everything was read. Releases previously acquired samples.
+        int acquire(int maxCount, double timeoutMs);
+
+        // Done with the acquired samples. Returns false if the writer overwrote some of them in
+        // the meantime, in which case they must be discarded.
+        bool release();
+
+        const complex_t* data() { return ring; }
+        uint64_t getOffset() { return acquiredStart & (capacity - 1); }
+        uint64_t getCapacity() { return capacity; }
+
+        // Samples written but not acquired yet
+        uint64_t getAvailable();
+
+        double getSamplerate();
+        double getFrequency();
+        bool isWriterRunning();
+
+        uint64_t getOverruns() { return overruns; }
+        uint64_t getDroppedSamples() { return droppedSamples; }
+        uint64_t getReadSamples() { return readSamples; }
+
+    private:
+        void publish();
+
+        SharedMemory shm;
+        shared_ring::Header* header = NULL;
+        shared_ring::ReaderSlot* slot = NULL;
+        const complex_t* ring = NULL;
+        uint64_t capacity = 0;
+
+        uint64_t cursor = 0;
+        uint64_t acquiredStart = 0;
+        uint64_t acquired = 0;
+        uint64_t overruns = 0;
+        uint64_t droppedSamples = 0;
+        uint64_t readSamples = 0;
+    };
+}
@@ -53,6 +53,7 @@ namespace dsp::channel {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(count);
             process(count, base_type::_in->readBuf, base_type::out.writeBuf);
 
             base_type::_in->flush();
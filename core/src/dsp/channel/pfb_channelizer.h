@@ -0,0 +1,190 @@
+#pragma once
+#include <vector>
+#include <fftw3.h>
+#include "../block.h"
+#include "../taps/windowed_sinc.h"
+#include "../window/nuttall.h"
+
+namespace dsp::channel {
+    // Critically sampled polyphase filter bank channelizer.
+    // Splits the input into channelCount evenly spaced channels of samplerate / channelCount each,
+    // with a single polyphase filtering pass and one FFT per output sample.
+    // Channel c is centered on c * samplerate / channelCount (channels above channelCount / 2 are
+    // negative frequencies). Only enabled channels are written to their output stream.
+    class PFBChannelizer : public block {
+    public:
+        PFBChannelizer() {}
+
+        PFBChannelizer(stream<complex_t>* in, int channelCount, int tapsPerChannel = 16) { init(in, channelCount, tapsPerChannel); }
+
+        ~PFBChannelizer() {
+            if (!_block_init) { return; }
+            stop();
+            for (auto& buf : branchBufs) { buffer::free(buf); }
+            for (auto& t : branchTaps) { buffer::free(t); }
+            fftwf_destroy_plan(fftPlan);
+            fftwf_free(fftIn);
+            fftwf_free(fftOut);
+            delete[] out;
+        }
+
+        void init(stream<complex_t>* in, int channelCount, int tapsPerChannel = 16) {
+            _in = in;
+            _channelCount = channelCount;
+            _tapsPerBranch = tapsPerChannel;
+            maxGroups = (STREAM_BUFFER_SIZE / _channelCount) + 1;
+
+            // Prototype low-pass filter with a cutoff at half a channel width
+            tap<float> proto = taps::windowedSinc<float>(_channelCount * _tapsPerBranch, 0.5 / (double)_channelCount, 1.0, window::nuttall);
+
+            // Split the prototype into branches, taps are reversed for use with dot products
+            for (int p = 0; p < _channelCount; p++) {
+                float* t = buffer::alloc<float>(_tapsPerBranch);
+                for (int j = 0; j < _tapsPerBranch; j++) {
+                    t[j] = proto.taps[(_tapsPerBranch - 1 - j) * _channelCount + p];
+                }
+                branchTaps.push_back(t);
+
+                complex_t* buf = buffer::alloc<complex_t>(_tapsPerBranch + maxGroups);
+                buffer::clear<complex_t>(buf, _tapsPerBranch + maxGroups);
+                branchBufs.push_back(buf);
+            }
+            taps::free(proto);
+
+            fftIn = (fftwf_complex*)fftwf_malloc(_channelCount * sizeof(fftwf_complex));
+            fftOut = (fftwf_complex*)fftwf_malloc(_channelCount * sizeof(fftwf_complex));
+            fftPlan = fftwf_plan_dft_1d(_channelCount, fftIn, fftOut, FFTW_BACKWARD, FFTW_ESTIMATE);
+
+            // Channel outputs only ever hold one sample per group of input samples
+            out = new stream<complex_t>[_channelCount];
+            for (int c = 0; c < _channelCount; c++) {
+                out[c].setBufferSize(maxGroups);
+            }
+            enabled.resize(_channelCount, false);
+
+            registerInput(_in);
+            _block_init = true;
+        }
+
+        void setInput(stream<complex_t>* in) {
+            assert(_block_init);
+            std::lock_guard<std::recursive_mutex> lck(ctrlMtx);
+            tempStop();
+            unregisterInput(_in);
+            _in = in;
+            registerInput(_in);
+            tempStart();
+        }
+
+        void setChannelEnabled(int channel, bool enable) {
+            assert(_block_init);
+            std::lock_guard<std::recursive_mutex> lck(ctrlMtx);
+            if (channel < 0 || channel >= _channelCount || enabled[channel] == enable) { return; }
+            tempStop();
+            enabled[channel] = enable;
+            if (enable) {
+                registerOutput(&out[channel]);
+            }
+            else {
+                unregisterOutput(&out[channel]);
+            }
+            tempStart();
+        }
+
+        bool isChannelEnabled(int channel) {
+            return (channel >= 0 && channel < _channelCount) ? (bool)enabled[channel] : false;
+        }
+
+        void reset() {
+            assert(_block_init);
+            std::lock_guard<std::recursive_mutex> lck(ctrlMtx);
+            tempStop();
+            for (auto& buf : branchBufs) { buffer::clear<complex_t>(buf, _tapsPerBranch + maxGroups); }
+            groupPos = 0;
+            tempStart();
+        }
+
+        int getChannelCount() { return _channelCount; }
+
+        // Offset of the center of a channel from the center of the input, as a fraction of the input samplerate
+        double getChannelOffset(int channel) {
+            int c = (channel > _channelCount / 2) ? (channel - _channelCount) : channel;
+            return (double)c / (double)_channelCount;
+        }
+
+        // Process count input samples, outs[c] receives the output of channel c if not NULL.
+        // Returns the number of samples written to each channel output.
+        inline int process(int count, const complex_t* in, complex_t** outs) {
+            // Commutate the input into the branch delay lines.
+            // The newest sample of a group goes to branch 0, the oldest to branch channelCount - 1.
+            int groups = 0;
+            for (int i = 0; i < count; i++) {
+                branchBufs[_channelCount - 1 - groupPos][_tapsPerBranch - 1 + groups] = in[i];
+                if (++groupPos == _channelCount) {
+                    groupPos = 0;
+                    groups++;
+                }
+            }
+
+            // Filter each branch and combine them with a single FFT per output sample
+            for (int m = 0; m < groups; m++) {
+                for (int p = 0; p < _channelCount; p++) {
+                    volk_32fc_32f_dot_prod_32fc((lv_32fc_t*)&fftIn[p], (lv_32fc_t*)&branchBufs[p][m], branchTaps[p], _tapsPerBranch);
+                }
+                fftwf_execute(fftPlan);
+                for (int c = 0; c < _channelCount; c++) {
+                    if (!outs[c]) { continue; }
+                    outs[c][m].re = fftOut[c][0];
+                    outs[c][m].im = fftOut[c][1];
+                }
+            }
+
+            // Keep the history and the samples of the incomplete group
+            for (int p = 0; p < _channelCount; p++) {
+                memmove(branchBufs[p], &branchBufs[p][groups], _tapsPerBranch * sizeof(complex_t));
+            }
+
+            return groups;
+        }
+
+        int run() {
+            int count = _in->read();
+            if (count < 0) { return -1; }
+
+            // Only write enabled channels
+            outPtrs.resize(_channelCount);
+            for (int c = 0; c < _channelCount; c++) {
+                outPtrs[c] = enabled[c] ? out[c].writeBuf : NULL;
+            }
+
+            int outCount = process(count, _in->readBuf, outPtrs.data());
+
+            _in->flush();
+            if (outCount) {
+                for (int c = 0; c < _channelCount; c++) {
+                    if (!enabled[c]) { continue; }
+                    if (!out[c].swap(outCount)) { return -1; }
+                }
+            }
+            return outCount;
+        }
+
+        stream<complex_t>* out = NULL;
+
+    protected:
+        stream<complex_t>* _in;
+        int _channelCount;
+        int _tapsPerBranch;
+        int maxGroups;
+        int groupPos = 0;
+
+        std::vector<float*> branchTaps;
+        std::vector<complex_t*> branchBufs;
+        std::vector<char> enabled;
+        std::vector<complex_t*> outPtrs;
+
+        fftwf_complex* fftIn;
+        fftwf_complex* fftOut;
+        fftwf_plan fftPlan;
+    };
+}
@@ -28,6 +28,9 @@ namespace dsp::channel {
             resamp.init(NULL, _inSamplerate, _outSamplerate);
             generateTaps();
             filter.init(NULL, ftaps);
+            xlator.out.free();
+            resamp.out.free();
+            filter.out.free();
 
             base_type::init(in);
         }
@@ -103,6 +106,8 @@ namespace dsp::channel {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            // The translated samples are written to the output first, then resampled in place
+            out.reserve(std::max<int>(count, resamp.maxOutputCount(count)));
             int outCount = process(count, base_type::_in->readBuf, out.writeBuf);
 
             // Swap if some data was generated
@@ -44,10 +44,11 @@ namespace dsp::compression {
                 return 8 + (count * sizeof(complex_t));
             }
 
-            // Find maximum value
+            // Scale by the largest magnitude so that no component can clip, whatever its sign
             uint32_t maxIdx;
-            volk_32f_index_max_32u(&maxIdx, (float*)in, count * 2);
-            float maxVal = ((float*)in)[maxIdx];
+            volk_32fc_index_max_32u(&maxIdx, (lv_32fc_t*)in, count);
+            float maxVal = sqrtf(in[maxIdx].re * in[maxIdx].re + in[maxIdx].im * in[maxIdx].im);
+            if (maxVal <= 0.0f) { maxVal = 1.0f; }
             *scaler = maxVal;
 
             // Convert to the right type and send it out (sign bit determines pcm type)
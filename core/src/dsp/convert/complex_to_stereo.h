@@ -15,6 +15,7 @@ namespace dsp::convert {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(count);
             memcpy(base_type::out.writeBuf, base_type::_in->readBuf, count * sizeof(complex_t));
 
             base_type::_in->flush();
@@ -95,6 +95,10 @@ namespace dsp::demod {
             carrierAgc.reset();
             audioAgc.reset();
             dcBlock.reset();
+            {
+                std::lock_guard<std::mutex> lck2(lpfMtx);
+                lpf.reset();
+            }
             base_type::tempStart();
         }
 
@@ -136,6 +140,7 @@ namespace dsp::demod {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(count);
             process(count, base_type::_in->readBuf, base_type::out.writeBuf);
 
             base_type::_in->flush();
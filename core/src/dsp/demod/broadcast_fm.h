@@ -13,6 +13,7 @@
 #include "../math/add.h"
 #include "../math/subtract.h"
 #include "../multirate/rational_resampler.h"
+#include "../channel/frequency_xlator.h"
 
 namespace dsp::demod {
     class BroadcastFM : public Processor<complex_t, stereo_t> {
@@ -219,6 +220,7 @@ namespace dsp::demod {
             if (count < 0) { return -1; }
 
             int rdsOutCount = 0;
+            base_type::out.reserve(count);
             process(count, base_type::_in->readBuf, base_type::out.writeBuf, rdsOutCount, rdsOut.writeBuf);
 
             base_type::_in->flush();
@@ -0,0 +1,216 @@
+#pragma once
+#include <vector>
+#include <algorithm>
+#include <math.h>
+#include <volk/volk.h>
+
+namespace dsp::detector {
+    // Constant false alarm rate detector over power spectrum frames in dB (eg. the FFT frames of
+    // IQFrontEnd). The noise around each bin is estimated from the training cells on both sides
+    // of it, skipping the guard cells next to it, and the bin is detected once its level is
+    // threshold dB above that estimate. Adjacent detected bins are merged into one detection.
+    //
+    // Cell averaging (CA) takes the mean of the training cells, in dB. Ordered statistic (OS)
+    // takes the training cell at the given rank instead, which isn't raised by strong neighbours
+    // but costs keeping the training cells sorted.
+    class CFAR {
+    public:
+        enum Mode {
+            CELL_AVERAGING,
+            ORDERED_STATISTIC
+        };
+
+        struct Detection {
+            int firstBin;
+            int lastBin;
+            int peakBin;
+
+            // Power weighted center, in (fractional) bins
+            float centerBin;
+
+            // Level of the peak bin, noise estimate at the peak bin and their difference, in dB
+            float level;
+            float noise;
+            float snr;
+        };
+
+        CFAR() {}
+
+        CFAR(Mode mode, int guard, int training, float threshold, float rank = 0.75f, int mergeGap = 0, int minBins = 1) {
+            init(mode, guard, training, threshold, rank, mergeGap, minBins);
+        }
+
+        void init(Mode mode, int guard, int training, float threshold, float rank = 0.75f, int mergeGap = 0, int minBins = 1) {
+            _mode = mode;
+            setWindow(guard, training);
+            setThreshold(threshold);
+            setRank(rank);
+            setMerge(mergeGap, minBins);
+        }
+
+        void setMode(Mode mode) {
+            _mode = mode;
+        }
+
+        // Guard and training cells on each side of the bin under test
+        void setWindow(int guard, int training) {
+            _guard = std::max<int>(guard, 0);
+            _training = std::max<int>(training, 1);
+        }
+
+        void setThreshold(float threshold) {
+            _threshold = threshold;
+        }
+
+        // Rank of the training cell used by OS-CFAR, from 0 (lowest) to 1 (highest)
+        void setRank(float rank) {
+            _rank = std::clamp<float>(rank, 0.0f, 1.0f);
+        }
+
+        // Detected bins separated by at most mergeGap undetected bins are merged, and detections
+        // narrower than minBins are discarded
+        void setMerge(int mergeGap, int minBins) {
+            _mergeGap = std::max<int>(mergeGap, 0);
+            _minBins = std::max<int>(minBins, 1);
+        }
+
+        // Detect signals in a frame of count bins. The detections replace the content of the vector,
+        // returns their number.
+        int process(int count, const float* in, std::vector<Detection>& detections) {
+            detections.clear();
+            if (count <= 0) { return 0; }
+            noiseBuf.resize(count);
+            snrBuf.resize(count);
+
+            if (_mode == ORDERED_STATISTIC) {
+                estimateOS(count, in);
+            }
+            else {
+                estimateCA(count, in);
+            }
+
+            // Margin of each bin over its noise estimate
+            volk_32f_x2_subtract_32f(snrBuf.data(), in, noiseBuf.data(), count);
+
+            // Group the bins over the threshold, tolerating short gaps
+            int first = -1;
+            int last = -1;
+            for (int i = 0; i < count; i++) {
+                if (snrBuf[i] < _threshold) { continue; }
+                if (first >= 0 && i - last - 1 > _mergeGap) {
+                    addDetection(first, last, in, detections);
+                    first = -1;
+                }
+                if (first < 0) { first = i; }
+                last = i;
+            }
+            if (first >= 0) { addDetection(first, last, in, detections); }
+
+            return detections.size();
+        }
+
+        // Noise estimate of each bin of the last processed frame, in dB
+        const std::vector<float>& getNoise() { return noiseBuf; }
+
+    private:
+        void estimateCA(int count, const float* in) {
+            // Window sums from a prefix sum, in double so the long sums don't lose the small differences
+            prefix.resize(count + 1);
+            prefix[0] = 0.0;
+            for (int i = 0; i < count; i++) { prefix[i + 1] = prefix[i] + in[i]; }
+
+            for (int i = 0; i < count; i++) {
+                // Training cells on the left and on the right, cut at the edges of the frame
+                int lStart = std::max<int>(i - _guard - _training, 0);
+                int lEnd = std::max<int>(i - _guard, 0);
+                int rStart = std::min<int>(i + _guard + 1, count);
+                int rEnd = std::min<int>(i + _guard + _training + 1, count);
+                int cells = (lEnd - lStart) + (rEnd - rStart);
+                if (!cells) {
+                    noiseBuf[i] = in[i];
+                    continue;
+                }
+                double sum = (prefix[lEnd] - prefix[lStart]) + (prefix[rEnd] - prefix[rStart]);
+                noiseBuf[i] = sum / (double)cells;
+            }
+        }
+
+        void estimateOS(int count, const float* in) {
+            // The training cells are kept sorted while the window slides, two leave and two enter per bin
+            cells.clear();
+            for (int j = 0; j < std::min<int>(_guard + _training + 1, count); j++) {
+                if (j > _guard) { insertCell(in[j]); }
+            }
+
+            for (int i = 0; i < count; i++) {
+                int n = cells.size();
+                if (n) {
+                    int k = roundf(_rank * (float)(n - 1));
+                    noiseBuf[i] = cells[k];
+                }
+                else {
+                    noiseBuf[i] = in[i];
+                }
+
+                // Slide to the next bin
+                int leftOut = i - _guard - _training;
+                int leftIn = i - _guard;
+                int rightOut = i + _guard + 1;
+                int rightIn = i + _guard + _training + 1;
+                if (leftOut >= 0) { removeCell(in[leftOut]); }
+                if (leftIn >= 0 && leftIn < count) { insertCell(in[leftIn]); }
+                if (rightOut < count) { removeCell(in[rightOut]); }
+                if (rightIn < count) { insertCell(in[rightIn]); }
+            }
+        }
+
+        inline void insertCell(float value) {
+            cells.insert(std::upper_bound(cells.begin(), cells.end(), value), value);
+        }
+
+        inline void removeCell(float value) {
+            cells.erase(std::lower_bound(cells.begin(), cells.end(), value));
+        }
+
+        void addDetection(int first, int last, const float* in, std::vector<Detection>& detections) {
+            if (last - first + 1 < _minBins) { return; }
+
+            int peak = first;
+            for (int i = first + 1; i <= last; i++) {
+                if (in[i] > in[peak]) { peak = i; }
+            }
+
+            // Centroid of the linear power, relative to the peak to stay in range
+            double weights = 0.0;
+            double center = 0.0;
+            for (int i = first; i <= last; i++) {
+                double w = pow(10.0, (in[i] - in[peak]) / 10.0);
+                weights += w;
+                center += w * i;
+            }
+
+            Detection det;
+            det.firstBin = first;
+            det.lastBin = last;
+            det.peakBin = peak;
+            det.centerBin = center / weights;
+            det.level = in[peak];
+            det.noise = noiseBuf[peak];
+            det.snr = snrBuf[peak];
+            detections.push_back(det);
+        }
+
+        Mode _mode = CELL_AVERAGING;
+        int _guard = 2;
+        int _training = 16;
+        float _threshold = 10.0f;
+        float _rank = 0.75f;
+        int _mergeGap = 0;
+        int _minBins = 1;
+
+        std::vector<float> noiseBuf;
+        std::vector<float> snrBuf;
+        std::vector<double> prefix;
+        std::vector<float> cells;
+    };
+}
@@ -42,6 +42,11 @@ namespace dsp::filter {
             base_type::tempStart();
         }
 
+        // Largest number of samples process() can write for a given number of input samples
+        inline int maxOutputCount(int count) {
+            return count / _decimation + 1;
+        }
+
         inline int process(int count, const D* in, D* out) {
             // Copy data to work buffer
             memcpy(base_type::bufStart, in, count * sizeof(D));
@@ -71,6 +76,7 @@ namespace dsp::filter {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(maxOutputCount(count));
             int outCount = process(count, base_type::_in->readBuf, base_type::out.writeBuf);
 
             // Swap if some data was generated
@@ -31,6 +31,7 @@ namespace dsp::math {
                 return 0;
             }
 
+            base_type::out.reserve(a_count);
             process(a_count, base_type::_a->readBuf, base_type::_b->readBuf, base_type::out.writeBuf);
 
             base_type::_a->flush();
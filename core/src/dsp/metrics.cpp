@@ -0,0 +1,260 @@
+#include "metrics.h"
+#include <algorithm>
+#include <map>
+#include <mutex>
+#include <set>
+#include <stdio.h>
+#ifdef __GNUG__
+#include <cxxabi.h>
+#include <stdlib.h>
+#endif
+
+namespace dsp::metrics {
+    struct Registry {
+        std::mutex mtx;
+        std::set<StreamCounters*> streams;
+        std::set<BlockCounters*> blocks;
+        uint64_t nextId = 1;
+    };
+
+    // Never destroyed, streams and blocks of global objects unregister after static destruction
+    static Registry& registry() {
+        static Registry* reg = new Registry;
+        return *reg;
+    }
+
+    static thread_local uint64_t threadWait = 0;
+    static std::atomic<uint64_t> allocations(0);
+
+    static std::string demangle(const char* name) {
+        if (!name) { return ""; }
+#ifdef __GNUG__
+        int status;
+        char* demangled = abi::__cxa_demangle(name, NULL, NULL, &status);
+        if (status == 0 && demangled) {
+            std::string str = demangled;
+            ::free(demangled);
+            return str;
+        }
+#endif
+        return name;
+    }
+
+    static double seconds(uint64_t ns) {
+        return (double)ns / 1e9;
+    }
+
+    static double waitingFor(const std::atomic<uint64_t>& since, uint64_t time) {
+        uint64_t start = since.load(std::memory_order_relaxed);
+        return (start && time > start) ? seconds(time - start) : 0.0;
+    }
+
+    static void registerStreamLocked(Registry& reg, StreamCounters* stream) {
+        if (stream->id) { return; }
+        stream->id = reg.nextId++;
+        stream->since = now();
+        reg.streams.insert(stream);
+        stream->registered.store(true, std::memory_order_release);
+    }
+
+    void registerStream(StreamCounters* stream) {
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+        registerStreamLocked(reg, stream);
+    }
+
+    void unregisterStream(StreamCounters* stream) {
+        if (!stream->registered.load(std::memory_order_acquire)) { return; }
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+        reg.streams.erase(stream);
+    }
+
+    void registerBlock(BlockCounters* block, const char* type, const std::vector<StreamCounters*>& inputs, const std::vector<StreamCounters*>& outputs) {
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+
+        // The block is registered again each time it starts, its streams may have changed
+        if (!block->id) {
+            block->id = reg.nextId++;
+            block->since = now();
+            reg.blocks.insert(block);
+        }
+        block->type = demangle(type);
+        block->inputs.clear();
+        for (auto& in : inputs) {
+            registerStreamLocked(reg, in);
+            block->inputs.push_back(in->id);
+        }
+        block->outputs.clear();
+        for (auto& out : outputs) {
+            registerStreamLocked(reg, out);
+            block->outputs.push_back(out->id);
+        }
+    }
+
+    void unregisterBlock(BlockCounters* block) {
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+        reg.blocks.erase(block);
+    }
+
+    void setName(StreamCounters* stream, const std::string& name) {
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+        stream->name = name;
+    }
+
+    void setName(BlockCounters* block, const std::string& name) {
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+        block->name = name;
+    }
+
+    void addThreadWait(uint64_t ns) {
+        threadWait += ns;
+    }
+
+    uint64_t getThreadWait() {
+        return threadWait;
+    }
+
+    void countAllocation() {
+        allocations.fetch_add(1, std::memory_order_relaxed);
+    }
+
+    uint64_t getAllocations() {
+        return allocations.load(std::memory_order_relaxed);
+    }
+
+    Snapshot snapshot() {
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+        uint64_t time = now();
+
+        Snapshot snap;
+        snap.time = seconds(time);
+        std::map<uint64_t, uint64_t> bufferBytes;
+        snap.streams.reserve(reg.streams.size());
+        for (auto& s : reg.streams) {
+            StreamStats stats;
+            stats.id = s->id;
+            stats.name = s->name;
+            stats.type = demangle(s->type);
+            stats.uptime = seconds(time - s->since);
+            stats.buffers = s->buffers.load(std::memory_order_relaxed);
+            stats.samples = s->samples.load(std::memory_order_relaxed);
+            stats.swapWait = seconds(s->swapWaitNs.load(std::memory_order_relaxed));
+            stats.swapWaitMax = seconds(s->swapWaitMaxNs.load(std::memory_order_relaxed));
+            stats.swapWaiting = waitingFor(s->swapWaitingSince, time);
+            stats.readWait = seconds(s->readWaitNs.load(std::memory_order_relaxed));
+            stats.readWaitMax = seconds(s->readWaitMaxNs.load(std::memory_order_relaxed));
+            stats.readWaiting = waitingFor(s->readWaitingSince, time);
+            stats.bufferBytes = s->bufferBytes.load(std::memory_order_relaxed);
+            snap.streams.push_back(stats);
+            bufferBytes[stats.id] = stats.bufferBytes;
+        }
+
+        snap.blocks.reserve(reg.blocks.size());
+        for (auto& b : reg.blocks) {
+            BlockStats stats;
+            stats.id = b->id;
+            stats.name = b->name;
+            stats.type = b->type;
+            stats.uptime = seconds(time - b->since);
+            stats.runs = b->runs.load(std::memory_order_relaxed);
+            stats.samples = b->samples.load(std::memory_order_relaxed);
+            stats.busy = seconds(b->busyNs.load(std::memory_order_relaxed));
+            stats.busyMax = seconds(b->busyMaxNs.load(std::memory_order_relaxed));
+            stats.wait = seconds(b->waitNs.load(std::memory_order_relaxed));
+            stats.inputs = b->inputs;
+            stats.outputs = b->outputs;
+            stats.bufferBytes = 0;
+            for (auto& id : b->outputs) {
+                auto it = bufferBytes.find(id);
+                if (it != bufferBytes.end()) { stats.bufferBytes += it->second; }
+            }
+            snap.blocks.push_back(stats);
+        }
+
+        // Sets are ordered by address, sort by id so that the order is stable
+        std::sort(snap.streams.begin(), snap.streams.end(), [](const StreamStats& a, const StreamStats& b) { return a.id < b.id; });
+        std::sort(snap.blocks.begin(), snap.blocks.end(), [](const BlockStats& a, const BlockStats& b) { return a.id < b.id; });
+        return snap;
+    }
+
+    void reset() {
+        Registry& reg = registry();
+        std::lock_guard<std::mutex> lck(reg.mtx);
+        uint64_t time = now();
+        for (auto& s : reg.streams) {
+            s->buffers = 0;
+            s->samples = 0;
+            s->swapWaitNs = 0;
+            s->swapWaitMaxNs = 0;
+            s->readWaitNs = 0;
+            s->readWaitMaxNs = 0;
+            s->since = time;
+        }
+        for (auto& b : reg.blocks) {
+            b->runs = 0;
+            b->samples = 0;
+            b->busyNs = 0;
+            b->busyMaxNs = 0;
+            b->waitNs = 0;
+            b->since = time;
+        }
+    }
+
+    static std::string escapeLabel(const std::string& str) {
+        std::string escaped;
+        escaped.reserve(str.size());
+        for (char c : str) {
+            if (c == '\\') { escaped += "\\\\"; }
+            else if (c == '"') { escaped += "\\\""; }
+            else if (c == '\n') { escaped += "\\n"; }
+            else { escaped += c; }
+        }
+        return escaped;
+    }
+
+    static std::string labels(uint64_t id, const std::string& name, const std::string& type) {
+        return "{id=\"" + std::to_string(id) + "\",name=\"" + escapeLabel(name) + "\",type=\"" + escapeLabel(type) + "\"}";
+    }
+
+    static std::string formatValue(double value) {
+        char buf[32];
+        snprintf(buf, sizeof(buf), "%.9g", value);
+        return buf;
+    }
+
+    template <class S, class F>
+    static void writeFamily(std::string& out, const std::vector<S>& entries, const char* name, const char* kind, const char* help, F value) {
+        out += std::string("# HELP ") + name + " " + help + "\n";
+        out += std::string("# TYPE ") + name + " " + kind + "\n";
+        for (const auto& e : entries) {
+            out += name + labels(e.id, e.name, e.type) + " " + formatValue(value(e)) + "\n";
+        }
+    }
+
+    std::string prometheus(const Snapshot& snap) {
+        std::string out;
+        const auto& st = snap.streams;
+        writeFamily(out, st, "sdrpp_stream_buffers_total", "counter", "Buffers swapped into the stream", [](const StreamStats& s) { return (double)s.buffers; });
+        writeFamily(out, st, "sdrpp_stream_samples_total", "counter", "Samples swapped into the stream", [](const StreamStats& s) { return (double)s.samples; });
+        writeFamily(out, st, "sdrpp_stream_swap_wait_seconds_total", "counter", "Time the writer waited for the reader in swap()", [](const StreamStats& s) { return s.swapWait; });
+        writeFamily(out, st, "sdrpp_stream_swap_wait_max_seconds", "gauge", "Longest single wait of the writer in swap()", [](const StreamStats& s) { return s.swapWaitMax; });
+        writeFamily(out, st, "sdrpp_stream_read_wait_seconds_total", "counter", "Time the reader waited for data in read()", [](const StreamStats& s) { return s.readWait; });
+        writeFamily(out, st, "sdrpp_stream_read_wait_max_seconds", "gauge", "Longest single wait of the reader in read()", [](const StreamStats& s) { return s.readWaitMax; });
+        writeFamily(out, st, "sdrpp_stream_buffer_bytes", "gauge", "Size of the buffers of the stream", [](const StreamStats& s) { return (double)s.bufferBytes; });
+
+        const auto& bl = snap.blocks;
+        writeFamily(out, bl, "sdrpp_block_runs_total", "counter", "Calls to the run() function of the block", [](const BlockStats& b) { return (double)b.runs; });
+        writeFamily(out, bl, "sdrpp_block_samples_total", "counter", "Samples processed by the block", [](const BlockStats& b) { return (double)b.samples; });
+        writeFamily(out, bl, "sdrpp_block_busy_seconds_total", "counter", "Time spent processing, without waiting on streams", [](const BlockStats& b) { return b.busy; });
+        writeFamily(out, bl, "sdrpp_block_busy_max_seconds", "gauge", "Longest processing time of a single run() call", [](const BlockStats& b) { return b.busyMax; });
+        writeFamily(out, bl, "sdrpp_block_wait_seconds_total", "counter", "Time spent waiting on the input and output streams", [](const BlockStats& b) { return b.wait; });
+        writeFamily(out, bl, "sdrpp_block_buffer_bytes", "gauge", "Size of the buffers of the output streams of the block", [](const BlockStats& b) { return (double)b.bufferBytes; });
+        return out;
+    }
+}
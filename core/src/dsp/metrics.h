@@ -0,0 +1,151 @@
+#pragma once
+#include <atomic>
+#include <chrono>
+#include <string>
+#include <vector>
+#include <stdint.h>
+
+// Runtime counters of the streams and blocks of the flowgraph.
+// Counting only costs a few relaxed atomic additions per buffer. The clock is only read around
+// run() calls and when a swap() or read() actually has to wait, so the counters are always enabled.
+// Streams and blocks are added to the registry the first time they're used and removed when destroyed.
+
+namespace dsp::metrics {
+    // Monotonic time in nanoseconds
+    inline uint64_t now() {
+        return std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now().time_since_epoch()).count();
+    }
+
+    inline void updateMax(std::atomic<uint64_t>& max, uint64_t value) {
+        uint64_t cur = max.load(std::memory_order_relaxed);
+        while (value > cur && !max.compare_exchange_weak(cur, value, std::memory_order_relaxed)) {}
+    }
+
+    struct StreamCounters;
+
+    void registerStream(StreamCounters* stream);
+    void addThreadWait(uint64_t ns);
+
+    // Account for a wait that started at the time stored in since, and clear it
+    inline void waited(std::atomic<uint64_t>& total, std::atomic<uint64_t>& max, std::atomic<uint64_t>& since) {
+        uint64_t ns = now() - since.exchange(0, std::memory_order_relaxed);
+        total.fetch_add(ns, std::memory_order_relaxed);
+        updateMax(max, ns);
+        addThreadWait(ns);
+    }
+
+    struct StreamCounters {
+        std::atomic<uint64_t> buffers{0};
+        std::atomic<uint64_t> samples{0};
+
+        // Time the writer waited for the reader to flush the previous buffer
+        std::atomic<uint64_t> swapWaitNs{0};
+        std::atomic<uint64_t> swapWaitMaxNs{0};
+        std::atomic<uint64_t> swapWaitingSince{0};
+
+        // Time the reader waited for a buffer
+        std::atomic<uint64_t> readWaitNs{0};
+        std::atomic<uint64_t> readWaitMaxNs{0};
+        std::atomic<uint64_t> readWaitingSince{0};
+
+        // Size of the buffers of the stream, set by the stream
+        std::atomic<uint64_t> bufferBytes{0};
+
+        std::atomic<bool> registered{false};
+
+        inline void swapped(int size) {
+            if (!registered.load(std::memory_order_relaxed)) { registerStream(this); }
+            buffers.fetch_add(1, std::memory_order_relaxed);
+            samples.fetch_add(size, std::memory_order_relaxed);
+        }
+
+        // Mangled name of the sample type, set by the stream
+        const char* type = NULL;
+
+        // Set by the registry, only accessed with the registry locked
+        uint64_t id = 0;
+        uint64_t since = 0;
+        std::string name;
+    };
+
+    struct BlockCounters {
+        std::atomic<uint64_t> runs{0};
+        std::atomic<uint64_t> samples{0};
+
+        // Time spent in run(), minus the time waited in swap() and read()
+        std::atomic<uint64_t> busyNs{0};
+        std::atomic<uint64_t> busyMaxNs{0};
+        std::atomic<uint64_t> waitNs{0};
+
+        // Set by the registry, only accessed with the registry locked
+        uint64_t id = 0;
+        uint64_t since = 0;
+        std::string name;
+        std::string type;
+        std::vector<uint64_t> inputs;
+        std::vector<uint64_t> outputs;
+    };
+
+    struct StreamStats {
+        uint64_t id;
+        std::string name;
+        std::string type;
+        double uptime;
+        uint64_t buffers;
+        uint64_t samples;
+        double swapWait;
+        double swapWaitMax;
+        double swapWaiting;
+        double readWait;
+        double readWaitMax;
+        double readWaiting;
+        uint64_t bufferBytes;
+    };
+
+    struct BlockStats {
+        uint64_t id;
+        std::string name;
+        std::string type;
+        double uptime;
+        uint64_t runs;
+        uint64_t samples;
+        double busy;
+        double busyMax;
+        double wait;
+        std::vector<uint64_t> inputs;
+        std::vector<uint64_t> outputs;
+
+        // Size of the buffers of the output streams of the block
+        uint64_t bufferBytes;
+    };
+
+    // All durations are in seconds
+    struct Snapshot {
+        double time;
+        std::vector<StreamStats> streams;
+        std::vector<BlockStats> blocks;
+    };
+
+    void unregisterStream(StreamCounters* stream);
+    void registerBlock(BlockCounters* block, const char* type, const std::vector<StreamCounters*>& inputs, const std::vector<StreamCounters*>& outputs);
+    void unregisterBlock(BlockCounters* block);
+
+    // Name shown in snapshots next to the id, can be set at any time
+    void setName(StreamCounters* stream, const std::string& name);
+    void setName(BlockCounters* block, const std::string& name);
+
+    // Total time the calling thread waited in swap() and read()
+    uint64_t getThreadWait();
+
+    // Number of buffers allocated with buffer::alloc()
+    void countAllocation();
+    uint64_t getAllocations();
+
+    Snapshot snapshot();
+
+    // Reset the counters of all registered streams and blocks
+    void reset();
+
+    // Snapshot in the Prometheus text exposition format
+    std::string prometheus(const Snapshot& snap);
+}
@@ -66,6 +66,11 @@ namespace dsp::multirate {
             base_type::tempStart();
         }
 
+        // Largest number of samples process() can write for a given number of input samples
+        inline int maxOutputCount(int count) {
+            return (int)(((int64_t)count * _interp) / _decim) + 2;
+        }
+
         inline int process(int count, const T* in, T* out) {
             int outCount = 0;
 
@@ -102,6 +107,7 @@ namespace dsp::multirate {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(maxOutputCount(count));
             int outCount = process(count, base_type::_in->readBuf, base_type::out.writeBuf);
 
             // Swap if some data was generated
@@ -48,6 +48,12 @@ namespace dsp::multirate {
             base_type::tempStart();
         }
 
+        // Largest number of samples process() can write for a given number of input samples
+        inline int maxOutputCount(int count) {
+            // The first stage decimates the most, the next ones work in place
+            return (_ratio == 1) ? count : decimFirs[0]->maxOutputCount(count);
+        }
+
         inline int process(int count, const T* in, T* out) {
             // If the ratio is 1, no need to decimate
             if (_ratio == 1) {
@@ -70,6 +76,7 @@ namespace dsp::multirate {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(maxOutputCount(count));
             int outCount = process(count, base_type::_in->readBuf, base_type::out.writeBuf);
 
             // Swap if some data was generated
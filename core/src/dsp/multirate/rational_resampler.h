@@ -79,6 +79,23 @@ namespace dsp::multirate {
             base_type::tempStart();
         }
 
+        // Largest number of samples process() can write for a given number of input samples
+        inline int maxOutputCount(int count) {
+            switch(mode) {
+                case Mode::BOTH:
+                    // The resampler works in place on the output of the decimator
+                    count = decim.maxOutputCount(count);
+                    return std::max<int>(count, resamp.maxOutputCount(count));
+                case Mode::DECIM_ONLY:
+                    return decim.maxOutputCount(count);
+                case Mode::RESAMP_ONLY:
+                    return resamp.maxOutputCount(count);
+                case Mode::NONE:
+                    return count;
+            }
+            return count;
+        }
+
         inline int process(int count, const T* in, T* out) {
             switch(mode) {
                 case Mode::BOTH:
@@ -99,6 +116,7 @@ namespace dsp::multirate {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(maxOutputCount(count));
             int outCount = process(count, base_type::_in->readBuf, base_type::out.writeBuf);
 
             // Swap if some data was generated
@@ -80,6 +80,7 @@ namespace dsp::noise_reduction {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
 
+            base_type::out.reserve(count);
             process(count, base_type::_in->readBuf, base_type::out.writeBuf);
 
             // Swap if some data was generated
@@ -51,6 +51,7 @@ namespace dsp::noise_reduction {
         int run() {
             int count = base_type::_in->read();
             if (count < 0) { return -1; }
+            base_type::out.reserve(count);
             process(count, base_type::_in->readBuf, base_type::out.writeBuf);
             base_type::_in->flush();
             if (!base_type::out.swap(count)) { return -1; }
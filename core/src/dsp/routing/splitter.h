@@ -48,6 +48,7 @@ namespace dsp::routing {
             if (count < 0) { return -1; }
 
             for (const auto& stream : streams) {
+                stream->reserve(count);
                 memcpy(stream->writeBuf, base_type::_in->readBuf, count * sizeof(T));
                 if (!stream->swap(count)) {
                     base_type::_in->flush();
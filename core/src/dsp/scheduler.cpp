@@ -0,0 +1,205 @@
+#include "scheduler.h"
+#include <algorithm>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <thread>
+
+namespace dsp::scheduler {
+    enum State {
+        IDLE,
+        QUEUED,
+        RUNNING,
+        RUNNING_NOTIFIED,
+        FINISHED
+    };
+
+    struct Pool {
+        std::mutex mtx;
+        std::condition_variable workCnd;
+        std::condition_variable finishedCnd;
+        std::deque<Task*> queue;
+
+        // Workers to keep running, workers started, workers waiting for work and workers waiting on a stream
+        int target = 1;
+        int threads = 0;
+        int idle = 0;
+        int blocked = 0;
+    };
+
+    static std::atomic<Mode> currentMode(Mode::THREAD_PER_BLOCK);
+    static thread_local bool isWorker = false;
+
+    // Never destroyed, the workers are detached
+    static Pool& getPool() {
+        static Pool* pool = new Pool();
+        return *pool;
+    }
+
+    static int workersFor(int workers) {
+        if (workers > 0) { return workers; }
+        return std::max<int>(std::thread::hardware_concurrency(), 1);
+    }
+
+    static void execute(Task* task);
+
+    static void worker() {
+        isWorker = true;
+        Pool& pool = getPool();
+        std::unique_lock<std::mutex> lck(pool.mtx);
+        while (true) {
+            // Retire the spare workers once they aren't needed anymore
+            if (pool.threads - pool.blocked > pool.target) {
+                pool.threads--;
+                return;
+            }
+
+            if (pool.queue.empty()) {
+                pool.idle++;
+                pool.workCnd.wait(lck);
+                pool.idle--;
+                continue;
+            }
+
+            Task* task = pool.queue.front();
+            pool.queue.pop_front();
+            lck.unlock();
+            execute(task);
+            lck.lock();
+        }
+    }
+
+    // Must be called with the pool mutex locked
+    static void spawnWorker(Pool& pool) {
+        pool.threads++;
+        std::thread(worker).detach();
+    }
+
+    static void enqueue(Task* task) {
+        Pool& pool = getPool();
+        std::lock_guard<std::mutex> lck(pool.mtx);
+        pool.queue.push_back(task);
+        if (pool.idle) {
+            pool.workCnd.notify_one();
+        }
+        else if (pool.threads - pool.blocked < pool.target) {
+            spawnWorker(pool);
+        }
+    }
+
+    static void finish(Task* task) {
+        Pool& pool = getPool();
+        {
+            std::lock_guard<std::mutex> lck(pool.mtx);
+            task->schedulerState.store(FINISHED);
+        }
+        pool.finishedCnd.notify_all();
+    }
+
+    static void execute(Task* task) {
+        task->schedulerState.store(RUNNING);
+        while (true) {
+            if (task->schedulerDetached.load()) {
+                finish(task);
+                return;
+            }
+
+            if (task->schedulerReady()) {
+                if (!task->schedulerRun()) {
+                    finish(task);
+                    return;
+                }
+
+                // Go back to the end of the queue to let the other tasks run
+                task->schedulerState.store(RUNNING);
+                if (task->schedulerReady()) {
+                    task->schedulerState.store(QUEUED);
+                    enqueue(task);
+                    return;
+                }
+            }
+
+            // Go idle unless a stream changed in the meantime
+            int expected = RUNNING;
+            if (task->schedulerState.compare_exchange_strong(expected, IDLE)) { return; }
+            task->schedulerState.store(RUNNING);
+        }
+    }
+
+    void setMode(Mode mode, int workers) {
+        Pool& pool = getPool();
+        std::lock_guard<std::mutex> lck(pool.mtx);
+        currentMode.store(mode);
+        pool.target = workersFor(workers);
+
+        // Wake up the workers so that the extra ones retire
+        pool.workCnd.notify_all();
+    }
+
+    Mode getMode() {
+        return currentMode.load();
+    }
+
+    int getWorkerCount() {
+        Pool& pool = getPool();
+        std::lock_guard<std::mutex> lck(pool.mtx);
+        return pool.target;
+    }
+
+    void attach(Task* task) {
+        task->schedulerDetached.store(false);
+        task->schedulerState.store(IDLE);
+        notify(task);
+    }
+
+    void detach(Task* task) {
+        task->schedulerDetached.store(true);
+        int expected = IDLE;
+        if (task->schedulerState.compare_exchange_strong(expected, FINISHED)) { return; }
+
+        // Make sure it gets run or looked at again, so that it sees it was detached
+        notify(task);
+        Pool& pool = getPool();
+        beginBlocking();
+        {
+            std::unique_lock<std::mutex> lck(pool.mtx);
+            pool.finishedCnd.wait(lck, [task]() { return task->schedulerState.load() == FINISHED; });
+        }
+        endBlocking();
+    }
+
+    void notify(Task* task) {
+        int state = task->schedulerState.load();
+        while (true) {
+            if (state == IDLE) {
+                if (task->schedulerState.compare_exchange_weak(state, QUEUED)) {
+                    enqueue(task);
+                    return;
+                }
+            }
+            else if (state == RUNNING) {
+                if (task->schedulerState.compare_exchange_weak(state, RUNNING_NOTIFIED)) { return; }
+            }
+            else {
+                return;
+            }
+        }
+    }
+
+    void beginBlocking() {
+        if (!isWorker) { return; }
+        Pool& pool = getPool();
+        std::lock_guard<std::mutex> lck(pool.mtx);
+        pool.blocked++;
+        if (!pool.queue.empty() && !pool.idle && pool.threads - pool.blocked < pool.target) {
+            spawnWorker(pool);
+        }
+    }
+
+    void endBlocking() {
+        if (!isWorker) { return; }
+        Pool& pool = getPool();
+        std::lock_guard<std::mutex> lck(pool.mtx);
+        pool.blocked--;
+    }
+}
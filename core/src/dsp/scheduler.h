@@ -0,0 +1,53 @@
+#pragma once
+#include <atomic>
+
+// Optional scheduling of DSP blocks on a fixed pool of worker threads instead of one thread per
+// block. A pooled block is only run once all of its inputs have data and all of its outputs can
+// be swapped, so that run() doesn't wait on its streams. Streams notify the blocks at both ends
+// whenever that changes.
+//
+// Blocks without inputs (sources) and blocks that manage their own threads keep a dedicated
+// thread. Blocks that still end up waiting on a stream from a pool worker (eg. writing several
+// buffers per run) are covered by starting spare workers for as long as they wait.
+
+namespace dsp::scheduler {
+    enum class Mode {
+        THREAD_PER_BLOCK,
+        POOL
+    };
+
+    // Only applies to blocks started afterwards. workers is the size of the pool, the number of
+    // cores if 0 or less.
+    void setMode(Mode mode, int workers = 0);
+    Mode getMode();
+    int getWorkerCount();
+
+    // Unit of work of the pool, implemented by dsp::block
+    class Task {
+    public:
+        virtual ~Task() {}
+
+        // Whether the task can run without waiting
+        virtual bool schedulerReady() = 0;
+
+        // Run once, returns false once the task is finished
+        virtual bool schedulerRun() = 0;
+
+        // Managed by the scheduler
+        std::atomic<int> schedulerState{0};
+        std::atomic<bool> schedulerDetached{false};
+    };
+
+    // Start scheduling a task, it's run as soon as it's ready
+    void attach(Task* task);
+
+    // Stop scheduling a task, waits for it to finish running
+    void detach(Task* task);
+
+    // One of the streams of a task changed, schedule it if it's now ready
+    void notify(Task* task);
+
+    // Called around waits on streams, so that the pool can start another worker while a worker waits
+    void beginBlocking();
+    void endBlocking();
+}
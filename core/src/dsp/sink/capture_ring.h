@@ -0,0 +1,212 @@
+#pragma once
+#include "../sink.h"
+#include <atomic>
+#include <cmath>
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <vector>
+#include <string.h>
+
+namespace dsp::sink {
+    // Keeps the last samples of a stream in a preallocated ring, with the time they were received, so
+    // that any time range still in the ring can be extracted afterwards (eg. around a detection).
+    // Extractions read the ring without stopping the writer: the samples overwritten while they were
+    // copied are detected and cut off the result. Any number of them can run at the same time.
+    class CaptureRing : public Sink<complex_t> {
+        using base_type = Sink<complex_t>;
+    public:
+        // Sample range of an extraction, with the time of its first sample in ns since the unix epoch
+        struct Range {
+            uint64_t first;
+            uint64_t count;
+            int64_t startTime;
+        };
+
+        CaptureRing() {}
+
+        CaptureRing(stream<complex_t>* in, double samplerate, uint64_t capacity) { init(in, samplerate, capacity); }
+
+        ~CaptureRing() {
+            if (!base_type::_block_init) { return; }
+            base_type::stop();
+        }
+
+        void init(stream<complex_t>* in, double samplerate, uint64_t capacity) {
+            _samplerate = samplerate;
+            _capacity = std::max<uint64_t>(capacity, 1);
+            ring.resize(_capacity);
+            base_type::init(in);
+        }
+
+        // Samplerate of the samples written from now on
+        void setSamplerate(double samplerate) { _samplerate = samplerate; }
+        double getSamplerate() { return _samplerate; }
+
+        uint64_t getCapacity() { return _capacity; }
+        uint64_t getWrittenSamples() { return written.load(std::memory_order_acquire); }
+
+        // Time of the oldest and of the next sample in the ring, in ns since the unix epoch (0 if empty)
+        int64_t getStartTime() {
+            std::lock_guard<std::mutex> lck(markMtx);
+            uint64_t w = written.load(std::memory_order_acquire);
+            return marks.empty() ? 0 : sampleTime(oldest(w));
+        }
+
+        int64_t getEndTime() {
+            std::lock_guard<std::mutex> lck(markMtx);
+            return marks.empty() ? 0 : sampleTime(written.load(std::memory_order_acquire));
+        }
+
+        // Find the samples between times t0 and t1 (ns since the unix epoch), clamped to those in the ring.
+        // Waits at most timeoutMs (forever if negative) for t1 to be received, until the ring is closed.
+        // Returns false if no sample of the range is in the ring.
+        bool find(int64_t t0, int64_t t1, double timeoutMs, Range& range) {
+            std::unique_lock<std::mutex> lck(markMtx);
+            auto received = [&]() { return closed || (!marks.empty() && sampleTime(written.load(std::memory_order_acquire)) >= t1); };
+            if (timeoutMs < 0) {
+                markCnd.wait(lck, received);
+            }
+            else {
+                markCnd.wait_for(lck, std::chrono::duration<double, std::milli>(timeoutMs), received);
+            }
+            if (marks.empty() || t1 <= t0) { return false; }
+
+            uint64_t w = written.load(std::memory_order_acquire);
+            uint64_t first = std::clamp<uint64_t>(timeSample(t0), oldest(w), w);
+            uint64_t last = std::clamp<uint64_t>(timeSample(t1), first, w);
+            range.first = first;
+            range.count = last - first;
+            range.startTime = sampleTime(first);
+            return range.count > 0;
+        }
+
+        // Copy the samples of a range into out, which must hold range.count samples. Returns the number
+        // of samples at the start of the range that were overwritten before or during the copy, those
+        // are invalid in out.
+        uint64_t copy(const Range& range, complex_t* out) {
+            uint64_t done = 0;
+            while (done < range.count) {
+                uint64_t pos = (range.first + done) % _capacity;
+                uint64_t n = std::min<uint64_t>(range.count - done, _capacity - pos);
+                memcpy(&out[done], &ring[pos], n * sizeof(complex_t));
+                done += n;
+            }
+            return overwritten(range);
+        }
+
+        // Call func(samples, count) on the contiguous parts of a range, straight from the ring. Returns
+        // the number of samples at the start of the range that were overwritten before or during the calls.
+        template <class Func>
+        uint64_t read(const Range& range, Func func) {
+            uint64_t done = 0;
+            while (done < range.count) {
+                uint64_t pos = (range.first + done) % _capacity;
+                uint64_t n = std::min<uint64_t>(range.count - done, _capacity - pos);
+                func(&ring[pos], (int)n);
+                done += n;
+            }
+            return overwritten(range);
+        }
+
+        // Unblock the pending find() calls, which return what's in the ring. Cleared by the next start.
+        void close() {
+            {
+                std::lock_guard<std::mutex> lck(markMtx);
+                closed = true;
+            }
+            markCnd.notify_all();
+        }
+
+        int run() {
+            int count = base_type::_in->read();
+            if (count < 0) { return -1; }
+            auto now = std::chrono::system_clock::now();
+
+            // Announce the samples about to be overwritten before touching the ring, see overwritten()
+            uint64_t w = written.load(std::memory_order_relaxed);
+            uint64_t n = std::min<uint64_t>(count, _capacity);
+            const complex_t* data = &base_type::_in->readBuf[count - n];
+            reserved.store(w + count, std::memory_order_seq_cst);
+
+            uint64_t done = 0;
+            while (done < n) {
+                uint64_t pos = (w + (count - n) + done) % _capacity;
+                uint64_t len = std::min<uint64_t>(n - done, _capacity - pos);
+                memcpy(&ring[pos], &data[done], len * sizeof(complex_t));
+                done += len;
+            }
+            base_type::_in->flush();
+
+            // The block ends when it's received, so it started count samples earlier. It can't start
+            // before the end of the previous block though, for sources running faster than realtime.
+            {
+                std::lock_guard<std::mutex> lck(markMtx);
+                double sr = _samplerate;
+                int64_t end = std::chrono::duration_cast<std::chrono::nanoseconds>(now.time_since_epoch()).count();
+                int64_t start = end - (int64_t)((double)count * 1e9 / sr);
+                if (!marks.empty()) { start = std::max<int64_t>(start, sampleTime(w)); }
+                marks.push_back({ w, start, sr });
+                written.store(w + count, std::memory_order_release);
+
+                // Forget the marks of the samples that left the ring, keeping the one covering the oldest sample
+                uint64_t old = oldest(w + count);
+                while (marks.size() > 1 && marks[1].sample <= old) { marks.pop_front(); }
+            }
+            markCnd.notify_all();
+
+            return count;
+        }
+
+    protected:
+        void doStart() {
+            {
+                std::lock_guard<std::mutex> lck(markMtx);
+                closed = false;
+            }
+            base_type::doStart();
+        }
+
+    private:
+        struct Mark {
+            uint64_t sample;
+            int64_t time;
+            double samplerate;
+        };
+
+        inline uint64_t oldest(uint64_t w) {
+            return (w > _capacity) ? (w - _capacity) : 0;
+        }
+
+        uint64_t overwritten(const Range& range) {
+            uint64_t valid = oldest(reserved.load(std::memory_order_seq_cst));
+            return (valid > range.first) ? std::min<uint64_t>(valid - range.first, range.count) : 0;
+        }
+
+        // Must be called with markMtx locked and marks not empty
+        int64_t sampleTime(uint64_t sample) {
+            auto it = std::upper_bound(marks.begin(), marks.end(), sample, [](uint64_t s, const Mark& m) { return s < m.sample; });
+            const Mark& m = (it == marks.begin()) ? *it : *std::prev(it);
+            return m.time + (int64_t)(((double)sample - (double)m.sample) * 1e9 / m.samplerate);
+        }
+
+        uint64_t timeSample(int64_t time) {
+            auto it = std::upper_bound(marks.begin(), marks.end(), time, [](int64_t t, const Mark& m) { return t < m.time; });
+            const Mark& m = (it == marks.begin()) ? *it : *std::prev(it);
+            double offset = std::round((double)(time - m.time) * m.samplerate / 1e9);
+            return (offset < -(double)m.sample) ? 0 : (uint64_t)((double)m.sample + offset);
+        }
+
+        std::vector<complex_t> ring;
+        uint64_t _capacity;
+        std::atomic<double> _samplerate;
+        std::atomic<uint64_t> written = 0;
+        std::atomic<uint64_t> reserved = 0;
+
+        std::mutex markMtx;
+        std::condition_variable markCnd;
+        std::deque<Mark> marks;
+        bool closed = false;
+    };
+}
@@ -16,6 +16,9 @@ namespace dsp::sink {
         void init(stream<T>* in, int maxLatency) {
             data.init(maxLatency);
             base_type::init(in);
+
+            // run() waits on the ring buffer
+            base_type::allowPool = false;
         }
 
         int run() {
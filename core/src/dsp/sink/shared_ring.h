@@ -0,0 +1,32 @@
+#pragma once
+#include "../sink.h"
+#include "../buffer/shared_ring.h"
+
+namespace dsp::sink {
+    // Publish a stream to other processes through a shared memory ring (see dsp::buffer::SharedRingWriter)
+    class SharedRing : public Sink<complex_t> {
+        using base_type = Sink<complex_t>;
+    public:
+        SharedRing() {}
+
+        SharedRing(stream<complex_t>* in, std::string name, uint64_t capacity) { init(in, name, capacity); }
+
+        // Throws std::runtime_error if the ring can't be created
+        void init(stream<complex_t>* in, std::string name, uint64_t capacity) {
+            ring.create(name, capacity);
+            base_type::init(in);
+        }
+
+        int run() {
+            int count = base_type::_in->read();
+            if (count < 0) { return -1; }
+
+            ring.write(base_type::_in->readBuf, count);
+
+            base_type::_in->flush();
+            return count;
+        }
+
+        buffer::SharedRingWriter ring;
+    };
+}
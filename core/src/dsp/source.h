@@ -7,8 +7,6 @@ namespace dsp {
     public:
         Source() {}
 
-        Source() { init(); }
-
         virtual ~Source() {}
 
         virtual void init() {
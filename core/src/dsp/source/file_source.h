@@ -0,0 +1,162 @@
+#pragma once
+#include "../source.h"
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <stdexcept>
+#include <utils/wav.h>
+
+namespace dsp::source {
+    // Replays a two channel WAV IQ recording from a memory mapping of the file.
+    // Without an open file, the block finishes as soon as it's started.
+    // In realtime mode the output is paced at the samplerate of the recording, otherwise samples
+    // are produced as fast as the consumers of the stream read them.
+    class File : public Source<complex_t> {
+        using base_type = Source<complex_t>;
+    public:
+        File() {}
+
+        File(std::string path, bool realtime = true, bool loop = false) { init(path, realtime, loop); }
+
+        ~File() {
+            if (!base_type::_block_init) { return; }
+            base_type::stop();
+        }
+
+        void init(std::string path, bool realtime = true, bool loop = false) {
+            _realtime = realtime;
+            _loop = loop;
+            base_type::init();
+            if (!path.empty()) { open(path); }
+        }
+
+        // Open another recording and go back to its start
+        void open(std::string path) {
+            assert(base_type::_block_init);
+            std::lock_guard<std::recursive_mutex> lck(base_type::ctrlMtx);
+            base_type::tempStop();
+            pos = 0;
+            finished = false;
+
+            const char* err = NULL;
+            if (!reader.open(path)) {
+                err = "Could not open WAV file";
+            }
+            else if (reader.getChannels() != 2) {
+                reader.close();
+                err = "WAV file is not an IQ recording (must have two channels)";
+            }
+            else {
+                reader.adviseSequential();
+
+                // Blocks of 5ms, like the hardware sources
+                blockSize = std::clamp<int>(reader.getSamplerate() / 200, 1, STREAM_BUFFER_SIZE);
+            }
+
+            base_type::tempStart();
+            if (err) { throw std::runtime_error(err); }
+        }
+
+        bool isOpen() { return reader.isOpen(); }
+
+        void setRealtime(bool realtime) {
+            assert(base_type::_block_init);
+            std::lock_guard<std::recursive_mutex> lck(base_type::ctrlMtx);
+            base_type::tempStop();
+            _realtime = realtime;
+            base_type::tempStart();
+        }
+
+        void setLoop(bool loop) {
+            assert(base_type::_block_init);
+            std::lock_guard<std::recursive_mutex> lck(base_type::ctrlMtx);
+            base_type::tempStop();
+            _loop = loop;
+            base_type::tempStart();
+        }
+
+        // Move the read position to the given sample
+        void seek(size_t sample) {
+            assert(base_type::_block_init);
+            std::lock_guard<std::recursive_mutex> lck(base_type::ctrlMtx);
+            base_type::tempStop();
+            pos = std::min<size_t>(sample, reader.getSampleCount());
+
+            // If the worker had exited at the end of the file, it's started again by tempStart()
+            if (pos < reader.getSampleCount()) { finished = false; }
+            base_type::tempStart();
+        }
+
+        // Wait for the end of the file to be reached (never happens in loop mode).
+        // Returns false if timeoutMs elapsed first, waits forever if negative.
+        bool waitFinished(double timeoutMs = -1.0) {
+            std::unique_lock<std::mutex> lck(finishMtx);
+            auto isFinished = [this]() { return (bool)finished; };
+            if (timeoutMs < 0) {
+                finishCV.wait(lck, isFinished);
+                return true;
+            }
+            return finishCV.wait_for(lck, std::chrono::duration<double, std::milli>(timeoutMs), isFinished);
+        }
+
+        bool isFinished() { return finished; }
+        bool isRealtime() { return _realtime; }
+        bool isLooping() { return _loop; }
+        double getSamplerate() { return reader.getSamplerate(); }
+        size_t getSampleCount() { return reader.getSampleCount(); }
+        size_t getPosition() { return pos; }
+
+        // Total number of samples written to the output since init or the last resetCounters()
+        uint64_t getSamplesWritten() { return samplesWritten; }
+        void resetCounters() { samplesWritten = 0; }
+
+        int run() {
+            // Handle the end of the file
+            if (pos >= reader.getSampleCount()) {
+                if (!_loop || !reader.getSampleCount()) {
+                    {
+                        std::lock_guard<std::mutex> lck(finishMtx);
+                        finished = true;
+                    }
+                    finishCV.notify_all();
+                    return -1;
+                }
+                pos = 0;
+            }
+
+            int count = reader.read((float*)base_type::out.writeBuf, pos, blockSize);
+            pos += count;
+
+            // Pace against the time the block was started so that rounding errors don't accumulate
+            if (_realtime) {
+                pacedSamples += count;
+                std::this_thread::sleep_until(pacingStart + std::chrono::duration<double>((double)pacedSamples / (double)reader.getSamplerate()));
+            }
+
+            if (!base_type::out.swap(count)) { return -1; }
+            samplesWritten += count;
+            return count;
+        }
+
+    protected:
+        void doStart() {
+            pacingStart = std::chrono::steady_clock::now();
+            pacedSamples = 0;
+            base_type::doStart();
+        }
+
+        wav::Reader reader;
+        bool _realtime;
+        bool _loop;
+        int blockSize = 1;
+        std::atomic<size_t> pos = 0;
+
+        std::chrono::steady_clock::time_point pacingStart;
+        uint64_t pacedSamples = 0;
+        std::atomic<uint64_t> samplesWritten = 0;
+
+        std::mutex finishMtx;
+        std::condition_variable finishCV;
+        std::atomic<bool> finished = false;
+    };
+}
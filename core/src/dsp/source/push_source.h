@@ -0,0 +1,98 @@
+#pragma once
+#include "../source.h"
+#include <atomic>
+#include <mutex>
+#include <string.h>
+
+namespace dsp::source {
+    // Source fed by the caller instead of a worker thread. push() copies the samples straight into
+    // the write buffer of the output stream and swaps it on the calling thread.
+    // In blocking mode push() waits for the consumers to take each buffer (back-pressure), otherwise
+    // it returns as soon as the previous buffer wasn't taken yet and the rest of the samples is
+    // counted as dropped. While the block is stopped, nothing is accepted.
+    class Push : public Source<complex_t> {
+        using base_type = Source<complex_t>;
+    public:
+        Push() {}
+
+        Push(bool blocking, int blockSize = 0) { init(blocking, blockSize); }
+
+        ~Push() {
+            if (!base_type::_block_init) { return; }
+            base_type::stop();
+        }
+
+        void init(bool blocking, int blockSize = 0) {
+            _blocking = blocking;
+            setBlockSize(blockSize);
+            base_type::init();
+        }
+
+        void setBlocking(bool blocking) { _blocking = blocking; }
+
+        // Maximum number of samples per output buffer, pushes are split into buffers of at most
+        // that size (up to STREAM_BUFFER_SIZE if 0)
+        void setBlockSize(int blockSize) {
+            _blockSize = (blockSize > 0) ? std::min<int>(blockSize, STREAM_BUFFER_SIZE) : STREAM_BUFFER_SIZE;
+        }
+
+        bool isBlocking() { return _blocking; }
+        int getBlockSize() { return _blockSize; }
+
+        // Write count samples to the output, returns the number of samples written. Less than count
+        // are written if the block is stopped meanwhile or, in non-blocking mode, if the consumers
+        // haven't taken the previous buffer yet. Pushes from several threads are serialized.
+        size_t push(const complex_t* data, size_t count) {
+            std::lock_guard<std::mutex> lck(pushMtx);
+            size_t written = 0;
+            while (written < count && accepting) {
+                if (!_blocking && !base_type::out.writable()) { break; }
+                int n = std::min<size_t>(count - written, _blockSize);
+                base_type::out.reserve(n);
+                memcpy(base_type::out.writeBuf, &data[written], n * sizeof(complex_t));
+                if (!base_type::out.swap(n)) { break; }
+                written += n;
+            }
+            samplesWritten += written;
+            samplesDropped += count - written;
+            return written;
+        }
+
+        // Totals since init or the last resetCounters()
+        uint64_t getSamplesWritten() { return samplesWritten; }
+        uint64_t getSamplesDropped() { return samplesDropped; }
+
+        void resetCounters() {
+            samplesWritten = 0;
+            samplesDropped = 0;
+        }
+
+        // Not used, the samples are written by push()
+        int run() { return -1; }
+
+    protected:
+        void doStart() {
+            // There is no worker thread, register with the metrics here so that the block shows up
+            base_type::registerMetrics();
+            accepting = true;
+        }
+
+        void doStop() {
+            // Unblock a push waiting on the consumers and wait for it to return before accepting swaps again
+            accepting = false;
+            base_type::out.stopWriter();
+            {
+                std::lock_guard<std::mutex> lck(pushMtx);
+            }
+            base_type::out.clearWriteStop();
+        }
+
+        std::atomic<bool> _blocking = true;
+        std::atomic<int> _blockSize = STREAM_BUFFER_SIZE;
+        std::atomic<bool> accepting = false;
+        std::mutex pushMtx;
+
+        std::atomic<uint64_t> samplesWritten = 0;
+        std::atomic<uint64_t> samplesDropped = 0;
+    };
+}
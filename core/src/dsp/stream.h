@@ -1,17 +1,24 @@
 #pragma once
 #include <string.h>
+#include <algorithm>
 #include <mutex>
 #include <condition_variable>
+#include <typeinfo>
 #include <volk/volk.h>
+#include "metrics.h"
+#include "scheduler.h"
 #include "buffer/buffer.h"
+#include "buffer/pool.h"
 
-// 1MSample buffer
+// 1MSample buffer, the default size of the buffers of a stream (see stream::reserve())
 #define STREAM_BUFFER_SIZE 1000000
 
 namespace dsp {
     class untyped_stream {
     public:
-        virtual ~untyped_stream() {}
+        virtual ~untyped_stream() {
+            metrics::unregisterStream(&counters);
+        }
         virtual bool swap(int size) { return false; }
         virtual int read() { return -1; }
         virtual void flush() {}
@@ -19,14 +26,33 @@ namespace dsp {
         virtual void clearWriteStop() {}
         virtual void stopReader() {}
         virtual void clearReadStop() {}
+
+        // Whether read() and swap() would return without waiting
+        virtual bool readable() { return true; }
+        virtual bool writable() { return true; }
+
+        // Pooled blocks notified when the stream can be read from or written to (see scheduler.h)
+        virtual void setReaderTask(scheduler::Task* task) {}
+        virtual void setWriterTask(scheduler::Task* task) {}
+        virtual void clearReaderTask(scheduler::Task* task) {}
+        virtual void clearWriterTask(scheduler::Task* task) {}
+
+        // Name shown in the metrics
+        void setMetricsName(const std::string& name) {
+            metrics::setName(&counters, name);
+        }
+
+        metrics::StreamCounters counters;
     };
 
     template <class T>
     class stream : public untyped_stream {
     public:
         stream() {
-            writeBuf = buffer::alloc<T>(STREAM_BUFFER_SIZE);
-            readBuf = buffer::alloc<T>(STREAM_BUFFER_SIZE);
+            writeBuf = allocBuffer(STREAM_BUFFER_SIZE, writeSize);
+            readBuf = allocBuffer(STREAM_BUFFER_SIZE, readSize);
+            updateBufferBytes();
+            counters.type = typeid(T).name();
         }
 
         virtual ~stream() {
@@ -34,33 +60,66 @@ namespace dsp {
         }
 
         virtual void setBufferSize(int samples) {
-            buffer::free(writeBuf);
-            buffer::free(readBuf);
-            writeBuf = buffer::alloc<T>(samples);
-            readBuf = buffer::alloc<T>(samples);
+            free();
+            writeBuf = allocBuffer(samples, writeSize);
+            readBuf = allocBuffer(samples, readSize);
+            reservedSize = writeSize;
+            updateBufferBytes();
+        }
+
+        // Make the buffers hold at least the given number of samples. Must be called by the writer
+        // before writing to writeBuf, from its thread or while it's stopped. The first call sizes the
+        // buffers for what the writer needs instead of STREAM_BUFFER_SIZE, the next ones only grow
+        // them. The buffer of the reader is resized by the next swap, once the reader is done with it.
+        inline void reserve(int samples) {
+            if (samples <= reservedSize) { return; }
+            if (bufferSize(samples) != writeSize) {
+                releaseBuffer(writeBuf, writeSize);
+                writeBuf = allocBuffer(samples, writeSize);
+                updateBufferBytes();
+            }
+            reservedSize = writeSize;
+        }
+
+        // Number of samples writeBuf can hold
+        int getBufferSize() {
+            return writeSize;
         }
 
         virtual inline bool swap(int size) {
             {
                 // Wait to either swap or stop
                 std::unique_lock<std::mutex> lck(swapMtx);
-                swapCV.wait(lck, [this] { return (canSwap || writerStop); });
+                if (!canSwap && !writerStop) {
+                    counters.swapWaitingSince.store(metrics::now(), std::memory_order_relaxed);
+                    scheduler::beginBlocking();
+                    swapCV.wait(lck, [this] { return (canSwap || writerStop); });
+                    scheduler::endBlocking();
+                    metrics::waited(counters.swapWaitNs, counters.swapWaitMaxNs, counters.swapWaitingSince);
+                }
 
                 // If writer was stopped, abandon operation
                 if (writerStop) { return false; }
 
+                // Resize the buffer flushed by the reader to the size reserved by the writer
+                if (readSize != writeSize) {
+                    releaseBuffer(readBuf, readSize);
+                    readBuf = allocBuffer(writeSize, readSize);
+                    updateBufferBytes();
+                }
+
                 // Swap buffers
                 dataSize = size;
-                T* temp = writeBuf;
-                writeBuf = readBuf;
-                readBuf = temp;
+                std::swap(writeBuf, readBuf);
                 canSwap = false;
             }
+            counters.swapped(size);
 
             // Notify reader that some data is ready
             {
                 std::lock_guard<std::mutex> lck(rdyMtx);
                 dataReady = true;
+                if (readerTask) { scheduler::notify(readerTask); }
             }
             rdyCV.notify_all();
 
@@ -70,7 +129,13 @@ namespace dsp {
         virtual inline int read() {
             // Wait for data to be ready or to be stopped
             std::unique_lock<std::mutex> lck(rdyMtx);
-            rdyCV.wait(lck, [this] { return (dataReady || readerStop); });
+            if (!dataReady && !readerStop) {
+                counters.readWaitingSince.store(metrics::now(), std::memory_order_relaxed);
+                scheduler::beginBlocking();
+                rdyCV.wait(lck, [this] { return (dataReady || readerStop); });
+                scheduler::endBlocking();
+                metrics::waited(counters.readWaitNs, counters.readWaitMaxNs, counters.readWaitingSince);
+            }
 
             return (readerStop ? -1 : dataSize);
         }
@@ -86,6 +151,7 @@ namespace dsp {
             {
                 std::lock_guard<std::mutex> lck(swapMtx);
                 canSwap = true;
+                if (writerTask) { scheduler::notify(writerTask); }
             }
 
             swapCV.notify_all();
@@ -95,6 +161,7 @@ namespace dsp {
             {
                 std::lock_guard<std::mutex> lck(swapMtx);
                 writerStop = true;
+                if (writerTask) { scheduler::notify(writerTask); }
             }
             swapCV.notify_all();
         }
@@ -107,6 +174,7 @@ namespace dsp {
             {
                 std::lock_guard<std::mutex> lck(rdyMtx);
                 readerStop = true;
+                if (readerTask) { scheduler::notify(readerTask); }
             }
             rdyCV.notify_all();
         }
@@ -115,17 +183,72 @@ namespace dsp {
             readerStop = false;
         }
 
+        virtual bool readable() {
+            std::lock_guard<std::mutex> lck(rdyMtx);
+            return dataReady || readerStop;
+        }
+
+        virtual bool writable() {
+            std::lock_guard<std::mutex> lck(swapMtx);
+            return canSwap || writerStop;
+        }
+
+        virtual void setReaderTask(scheduler::Task* task) {
+            std::lock_guard<std::mutex> lck(rdyMtx);
+            readerTask = task;
+        }
+
+        virtual void setWriterTask(scheduler::Task* task) {
+            std::lock_guard<std::mutex> lck(swapMtx);
+            writerTask = task;
+        }
+
+        virtual void clearReaderTask(scheduler::Task* task) {
+            std::lock_guard<std::mutex> lck(rdyMtx);
+            if (readerTask == task) { readerTask = NULL; }
+        }
+
+        virtual void clearWriterTask(scheduler::Task* task) {
+            std::lock_guard<std::mutex> lck(swapMtx);
+            if (writerTask == task) { writerTask = NULL; }
+        }
+
         void free() {
-            if (writeBuf) { buffer::free(writeBuf); }
-            if (readBuf) { buffer::free(readBuf); }
+            releaseBuffer(writeBuf, writeSize);
+            releaseBuffer(readBuf, readSize);
             writeBuf = NULL;
             readBuf = NULL;
+            writeSize = 0;
+            readSize = 0;
+            updateBufferBytes();
         }
 
         T* writeBuf;
         T* readBuf;
 
     private:
+        // Buffers are taken from the shared pool, their size rounded up to its size class
+        static int bufferSize(int samples) {
+            return buffer::pool::classSize((size_t)std::max<int>(samples, 1) * sizeof(T)) / sizeof(T);
+        }
+
+        static T* allocBuffer(int samples, int& size) {
+            size = bufferSize(samples);
+            return (T*)buffer::pool::acquire((size_t)size * sizeof(T));
+        }
+
+        static void releaseBuffer(T* buf, int size) {
+            if (buf) { buffer::pool::release(buf, (size_t)size * sizeof(T)); }
+        }
+
+        void updateBufferBytes() {
+            counters.bufferBytes.store((uint64_t)(writeSize + readSize) * sizeof(T), std::memory_order_relaxed);
+        }
+
+        int writeSize = 0;
+        int readSize = 0;
+        int reservedSize = 0;
+
         std::mutex swapMtx;
         std::condition_variable swapCV;
         bool canSwap = true;
@@ -137,6 +260,9 @@ namespace dsp {
         bool readerStop = false;
         bool writerStop = false;
 
+        scheduler::Task* readerTask = NULL;
+        scheduler::Task* writerTask = NULL;
+
         int dataSize = 0;
     };
 }
\ No newline at end of file
@@ -0,0 +1,129 @@
+#include "headless.h"
+#include <core.h>
+#include <filesystem>
+#include <utils/flog.h>
+#include <gui/smgui.h>
+#include <signal_path/signal_path.h>
+
+namespace headless {
+    dsp::stream<dsp::complex_t> dummyStream;
+    bool active = false;
+    bool saveConfig = false;
+
+    bool moduleSelected(const std::string& filename, const std::vector<std::string>& filter) {
+        if (filter.empty()) { return true; }
+        for (const auto& f : filter) {
+            if (filename.find(f) != std::string::npos) { return true; }
+        }
+        return false;
+    }
+
+    void loadModule(const std::filesystem::path& file, const std::vector<std::string>& filter) {
+        if (file.extension().generic_string() != SDRPP_MOD_EXTENTSION) { return; }
+        if (!std::filesystem::is_regular_file(file)) { return; }
+        if (!moduleSelected(file.filename().string(), filter)) { return; }
+
+        std::string path = std::filesystem::absolute(file).generic_string();
+        flog::info("Loading {0}", path);
+        core::moduleManager.loadModule(path);
+    }
+
+    int init(const Options& options) {
+        if (active) {
+            flog::error("Headless core already initialized");
+            return -1;
+        }
+        flog::info("=====| HEADLESS MODE |=====");
+
+        // Modules read their paths from the command line arguments
+        std::string root = std::filesystem::absolute(options.root).string();
+        core::args.defineAll();
+        const char* argv[] = { "sdrpp", "--root", root.c_str() };
+        if (core::args.parse(3, (char**)argv) < 0) { return -1; }
+
+        // Load config
+        saveConfig = options.saveConfig;
+        if (core::loadConfig(root, saveConfig) < 0) { return -1; }
+
+        core::configManager.acquire();
+        std::string modulesDir = core::configManager.conf["modulesDirectory"];
+        std::vector<std::string> modules = core::configManager.conf["modules"];
+        auto modList = core::configManager.conf["moduleInstances"].items();
+        std::string sourceName = core::configManager.conf["source"];
+        double frequency = core::configManager.conf["frequency"];
+        int fftSize = core::configManager.conf["fftSize"];
+        double fftRate = core::configManager.conf["fftRate"];
+        int fftWindow = core::configManager.conf["fftWindow"];
+        core::configManager.release();
+        modulesDir = std::filesystem::absolute(modulesDir).string();
+
+        // Module menus are only ever recorded, never rendered
+        SmGui::init(true);
+
+        // Init DSP, without a waterfall to write FFTs to
+        IQFrontEnd::FFTWindow window = (IQFrontEnd::FFTWindow)std::clamp<int>(fftWindow, IQFrontEnd::FFTWindow::RECTANGULAR, IQFrontEnd::FFTWindow::NUTTALL);
+        sigpath::iqFrontEnd.init(&dummyStream, 8000000, true, 1, false, fftSize, fftRate, window, NULL, NULL, NULL);
+        sigpath::iqFrontEnd.start();
+        active = true;
+
+        flog::info("Loading modules");
+        if (std::filesystem::is_directory(modulesDir)) {
+            for (const auto& file : std::filesystem::directory_iterator(modulesDir)) {
+                loadModule(file.path(), options.moduleFilter);
+            }
+        }
+        else {
+            flog::warn("Module directory {0} does not exist, not loading modules from directory", modulesDir);
+        }
+
+        // Load additional modules through the config
+        for (auto const& path : modules) {
+            loadModule(path, options.moduleFilter);
+        }
+
+        // Create module instances
+        for (auto const& [name, _module] : modList) {
+            std::string mod = _module["module"];
+            bool enabled = _module["enabled"];
+            if (core::moduleManager.modules.find(mod) == core::moduleManager.modules.end()) { continue; }
+            flog::info("Initializing {0} ({1})", name, mod);
+            core::moduleManager.createInstance(name, mod);
+            if (!enabled) { core::moduleManager.disableInstance(name); }
+        }
+
+        // Do post-init
+        core::moduleManager.doPostInitAll();
+
+        // Select the last used source if it's available
+        auto sources = sigpath::sourceManager.getSourceNames();
+        if (std::find(sources.begin(), sources.end(), sourceName) != sources.end()) {
+            sigpath::sourceManager.selectSource(sourceName);
+        }
+        sigpath::sourceManager.tune(frequency);
+
+        flog::info("Ready.");
+        return 0;
+    }
+
+    void end() {
+        if (!active) { return; }
+
+        // Shut down all modules
+        sigpath::sourceManager.stop();
+        for (auto& [name, mod] : core::moduleManager.modules) {
+            mod.end();
+        }
+
+        sigpath::iqFrontEnd.stop();
+
+        if (saveConfig) {
+            core::configManager.disableAutoSave();
+            core::configManager.save();
+        }
+        active = false;
+    }
+
+    bool isActive() {
+        return active;
+    }
+}
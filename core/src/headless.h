@@ -0,0 +1,22 @@
+#pragma once
+#include <string>
+#include <vector>
+
+// Core initialization without any GUI backend (no GLFW/ImGui), used when SDR++ is driven
+// by another program such as the Python bindings
+namespace headless {
+    struct Options {
+        // Root directory holding config.json
+        std::string root;
+
+        // Only load modules whose filename contains one of these strings (all modules if empty)
+        std::vector<std::string> moduleFilter = { "source" };
+
+        // Save config changes back to the root directory
+        bool saveConfig = false;
+    };
+
+    int init(const Options& options);
+    void end();
+    bool isActive();
+}
@@ -1,9 +1,11 @@
 #include "server.h"
 #include "core.h"
+#include <utils/networking.h>
 #include <utils/flog.h>
 #include <version.h>
 #include <config.h>
 #include <filesystem>
+#include <mutex>
 #include <dsp/types.h>
 #include <signal_path/signal_path.h>
 #include <gui/smgui.h>
@@ -13,6 +15,10 @@
 #include <zstd.h>
 
 namespace server {
+    void _clientHandler(net::Conn conn, void* ctx);
+    void _packetHandler(int count, uint8_t* buf, void* ctx);
+    void _testServerHandler(uint8_t* data, int count, void* ctx);
+
     dsp::stream<dsp::complex_t> dummyInput;
     dsp::compression::SampleStreamCompressor comp;
     dsp::sink::Handler<uint8_t> hnd;
@@ -31,6 +37,10 @@ namespace server {
     CommandHeader* s_cmd_hdr = NULL;
     uint8_t* s_cmd_data = NULL;
 
+    // Held while sbuf is filled and sent, commands are answered from the read thread while
+    // the samplerate can be sent from any thread. Recursive since handling a command can change it.
+    std::recursive_mutex sendMtx;
+
     PacketHeader* bb_pkt_hdr = NULL;
     uint8_t* bb_pkt_data = NULL;
 
@@ -45,9 +55,10 @@ namespace server {
     bool running = false;
     bool compression = false;
     double sampleRate = 1000000.0;
+    bool initialized = false;
 
-    int main() {
-        flog::info("=====| SERVER MODE |=====");
+    void init() {
+        if (initialized) { return; }
 
         // Init DSP
         comp.init(&dummyInput, dsp::compression::PCM_TYPE_I8);
@@ -55,8 +66,6 @@ namespace server {
         rbuf = new uint8_t[SERVER_MAX_PACKET_SIZE];
         sbuf = new uint8_t[SERVER_MAX_PACKET_SIZE];
         bbuf = new uint8_t[SERVER_MAX_PACKET_SIZE];
-        comp.start();
-        hnd.start();
 
         // Initialize headers
         r_pkt_hdr = (PacketHeader*)rbuf;
@@ -75,6 +84,12 @@ namespace server {
         // Initialize compressor
         cctx = ZSTD_createCCtx();
 
+        initialized = true;
+    }
+
+    int main() {
+        flog::info("=====| SERVER MODE |=====");
+
         // Load config
         core::configManager.acquire();
         std::string modulesDir = core::configManager.conf["modulesDirectory"];
@@ -151,8 +166,7 @@ namespace server {
         // TODO: Use command line option
         std::string host = (std::string)core::args["addr"];
         int port = (int)core::args["port"];
-        listener = net::listen(host, port);
-        listener->acceptAsync(_clientHandler, NULL);
+        if (!start(host, port)) { return -1; }
 
         flog::info("Ready, listening on {0}:{1}", host, port);
         while(1) { std::this_thread::sleep_for(std::chrono::milliseconds(100)); }
@@ -160,6 +174,48 @@ namespace server {
         return 0;
     }
 
+    bool start(std::string host, int port) {
+        if (isListening()) {
+            flog::error("Server already listening");
+            return false;
+        }
+        init();
+
+        // Module menus are recorded and sent to the client instead of being rendered
+        SmGui::init(true);
+
+        try {
+            listener = net::listen(host, port);
+        }
+        catch (const std::exception& e) {
+            flog::error("Could not listen on {0}:{1}: {2}", host, port, e.what());
+            return false;
+        }
+        if (!listener) {
+            flog::error("Could not listen on {0}:{1}", host, port);
+            return false;
+        }
+
+        comp.start();
+        hnd.start();
+        listener->acceptAsync(_clientHandler, NULL);
+        return true;
+    }
+
+    void stop() {
+        if (!listener) { return; }
+        listener->close();
+        listener.reset();
+        if (client) { client->close(); }
+        comp.stop();
+        hnd.stop();
+        running = false;
+    }
+
+    bool isListening() {
+        return listener && listener->isListening();
+    }
+
     void _clientHandler(net::Conn conn, void* ctx) {
         // Reject if someone else is already connected
         if (client && client->isOpen()) {
@@ -186,14 +242,20 @@ namespace server {
 
         flog::info("Connection from {0}:{1}", "TODO", "TODO");
         client = std::move(conn);
-        client->readAsync(sizeof(PacketHeader), rbuf, _packetHandler, NULL);
 
         // Perform settings reset
         sigpath::sourceManager.stop();
+        running = false;
         comp.setPCMType(dsp::compression::PCM_TYPE_I16);
         compression = false;
 
-        sendSampleRate(sampleRate);
+        {
+            std::lock_guard<std::recursive_mutex> lck(sendMtx);
+            sendSampleRate(sampleRate);
+        }
+
+        // Only read once the reset is done, clients may send commands as soon as they're connected
+        client->readAsync(sizeof(PacketHeader), rbuf, _packetHandler, NULL);
 
         // TODO: Wait otherwise someone else could connect
 
@@ -214,12 +276,15 @@ namespace server {
         }
 
         // Parse and process
-        if (hdr->type == PACKET_TYPE_COMMAND && hdr->size >= sizeof(PacketHeader) + sizeof(CommandHeader)) {
-            CommandHeader* chdr = (CommandHeader*)&buf[sizeof(PacketHeader)];
-            commandHandler((Command)chdr->cmd, &buf[sizeof(PacketHeader) + sizeof(CommandHeader)], hdr->size - sizeof(PacketHeader) - sizeof(CommandHeader));
-        }
-        else {
-            sendError(ERROR_INVALID_PACKET);
+        {
+            std::lock_guard<std::recursive_mutex> lck(sendMtx);
+            if (hdr->type == PACKET_TYPE_COMMAND && hdr->size >= sizeof(PacketHeader) + sizeof(CommandHeader)) {
+                CommandHeader* chdr = (CommandHeader*)&buf[sizeof(PacketHeader)];
+                commandHandler((Command)chdr->cmd, &buf[sizeof(PacketHeader) + sizeof(CommandHeader)], hdr->size - sizeof(PacketHeader) - sizeof(CommandHeader));
+            }
+            else {
+                sendError(ERROR_INVALID_PACKET);
+            }
         }
 
         // Start another async read
@@ -227,6 +292,9 @@ namespace server {
     }
 
     void _testServerHandler(uint8_t* data, int count, void* ctx) {
+        // Only stream once the client asked for it
+        if (!running) { return; }
+
         // Compress data if needed and fill out header fields
         if (compression) {
             bb_pkt_hdr->type = PACKET_TYPE_BASEBAND_COMPRESSED;
@@ -291,12 +359,23 @@ namespace server {
             sigpath::sourceManager.tune(*(double*)data);
             sendCommandAck(COMMAND_SET_FREQUENCY, 0);
         }
+        else if (cmd == COMMAND_GET_SAMPLERATE) {
+            *(double*)s_cmd_data = sampleRate;
+            sendCommandAck(COMMAND_GET_SAMPLERATE, sizeof(double));
+        }
         else if (cmd == COMMAND_SET_SAMPLE_TYPE && len == 1) {
+            if (data[0] > dsp::compression::PCM_TYPE_F32) { sendError(ERROR_INVALID_ARGUMENT); return; }
             dsp::compression::PCMType type = (dsp::compression::PCMType)*(uint8_t*)data;
             comp.setPCMType(type);
+
+            // Acknowledge with the type now in use
+            s_cmd_data[0] = type;
+            sendCommandAck(COMMAND_SET_SAMPLE_TYPE, 1);
         }
         else if (cmd == COMMAND_SET_COMPRESSION && len == 1) {
             compression = *(uint8_t*)data;
+            s_cmd_data[0] = compression;
+            sendCommandAck(COMMAND_SET_COMPRESSION, 1);
         }
         else {
             flog::error("Invalid Command: {0} (len = {1})", (int)cmd, len);
@@ -364,6 +443,7 @@ namespace server {
     }
 
     void setInputSampleRate(double samplerate) {
+        std::lock_guard<std::recursive_mutex> lck(sendMtx);
         sampleRate = samplerate;
         if (!client || !client->isOpen()) { return; }
         sendSampleRate(sampleRate);
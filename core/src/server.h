@@ -1,5 +1,5 @@
 #pragma once
-#include <utils/networking.h>
+#include <string>
 #include <dsp/stream.h>
 #include <dsp/types.h>
 #include <server_protocol.h>
@@ -8,9 +8,10 @@ namespace server {
     void setInput(dsp::stream<dsp::complex_t>* stream);
     int main();
 
-    void _clientHandler(net::Conn conn, void* ctx);
-    void _packetHandler(int count, uint8_t* buf, void* ctx);
-    void _testServerHandler(uint8_t* data, int count, void* ctx);
+    // Serve the current input without the rest of server mode (eg. from a headless runtime)
+    bool start(std::string host, int port);
+    void stop();
+    bool isListening();
 
     void drawMenu();
 
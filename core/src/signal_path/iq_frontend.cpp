@@ -66,6 +66,16 @@ void IQFrontEnd::init(dsp::stream<dsp::complex_t>* in, double sampleRate, bool b
 
     split.bindStream(&fftIn);
 
+    // Names shown in the DSP metrics
+    inBuf.setMetricsName("IQFrontEnd.buffer");
+    decim.setMetricsName("IQFrontEnd.decimator");
+    dcBlock.setMetricsName("IQFrontEnd.dcBlocker");
+    conjugate.setMetricsName("IQFrontEnd.conjugate");
+    split.setMetricsName("IQFrontEnd.splitter");
+    fftIn.setMetricsName("IQFrontEnd.fft");
+    reshape.setMetricsName("IQFrontEnd.reshaper");
+    fftSink.setMetricsName("IQFrontEnd.fftSink");
+
     _init = true;
 }
 
@@ -138,6 +148,8 @@ void IQFrontEnd::unbindIQStream(dsp::stream<dsp::complex_t>* stream) {
 }
 
 dsp::channel::RxVFO* IQFrontEnd::addVFO(std::string name, double sampleRate, double bandwidth, double offset) {
+    std::lock_guard<std::recursive_mutex> lck(vfoMtx);
+
     // Make sure no other VFO with that name already exists
     if (vfos.find(name) != vfos.end()) {
         flog::error("[IQFrontEnd] Tried to add VFO with existing name.");
@@ -147,6 +159,9 @@ dsp::channel::RxVFO* IQFrontEnd::addVFO(std::string name, double sampleRate, dou
     // Create VFO and its input stream
     dsp::stream<dsp::complex_t>* vfoIn = new dsp::stream<dsp::complex_t>;
     dsp::channel::RxVFO* vfo = new dsp::channel::RxVFO(vfoIn, effectiveSr, sampleRate, bandwidth, offset);
+    vfoIn->setMetricsName("IQFrontEnd.vfo." + name);
+    vfo->setMetricsName("vfo." + name);
+    vfo->out.setMetricsName("vfo." + name);
 
     // Register them
     vfoStreams[name] = vfoIn;
@@ -160,6 +175,8 @@ dsp::channel::RxVFO* IQFrontEnd::addVFO(std::string name, double sampleRate, dou
 }
 
 void IQFrontEnd::removeVFO(std::string name) {
+    std::lock_guard<std::recursive_mutex> lck(vfoMtx);
+
     // Make sure that a VFO with that name exists
     if (vfos.find(name) == vfos.end()) {
         flog::error("[IQFrontEnd] Tried to remove a VFO that doesn't exist.");
@@ -182,6 +199,69 @@ void IQFrontEnd::removeVFO(std::string name) {
     delete vfoIn;
 }
 
+void IQFrontEnd::beginVFOBatch() {
+    vfoMtx.lock();
+
+    // Binding and unbinding streams nest their own temp stops inside this one
+    split.tempStop();
+}
+
+void IQFrontEnd::endVFOBatch() {
+    split.tempStart();
+    vfoMtx.unlock();
+}
+
+dsp::channel::PFBChannelizer* IQFrontEnd::addChannelizer(std::string name, int channelCount, int tapsPerChannel) {
+    std::lock_guard<std::recursive_mutex> lck(vfoMtx);
+
+    // Make sure no other channelizer with that name already exists
+    if (channelizers.find(name) != channelizers.end()) {
+        flog::error("[IQFrontEnd] Tried to add channelizer with existing name.");
+        return NULL;
+    }
+
+    // Create channelizer and its input stream
+    dsp::stream<dsp::complex_t>* chanIn = new dsp::stream<dsp::complex_t>;
+    dsp::channel::PFBChannelizer* chan = new dsp::channel::PFBChannelizer(chanIn, channelCount, tapsPerChannel);
+    chanIn->setMetricsName("IQFrontEnd.channelizer." + name);
+    chan->setMetricsName("channelizer." + name);
+
+    // Register them
+    channelizerStreams[name] = chanIn;
+    channelizers[name] = chan;
+    bindIQStream(chanIn);
+
+    // Start channelizer
+    chan->start();
+
+    return chan;
+}
+
+void IQFrontEnd::removeChannelizer(std::string name) {
+    std::lock_guard<std::recursive_mutex> lck(vfoMtx);
+
+    // Make sure that a channelizer with that name exists
+    if (channelizers.find(name) == channelizers.end()) {
+        flog::error("[IQFrontEnd] Tried to remove a channelizer that doesn't exist.");
+        return;
+    }
+
+    // Remove the channelizer and stream from registry
+    dsp::stream<dsp::complex_t>* chanIn = channelizerStreams[name];
+    dsp::channel::PFBChannelizer* chan = channelizers[name];
+
+    // Stop the channelizer
+    chan->stop();
+
+    unbindIQStream(chanIn);
+    channelizerStreams.erase(name);
+    channelizers.erase(name);
+
+    // Delete the channelizer and its input stream
+    delete chan;
+    delete chanIn;
+}
+
 void IQFrontEnd::setFFTSize(int size) {
     _fftSize = size;
     updateFFTPath(true);
@@ -197,6 +277,18 @@ void IQFrontEnd::setFFTWindow(FFTWindow fftWindow) {
     updateFFTPath();
 }
 
+void IQFrontEnd::bindFFTHandler(EventHandler<FFTFrame>* handler) {
+    std::lock_guard<std::mutex> lck(fftHandlerMtx);
+    onFFTFrame.bindHandler(handler);
+    fftHandlerCount++;
+}
+
+void IQFrontEnd::unbindFFTHandler(EventHandler<FFTFrame>* handler) {
+    std::lock_guard<std::mutex> lck(fftHandlerMtx);
+    onFFTFrame.unbindHandler(handler);
+    fftHandlerCount = std::max<int>(fftHandlerCount - 1, 0);
+}
+
 void IQFrontEnd::flushInputBuffer() {
     inBuf.flush();
 }
@@ -255,15 +347,30 @@ void IQFrontEnd::handler(dsp::complex_t* data, int count, void* ctx) {
     fftwf_execute(_this->fftwPlan);
 
     // Aquire buffer
-    float* fftBuf = _this->_acquireFFTBuffer(_this->_fftCtx);
-
-    // Convert the complex output of the FFT to dB amplitude
-    if (fftBuf) {
-        volk_32fc_s32f_power_spectrum_32f(fftBuf, (lv_32fc_t*)_this->fftOutBuf, _this->_fftSize, _this->_fftSize);
+    float* fftBuf = _this->_acquireFFTBuffer ? _this->_acquireFFTBuffer(_this->_fftCtx) : NULL;
+
+    {
+        // Still compute the power spectrum for the FFT handlers when there's no waterfall
+        std::lock_guard<std::mutex> lck(_this->fftHandlerMtx);
+        float* powerBuf = fftBuf;
+        if (!powerBuf && _this->fftHandlerCount) {
+            _this->fftTapBuf.resize(_this->_fftSize);
+            powerBuf = _this->fftTapBuf.data();
+        }
+
+        // Convert the complex output of the FFT to dB amplitude
+        if (powerBuf) {
+            volk_32fc_s32f_power_spectrum_32f(powerBuf, (lv_32fc_t*)_this->fftOutBuf, _this->_fftSize, _this->_fftSize);
+        }
+
+        // Send the frame to the handlers
+        if (powerBuf && _this->fftHandlerCount) {
+            _this->onFFTFrame.emit({ powerBuf, _this->_fftSize });
+        }
     }
 
     // Release buffer
-    _this->_releaseFFTBuffer(_this->_fftCtx);
+    if (_this->_releaseFFTBuffer) { _this->_releaseFFTBuffer(_this->_fftCtx); }
 }
 
 void IQFrontEnd::updateFFTPath(bool updateWaterfall) {
@@ -301,7 +408,7 @@ void IQFrontEnd::updateFFTPath(bool updateWaterfall) {
     dsp::buffer::clear(fftInBuf, _fftSize - _nzFFTSize, _nzFFTSize);
 
     // Update waterfall (TODO: This is annoying, it makes this module non testable and will constantly clear the waterfall for any reason)
-    if (updateWaterfall) { gui::waterfall.setRawFFTSize(_fftSize); }
+    if (updateWaterfall && _acquireFFTBuffer) { gui::waterfall.setRawFFTSize(_fftSize); }
 
     // Restart branch
     reshape.tempStart();
@@ -6,9 +6,12 @@
 #include "../dsp/chain.h"
 #include "../dsp/routing/splitter.h"
 #include "../dsp/channel/rx_vfo.h"
+#include "../dsp/channel/pfb_channelizer.h"
 #include "../dsp/sink/handler_sink.h"
 #include "../dsp/math/conjugate.h"
+#include <utils/event.h>
 #include <fftw3.h>
+#include <mutex>
 
 class IQFrontEnd {
 public:
@@ -20,6 +23,11 @@ public:
         NUTTALL
     };
 
+    struct FFTFrame {
+        const float* data;
+        int size;
+    };
+
     void init(dsp::stream<dsp::complex_t>* in, double sampleRate, bool buffering, int decimRatio, bool dcBlocking, int fftSize, double fftRate, FFTWindow fftWindow, float* (*acquireFFTBuffer)(void* ctx), void (*releaseFFTBuffer)(void* ctx), void* fftCtx);
 
     void setInput(dsp::stream<dsp::complex_t>* in);
@@ -37,9 +45,24 @@ public:
     dsp::channel::RxVFO* addVFO(std::string name, double sampleRate, double bandwidth, double offset);
     void removeVFO(std::string name);
 
+    // Group VFO additions and removals under a single lock and a single pause of the IQ splitter
+    void beginVFOBatch();
+    void endVFOBatch();
+
+    // Polyphase channelizer splitting the whole band into evenly spaced channels, cheaper than one VFO per channel
+    dsp::channel::PFBChannelizer* addChannelizer(std::string name, int channelCount, int tapsPerChannel = 16);
+    void removeChannelizer(std::string name);
+
     void setFFTSize(int size);
     void setFFTRate(double rate);
     void setFFTWindow(FFTWindow fftWindow);
+    inline int getFFTSize() { return _fftSize; }
+    inline double getFFTRate() { return _fftRate; }
+
+    // Receive the power spectrum frames (in dB, DC centered) computed for the waterfall.
+    // Handlers are called from the FFT thread and the data is only valid during the call.
+    void bindFFTHandler(EventHandler<FFTFrame>* handler);
+    void unbindFFTHandler(EventHandler<FFTFrame>* handler);
 
     void flushInputBuffer();
 
@@ -82,6 +105,11 @@ protected:
     // VFOs
     std::map<std::string, dsp::stream<dsp::complex_t>*> vfoStreams;
     std::map<std::string, dsp::channel::RxVFO*> vfos;
+    std::recursive_mutex vfoMtx;
+
+    // Channelizers
+    std::map<std::string, dsp::stream<dsp::complex_t>*> channelizerStreams;
+    std::map<std::string, dsp::channel::PFBChannelizer*> channelizers;
 
     // Parameters
     double _sampleRate;
@@ -100,6 +128,12 @@ protected:
     fftwf_plan fftwPlan;
     float* fftDbOut;
 
+    // FFT frame handlers
+    Event<FFTFrame> onFFTFrame;
+    int fftHandlerCount = 0;
+    std::mutex fftHandlerMtx;
+    std::vector<float> fftTapBuf;
+
     double effectiveSr;
 
     bool _init = false;
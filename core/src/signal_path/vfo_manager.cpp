@@ -5,6 +5,7 @@
 VFOManager::VFO::VFO(std::string name, int reference, double offset, double bandwidth, double sampleRate, double minBandwidth, double maxBandwidth, bool bandwidthLocked) {
     this->name = name;
     _bandwidth = bandwidth;
+    _sampleRate = sampleRate;
     dspVFO = sigpath::iqFrontEnd.addVFO(name, sampleRate, bandwidth, offset);
     wtfVFO = new ImGui::WaterfallVFO;
     wtfVFO->setReference(reference);
@@ -49,6 +50,7 @@ void VFOManager::VFO::setBandwidth(double bandwidth, bool updateWaterfall) {
 }
 
 void VFOManager::VFO::setSampleRate(double sampleRate, double bandwidth) {
+    _sampleRate = sampleRate;
     dspVFO->setOutSamplerate(sampleRate, bandwidth);
     wtfVFO->setBandwidth(bandwidth);
 }
@@ -77,6 +79,10 @@ double VFOManager::VFO::getBandwidth() {
     return wtfVFO->bandwidth;
 }
 
+double VFOManager::VFO::getSampleRate() {
+    return _sampleRate;
+}
+
 int VFOManager::VFO::getReference() {
     return wtfVFO->reference;
 }
@@ -119,6 +125,13 @@ void VFOManager::deleteVFO(VFOManager::VFO* vfo) {
     onVfoDeleted.emit(name);
 }
 
+VFOManager::VFO* VFOManager::getVFO(std::string name) {
+    if (vfos.find(name) == vfos.end()) {
+        return NULL;
+    }
+    return vfos[name];
+}
+
 void VFOManager::setOffset(std::string name, double offset) {
     if (vfos.find(name) == vfos.end()) {
         return;
@@ -182,6 +195,13 @@ double VFOManager::getBandwidth(std::string name) {
     return vfos[name]->getBandwidth();
 }
 
+double VFOManager::getSampleRate(std::string name) {
+    if (vfos.find(name) == vfos.end()) {
+        return NAN;
+    }
+    return vfos[name]->getSampleRate();
+}
+
 int VFOManager::getReference(std::string name) {
     if (vfos.find(name) == vfos.end()) {
         return -1;
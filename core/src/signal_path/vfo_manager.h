@@ -22,6 +22,7 @@ public:
         void setBandwidthLimits(double minBandwidth, double maxBandwidth, bool bandwidthLocked);
         bool getBandwidthChanged(bool erase = true);
         double getBandwidth();
+        double getSampleRate();
         int getReference();
         void setColor(ImU32 color);
         std::string getName();
@@ -36,11 +37,13 @@ public:
     private:
         std::string name;
         double _bandwidth;
+        double _sampleRate;
 
     };
 
     VFOManager::VFO* createVFO(std::string name, int reference, double offset, double bandwidth, double sampleRate, double minBandwidth, double maxBandwidth, bool bandwidthLocked);
     void deleteVFO(VFOManager::VFO* vfo);
+    VFOManager::VFO* getVFO(std::string name);
 
     void setOffset(std::string name, double offset);
     double getOffset(std::string name);
@@ -51,6 +54,7 @@ public:
     void setBandwidthLimits(std::string name, double minBandwidth, double maxBandwidth, bool bandwidthLocked);
     bool getBandwidthChanged(std::string name, bool erase = true);
     double getBandwidth(std::string name);
+    double getSampleRate(std::string name);
     void setColor(std::string name, ImU32 color);
     std::string getName();
     int getReference(std::string name);
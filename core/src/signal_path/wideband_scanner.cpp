@@ -0,0 +1,290 @@
+#include "wideband_scanner.h"
+#include <math.h>
+#include <stdexcept>
+#include <utils/flog.h>
+
+WidebandScanner::WidebandScanner() {
+    fftFrameHandler.handler = fftHandler;
+    fftFrameHandler.ctx = this;
+    plan();
+    reset();
+}
+
+WidebandScanner::~WidebandScanner() {
+    stop();
+}
+
+void WidebandScanner::configure(const Config& config) {
+    if (config.spacing <= 0.0) { throw std::runtime_error("The channel spacing must be positive"); }
+    if (config.stopFreq < config.startFreq) { throw std::runtime_error("The stop frequency must not be below the start frequency"); }
+    if (config.channelWidth <= 0.0) { throw std::runtime_error("The channel width must be positive"); }
+    if (config.usableRatio <= 0.0 || config.usableRatio > 1.0) { throw std::runtime_error("The usable bandwidth ratio must be in ]0, 1]"); }
+    if (config.settleTime < 0 || config.dwellTime < 0 || config.hangTime < 0 || config.maxHoldTime < 0) {
+        throw std::runtime_error("The scanner times must not be negative");
+    }
+
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    this->config = config;
+    plan();
+    reset();
+}
+
+WidebandScanner::Config WidebandScanner::getConfig() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    return config;
+}
+
+void WidebandScanner::setSamplerate(double samplerate) {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    if (samplerate == this->samplerate) { return; }
+    this->samplerate = samplerate;
+    plan();
+    reset();
+}
+
+void WidebandScanner::start(IQFrontEnd* frontEnd, SourceManager* sourceManager) {
+    if (running) { return; }
+    this->frontEnd = frontEnd;
+    this->sourceManager = sourceManager;
+    {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        samplerate = frontEnd->getEffectiveSamplerate();
+        plan();
+        reset();
+    }
+
+    frameReady = false;
+    running = true;
+    startTime = std::chrono::steady_clock::now();
+    workerThread = std::thread(&WidebandScanner::worker, this);
+    frontEnd->bindFFTHandler(&fftFrameHandler);
+    flog::info("Wideband scanner started with {0} channels in {1} steps", (int)channels.size(), (int)steps.size());
+}
+
+void WidebandScanner::stop() {
+    if (!running) { return; }
+    frontEnd->unbindFFTHandler(&fftFrameHandler);
+    {
+        std::lock_guard<std::mutex> lck(frameMtx);
+        running = false;
+    }
+    frameCnd.notify_all();
+    if (workerThread.joinable()) { workerThread.join(); }
+    frontEnd = NULL;
+    sourceManager = NULL;
+}
+
+bool WidebandScanner::isRunning() {
+    return running;
+}
+
+void WidebandScanner::processFrame(const float* data, int size, double time) {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    if (steps.empty() || size <= 0) { return; }
+
+    // The frame was taken before the first tune, the level at the right frequencies is unknown
+    if (tunePending) {
+        tunePending = false;
+        sweepStart = time;
+        tune(currentStep, time);
+        return;
+    }
+
+    // Skip the frames of the previous step still in the pipeline
+    if ((time - tuneTime) * 1000.0 < config.settleTime) { return; }
+    if (dwellStart < 0.0) { dwellStart = time; }
+
+    // Level of each channel of the step, the highest bin over its bandwidth
+    const Step& step = steps[currentStep];
+    double lowerEdge = step.center - (samplerate / 2.0);
+    double binWidth = samplerate / (double)size;
+    bool anyActive = false;
+    for (int i = step.firstChannel; i < step.firstChannel + step.channelCount; i++) {
+        Channel& ch = channels[i];
+        int first = std::clamp<int>(floor((ch.frequency - (config.channelWidth / 2.0) - lowerEdge) / binWidth), 0, size - 1);
+        int last = std::clamp<int>(floor((ch.frequency + (config.channelWidth / 2.0) - lowerEdge) / binWidth), first, size - 1);
+        float level = data[first];
+        for (int j = first + 1; j <= last; j++) {
+            level = std::max<float>(level, data[j]);
+        }
+
+        ch.level = level;
+        ch.observed++;
+        if (level >= config.level) {
+            ch.occupied++;
+            if (!ch.active) {
+                ch.active = true;
+                ch.peak = level;
+                ch.hitStart = time;
+                emit(EVENT_HIT_START, ch.frequency, level, time, 0.0);
+            }
+            ch.peak = std::max<float>(ch.peak, level);
+            ch.lastAbove = time;
+        }
+        else if (ch.active && (time - ch.lastAbove) * 1000.0 >= config.hangTime) {
+            ch.active = false;
+            emit(EVENT_HIT_END, ch.frequency, ch.peak, ch.hitStart, ch.lastAbove - ch.hitStart);
+        }
+        anyActive |= ch.active;
+    }
+
+    // Stay on the step until it was watched long enough and nothing is going on anymore
+    double watched = (time - dwellStart) * 1000.0;
+    if (watched < config.dwellTime) { return; }
+
+    // With a single step there's nothing to retune, hits last as long as they need
+    if (steps.size() == 1) {
+        sweeps++;
+        emit(EVENT_SWEEP, 0.0, 0.0f, time, time - sweepStart);
+        sweepStart = time;
+        dwellStart = time;
+        return;
+    }
+
+    bool held = anyActive && (config.maxHoldTime <= 0 || watched < config.dwellTime + config.maxHoldTime);
+    if (held) { return; }
+
+    endHits(step);
+    currentStep = (currentStep + 1) % steps.size();
+    if (!currentStep) {
+        sweeps++;
+        emit(EVENT_SWEEP, 0.0, 0.0f, time, time - sweepStart);
+        sweepStart = time;
+    }
+    tune(currentStep, time);
+}
+
+int WidebandScanner::getChannelCount() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    return channels.size();
+}
+
+int WidebandScanner::getStepCount() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    return steps.size();
+}
+
+double WidebandScanner::getCenterFrequency() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    if (steps.empty()) { return 0.0; }
+    return steps[currentStep].center;
+}
+
+uint64_t WidebandScanner::getSweepCount() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    return sweeps;
+}
+
+std::vector<double> WidebandScanner::getChannelFrequencies() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    std::vector<double> freqs;
+    for (const auto& ch : channels) { freqs.push_back(ch.frequency); }
+    return freqs;
+}
+
+std::vector<float> WidebandScanner::getChannelLevels() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    std::vector<float> levels;
+    for (const auto& ch : channels) { levels.push_back(ch.level); }
+    return levels;
+}
+
+std::vector<float> WidebandScanner::getChannelOccupancy() {
+    std::lock_guard<std::recursive_mutex> lck(mtx);
+    std::vector<float> occupancy;
+    for (const auto& ch : channels) {
+        occupancy.push_back(ch.observed ? (float)ch.occupied / (float)ch.observed : 0.0f);
+    }
+    return occupancy;
+}
+
+void WidebandScanner::plan() {
+    // Channels of the range, the small margin keeps the stop frequency despite rounding
+    channels.clear();
+    int count = floor(((config.stopFreq - config.startFreq) / config.spacing) + 1e-6) + 1;
+    for (int i = 0; i < count; i++) {
+        channels.push_back({ config.startFreq + (i * config.spacing) });
+    }
+
+    // Pack as many channels as fit in the usable bandwidth into each step, centered on them
+    steps.clear();
+    if (samplerate <= 0.0) { return; }
+    double usable = std::max<double>(samplerate * config.usableRatio, config.channelWidth);
+    int i = 0;
+    while (i < count) {
+        double lower = channels[i].frequency - (config.channelWidth / 2.0);
+        int j = i + 1;
+        while (j < count && channels[j].frequency + (config.channelWidth / 2.0) <= lower + usable + 1e-6) { j++; }
+        double upper = channels[j - 1].frequency + (config.channelWidth / 2.0);
+        steps.push_back({ (lower + upper) / 2.0, i, j - i });
+        i = j;
+    }
+}
+
+void WidebandScanner::reset() {
+    for (auto& ch : channels) {
+        ch.level = -INFINITY;
+        ch.observed = 0;
+        ch.occupied = 0;
+        ch.active = false;
+        ch.peak = -INFINITY;
+        ch.hitStart = 0.0;
+        ch.lastAbove = 0.0;
+    }
+    currentStep = 0;
+    tunePending = true;
+    dwellStart = -1.0;
+    sweeps = 0;
+}
+
+void WidebandScanner::tune(int step, double time) {
+    tuneTime = time;
+    dwellStart = -1.0;
+    if (sourceManager) { sourceManager->tune(steps[step].center); }
+    emit(EVENT_TUNE, steps[step].center, 0.0f, time, 0.0);
+}
+
+void WidebandScanner::endHits(const Step& step) {
+    // The channels can't be watched anymore once retuned
+    for (int i = step.firstChannel; i < step.firstChannel + step.channelCount; i++) {
+        Channel& ch = channels[i];
+        if (!ch.active) { continue; }
+        ch.active = false;
+        emit(EVENT_HIT_END, ch.frequency, ch.peak, ch.hitStart, ch.lastAbove - ch.hitStart);
+    }
+}
+
+void WidebandScanner::emit(EventType type, double frequency, float level, double time, double duration) {
+    onEvent.emit({ type, frequency, level, time, duration });
+}
+
+void WidebandScanner::fftHandler(IQFrontEnd::FFTFrame frame, void* ctx) {
+    WidebandScanner* _this = (WidebandScanner*)ctx;
+
+    // Only keep the latest frame, the worker skips the ones it doesn't have time for
+    {
+        std::lock_guard<std::mutex> lck(_this->frameMtx);
+        _this->frame.assign(frame.data, frame.data + frame.size);
+        _this->frameReady = true;
+    }
+    _this->frameCnd.notify_one();
+}
+
+void WidebandScanner::worker() {
+    std::vector<float> data;
+    while (true) {
+        {
+            std::unique_lock<std::mutex> lck(frameMtx);
+            frameCnd.wait(lck, [this]() { return frameReady || !running; });
+            if (!running) { return; }
+            std::swap(data, frame);
+            frameReady = false;
+        }
+
+        // The samplerate changes along with the source, replan when it does
+        setSamplerate(frontEnd->getEffectiveSamplerate());
+
+        double time = std::chrono::duration<double>(std::chrono::steady_clock::now() - startTime).count();
+        processFrame(data.data(), data.size(), time);
+    }
+}
@@ -0,0 +1,153 @@
+#pragma once
+#include <vector>
+#include <algorithm>
+#include <chrono>
+#include <mutex>
+#include <thread>
+#include <condition_variable>
+#include <utils/event.h>
+#include "iq_frontend.h"
+#include "source.h"
+
+// Headless scanner working on the FFT frames of the front end. Instead of tuning to each channel
+// and waiting on it like the scanner module, the level of every channel inside the usable part of
+// the IQ bandwidth is read from the same frame, and the source is only retuned in steps of that
+// bandwidth. A sweep then takes as many dwells as there are steps instead of one per channel.
+//
+// A channel with a level above the threshold opens a hit. The scanner stays on the step while a
+// hit is open, and the hit is closed once the channel stayed below the threshold for the hang time.
+class WidebandScanner {
+public:
+    struct Config {
+        // Channels are startFreq, startFreq + spacing, ... up to stopFreq
+        double startFreq = 88000000.0;
+        double stopFreq = 108000000.0;
+        double spacing = 100000.0;
+
+        // Bandwidth over which the level of a channel is measured
+        double channelWidth = 10000.0;
+
+        // Level in dB above which a channel is occupied
+        float level = -50.0f;
+
+        // Part of the IQ bandwidth used per step, the edges are left out for the filter roll-off
+        double usableRatio = 0.8;
+
+        // Frames are ignored for settleTime ms after a retune and each step is watched for dwellTime ms.
+        // A hit ends after hangTime ms below the threshold, and holds the scanner on its step for at
+        // most maxHoldTime ms (forever if 0).
+        int settleTime = 50;
+        int dwellTime = 100;
+        int hangTime = 1000;
+        int maxHoldTime = 0;
+    };
+
+    enum EventType {
+        EVENT_HIT_START,
+        EVENT_HIT_END,
+        EVENT_SWEEP,
+        EVENT_TUNE
+    };
+
+    struct ScanEvent {
+        EventType type;
+
+        // Channel of the hit or center frequency to tune to
+        double frequency;
+
+        // Peak level of the hit in dB
+        float level;
+
+        // Time in seconds of the frame at which the hit started, the sweep ended or the tune was requested
+        double time;
+
+        // Duration of the hit or of the sweep in seconds
+        double duration;
+    };
+
+    WidebandScanner();
+    ~WidebandScanner();
+
+    // Replaces the channel plan and restarts the scan, throws std::runtime_error if invalid
+    void configure(const Config& config);
+    Config getConfig();
+
+    // Samplerate of the frames, the steps depend on it
+    void setSamplerate(double samplerate);
+
+    // Run the scan on the FFT frames of a front end, retuning the source manager
+    void start(IQFrontEnd* frontEnd, SourceManager* sourceManager);
+    void stop();
+    bool isRunning();
+
+    // Process one FFT frame (dB, DC in the middle) taken at a time in seconds. Used by start(),
+    // or directly to drive the scan with frames from elsewhere, retuning on EVENT_TUNE.
+    void processFrame(const float* data, int size, double time);
+
+    int getChannelCount();
+    int getStepCount();
+    double getCenterFrequency();
+    uint64_t getSweepCount();
+
+    // Per channel frequency, last measured level (-inf if never measured) and fraction of the
+    // frames in which it was above the threshold
+    std::vector<double> getChannelFrequencies();
+    std::vector<float> getChannelLevels();
+    std::vector<float> getChannelOccupancy();
+
+    Event<ScanEvent> onEvent;
+
+private:
+    struct Channel {
+        double frequency;
+        float level;
+        uint64_t observed;
+        uint64_t occupied;
+
+        bool active;
+        float peak;
+        double hitStart;
+        double lastAbove;
+    };
+
+    struct Step {
+        double center;
+        int firstChannel;
+        int channelCount;
+    };
+
+    void plan();
+    void reset();
+    void tune(int step, double time);
+    void endHits(const Step& step);
+    void emit(EventType type, double frequency, float level, double time, double duration);
+
+    static void fftHandler(IQFrontEnd::FFTFrame frame, void* ctx);
+    void worker();
+
+    std::recursive_mutex mtx;
+    Config config;
+    double samplerate = 0.0;
+    std::vector<Channel> channels;
+    std::vector<Step> steps;
+
+    // Scan state
+    int currentStep = 0;
+    bool tunePending = true;
+    double tuneTime = 0.0;
+    double dwellStart = -1.0;
+    double sweepStart = 0.0;
+    uint64_t sweeps = 0;
+
+    // Attached to a front end
+    IQFrontEnd* frontEnd = NULL;
+    SourceManager* sourceManager = NULL;
+    EventHandler<IQFrontEnd::FFTFrame> fftFrameHandler;
+    std::thread workerThread;
+    std::mutex frameMtx;
+    std::condition_variable frameCnd;
+    std::vector<float> frame;
+    bool frameReady = false;
+    bool running = false;
+    std::chrono::steady_clock::time_point startTime;
+};
@@ -0,0 +1,273 @@
+#include "ciq.h"
+#include <algorithm>
+#include <chrono>
+#include <stdexcept>
+#include <string.h>
+#include <dsp/compression/sample_stream_compressor.h>
+#include <dsp/compression/sample_stream_decompressor.h>
+
+namespace ciq {
+    const char* FILE_MAGIC      = "SDRPPCIQ";
+    const uint16_t FILE_VERSION = 1;
+
+    // Header of the dsp::compression PCM blocks
+    const size_t COMP_HEADER_SIZE = 8;
+
+    size_t chunkBytes(dsp::compression::PCMType type, int count) {
+        // Raw chunks aren't padded so that the samples of the whole file stay contiguous
+        if (type == dsp::compression::PCM_TYPE_F32) { return count * sizeof(dsp::complex_t); }
+        size_t sampBytes = (type == dsp::compression::PCM_TYPE_I8) ? 2 * sizeof(int8_t) : 2 * sizeof(int16_t);
+        size_t bytes = COMP_HEADER_SIZE + count * sampBytes;
+        return (bytes + 7) & ~(size_t)7;
+    }
+
+    Writer::Writer(double samplerate, dsp::compression::PCMType type, int chunkSamples) {
+        // Validate parameters
+        if (samplerate <= 0.0) { throw std::runtime_error("Samplerate must be non-zero"); }
+        if (chunkSamples < 1) { throw std::runtime_error("Chunks must have at least one sample"); }
+
+        _samplerate = samplerate;
+        _type = type;
+        _chunkSamples = chunkSamples;
+    }
+
+    Writer::~Writer() { close(); }
+
+    bool Writer::open(std::string path, int64_t startTime) {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        // Close previous file
+        if (file.is_open()) { close(); }
+
+        // Open file
+        file = std::ofstream(path, std::ios::out | std::ios::binary);
+        if (!file.is_open()) { return false; }
+
+        // Reset work values
+        index.clear();
+        chunkFill = 0;
+        samplesWritten = 0;
+        chunkBuf.resize(_chunkSamples);
+        compBuf.resize(COMP_HEADER_SIZE + _chunkSamples * sizeof(dsp::complex_t));
+
+        // Write the header, it's rewritten with the index location when closing
+        if (startTime < 0) {
+            startTime = std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::system_clock::now().time_since_epoch()).count();
+        }
+        memset(&hdr, 0, sizeof(FileHeader));
+        memcpy(hdr.magic, FILE_MAGIC, sizeof(hdr.magic));
+        hdr.version = FILE_VERSION;
+        hdr.pcmType = _type;
+        hdr.chunkSamples = _chunkSamples;
+        hdr.samplerate = _samplerate;
+        hdr.startTime = startTime;
+        hdr.frequency = _frequency;
+        file.write((char*)&hdr, sizeof(FileHeader));
+
+        return true;
+    }
+
+    bool Writer::isOpen() {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        return file.is_open();
+    }
+
+    void Writer::close() {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        // Do nothing if the file is not open
+        if (!file.is_open()) { return; }
+
+        // Write the last partial chunk
+        if (chunkFill) { flushChunk(); }
+
+        // Write the index and update the header
+        hdr.indexOffset = file.tellp();
+        hdr.chunkCount = index.size();
+        hdr.sampleCount = samplesWritten;
+        file.write((char*)index.data(), index.size() * sizeof(IndexEntry));
+        file.seekp(0);
+        file.write((char*)&hdr, sizeof(FileHeader));
+
+        // Close the file
+        file.close();
+    }
+
+    void Writer::setSamplerate(double samplerate) {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        // Do not allow settings to change while open
+        if (file.is_open()) { throw std::runtime_error("Cannot change parameters while file is open"); }
+        if (samplerate <= 0.0) { throw std::runtime_error("Samplerate must be non-zero"); }
+        _samplerate = samplerate;
+    }
+
+    void Writer::setPCMType(dsp::compression::PCMType type) {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        // Do not allow settings to change while open
+        if (file.is_open()) { throw std::runtime_error("Cannot change parameters while file is open"); }
+        _type = type;
+    }
+
+    void Writer::setChunkSamples(int chunkSamples) {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        // Do not allow settings to change while open
+        if (file.is_open()) { throw std::runtime_error("Cannot change parameters while file is open"); }
+        if (chunkSamples < 1) { throw std::runtime_error("Chunks must have at least one sample"); }
+        _chunkSamples = chunkSamples;
+    }
+
+    void Writer::setFrequency(double frequency) {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        _frequency = frequency;
+        if (file.is_open() && !samplesWritten && !chunkFill) { hdr.frequency = frequency; }
+    }
+
+    void Writer::write(const dsp::complex_t* samples, int count) {
+        std::lock_guard<std::recursive_mutex> lck(mtx);
+        if (!file.is_open()) { return; }
+
+        while (count > 0) {
+            // The frequency of a chunk is the one when its first sample was received
+            if (!chunkFill) { chunkFrequency = _frequency; }
+
+            int toCopy = std::min<int>(count, _chunkSamples - chunkFill);
+            memcpy(&chunkBuf[chunkFill], samples, toCopy * sizeof(dsp::complex_t));
+            chunkFill += toCopy;
+            samples += toCopy;
+            count -= toCopy;
+
+            if (chunkFill == _chunkSamples) { flushChunk(); }
+        }
+    }
+
+    void Writer::flushChunk() {
+        // Add the chunk to the index, timestamps are derived from the sample count
+        IndexEntry entry;
+        entry.timestamp = hdr.startTime + (int64_t)((double)samplesWritten * 1e9 / _samplerate);
+        entry.frequency = chunkFrequency;
+        entry.firstSample = samplesWritten;
+        entry.sampleCount = chunkFill;
+        entry.reserved = 0;
+        index.push_back(entry);
+
+        // Write the samples, compressed if needed
+        size_t bytes = chunkBytes(_type, chunkFill);
+        if (_type == dsp::compression::PCM_TYPE_F32) {
+            file.write((char*)chunkBuf.data(), bytes);
+        }
+        else {
+            int len = dsp::compression::SampleStreamCompressor::process(chunkFill, _type, chunkBuf.data(), compBuf.data());
+            memset(&compBuf[len], 0, bytes - len);
+            file.write((char*)compBuf.data(), bytes);
+        }
+
+        samplesWritten += chunkFill;
+        chunkFill = 0;
+    }
+
+    bool Reader::open(std::string path) {
+        // Close previous file
+        close();
+
+        if (!file.open(path)) { return false; }
+        const uint8_t* buf = file.data();
+        size_t size = file.size();
+
+        // Check the header
+        if (size < sizeof(FileHeader)) { close(); return false; }
+        memcpy(&hdr, buf, sizeof(FileHeader));
+        if (memcmp(hdr.magic, FILE_MAGIC, sizeof(hdr.magic)) || hdr.version != FILE_VERSION) { close(); return false; }
+        if (hdr.pcmType > dsp::compression::PCM_TYPE_F32 || !hdr.chunkSamples || hdr.samplerate <= 0.0) { close(); return false; }
+
+        size_t fullChunkBytes = chunkBytes((dsp::compression::PCMType)hdr.pcmType, hdr.chunkSamples);
+        if (hdr.indexOffset && hdr.indexOffset + hdr.chunkCount * sizeof(IndexEntry) <= size) {
+            // Use the index in place
+            entries = (const IndexEntry*)&buf[hdr.indexOffset];
+            chunkCount = hdr.chunkCount;
+            sampleCount = hdr.sampleCount;
+            return true;
+        }
+
+        // The recording wasn't closed. Only full chunks can be recovered, assuming they're contiguous in time.
+        chunkCount = (size - sizeof(FileHeader)) / fullChunkBytes;
+        recoveredEntries.resize(chunkCount);
+        for (size_t i = 0; i < chunkCount; i++) {
+            IndexEntry& entry = recoveredEntries[i];
+            entry.firstSample = (uint64_t)i * hdr.chunkSamples;
+            entry.timestamp = hdr.startTime + (int64_t)((double)entry.firstSample * 1e9 / hdr.samplerate);
+            entry.frequency = hdr.frequency;
+            entry.sampleCount = hdr.chunkSamples;
+            entry.reserved = 0;
+        }
+        entries = recoveredEntries.data();
+        sampleCount = (uint64_t)chunkCount * hdr.chunkSamples;
+        recovered = true;
+        return true;
+    }
+
+    void Reader::close() {
+        file.close();
+        entries = NULL;
+        recoveredEntries.clear();
+        chunkCount = 0;
+        sampleCount = 0;
+        recovered = false;
+        decodedChunk = -1;
+    }
+
+    size_t Reader::getChunkOffset(size_t chunk) {
+        // All chunks but the last one are full
+        return sizeof(FileHeader) + chunk * chunkBytes((dsp::compression::PCMType)hdr.pcmType, hdr.chunkSamples);
+    }
+
+    size_t Reader::findChunk(int64_t timestamp) {
+        if (!chunkCount) { return 0; }
+        auto it = std::upper_bound(entries, entries + chunkCount, timestamp, [](int64_t ts, const IndexEntry& e) { return ts < e.timestamp; });
+        return (it == entries) ? 0 : (it - entries) - 1;
+    }
+
+    uint64_t Reader::findSample(int64_t timestamp) {
+        if (!chunkCount) { return 0; }
+        const IndexEntry& entry = entries[findChunk(timestamp)];
+        double offset = std::round((double)(timestamp - entry.timestamp) * hdr.samplerate / 1e9);
+        return entry.firstSample + (uint64_t)std::clamp<double>(offset, 0.0, entry.sampleCount);
+    }
+
+    size_t Reader::read(dsp::complex_t* samples, uint64_t offset, size_t count) {
+        if (!file.isOpen() || offset >= sampleCount) { return 0; }
+        count = std::min<uint64_t>(count, sampleCount - offset);
+
+        // Uncompressed samples can be copied directly
+        if (hdr.pcmType == dsp::compression::PCM_TYPE_F32) {
+            memcpy(samples, &getSamples()[offset], count * sizeof(dsp::complex_t));
+            return count;
+        }
+
+        size_t done = 0;
+        while (done < count) {
+            uint64_t pos = offset + done;
+            size_t chunk = pos / hdr.chunkSamples;
+            const IndexEntry& entry = entries[chunk];
+
+            // Decompress the chunk unless it's the one decoded last
+            if (decodedChunk != (int64_t)chunk) {
+                decodeBuf.resize(hdr.chunkSamples);
+                size_t bytes = chunkBytes((dsp::compression::PCMType)hdr.pcmType, entry.sampleCount);
+                size_t used = (hdr.pcmType == dsp::compression::PCM_TYPE_I8) ? entry.sampleCount * 2 * sizeof(int8_t) : entry.sampleCount * 2 * sizeof(int16_t);
+                if (getChunkOffset(chunk) + bytes > file.size()) { break; }
+                dsp::compression::SampleStreamDecompressor::process(COMP_HEADER_SIZE + used, &file.data()[getChunkOffset(chunk)], decodeBuf.data());
+                decodedChunk = chunk;
+            }
+
+            size_t inChunk = pos - entry.firstSample;
+            size_t toCopy = std::min<size_t>(count - done, entry.sampleCount - inChunk);
+            memcpy(&samples[done], &decodeBuf[inChunk], toCopy * sizeof(dsp::complex_t));
+            done += toCopy;
+        }
+
+        return done;
+    }
+
+    const dsp::complex_t* Reader::getSamples() {
+        if (!file.isOpen() || hdr.pcmType != dsp::compression::PCM_TYPE_F32) { return NULL; }
+        return (const dsp::complex_t*)&file.data()[sizeof(FileHeader)];
+    }
+}
@@ -0,0 +1,136 @@
+#pragma once
+#include <string>
+#include <fstream>
+#include <vector>
+#include <mutex>
+#include <stdint.h>
+#include <dsp/types.h>
+#include <dsp/compression/pcm_type.h>
+#include "mapped_file.h"
+
+// Chunked IQ recordings (.ciq)
+// Samples are stored in chunks of a fixed number of samples, each with the timestamp of its first
+// sample and the frequency it was recorded at. The index of all chunks is written at the end of the
+// file when it's closed, so any time range can be found with a binary search instead of a scan.
+// Chunks are either raw complex float32, in which case the samples of the whole file are contiguous,
+// or compressed with the int8/int16 PCM format of dsp::compression.
+namespace ciq {
+#pragma pack(push, 1)
+    struct FileHeader {
+        char magic[8];          // "SDRPPCIQ"
+        uint16_t version;
+        uint16_t pcmType;       // dsp::compression::PCMType
+        uint32_t chunkSamples;
+        double samplerate;
+        int64_t startTime;      // Nanoseconds since the unix epoch
+        double frequency;       // Frequency when the recording was started
+        uint64_t indexOffset;   // Zero until the recording is closed
+        uint64_t chunkCount;
+        uint64_t sampleCount;
+    };
+
+    struct IndexEntry {
+        int64_t timestamp;      // Time of the first sample of the chunk, in nanoseconds since the unix epoch
+        double frequency;
+        uint64_t firstSample;
+        uint32_t sampleCount;
+        uint32_t reserved;
+    };
+#pragma pack(pop)
+
+    // Number of bytes used in the file by a chunk of count samples
+    size_t chunkBytes(dsp::compression::PCMType type, int count);
+
+    class Writer {
+    public:
+        Writer(double samplerate = 1000000.0, dsp::compression::PCMType type = dsp::compression::PCM_TYPE_I16, int chunkSamples = 65536);
+        ~Writer();
+
+        // Open a new recording, the start time defaults to the current time
+        bool open(std::string path, int64_t startTime = -1);
+        bool isOpen();
+        void close();
+
+        void setSamplerate(double samplerate);
+        void setPCMType(dsp::compression::PCMType type);
+        void setChunkSamples(int chunkSamples);
+
+        // Set the frequency recorded for the chunks started from now on
+        void setFrequency(double frequency);
+
+        uint64_t getSamplesWritten() { return samplesWritten; }
+
+        void write(const dsp::complex_t* samples, int count);
+
+    private:
+        void flushChunk();
+
+        std::recursive_mutex mtx;
+        std::ofstream file;
+        FileHeader hdr;
+        std::vector<IndexEntry> index;
+
+        double _samplerate;
+        dsp::compression::PCMType _type;
+        int _chunkSamples;
+        double _frequency = 0.0;
+
+        std::vector<dsp::complex_t> chunkBuf;
+        std::vector<uint8_t> compBuf;
+        int chunkFill = 0;
+        double chunkFrequency = 0.0;
+        uint64_t samplesWritten = 0;
+    };
+
+    class Reader {
+    public:
+        Reader() {}
+        Reader(std::string path) { open(path); }
+
+        bool open(std::string path);
+        bool isOpen() { return file.isOpen(); }
+        void close();
+
+        double getSamplerate() { return hdr.samplerate; }
+        dsp::compression::PCMType getPCMType() { return (dsp::compression::PCMType)hdr.pcmType; }
+        int getChunkSamples() { return hdr.chunkSamples; }
+        int64_t getStartTime() { return hdr.startTime; }
+        double getFrequency() { return hdr.frequency; }
+        uint64_t getSampleCount() { return sampleCount; }
+        size_t getChunkCount() { return chunkCount; }
+
+        // True if the recording wasn't closed and the index was rebuilt assuming no gaps
+        bool isRecovered() { return recovered; }
+
+        const IndexEntry& getChunk(size_t chunk) { return entries[chunk]; }
+
+        // Offset in the file of the data of a chunk
+        size_t getChunkOffset(size_t chunk);
+
+        // Chunk containing the sample at the given time, clamped to the recording
+        size_t findChunk(int64_t timestamp);
+
+        // Index of the sample at the given time, clamped to the recording
+        uint64_t findSample(int64_t timestamp);
+
+        // Decode count samples starting at sample offset.
+        // Returns the number of samples decoded, less than count at the end of the recording.
+        size_t read(dsp::complex_t* samples, uint64_t offset, size_t count);
+
+        // Contiguous samples of an uncompressed recording, NULL if compressed
+        const dsp::complex_t* getSamples();
+
+    private:
+        MappedFile file;
+        FileHeader hdr;
+        const IndexEntry* entries = NULL;
+        std::vector<IndexEntry> recoveredEntries;
+        size_t chunkCount = 0;
+        uint64_t sampleCount = 0;
+        bool recovered = false;
+
+        // Last decompressed chunk, for sequential reads smaller than a chunk
+        std::vector<dsp::complex_t> decodeBuf;
+        int64_t decodedChunk = -1;
+    };
+}
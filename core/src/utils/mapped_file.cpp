@@ -0,0 +1,90 @@
+#include "mapped_file.h"
+
+#ifdef _WIN32
+#include <Windows.h>
+#else
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <fcntl.h>
+#include <unistd.h>
+#endif
+
+MappedFile::~MappedFile() {
+    close();
+}
+
+bool MappedFile::open(std::string path) {
+    // Close previous file
+    close();
+
+#ifdef _WIN32
+    HANDLE file = CreateFileA(path.c_str(), GENERIC_READ, FILE_SHARE_READ | FILE_SHARE_WRITE, NULL, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, NULL);
+    if (file == INVALID_HANDLE_VALUE) { return false; }
+
+    LARGE_INTEGER size;
+    if (!GetFileSizeEx(file, &size) || !size.QuadPart) {
+        CloseHandle(file);
+        return false;
+    }
+
+    HANDLE map = CreateFileMappingA(file, NULL, PAGE_READONLY, 0, 0, NULL);
+    if (!map) {
+        CloseHandle(file);
+        return false;
+    }
+
+    void* data = MapViewOfFile(map, FILE_MAP_READ, 0, 0, 0);
+    if (!data) {
+        CloseHandle(map);
+        CloseHandle(file);
+        return false;
+    }
+
+    fileHandle = file;
+    mapHandle = map;
+    _size = size.QuadPart;
+    _data = (const uint8_t*)data;
+#else
+    int fd = ::open(path.c_str(), O_RDONLY);
+    if (fd < 0) { return false; }
+
+    struct stat st;
+    if (fstat(fd, &st) < 0 || !st.st_size) {
+        ::close(fd);
+        return false;
+    }
+
+    // The mapping stays valid once the descriptor is closed
+    void* data = mmap(NULL, st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+    ::close(fd);
+    if (data == MAP_FAILED) { return false; }
+
+    _size = st.st_size;
+    _data = (const uint8_t*)data;
+#endif
+
+    return true;
+}
+
+void MappedFile::close() {
+    if (!_data) { return; }
+
+#ifdef _WIN32
+    UnmapViewOfFile(_data);
+    CloseHandle(mapHandle);
+    CloseHandle(fileHandle);
+    mapHandle = NULL;
+    fileHandle = NULL;
+#else
+    munmap((void*)_data, _size);
+#endif
+
+    _data = NULL;
+    _size = 0;
+}
+
+void MappedFile::adviseSequential() {
+#ifndef _WIN32
+    if (_data) { madvise((void*)_data, _size, MADV_SEQUENTIAL); }
+#endif
+}
@@ -0,0 +1,33 @@
+#pragma once
+#include <string>
+#include <stdint.h>
+#include <stddef.h>
+
+// Read-only memory mapping of a whole file
+class MappedFile {
+public:
+    MappedFile() {}
+    MappedFile(std::string path) { open(path); }
+    ~MappedFile();
+
+    MappedFile(const MappedFile&) = delete;
+    MappedFile& operator=(const MappedFile&) = delete;
+
+    bool open(std::string path);
+    bool isOpen() { return _data != NULL; }
+    void close();
+
+    // Hint the OS that the mapping will be read sequentially
+    void adviseSequential();
+
+    const uint8_t* data() { return _data; }
+    size_t size() { return _size; }
+
+private:
+    const uint8_t* _data = NULL;
+    size_t _size = 0;
+#ifdef _WIN32
+    void* fileHandle = NULL;
+    void* mapHandle = NULL;
+#endif
+};
@@ -0,0 +1,151 @@
+#include "shared_memory.h"
+
+#ifdef _WIN32
+#include <Windows.h>
+#else
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <fcntl.h>
+#include <unistd.h>
+#endif
+
+SharedMemory::~SharedMemory() {
+    close();
+}
+
+std::string SharedMemory::osName(const std::string& name) {
+#ifdef _WIN32
+    return "Local\\" + name;
+#else
+    // POSIX names must start with a slash and contain no other one
+    return (!name.empty() && name[0] == '/') ? name : ("/" + name);
+#endif
+}
+
+bool SharedMemory::create(std::string name, size_t size) {
+    close();
+    if (name.empty() || !size) { return false; }
+
+#ifdef _WIN32
+    HANDLE map = CreateFileMappingA(INVALID_HANDLE_VALUE, NULL, PAGE_READWRITE, (DWORD)((uint64_t)size >> 32), (DWORD)size, osName(name).c_str());
+    if (!map) { return false; }
+
+    // The segment lives until all handles are closed, so an existing one can't be replaced
+    if (GetLastError() == ERROR_ALREADY_EXISTS) {
+        CloseHandle(map);
+        return false;
+    }
+
+    void* data = MapViewOfFile(map, FILE_MAP_ALL_ACCESS, 0, 0, size);
+    if (!data) {
+        CloseHandle(map);
+        return false;
+    }
+    mapHandle = map;
+#elif defined(__ANDROID__)
+    return false;
+#else
+    // Remove a segment left behind by a process that didn't close it
+    std::string path = osName(name);
+    shm_unlink(path.c_str());
+
+    int fd = shm_open(path.c_str(), O_RDWR | O_CREAT | O_EXCL, 0600);
+    if (fd < 0) { return false; }
+    if (ftruncate(fd, size) < 0) {
+        ::close(fd);
+        shm_unlink(path.c_str());
+        return false;
+    }
+
+    // The mapping stays valid once the descriptor is closed
+    void* data = mmap(NULL, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    ::close(fd);
+    if (data == MAP_FAILED) {
+        shm_unlink(path.c_str());
+        return false;
+    }
+#endif
+
+    _name = name;
+    _size = size;
+    _data = (uint8_t*)data;
+    owner = true;
+    return true;
+}
+
+bool SharedMemory::open(std::string name) {
+    close();
+    if (name.empty()) { return false; }
+
+#ifdef _WIN32
+    HANDLE map = OpenFileMappingA(FILE_MAP_ALL_ACCESS, FALSE, osName(name).c_str());
+    if (!map) { return false; }
+
+    void* data = MapViewOfFile(map, FILE_MAP_ALL_ACCESS, 0, 0, 0);
+    if (!data) {
+        CloseHandle(map);
+        return false;
+    }
+
+    MEMORY_BASIC_INFORMATION info;
+    if (!VirtualQuery(data, &info, sizeof(info))) {
+        UnmapViewOfFile(data);
+        CloseHandle(map);
+        return false;
+    }
+    mapHandle = map;
+    _size = info.RegionSize;
+#elif defined(__ANDROID__)
+    return false;
+#else
+    int fd = shm_open(osName(name).c_str(), O_RDWR, 0);
+    if (fd < 0) { return false; }
+
+    struct stat st;
+    if (fstat(fd, &st) < 0 || !st.st_size) {
+        ::close(fd);
+        return false;
+    }
+
+    void* data = mmap(NULL, st.st_size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    ::close(fd);
+    if (data == MAP_FAILED) { return false; }
+    _size = st.st_size;
+#endif
+
+    _name = name;
+    _data = (uint8_t*)data;
+    owner = false;
+    return true;
+}
+
+void SharedMemory::close() {
+    if (!_data) { return; }
+
+#ifdef _WIN32
+    UnmapViewOfFile(_data);
+    CloseHandle(mapHandle);
+    mapHandle = NULL;
+#elif !defined(__ANDROID__)
+    munmap(_data, _size);
+    if (owner) { shm_unlink(osName(_name).c_str()); }
+#endif
+
+    _data = NULL;
+    _size = 0;
+    _name.clear();
+    owner = false;
+}
+
+void SharedMemory::leak() {
+#if !defined(_WIN32) && !defined(__ANDROID__)
+    if (_data && owner) { shm_unlink(osName(_name).c_str()); }
+#endif
+    _data = NULL;
+    _size = 0;
+    _name.clear();
+    owner = false;
+#ifdef _WIN32
+    mapHandle = NULL;
+#endif
+}
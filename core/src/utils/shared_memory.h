@@ -0,0 +1,43 @@
+#pragma once
+#include <string>
+#include <stdint.h>
+#include <stddef.h>
+
+// Named shared memory segment, mapped read-write (POSIX shm_open or a Windows file mapping)
+class SharedMemory {
+public:
+    SharedMemory() {}
+    ~SharedMemory();
+
+    SharedMemory(const SharedMemory&) = delete;
+    SharedMemory& operator=(const SharedMemory&) = delete;
+
+    // Create a segment of the given size, replacing any existing segment with the same name
+    bool create(std::string name, size_t size);
+
+    // Map an existing segment
+    bool open(std::string name);
+
+    // Unmap the segment, and remove its name if it was created by this object. Processes that
+    // still have it mapped keep their mapping.
+    void close();
+
+    // Keep the segment mapped forever, for when memory views over it can't be invalidated.
+    // The name is still removed if it was created by this object.
+    void leak();
+
+    bool isOpen() { return _data != NULL; }
+    uint8_t* data() { return _data; }
+    size_t size() { return _size; }
+
+private:
+    static std::string osName(const std::string& name);
+
+    uint8_t* _data = NULL;
+    size_t _size = 0;
+    std::string _name;
+    bool owner = false;
+#ifdef _WIN32
+    void* mapHandle = NULL;
+#endif
+};
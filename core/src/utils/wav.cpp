@@ -4,6 +4,7 @@
 #include <dsp/buffer/buffer.h>
 #include <dsp/stream.h>
 #include <map>
+#include <string.h>
 
 namespace wav {
     const char* WAVE_FILE_TYPE          = "WAVE";
@@ -11,6 +12,7 @@ namespace wav {
     const char* DATA_MARKER             = "data";
     const uint32_t FORMAT_HEADER_LEN    = 16;
     const uint16_t SAMPLE_TYPE_PCM      = 1;
+    const uint16_t CODEC_EXTENSIBLE     = 0xFFFE;
 
     std::map<SampleType, int> SAMP_BITS = {
         { SAMP_TYPE_UINT8, 8 },
@@ -180,4 +182,107 @@ namespace wav {
         // Increment sample counter
         samplesWritten += count;
     }
+
+    bool Reader::open(std::string path) {
+        // Close previous file
+        close();
+
+        if (!file.open(path)) { return false; }
+        const uint8_t* buf = file.data();
+        size_t size = file.size();
+
+        // Check the RIFF or RF64 header
+        if (size < 12) { close(); return false; }
+        bool rf64 = !memcmp(buf, "RF64", 4);
+        if ((memcmp(buf, "RIFF", 4) && !rf64) || memcmp(&buf[8], WAVE_FILE_TYPE, 4)) { close(); return false; }
+
+        // Walk the chunks until both the format and the data were found
+        bool fmtFound = false;
+        uint64_t rf64DataSize = 0;
+        size_t dataOffset = 0;
+        uint64_t dataSize = 0;
+        size_t pos = 12;
+        while (pos + sizeof(riff::ChunkHeader) <= size) {
+            riff::ChunkHeader chdr;
+            memcpy(&chdr, &buf[pos], sizeof(riff::ChunkHeader));
+            size_t start = pos + sizeof(riff::ChunkHeader);
+            size_t avail = size - start;
+
+            if (!memcmp(chdr.id, "ds64", 4) && chdr.size >= 16 && avail >= 16) {
+                memcpy(&rf64DataSize, &buf[start + 8], sizeof(uint64_t));
+            }
+            else if (!memcmp(chdr.id, FORMAT_MARKER, 4) && chdr.size >= sizeof(FormatHeader) && avail >= sizeof(FormatHeader)) {
+                memcpy(&hdr, &buf[start], sizeof(FormatHeader));
+                // WAVE_FORMAT_EXTENSIBLE, the actual codec is at the start of the sub-format GUID
+                if (hdr.codec == CODEC_EXTENSIBLE && chdr.size >= 26 && avail >= 26) {
+                    memcpy(&hdr.codec, &buf[start + 24], sizeof(uint16_t));
+                }
+                fmtFound = true;
+            }
+            else if (!memcmp(chdr.id, DATA_MARKER, 4)) {
+                dataOffset = start;
+                dataSize = (rf64 && chdr.size == 0xFFFFFFFF) ? rf64DataSize : chdr.size;
+
+                // Recordings that weren't closed have a zero size, and files over 4GiB a wrapped one.
+                // In both cases the data goes to the end of the file.
+                if (!dataSize || dataSize > avail || (!rf64 && avail > 0xFFFFFFFF)) { dataSize = avail; }
+                break;
+            }
+
+            // Chunks are padded to an even size
+            pos = start + chdr.size + (chdr.size & 1);
+        }
+        if (!fmtFound || !dataOffset || !hdr.channelCount || !hdr.sampleRate) { close(); return false; }
+
+        // Get the sample type
+        if (hdr.codec == CODEC_FLOAT && hdr.bitDepth == 32) { _type = SAMP_TYPE_FLOAT32; }
+        else if (hdr.codec == CODEC_PCM && hdr.bitDepth == 8) { _type = SAMP_TYPE_UINT8; }
+        else if (hdr.codec == CODEC_PCM && hdr.bitDepth == 16) { _type = SAMP_TYPE_INT16; }
+        else if (hdr.codec == CODEC_PCM && hdr.bitDepth == 32) { _type = SAMP_TYPE_INT32; }
+        else { close(); return false; }
+
+        bytesPerSamp = (SAMP_BITS[_type] / 8) * hdr.channelCount;
+        data = &buf[dataOffset];
+        sampleCount = dataSize / bytesPerSamp;
+        return true;
+    }
+
+    bool Reader::isOpen() {
+        return file.isOpen();
+    }
+
+    void Reader::close() {
+        file.close();
+        data = NULL;
+        bytesPerSamp = 0;
+        sampleCount = 0;
+    }
+
+    size_t Reader::read(float* samples, size_t offset, size_t count) {
+        if (!data || offset >= sampleCount) { return 0; }
+        count = std::min<size_t>(count, sampleCount - offset);
+
+        const uint8_t* src = &data[offset * bytesPerSamp];
+        size_t tcount = count * hdr.channelCount;
+        switch (_type) {
+        case SAMP_TYPE_UINT8:
+            for (size_t i = 0; i < tcount; i++) {
+                samples[i] = ((float)src[i] - 128.0f) / 127.0f;
+            }
+            break;
+        case SAMP_TYPE_INT16:
+            volk_16i_s32f_convert_32f(samples, (const int16_t*)src, 32768.0f, tcount);
+            break;
+        case SAMP_TYPE_INT32:
+            volk_32i_s32f_convert_32f(samples, (const int32_t*)src, 2147483648.0f, tcount);
+            break;
+        case SAMP_TYPE_FLOAT32:
+            memcpy(samples, src, tcount * sizeof(float));
+            break;
+        default:
+            return 0;
+        }
+
+        return count;
+    }
 }
@@ -4,6 +4,7 @@
 #include <stdint.h>
 #include <mutex>
 #include "riff.h"
+#include "mapped_file.h"
 
 namespace wav {    
     #pragma pack(push, 1)
@@ -68,4 +69,42 @@ namespace wav {
         int32_t* bufI32 = NULL;
         size_t samplesWritten = 0;
     };
+
+    // Memory mapped reader for WAV files, including ones that weren't properly closed or that are
+    // larger than what the 32bit RIFF sizes can describe
+    class Reader {
+    public:
+        Reader() {}
+        Reader(std::string path) { open(path); }
+
+        bool open(std::string path);
+        bool isOpen();
+        void close();
+
+        int getChannels() { return hdr.channelCount; }
+        uint64_t getSamplerate() { return hdr.sampleRate; }
+        SampleType getSampleType() { return _type; }
+
+        // Number of samples (of all channels) in the file
+        size_t getSampleCount() { return sampleCount; }
+
+        // Raw sample data, getSampleCount() samples of getBytesPerSample() bytes each
+        const uint8_t* getData() { return data; }
+        size_t getBytesPerSample() { return bytesPerSamp; }
+
+        // Hint the OS that the file will be read sequentially
+        void adviseSequential() { file.adviseSequential(); }
+
+        // Convert count samples starting at sample offset to interleaved floats.
+        // Returns the number of samples converted, less than count at the end of the file.
+        size_t read(float* samples, size_t offset, size_t count);
+
+    private:
+        MappedFile file;
+        FormatHeader hdr;
+        SampleType _type;
+        const uint8_t* data = NULL;
+        size_t bytesPerSamp = 0;
+        size_t sampleCount = 0;
+    };
 }
@@ -21,6 +21,7 @@
 #include <core.h>
 #include <utils/optionlist.h>
 #include <utils/wav.h>
+#include <utils/ciq.h>
 #include <radio_interface.h>
 
 #define CONCAT(a, b) ((std::string(a) + b).c_str())
@@ -37,6 +38,11 @@ SDRPP_MOD_INFO{
 
 ConfigManager config;
 
+enum Container {
+    CONTAINER_WAV,
+    CONTAINER_CIQ
+};
+
 class RecorderModule : public ModuleManager::Instance {
 public:
     RecorderModule(std::string name) : folderSelect("%ROOT%/recordings") {
@@ -45,15 +51,16 @@ public:
         strcpy(nameTemplate, "$t_$f_$h-$m-$s_$d-$M-$y");
 
         // Define option lists
-        containers.define("WAV", wav::FORMAT_WAV);
+        containers.define("WAV", CONTAINER_WAV);
         // containers.define("RF64", wav::FORMAT_RF64); // Disabled for now
+        containers.define("CIQ", "Chunked IQ", CONTAINER_CIQ);
         sampleTypes.define(wav::SAMP_TYPE_UINT8, "Uint8", wav::SAMP_TYPE_UINT8);
         sampleTypes.define(wav::SAMP_TYPE_INT16, "Int16", wav::SAMP_TYPE_INT16);
         sampleTypes.define(wav::SAMP_TYPE_INT32, "Int32", wav::SAMP_TYPE_INT32);
         sampleTypes.define(wav::SAMP_TYPE_FLOAT32, "Float32", wav::SAMP_TYPE_FLOAT32);
 
         // Load default config for option lists
-        containerId = containers.valueId(wav::FORMAT_WAV);
+        containerId = containers.valueId(CONTAINER_WAV);
         sampleTypeId = sampleTypes.valueId(wav::SAMP_TYPE_INT16);
 
         // Load config
@@ -162,16 +169,25 @@ public:
         else {
             samplerate = sigpath::iqFrontEnd.getSampleRate();
         }
-        writer.setFormat(containers[containerId]);
-        writer.setChannels((recMode == RECORDER_MODE_AUDIO && !stereo) ? 1 : 2);
-        writer.setSampleType(sampleTypes[sampleTypeId]);
-        writer.setSamplerate(samplerate);
+        // Chunked IQ recordings are only for baseband, audio is always recorded to WAV
+        chunked = (recMode == RECORDER_MODE_BASEBAND && containers[containerId] == CONTAINER_CIQ);
+        if (chunked) {
+            ciqWriter.setSamplerate(samplerate);
+            ciqWriter.setPCMType(sampleTypeToPCMType(sampleTypes[sampleTypeId]));
+            ciqWriter.setFrequency(gui::waterfall.getCenterFrequency());
+        }
+        else {
+            writer.setFormat(wav::FORMAT_WAV);
+            writer.setChannels((recMode == RECORDER_MODE_AUDIO && !stereo) ? 1 : 2);
+            writer.setSampleType(sampleTypes[sampleTypeId]);
+            writer.setSamplerate(samplerate);
+        }
 
         // Open file
         std::string vfoName = (recMode == RECORDER_MODE_AUDIO) ? selectedStreamName : "";
-        std::string extension = ".wav";
+        std::string extension = chunked ? ".ciq" : ".wav";
         std::string expandedPath = expandString(folderSelect.path + "/" + genFileName(nameTemplate, recMode, vfoName) + extension);
-        if (!writer.open(expandedPath)) {
+        if (!(chunked ? ciqWriter.open(expandedPath) : writer.open(expandedPath))) {
             flog::error("Failed to open file for recording: {0}", expandedPath);
             return;
         }
@@ -189,6 +205,13 @@ public:
             splitter.bindStream(&stereoStream);
         }
         else {
+            // Keep track of the frequency of each chunk
+            if (chunked) {
+                retuneHandler.ctx = this;
+                retuneHandler.handler = retuneHandlerFunc;
+                sigpath::sourceManager.onRetune.bindHandler(&retuneHandler);
+            }
+
             // Create and bind IQ stream
             basebandStream = new dsp::stream<dsp::complex_t>();
             basebandSink.setInput(basebandStream);
@@ -216,10 +239,16 @@ public:
             sigpath::iqFrontEnd.unbindIQStream(basebandStream);
             basebandSink.stop();
             delete basebandStream;
+            if (chunked) { sigpath::sourceManager.onRetune.unbindHandler(&retuneHandler); }
         }
 
         // Close file
-        writer.close();
+        if (chunked) {
+            ciqWriter.close();
+        }
+        else {
+            writer.close();
+        }
         
         recording = false;
     }
@@ -339,7 +368,8 @@ private:
             if (ImGui::Button(CONCAT("Stop##_recorder_rec_", _this->name), ImVec2(menuWidth, 0))) {
                 _this->stop();
             }
-            uint64_t seconds = _this->writer.getSamplesWritten() / _this->samplerate;
+            uint64_t written = _this->chunked ? _this->ciqWriter.getSamplesWritten() : _this->writer.getSamplesWritten();
+            uint64_t seconds = written / _this->samplerate;
             time_t diff = seconds;
             tm* dtm = gmtime(&diff);
 
@@ -506,7 +536,28 @@ private:
 
     static void complexHandler(dsp::complex_t* data, int count, void* ctx) {
         RecorderModule* _this = (RecorderModule*)ctx;
-        _this->writer.write((float*)data, count);
+        if (_this->chunked) {
+            _this->ciqWriter.write(data, count);
+        }
+        else {
+            _this->writer.write((float*)data, count);
+        }
+    }
+
+    static void retuneHandlerFunc(double freq, void* ctx) {
+        RecorderModule* _this = (RecorderModule*)ctx;
+        _this->ciqWriter.setFrequency(freq);
+    }
+
+    static dsp::compression::PCMType sampleTypeToPCMType(wav::SampleType type) {
+        switch (type) {
+        case wav::SAMP_TYPE_UINT8:
+            return dsp::compression::PCM_TYPE_I8;
+        case wav::SAMP_TYPE_INT16:
+            return dsp::compression::PCM_TYPE_I16;
+        default:
+            return dsp::compression::PCM_TYPE_F32;
+        }
     }
 
     static void stereoHandler(dsp::stereo_t* data, int count, void* ctx) {
@@ -564,7 +615,7 @@ private:
     std::string root;
     char nameTemplate[1024];
 
-    OptionList<std::string, wav::Format> containers;
+    OptionList<std::string, Container> containers;
     OptionList<int, wav::SampleType> sampleTypes;
     FolderSelect folderSelect;
 
@@ -580,6 +631,8 @@ private:
     bool recording = false;
     bool ignoringSilence = false;
     wav::Writer writer;
+    ciq::Writer ciqWriter;
+    bool chunked = false;
     std::recursive_mutex recMtx;
     dsp::stream<dsp::complex_t>* basebandStream;
     dsp::stream<dsp::stereo_t> stereoStream;
@@ -600,6 +653,7 @@ private:
 
     EventHandler<std::string> onStreamRegisteredHandler;
     EventHandler<std::string> onStreamUnregisterHandler;
+    EventHandler<double> retuneHandler;
 
 };
 
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks of the core DSP blocks over parameter matrices
+Runs the same suite as the sdrpp_dsp_bench program, optionally comparing against a baseline report
+"""
+
+import sys
+import os
+import json
+import argparse
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the core DSP blocks")
+    parser.add_argument("--config", help="JSON file with the benchmark options")
+    parser.add_argument("--blocks", nargs="+", help="Blocks to run (fir, resampler, fft, chains, fm, wfm, am, usb, lsb)")
+    parser.add_argument("--duration", type=int, help="Duration of each case in milliseconds")
+    parser.add_argument("--buffer-sizes", type=int, nargs="+")
+    parser.add_argument("--chain-counts", type=int, nargs="+", help="Number of parallel VFO chains of the chains cases")
+    parser.add_argument("--schedulers", nargs="+", choices=["threads", "pool"], help="Scheduler modes of the chains cases")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--baseline", help="Compare the results with this JSON report")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative throughput drop reported as a regression")
+    parser.add_argument("--list", action="store_true", help="Only list the cases")
+    args = parser.parse_args()
+
+    options = {}
+    if args.config:
+        with open(args.config) as f:
+            options = json.load(f)
+    if args.blocks:
+        options["blocks"] = args.blocks
+    if args.duration:
+        options["duration_ms"] = args.duration
+    if args.buffer_sizes:
+        options["buffer_sizes"] = args.buffer_sizes
+    if args.chain_counts:
+        options["chain_counts"] = args.chain_counts
+    if args.schedulers:
+        options["schedulers"] = args.schedulers
+
+    if args.list:
+        print("\n".join(sdrpp.listDSPBenchmarks(options)))
+        return 0
+
+    report = sdrpp.runDSPBenchmarks(options)
+    print(f"{'case':<48} {'MS/s':>10} {'CPU %':>8} {'buf alloc':>10}")
+    for r in report["results"]:
+        print(f"{r['name']:<48} {r['samples_per_second'] / 1e6:>10.2f} {r['cpu_percent']:>8.1f} {r['buffer_allocations']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = sdrpp.compareDSPBenchmarks(report, baseline, args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['name']}: {r['metric']} {r['baseline']:g} -> {r['current']:g}")
+    print(f"{len(regressions)} regression(s) compared to {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the cold import time and resident memory of the SDR++ Python bindings
+Every import is done in a fresh interpreter, so nothing is cached between runs
+"""
+
+import sys
+import os
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "sdrpp",
+    "sdrpp.config",
+    "sdrpp.source",
+    "sdrpp.vfo",
+    "sdrpp.stream",
+    "sdrpp.runtime",
+    "_sdrpp",
+]
+
+# Run in the child interpreter, prints the measurements of a single import as JSON
+CHILD = r"""
+import sys, os, time, json, importlib
+sys.path.insert(0, {root!r})
+
+def rss():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+before = rss()
+start = time.perf_counter()
+mod = importlib.import_module({name!r})
+elapsed = time.perf_counter() - start
+after = rss()
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_bytes": None if before is None else after - before,
+    "symbols": len([n for n in vars(mod) if not n.startswith("_")]),
+}}))
+"""
+
+def measure(name, repeat):
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", CHILD.format(root=ROOT, name=name)],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"module": name, "error": proc.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(proc.stdout))
+
+    rss = [r["rss_bytes"] for r in runs if r["rss_bytes"] is not None]
+    return {
+        "module": name,
+        "import_ms": statistics.median(r["seconds"] for r in runs) * 1e3,
+        "import_ms_min": min(r["seconds"] for r in runs) * 1e3,
+        "rss_mb": statistics.median(rss) / 1e6 if rss else None,
+        "symbols": runs[0]["symbols"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold import cost of the SDR++ bindings")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per module")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(name, args.repeat) for name in args.modules]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'module':<16} {'import (ms)':>12} {'min (ms)':>10} {'RSS (MB)':>10} {'symbols':>8}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['module']:<16} failed: {r['error']}")
+            continue
+        rss = f"{r['rss_mb']:.2f}" if r["rss_mb"] is not None else "n/a"
+        print(f"{r['module']:<16} {r['import_ms']:>12.2f} {r['import_ms_min']:>10.2f} {rss:>10} {r['symbols']:>8}")
+
+if __name__ == "__main__":
+    main()
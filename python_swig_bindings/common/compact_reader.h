@@ -0,0 +1,178 @@
+#pragma once
+
+// Pull-based reader for dsp::stream delivering int8/int16 IQ instead of complex float32
+// Each buffer of the stream is compressed by the block's worker thread with SampleStreamCompressor,
+// scaled by its own largest magnitude, and queued as one block. Like StreamReader, the blocks that
+// don't fit in 'depth' samples are dropped and counted instead of blocking the writer. Queued
+// blocks take 2 (int8) or 4 (int16) bytes per sample instead of 8, and their buffers are reused.
+
+#include <chrono>
+#include <deque>
+#include <mutex>
+#include <vector>
+#include <condition_variable>
+#include <atomic>
+#include <stdint.h>
+#include <dsp/sink.h>
+#include <dsp/compression/sample_stream_compressor.h>
+#include "pcm_format.h"
+#include "wakeup.h"
+
+class CompactStreamReader : public dsp::Sink<dsp::complex_t> {
+    using base_type = dsp::Sink<dsp::complex_t>;
+public:
+    // Compressed block: the header written by SampleStreamCompressor followed by the samples
+    typedef std::vector<uint8_t> Block;
+
+    CompactStreamReader() {}
+
+    CompactStreamReader(dsp::stream<dsp::complex_t>* in, dsp::compression::PCMType type, int depth) { init(in, type, depth); }
+
+    ~CompactStreamReader() {
+        if (!base_type::_block_init) { return; }
+        base_type::stop();
+    }
+
+    void init(dsp::stream<dsp::complex_t>* in, dsp::compression::PCMType type, int depth) {
+        _type = type;
+        _depth = std::max<int>(depth, 1);
+        base_type::init(in);
+    }
+
+    // The format of the blocks compressed from now on
+    void setPCMType(dsp::compression::PCMType type) { _type = type; }
+    dsp::compression::PCMType getPCMType() { return _type; }
+
+    int run() {
+        int count = base_type::_in->read();
+        if (count < 0) { return -1; }
+
+        // Drop the whole buffer if it doesn't fit
+        dsp::compression::PCMType type = _type;
+        Block block;
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            if (queuedSamples + count > _depth) {
+                overflows++;
+                droppedSamples += count;
+                base_type::_in->flush();
+                return count;
+            }
+            if (!pool.empty()) {
+                block = std::move(pool.back());
+                pool.pop_back();
+            }
+        }
+
+        block.resize(8 + (size_t)count * pcmSampleBytes(type));
+        int len = dsp::compression::SampleStreamCompressor::process(count, type, base_type::_in->readBuf, block.data());
+        block.resize(len);
+        base_type::_in->flush();
+
+        // Queue and notify the consumer
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            blocks.push_back(std::move(block));
+            queuedSamples += count;
+        }
+        writtenSamples += count;
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+
+        return count;
+    }
+
+    // Take the oldest queued block, waiting at most timeoutMs for one (forever if negative).
+    // Returns false on timeout or once the reader is closed. The previous content of the block is
+    // given back to be reused for the next blocks.
+    bool read(Block& block, double timeoutMs) {
+        std::unique_lock<std::mutex> lck(dataMtx);
+        auto ready = [this]() { return !blocks.empty() || closed; };
+        if (timeoutMs < 0) {
+            dataCnd.wait(lck, ready);
+        }
+        else if (!dataCnd.wait_for(lck, std::chrono::duration<double, std::milli>(timeoutMs), ready)) {
+            return false;
+        }
+        if (closed) { return false; }
+
+        if (block.capacity() && pool.size() < MAX_POOLED) { pool.push_back(std::move(block)); }
+        block = std::move(blocks.front());
+        blocks.pop_front();
+        int count = sampleCount(block);
+        queuedSamples -= count;
+        readSamples += count;
+        return true;
+    }
+
+    // Number of samples of a compressed block
+    static int sampleCount(const Block& block) {
+        if (block.size() < 8) { return 0; }
+        dsp::compression::PCMType type = (dsp::compression::PCMType)*(const uint16_t*)&block[2];
+        return (block.size() - 8) / pcmSampleBytes(type);
+    }
+
+    // Also signal an event loop whenever a block is available (NULL to disable)
+    void setWakeup(Wakeup* wakeup) {
+        this->wakeup = wakeup;
+    }
+
+    // Unblock any pending read() and make all future reads return false
+    void close() {
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            closed = true;
+        }
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+    }
+
+    void reopen() {
+        std::lock_guard<std::mutex> lck(dataMtx);
+        closed = false;
+    }
+
+    bool isClosed() {
+        std::lock_guard<std::mutex> lck(dataMtx);
+        return closed;
+    }
+
+    int getDepth() { return _depth; }
+
+    int getAvailable() {
+        std::lock_guard<std::mutex> lck(dataMtx);
+        return queuedSamples;
+    }
+
+    uint64_t getOverflowCount() { return overflows; }
+    uint64_t getDroppedSamples() { return droppedSamples; }
+    uint64_t getWrittenSamples() { return writtenSamples; }
+    uint64_t getReadSamples() { return readSamples; }
+
+    void resetCounters() {
+        overflows = 0;
+        droppedSamples = 0;
+        writtenSamples = 0;
+        readSamples = 0;
+    }
+
+private:
+    // Buffers of read blocks kept for reuse
+    static const size_t MAX_POOLED = 8;
+
+    std::atomic<dsp::compression::PCMType> _type;
+    int _depth;
+
+    std::mutex dataMtx;
+    std::condition_variable dataCnd;
+    std::deque<Block> blocks;
+    std::vector<Block> pool;
+    int queuedSamples = 0;
+    bool closed = false;
+    Wakeup* wakeup = NULL;
+
+    std::atomic<uint64_t> overflows = 0;
+    std::atomic<uint64_t> droppedSamples = 0;
+    std::atomic<uint64_t> writtenSamples = 0;
+    std::atomic<uint64_t> readSamples = 0;
+};
@@ -0,0 +1,262 @@
+#pragma once
+
+// CFAR detection on the FFT frames already computed by IQFrontEnd for the waterfall
+// Frames are averaged and rate limited like with FFTTap, then the detector runs on the FFT thread
+// and only the list of detections of each frame is queued for the consumer. When the consumer is
+// too slow, the oldest queued lists are dropped and counted instead of blocking the FFT thread.
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <stdexcept>
+#include <vector>
+#include <stdint.h>
+#include <signal_path/iq_frontend.h>
+#include <signal_path/source.h>
+#include <dsp/detector/cfar.h>
+#include "wakeup.h"
+
+struct CFARDetection {
+    // Power weighted center, absolute and relative to the center of the band, and width in Hz
+    double frequency;
+    double offset;
+    double bandwidth;
+
+    // Peak level, noise estimate and SNR in dB
+    float level;
+    float noise;
+    float snr;
+
+    int firstBin;
+    int lastBin;
+};
+
+struct CFARFrame {
+    unsigned long long index;
+    double centerFrequency;
+    double samplerate;
+    int fftSize;
+    std::vector<CFARDetection> detections;
+};
+
+class DetectionTap {
+public:
+    // rate: maximum number of frames per second processed (unlimited if 0 or negative)
+    // average: minimum number of FFT frames averaged into each processed frame
+    DetectionTap(IQFrontEnd* frontEnd, SourceManager* sourceManager, double rate = 0.0, int average = 1, int maxQueued = 16) {
+        _frontEnd = frontEnd;
+        _sourceManager = sourceManager;
+        _maxQueued = std::max<int>(maxQueued, 1);
+        setRate(rate);
+        setAverage(average);
+        fftHandler.handler = onFFTFrame;
+        fftHandler.ctx = this;
+        retuneHandler.handler = onRetune;
+        retuneHandler.ctx = this;
+    }
+
+    ~DetectionTap() {
+        close();
+        stop();
+    }
+
+    void start() {
+        if (running) { return; }
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            closed = false;
+        }
+        if (_sourceManager) { _sourceManager->onRetune.bindHandler(&retuneHandler); }
+        _frontEnd->bindFFTHandler(&fftHandler);
+        running = true;
+    }
+
+    void stop() {
+        if (!running) { return; }
+        _frontEnd->unbindFFTHandler(&fftHandler);
+        if (_sourceManager) { _sourceManager->onRetune.unbindHandler(&retuneHandler); }
+        running = false;
+    }
+
+    // The detector can be reconfigured at any time, the change applies from the next frame
+    template <class Func>
+    void configure(Func func) {
+        std::lock_guard<std::mutex> lck(detMtx);
+        func(cfar);
+    }
+
+    void setRate(double rate) {
+        std::lock_guard<std::mutex> lck(detMtx);
+        interval = (rate > 0.0) ? (1.0 / rate) : 0.0;
+    }
+
+    void setAverage(int average) {
+        std::lock_guard<std::mutex> lck(detMtx);
+        _average = std::max<int>(average, 1);
+    }
+
+    // Center frequency of the band, followed on retunes of the source manager afterwards
+    void setCenterFrequency(double frequency) { centerFrequency = frequency; }
+    double getCenterFrequency() { return centerFrequency; }
+
+    // Also signal an event loop whenever detections are available (NULL to disable)
+    void setWakeup(Wakeup* wakeup) {
+        this->wakeup = wakeup;
+    }
+
+    // Run the detector on a frame of count bins (dB, DC in the middle) given by the caller
+    void process(const float* data, int count, double samplerate, double centerFrequency, CFARFrame& frame) {
+        std::lock_guard<std::mutex> lck(detMtx);
+        detect(data, count, samplerate, centerFrequency, frame);
+    }
+
+    // Take the detections of the oldest queued frame, waiting at most timeoutMs for one (forever if
+    // negative). Returns false on timeout, throws once the tap was closed.
+    bool read(CFARFrame& frame, double timeoutMs) {
+        std::unique_lock<std::mutex> lck(dataMtx);
+        auto ready = [this]() { return !frames.empty() || closed; };
+        if (timeoutMs < 0) {
+            dataCnd.wait(lck, ready);
+        }
+        else if (!dataCnd.wait_for(lck, std::chrono::duration<double, std::milli>(timeoutMs), ready)) {
+            return false;
+        }
+        if (closed) { throw std::runtime_error("The detection tap is closed"); }
+        frame = std::move(frames.front());
+        frames.pop_front();
+        readFrames++;
+        return true;
+    }
+
+    // Unblock any pending read() and make all future reads throw
+    void close() {
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            closed = true;
+        }
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+    }
+
+    int getQueued() {
+        std::lock_guard<std::mutex> lck(dataMtx);
+        return frames.size();
+    }
+    uint64_t getDroppedFrames() { return droppedFrames; }
+    uint64_t getWrittenFrames() { return writtenFrames; }
+    uint64_t getReadFrames() { return readFrames; }
+
+    void resetCounters() {
+        droppedFrames = 0;
+        writtenFrames = 0;
+        readFrames = 0;
+    }
+
+private:
+    // Must be called with detMtx locked
+    void detect(const float* data, int count, double samplerate, double center, CFARFrame& frame) {
+        cfar.process(count, data, detections);
+
+        double binWidth = samplerate / (double)count;
+        frame.centerFrequency = center;
+        frame.samplerate = samplerate;
+        frame.fftSize = count;
+        frame.detections.clear();
+        for (const auto& det : detections) {
+            CFARDetection out;
+            out.offset = (det.centerBin - (count / 2)) * binWidth;
+            out.frequency = center + out.offset;
+            out.bandwidth = (det.lastBin - det.firstBin + 1) * binWidth;
+            out.level = det.level;
+            out.noise = det.noise;
+            out.snr = det.snr;
+            out.firstBin = det.firstBin;
+            out.lastBin = det.lastBin;
+            frame.detections.push_back(out);
+        }
+    }
+
+    static void onFFTFrame(IQFrontEnd::FFTFrame frame, void* ctx) {
+        DetectionTap* _this = (DetectionTap*)ctx;
+        std::lock_guard<std::mutex> lck(_this->detMtx);
+
+        // Restart averaging if the FFT size changed
+        if ((int)_this->acc.size() != frame.size) {
+            _this->acc.assign(frame.size, 0.0f);
+            _this->accCount = 0;
+        }
+
+        // Accumulate
+        float* acc = _this->acc.data();
+        volk_32f_x2_add_32f(acc, acc, frame.data, frame.size);
+        _this->accCount++;
+
+        // Detect once enough frames were averaged and the interval elapsed
+        auto now = std::chrono::steady_clock::now();
+        if (_this->accCount < _this->_average) { return; }
+        if (std::chrono::duration<double>(now - _this->lastOut).count() < _this->interval) { return; }
+        _this->lastOut = now;
+
+        float scale = 1.0f / (float)_this->accCount;
+        volk_32f_s32f_multiply_32f(acc, acc, scale, frame.size);
+        _this->accCount = 0;
+
+        CFARFrame out;
+        out.index = _this->frameIndex++;
+        _this->detect(acc, frame.size, _this->_frontEnd->getEffectiveSamplerate(), _this->centerFrequency, out);
+        std::fill(_this->acc.begin(), _this->acc.end(), 0.0f);
+        _this->push(std::move(out));
+    }
+
+    static void onRetune(double freq, void* ctx) {
+        ((DetectionTap*)ctx)->centerFrequency = freq;
+    }
+
+    void push(CFARFrame&& frame) {
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            if ((int)frames.size() >= _maxQueued) {
+                frames.pop_front();
+                droppedFrames++;
+            }
+            frames.push_back(std::move(frame));
+        }
+        writtenFrames++;
+
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+    }
+
+    IQFrontEnd* _frontEnd;
+    SourceManager* _sourceManager;
+    EventHandler<IQFrontEnd::FFTFrame> fftHandler;
+    EventHandler<double> retuneHandler;
+    bool running = false;
+    std::atomic<double> centerFrequency = 0.0;
+
+    // Detector and averaging, only touched by the FFT thread and the setters
+    std::mutex detMtx;
+    dsp::detector::CFAR cfar;
+    std::vector<dsp::detector::CFAR::Detection> detections;
+    std::vector<float> acc;
+    int accCount = 0;
+    int _average;
+    double interval;
+    std::chrono::steady_clock::time_point lastOut;
+    uint64_t frameIndex = 0;
+
+    // Detection queue
+    std::mutex dataMtx;
+    std::condition_variable dataCnd;
+    std::deque<CFARFrame> frames;
+    int _maxQueued;
+    bool closed = false;
+    Wakeup* wakeup = NULL;
+
+    std::atomic<uint64_t> droppedFrames = 0;
+    std::atomic<uint64_t> writtenFrames = 0;
+    std::atomic<uint64_t> readFrames = 0;
+};
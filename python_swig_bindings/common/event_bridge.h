@@ -0,0 +1,137 @@
+#pragma once
+
+// Queue for source and VFO manager events
+// Events are recorded on whatever thread emits them without ever taking the GIL. Python is
+// woken up through a Wakeup and drains them from its own thread with poll().
+
+#include <string>
+#include <vector>
+#include <deque>
+#include <mutex>
+#include <signal_path/source.h>
+#include <signal_path/vfo_manager.h>
+#include "wakeup.h"
+
+struct BridgedEvent {
+    std::string type;
+    std::string name;
+    double value;
+};
+
+class EventBridge {
+public:
+    EventBridge(Wakeup* wakeup = NULL, int maxQueued = 4096) : _wakeup(wakeup), _maxQueued(maxQueued) {
+        sourceRegisteredHandler.handler = sourceRegisteredHandlerFunc;
+        sourceRegisteredHandler.ctx = this;
+        sourceUnregisteredHandler.handler = sourceUnregisteredHandlerFunc;
+        sourceUnregisteredHandler.ctx = this;
+        retuneHandler.handler = retuneHandlerFunc;
+        retuneHandler.ctx = this;
+        vfoCreatedHandler.handler = vfoCreatedHandlerFunc;
+        vfoCreatedHandler.ctx = this;
+        vfoDeletedHandler.handler = vfoDeletedHandlerFunc;
+        vfoDeletedHandler.ctx = this;
+    }
+
+    ~EventBridge() {
+        detach();
+    }
+
+    void attachSourceManager(SourceManager* mgr) {
+        if (sourceMgr) { detachSourceManager(); }
+        sourceMgr = mgr;
+        sourceMgr->onSourceRegistered.bindHandler(&sourceRegisteredHandler);
+        sourceMgr->onSourceUnregistered.bindHandler(&sourceUnregisteredHandler);
+        sourceMgr->onRetune.bindHandler(&retuneHandler);
+    }
+
+    void detachSourceManager() {
+        if (!sourceMgr) { return; }
+        sourceMgr->onSourceRegistered.unbindHandler(&sourceRegisteredHandler);
+        sourceMgr->onSourceUnregistered.unbindHandler(&sourceUnregisteredHandler);
+        sourceMgr->onRetune.unbindHandler(&retuneHandler);
+        sourceMgr = NULL;
+    }
+
+    void attachVFOManager(VFOManager* mgr) {
+        if (vfoMgr) { detachVFOManager(); }
+        vfoMgr = mgr;
+        vfoMgr->onVfoCreated.bindHandler(&vfoCreatedHandler);
+        vfoMgr->onVfoDeleted.bindHandler(&vfoDeletedHandler);
+    }
+
+    void detachVFOManager() {
+        if (!vfoMgr) { return; }
+        vfoMgr->onVfoCreated.unbindHandler(&vfoCreatedHandler);
+        vfoMgr->onVfoDeleted.unbindHandler(&vfoDeletedHandler);
+        vfoMgr = NULL;
+    }
+
+    void detach() {
+        detachSourceManager();
+        detachVFOManager();
+    }
+
+    // Take all queued events, oldest first
+    std::vector<BridgedEvent> poll() {
+        std::lock_guard<std::mutex> lck(queueMtx);
+        std::vector<BridgedEvent> events(queue.begin(), queue.end());
+        queue.clear();
+        return events;
+    }
+
+    // Number of events that were discarded because nobody polled in time
+    int getDroppedCount() {
+        std::lock_guard<std::mutex> lck(queueMtx);
+        return dropped;
+    }
+
+private:
+    void push(const std::string& type, const std::string& name, double value) {
+        {
+            std::lock_guard<std::mutex> lck(queueMtx);
+            if (queue.size() >= (size_t)_maxQueued) {
+                queue.pop_front();
+                dropped++;
+            }
+            queue.push_back({ type, name, value });
+        }
+        if (_wakeup) { _wakeup->notify(); }
+    }
+
+    static void sourceRegisteredHandlerFunc(std::string name, void* ctx) {
+        ((EventBridge*)ctx)->push("source_registered", name, 0.0);
+    }
+
+    static void sourceUnregisteredHandlerFunc(std::string name, void* ctx) {
+        ((EventBridge*)ctx)->push("source_unregistered", name, 0.0);
+    }
+
+    static void retuneHandlerFunc(double freq, void* ctx) {
+        ((EventBridge*)ctx)->push("retune", "", freq);
+    }
+
+    static void vfoCreatedHandlerFunc(VFOManager::VFO* vfo, void* ctx) {
+        ((EventBridge*)ctx)->push("vfo_created", vfo->getName(), 0.0);
+    }
+
+    static void vfoDeletedHandlerFunc(std::string name, void* ctx) {
+        ((EventBridge*)ctx)->push("vfo_deleted", name, 0.0);
+    }
+
+    Wakeup* _wakeup;
+    int _maxQueued;
+
+    SourceManager* sourceMgr = NULL;
+    VFOManager* vfoMgr = NULL;
+
+    EventHandler<std::string> sourceRegisteredHandler;
+    EventHandler<std::string> sourceUnregisteredHandler;
+    EventHandler<double> retuneHandler;
+    EventHandler<VFOManager::VFO*> vfoCreatedHandler;
+    EventHandler<std::string> vfoDeletedHandler;
+
+    std::mutex queueMtx;
+    std::deque<BridgedEvent> queue;
+    int dropped = 0;
+};
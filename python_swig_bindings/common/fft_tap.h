@@ -0,0 +1,207 @@
+#pragma once
+
+// Tap on the FFT frames already computed by IQFrontEnd for the waterfall
+// Frames are averaged in linear power and rate limited on the FFT thread, then queued in dB for a
+// consumer. When the consumer is too slow, the oldest queued frames are dropped and counted instead
+// of blocking the FFT thread.
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <deque>
+#include <mutex>
+#include <condition_variable>
+#include <atomic>
+#include <stdexcept>
+#include <vector>
+#include <stdint.h>
+#include <signal_path/iq_frontend.h>
+#include "wakeup.h"
+
+class FFTTap {
+public:
+    // rate: maximum number of frames per second delivered (unlimited if 0 or negative)
+    // average: minimum number of FFT frames averaged into each delivered frame
+    FFTTap(IQFrontEnd* frontEnd, double rate = 0.0, int average = 1, int maxQueued = 16) {
+        _frontEnd = frontEnd;
+        _maxQueued = std::max<int>(maxQueued, 1);
+        setRate(rate);
+        setAverage(average);
+        fftHandler.handler = onFFTFrame;
+        fftHandler.ctx = this;
+    }
+
+    ~FFTTap() {
+        close();
+        stop();
+    }
+
+    void start() {
+        if (running) { return; }
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            closed = false;
+        }
+        _frontEnd->bindFFTHandler(&fftHandler);
+        running = true;
+    }
+
+    void stop() {
+        if (!running) { return; }
+        _frontEnd->unbindFFTHandler(&fftHandler);
+        running = false;
+    }
+
+    void setRate(double rate) {
+        std::lock_guard<std::mutex> lck(accMtx);
+        interval = (rate > 0.0) ? (1.0 / rate) : 0.0;
+    }
+
+    void setAverage(int average) {
+        std::lock_guard<std::mutex> lck(accMtx);
+        _average = std::max<int>(average, 1);
+    }
+
+    // Also signal an event loop whenever a new frame is available (NULL to disable)
+    void setWakeup(Wakeup* wakeup) {
+        this->wakeup = wakeup;
+    }
+
+    // Read the oldest queued frame, waiting at most timeoutMs for one (forever if negative).
+    // Returns the number of bins written, 0 on timeout or -1 if the tap was closed.
+    int read(float* data, int len, double timeoutMs) {
+        std::vector<float> frame;
+        {
+            std::unique_lock<std::mutex> lck(dataMtx);
+            auto ready = [this]() { return !frames.empty() || closed; };
+            if (timeoutMs < 0) {
+                dataCnd.wait(lck, ready);
+            }
+            else if (!dataCnd.wait_for(lck, std::chrono::duration<double, std::milli>(timeoutMs), ready)) {
+                return 0;
+            }
+            if (closed) { return -1; }
+            if ((int)frames.front().size() > len) {
+                throw std::runtime_error("Buffer is smaller than the FFT size");
+            }
+            frame = std::move(frames.front());
+            frames.pop_front();
+        }
+
+        int count = frame.size();
+        std::copy(frame.begin(), frame.end(), data);
+        readFrames++;
+
+        // Give the storage back to the FFT thread
+        std::lock_guard<std::mutex> lck(dataMtx);
+        freeFrames.push_back(std::move(frame));
+        return count;
+    }
+
+    // Unblock any pending read() and make all future reads return -1
+    void close() {
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            closed = true;
+        }
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+    }
+
+    int getFFTSize() { return _frontEnd->getFFTSize(); }
+    int getQueued() {
+        std::lock_guard<std::mutex> lck(dataMtx);
+        return frames.size();
+    }
+    uint64_t getDroppedFrames() { return droppedFrames; }
+    uint64_t getWrittenFrames() { return writtenFrames; }
+    uint64_t getReadFrames() { return readFrames; }
+
+    void resetCounters() {
+        droppedFrames = 0;
+        writtenFrames = 0;
+        readFrames = 0;
+    }
+
+private:
+    static void onFFTFrame(IQFrontEnd::FFTFrame frame, void* ctx) {
+        FFTTap* _this = (FFTTap*)ctx;
+        std::lock_guard<std::mutex> lck(_this->accMtx);
+
+        // Restart averaging if the FFT size changed
+        if ((int)_this->acc.size() != frame.size) {
+            _this->acc.assign(frame.size, 0.0f);
+            _this->accCount = 0;
+        }
+
+        // Accumulate in linear power, the frames are in dB and a mean of logarithms would bias the noise floor low
+        float* acc = _this->acc.data();
+        for (int i = 0; i < frame.size; i++) { acc[i] += powf(10.0f, frame.data[i] * 0.1f); }
+        _this->accCount++;
+
+        // Deliver once enough frames were averaged and the interval elapsed
+        auto now = std::chrono::steady_clock::now();
+        if (_this->accCount < _this->_average) { return; }
+        if (std::chrono::duration<double>(now - _this->lastOut).count() < _this->interval) { return; }
+        _this->lastOut = now;
+        _this->push();
+    }
+
+    void push() {
+        std::vector<float> frame;
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            if (!freeFrames.empty()) {
+                frame = std::move(freeFrames.back());
+                freeFrames.pop_back();
+            }
+        }
+
+        float scale = 1.0f / (float)accCount;
+        frame.resize(acc.size());
+        for (int i = 0; i < (int)acc.size(); i++) {
+            frame[i] = 10.0f * log10f(acc[i] * scale);
+            acc[i] = 0.0f;
+        }
+        accCount = 0;
+
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            if ((int)frames.size() >= _maxQueued) {
+                freeFrames.push_back(std::move(frames.front()));
+                frames.pop_front();
+                droppedFrames++;
+            }
+            frames.push_back(std::move(frame));
+        }
+        writtenFrames++;
+
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+    }
+
+    IQFrontEnd* _frontEnd;
+    EventHandler<IQFrontEnd::FFTFrame> fftHandler;
+    bool running = false;
+
+    // Averaging, only touched by the FFT thread and the setters
+    std::mutex accMtx;
+    std::vector<float> acc;
+    int accCount = 0;
+    int _average;
+    double interval;
+    std::chrono::steady_clock::time_point lastOut;
+
+    // Frame queue
+    std::mutex dataMtx;
+    std::condition_variable dataCnd;
+    std::deque<std::vector<float>> frames;
+    std::vector<std::vector<float>> freeFrames;
+    int _maxQueued;
+    bool closed = false;
+    Wakeup* wakeup = NULL;
+
+    std::atomic<uint64_t> droppedFrames = 0;
+    std::atomic<uint64_t> writtenFrames = 0;
+    std::atomic<uint64_t> readFrames = 0;
+};
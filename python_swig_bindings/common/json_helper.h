@@ -6,14 +6,13 @@
 #include <string>
 #include <stdexcept>
 
-// Forward declare the nlohmann::json class for C++ code
+// Include the actual JSON header in C++ code only, SWIG only sees a forward declaration
+#ifndef SWIG
+#include "../../core/src/json.hpp"
+#else
 namespace nlohmann {
     class json;
 }
-
-// Include the actual JSON header in C++ code only, not in SWIG parsing
-#ifndef SWIG
-#include "../../core/src/json.hpp"
 #endif
 
 // Helper class to convert between JSON and string representations
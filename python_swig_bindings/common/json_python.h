@@ -0,0 +1,116 @@
+#pragma once
+
+// Direct conversion between nlohmann::json values and Python objects, so that parts of the
+// config can be read and written from Python without serializing it to a JSON string.
+// All functions must be called with the GIL held.
+
+#include <Python.h>
+#include <string>
+#include <stdexcept>
+#include "../../core/src/json.hpp"
+
+namespace json_python {
+    // Convert a JSON value to a new Python object reference
+    inline PyObject* toPython(const nlohmann::json& value) {
+        switch (value.type()) {
+            case nlohmann::json::value_t::null:
+                Py_RETURN_NONE;
+            case nlohmann::json::value_t::boolean:
+                return PyBool_FromLong(value.get<bool>());
+            case nlohmann::json::value_t::number_integer:
+                return PyLong_FromLongLong(value.get<int64_t>());
+            case nlohmann::json::value_t::number_unsigned:
+                return PyLong_FromUnsignedLongLong(value.get<uint64_t>());
+            case nlohmann::json::value_t::number_float:
+                return PyFloat_FromDouble(value.get<double>());
+            case nlohmann::json::value_t::string: {
+                const std::string& str = value.get_ref<const std::string&>();
+                return PyUnicode_FromStringAndSize(str.data(), str.size());
+            }
+            case nlohmann::json::value_t::array: {
+                PyObject* list = PyList_New(value.size());
+                if (!list) { return NULL; }
+                Py_ssize_t i = 0;
+                for (const auto& item : value) {
+                    PyObject* obj = toPython(item);
+                    if (!obj) {
+                        Py_DECREF(list);
+                        return NULL;
+                    }
+                    PyList_SET_ITEM(list, i++, obj);
+                }
+                return list;
+            }
+            case nlohmann::json::value_t::object: {
+                PyObject* dict = PyDict_New();
+                if (!dict) { return NULL; }
+                for (auto it = value.begin(); it != value.end(); it++) {
+                    PyObject* obj = toPython(it.value());
+                    if (!obj || PyDict_SetItemString(dict, it.key().c_str(), obj) < 0) {
+                        Py_XDECREF(obj);
+                        Py_DECREF(dict);
+                        return NULL;
+                    }
+                    Py_DECREF(obj);
+                }
+                return dict;
+            }
+            default:
+                PyErr_SetString(PyExc_TypeError, "Unsupported JSON value type");
+                return NULL;
+        }
+    }
+
+    // Convert a Python object (None, bool, int, float, str, list, tuple or dict with str keys) to JSON.
+    // Throws std::runtime_error for any other type.
+    inline nlohmann::json fromPython(PyObject* obj) {
+        if (obj == Py_None) { return nullptr; }
+        if (PyBool_Check(obj)) { return obj == Py_True; }
+        if (PyLong_Check(obj)) {
+            int overflow;
+            long long val = PyLong_AsLongLongAndOverflow(obj, &overflow);
+            if (!overflow) { return (int64_t)val; }
+            if (overflow > 0) {
+                unsigned long long uval = PyLong_AsUnsignedLongLong(obj);
+                if (!PyErr_Occurred()) { return (uint64_t)uval; }
+                PyErr_Clear();
+            }
+            throw std::runtime_error("Integer is too large for the config");
+        }
+        if (PyFloat_Check(obj)) { return PyFloat_AsDouble(obj); }
+        if (PyUnicode_Check(obj)) {
+            Py_ssize_t len;
+            const char* str = PyUnicode_AsUTF8AndSize(obj, &len);
+            if (!str) {
+                PyErr_Clear();
+                throw std::runtime_error("String can't be encoded to UTF-8");
+            }
+            return std::string(str, len);
+        }
+        if (PyList_Check(obj) || PyTuple_Check(obj)) {
+            nlohmann::json arr = nlohmann::json::array();
+            Py_ssize_t len = PySequence_Fast_GET_SIZE(obj);
+            PyObject** items = PySequence_Fast_ITEMS(obj);
+            for (Py_ssize_t i = 0; i < len; i++) {
+                arr.push_back(fromPython(items[i]));
+            }
+            return arr;
+        }
+        if (PyDict_Check(obj)) {
+            nlohmann::json dict = nlohmann::json::object();
+            PyObject *key, *val;
+            Py_ssize_t pos = 0;
+            while (PyDict_Next(obj, &pos, &key, &val)) {
+                if (!PyUnicode_Check(key)) { throw std::runtime_error("Config object keys must be strings"); }
+                const char* keyStr = PyUnicode_AsUTF8(key);
+                if (!keyStr) {
+                    PyErr_Clear();
+                    throw std::runtime_error("Key can't be encoded to UTF-8");
+                }
+                dict[keyStr] = fromPython(val);
+            }
+            return dict;
+        }
+        throw std::runtime_error(std::string("Unsupported type for the config: ") + Py_TYPE(obj)->tp_name);
+    }
+}
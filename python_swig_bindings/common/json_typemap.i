@@ -1,6 +1,6 @@
 // Type mappings for nlohmann::json in SWIG
 %{
-#include "../../core/src/json.hpp"
+#include "../core/src/json.hpp"
 %}
 
 // Don't wrap the actual nlohmann::json class, but instead convert to/from Python dict
@@ -0,0 +1,36 @@
+// Common prelude of every SDR++ extension module (the all-in-one _sdrpp and the
+// _sdrpp_<name> submodules loaded lazily by the sdrpp package)
+
+// Define that we're building with SWIG to enable conditional compilation
+#define SWIG_BUILDING
+
+// Begin section for proper Python initialization
+%begin %{
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+%}
+
+// Include standard library support before the GIL handling below, the container iterators
+// create Python objects and must keep the GIL
+%include "std_string.i"
+%include "std_vector.i"
+%include "std_map.i"
+
+// Template instantiations for containers used in SDR++
+%template(StringVector) std::vector<std::string>;
+
+// Handle exceptions and GIL management
+%include "exception.i"
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception");
+    }
+    PyEval_RestoreThread(_save);
+}
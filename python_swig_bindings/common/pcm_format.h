@@ -0,0 +1,37 @@
+#pragma once
+
+// Names and sizes of the dsp::compression PCM sample types, shared by the bindings that let Python
+// pick a sample format by name ("i8", "i16" or "f32")
+
+#include <stdexcept>
+#include <string>
+#include <dsp/types.h>
+#include <dsp/compression/pcm_type.h>
+
+inline dsp::compression::PCMType pcmTypeFromName(const std::string& name) {
+    if (name == "i8") { return dsp::compression::PCM_TYPE_I8; }
+    if (name == "i16") { return dsp::compression::PCM_TYPE_I16; }
+    if (name == "f32") { return dsp::compression::PCM_TYPE_F32; }
+    throw std::runtime_error("Unknown sample type '" + name + "', must be 'i8', 'i16' or 'f32'");
+}
+
+inline std::string pcmTypeName(dsp::compression::PCMType type) {
+    if (type == dsp::compression::PCM_TYPE_I8) { return "i8"; }
+    if (type == dsp::compression::PCM_TYPE_I16) { return "i16"; }
+    return "f32";
+}
+
+// Bytes used by one IQ sample
+inline int pcmSampleBytes(dsp::compression::PCMType type) {
+    if (type == dsp::compression::PCM_TYPE_I8) { return 2 * sizeof(int8_t); }
+    if (type == dsp::compression::PCM_TYPE_I16) { return 2 * sizeof(int16_t); }
+    return sizeof(dsp::complex_t);
+}
+
+// Factor converting the integers of a block compressed with the given scaler back to floats,
+// matching SampleStreamDecompressor
+inline float pcmScale(dsp::compression::PCMType type, float scaler) {
+    if (type == dsp::compression::PCM_TYPE_I8) { return scaler / 128.0f; }
+    if (type == dsp::compression::PCM_TYPE_I16) { return scaler / 32768.0f; }
+    return 1.0f;
+}
@@ -0,0 +1,88 @@
+#pragma once
+
+// Helpers to hand sample buffers to Python without going through per-sample PyObjects
+// The views created here use the buffer protocol so they can be wrapped by numpy
+// with np.frombuffer(view, dtype=np.complex64) or np.asarray(view) without a copy
+
+#include <Python.h>
+#include <string.h>
+
+namespace sample_view {
+    // Buffer protocol format string of a complex64 sample (two native floats)
+    static const char* COMPLEX64_FORMAT = "Zf";
+    static const char* FLOAT32_FORMAT = "f";
+
+    // Create a read-only memoryview directly over existing memory.
+    // IMPORTANT: The view does not own the memory, the caller must call release() once the
+    // memory is no longer valid. Must be called with the GIL held.
+    inline PyObject* makeView(const void* data, Py_ssize_t count, Py_ssize_t itemSize, const char* format) {
+        Py_buffer info;
+        memset(&info, 0, sizeof(Py_buffer));
+        info.buf = (void*)data;
+        info.obj = NULL;
+        info.len = count * itemSize;
+        info.itemsize = itemSize;
+        info.readonly = 1;
+        info.ndim = 1;
+        info.format = (char*)format;
+        info.shape = &count;
+        info.strides = &info.itemsize;
+        return PyMemoryView_FromBuffer(&info);
+    }
+
+    // T is expected to be a pair of floats (dsp::complex_t)
+    template <class T>
+    inline PyObject* makeComplexView(const T* samples, int count) {
+        static_assert(sizeof(T) == 2 * sizeof(float), "Complex type must be two floats");
+        return makeView(samples, count, sizeof(T), COMPLEX64_FORMAT);
+    }
+
+    inline PyObject* makeFloatView(const float* samples, int count) {
+        return makeView(samples, count, sizeof(float), FLOAT32_FORMAT);
+    }
+
+    // Create a bytes object owning a copy of the samples. Must be called with the GIL held.
+    inline PyObject* makeCopy(const void* data, Py_ssize_t size) {
+        return PyBytes_FromStringAndSize((const char*)data, size);
+    }
+
+    // Invalidate a view created with makeView(). Returns false if Python code still holds
+    // an export of the view (eg. a numpy array built on top of it), in which case the
+    // view cannot be invalidated. Must be called with the GIL held.
+    inline bool release(PyObject* view) {
+        PyObject* res = PyObject_CallMethod(view, "release", NULL);
+        if (!res) {
+            PyErr_Clear();
+            return false;
+        }
+        Py_DECREF(res);
+        return true;
+    }
+
+    // Get a writable C-contiguous buffer from a Python object (ndarray, bytearray, memoryview...)
+    // The buffer must be released with PyBuffer_Release(). Must be called with the GIL held.
+    inline bool getWritable(PyObject* obj, Py_buffer* view, Py_ssize_t itemSize) {
+        if (PyObject_GetBuffer(obj, view, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS) < 0) {
+            return false;
+        }
+        if (view->len % itemSize) {
+            PyBuffer_Release(view);
+            PyErr_SetString(PyExc_ValueError, "Buffer size is not a multiple of the sample size");
+            return false;
+        }
+        return true;
+    }
+
+    // Same as getWritable() for a buffer that's only read
+    inline bool getReadable(PyObject* obj, Py_buffer* view, Py_ssize_t itemSize) {
+        if (PyObject_GetBuffer(obj, view, PyBUF_C_CONTIGUOUS) < 0) {
+            return false;
+        }
+        if (view->len % itemSize) {
+            PyBuffer_Release(view);
+            PyErr_SetString(PyExc_ValueError, "Buffer size is not a multiple of the sample size");
+            return false;
+        }
+        return true;
+    }
+}
@@ -0,0 +1,340 @@
+#pragma once
+
+// Client for the SDR++ server protocol (see core/src/server.cpp) without any GUI.
+// A worker thread receives the packets, decompresses the baseband (zstd, then the
+// SampleStreamDecompressor PCM frames) and hands the samples to a StreamReader, so reading
+// them only copies from its ring buffer. Commands are written right away and their
+// acknowledgments are matched asynchronously, so several commands can be in flight at once.
+
+#include <string>
+#include <algorithm>
+#include <deque>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <stdexcept>
+#include <stdint.h>
+#include <string.h>
+#include <zstd.h>
+#include <server_protocol.h>
+#include <utils/net.h>
+#include <utils/flog.h>
+#include <dsp/compression/sample_stream_decompressor.h>
+#include "stream_reader.h"
+
+class ServerClient {
+public:
+    // Connect and wait at most timeoutMs for the server to answer. depth is the number of
+    // samples buffered for read() before new ones are dropped.
+    ServerClient(const std::string& host, int port, int depth = 1000000, double timeoutMs = 10000.0) {
+        this->timeoutMs = timeoutMs;
+
+        reader.init(&out, depth);
+        reader.start();
+
+        sock = net::connect(host, port);
+        workerThread = std::thread(&ServerClient::worker, this);
+
+        // The server either sends its samplerate or tells us to go away if it already has a client,
+        // wait for a round trip to know which
+        try {
+            wait(sendCommand(server::COMMAND_GET_UI, NULL, 0));
+        }
+        catch (const std::exception& e) {
+            bool busy = serverBusy;
+            close();
+            if (busy) { throw std::runtime_error("Server busy, another client is already connected"); }
+            throw;
+        }
+    }
+
+    ~ServerClient() {
+        close();
+    }
+
+    void close() {
+        if (sock) { sock->close(); }
+        out.stopWriter();
+        if (workerThread.joinable()) { workerThread.join(); }
+        out.clearWriteStop();
+        reader.close();
+        reader.stop();
+    }
+
+    bool isOpen() {
+        return sock && sock->isOpen() && !disconnected;
+    }
+
+    // Commands, each returns an id to pass to wait(). The server handles them in order.
+    uint64_t setFrequency(double frequency) {
+        return sendCommand(server::COMMAND_SET_FREQUENCY, (uint8_t*)&frequency, sizeof(double));
+    }
+
+    uint64_t setSampleType(dsp::compression::PCMType type) {
+        uint8_t val = type;
+        return sendCommand(server::COMMAND_SET_SAMPLE_TYPE, &val, 1);
+    }
+
+    uint64_t setCompression(bool enabled) {
+        uint8_t val = enabled;
+        return sendCommand(server::COMMAND_SET_COMPRESSION, &val, 1);
+    }
+
+    uint64_t requestSamplerate() {
+        return sendCommand(server::COMMAND_GET_SAMPLERATE, NULL, 0);
+    }
+
+    // Start and stop aren't acknowledged by the server, the returned id is the one of a UI request sent right after
+    uint64_t start() {
+        sendCommand(server::COMMAND_START, NULL, 0);
+        return sendCommand(server::COMMAND_GET_UI, NULL, 0);
+    }
+
+    uint64_t stop() {
+        sendCommand(server::COMMAND_STOP, NULL, 0);
+        return sendCommand(server::COMMAND_GET_UI, NULL, 0);
+    }
+
+    // Wait for a command to be acknowledged, throws if the server rejected it, disconnected or timed out
+    void wait(uint64_t id) {
+        std::unique_lock<std::mutex> lck(cmdMtx);
+        bool done = cmdCnd.wait_for(lck, std::chrono::duration<double, std::milli>(timeoutMs), [=]() { return completed >= id || disconnected; });
+        auto it = errors.find(id);
+        if (it != errors.end()) {
+            int err = it->second;
+            errors.erase(it);
+            throw std::runtime_error("Server rejected the command (error " + std::to_string(err) + ")");
+        }
+        if (completed >= id) { return; }
+        if (!done) { throw std::runtime_error("Timed out waiting for the server"); }
+        throw std::runtime_error("Disconnected from the server");
+    }
+
+    // Wait for all commands sent so far
+    void sync() {
+        uint64_t last;
+        {
+            std::lock_guard<std::mutex> lck(cmdMtx);
+            last = lastId;
+        }
+        wait(last);
+
+        // Report the failures of the commands that weren't waited for
+        std::lock_guard<std::mutex> lck(cmdMtx);
+        if (!errors.empty()) {
+            int err = errors.begin()->second;
+            errors.clear();
+            throw std::runtime_error("Server rejected a command (error " + std::to_string(err) + ")");
+        }
+    }
+
+    // State as last acknowledged by the server
+    double getSamplerate() { return samplerate; }
+    dsp::compression::PCMType getSampleType() { return sampleType; }
+    bool getCompression() { return compression; }
+
+    StreamReader<dsp::complex_t>& getReader() { return reader; }
+
+    // Bytes received in total, baseband bytes as sent and after zstd decompression
+    uint64_t getBytesReceived() { return bytesReceived; }
+    uint64_t getBasebandBytes() { return basebandBytes; }
+    uint64_t getDecompressedBytes() { return decompressedBytes; }
+    uint64_t getInvalidPackets() { return invalidPackets; }
+
+private:
+    // Largest PCM frame of the compressor, 8 byte header included
+    static constexpr size_t FRAME_SIZE = STREAM_BUFFER_SIZE * sizeof(dsp::complex_t) + 8;
+
+    struct PendingCommand {
+        uint64_t id;
+        server::Command cmd;
+    };
+
+    uint64_t sendCommand(server::Command cmd, const uint8_t* data, int len) {
+        std::lock_guard<std::mutex> sendLck(sendMtx);
+        if (!isOpen()) { throw std::runtime_error("Not connected"); }
+
+        server::PacketHeader* phdr = (server::PacketHeader*)sbuffer.data();
+        server::CommandHeader* chdr = (server::CommandHeader*)&sbuffer[sizeof(server::PacketHeader)];
+        phdr->type = server::PACKET_TYPE_COMMAND;
+        phdr->size = sizeof(server::PacketHeader) + sizeof(server::CommandHeader) + len;
+        chdr->cmd = cmd;
+        if (len) { memcpy(&sbuffer[sizeof(server::PacketHeader) + sizeof(server::CommandHeader)], data, len); }
+
+        // Register before sending so that the acknowledgment can't arrive first
+        uint64_t id;
+        bool acked = (cmd != server::COMMAND_START && cmd != server::COMMAND_STOP);
+        {
+            std::lock_guard<std::mutex> lck(cmdMtx);
+            if (acked) {
+                id = ++lastId;
+                pending.push_back({ id, cmd });
+            }
+            else {
+                id = lastId;
+            }
+        }
+
+        if (sock->send(sbuffer.data(), phdr->size) != (int)phdr->size) {
+            throw std::runtime_error("Could not send the command");
+        }
+        return id;
+    }
+
+    void completeCommand(server::Command cmd, const uint8_t* data, int len) {
+        // Apply what the server acknowledged
+        if (cmd == server::COMMAND_GET_SAMPLERATE && len == sizeof(double)) {
+            samplerate = *(double*)data;
+        }
+        else if (cmd == server::COMMAND_SET_SAMPLE_TYPE && len == 1) {
+            sampleType = (dsp::compression::PCMType)data[0];
+        }
+        else if (cmd == server::COMMAND_SET_COMPRESSION && len == 1) {
+            compression = data[0];
+        }
+
+        // The server handles commands in order, so the ones before were handled too even if
+        // they weren't acknowledged (older servers don't acknowledge all commands)
+        {
+            std::lock_guard<std::mutex> lck(cmdMtx);
+            auto it = std::find_if(pending.begin(), pending.end(), [cmd](const PendingCommand& p) { return p.cmd == cmd; });
+            if (it == pending.end()) { return; }
+            completed = it->id;
+            pending.erase(pending.begin(), it + 1);
+        }
+        cmdCnd.notify_all();
+    }
+
+    void failCommand(int err) {
+        {
+            std::lock_guard<std::mutex> lck(cmdMtx);
+            if (pending.empty()) { return; }
+            completed = pending.front().id;
+            errors[completed] = err;
+            pending.pop_front();
+        }
+        cmdCnd.notify_all();
+    }
+
+    void handleBaseband(const uint8_t* data, int len, bool compressed) {
+        basebandBytes += len;
+        if (compressed) {
+            size_t count = ZSTD_decompressDCtx(dctx.get(), frame.data(), FRAME_SIZE, data, len);
+            if (ZSTD_isError(count)) {
+                invalidPackets++;
+                return;
+            }
+            data = frame.data();
+            len = count;
+        }
+
+        // Check that the frame fits in a stream buffer before converting it
+        if (len < 8) {
+            invalidPackets++;
+            return;
+        }
+        uint16_t type = *(uint16_t*)&data[2];
+        int sampleSize = (type == dsp::compression::PCM_TYPE_I8) ? 2 : ((type == dsp::compression::PCM_TYPE_I16) ? 4 : 8);
+        if ((len - 8) / sampleSize > STREAM_BUFFER_SIZE || type > dsp::compression::PCM_TYPE_F32) {
+            invalidPackets++;
+            return;
+        }
+        decompressedBytes += len;
+
+        int count = dsp::compression::SampleStreamDecompressor::process(len, data, out.writeBuf);
+        if (count > 0) { out.swap(count); }
+    }
+
+    void worker() {
+        server::PacketHeader* hdr = (server::PacketHeader*)rbuffer.data();
+        uint8_t* pktData = &rbuffer[sizeof(server::PacketHeader)];
+        server::CommandHeader* chdr = (server::CommandHeader*)pktData;
+        uint8_t* cmdData = &rbuffer[sizeof(server::PacketHeader) + sizeof(server::CommandHeader)];
+
+        while (true) {
+            // Receive the header and then the rest of the packet
+            if (sock->recv(rbuffer.data(), sizeof(server::PacketHeader), true) <= 0) { break; }
+            if (hdr->size < sizeof(server::PacketHeader) || hdr->size > SERVER_MAX_PACKET_SIZE) {
+                flog::error("Invalid packet size from the server: {0}", hdr->size);
+                break;
+            }
+            int len = hdr->size - sizeof(server::PacketHeader);
+            if (len && sock->recv(pktData, len, true, (int)timeoutMs) <= 0) { break; }
+            bytesReceived += hdr->size;
+
+            int cmdLen = len - (int)sizeof(server::CommandHeader);
+            if (hdr->type == server::PACKET_TYPE_COMMAND && cmdLen >= 0) {
+                if (chdr->cmd == server::COMMAND_SET_SAMPLERATE && cmdLen == sizeof(double)) {
+                    samplerate = *(double*)cmdData;
+                }
+                else if (chdr->cmd == server::COMMAND_DISCONNECT) {
+                    flog::warn("Asked to disconnect by the server");
+                    serverBusy = true;
+                    break;
+                }
+            }
+            else if (hdr->type == server::PACKET_TYPE_COMMAND_ACK && cmdLen >= 0) {
+                completeCommand((server::Command)chdr->cmd, cmdData, cmdLen);
+            }
+            else if (hdr->type == server::PACKET_TYPE_BASEBAND) {
+                handleBaseband(pktData, len, false);
+            }
+            else if (hdr->type == server::PACKET_TYPE_BASEBAND_COMPRESSED) {
+                handleBaseband(pktData, len, true);
+            }
+            else if (hdr->type == server::PACKET_TYPE_ERROR && len >= 1) {
+                flog::error("SDR++ Server Error: {0}", pktData[0]);
+                failCommand(pktData[0]);
+            }
+            else {
+                invalidPackets++;
+            }
+        }
+
+        // Fail anything still waiting and end the reads
+        {
+            std::lock_guard<std::mutex> lck(cmdMtx);
+            disconnected = true;
+            pending.clear();
+        }
+        cmdCnd.notify_all();
+        reader.close();
+    }
+
+    std::shared_ptr<net::Socket> sock;
+    std::thread workerThread;
+    double timeoutMs;
+
+    // Owned so that they're freed when the constructor throws too
+    std::vector<uint8_t> rbuffer = std::vector<uint8_t>(SERVER_MAX_PACKET_SIZE);
+    std::vector<uint8_t> sbuffer = std::vector<uint8_t>(SERVER_MAX_PACKET_SIZE);
+    std::vector<uint8_t> frame = std::vector<uint8_t>(FRAME_SIZE);
+    std::unique_ptr<ZSTD_DCtx, size_t (*)(ZSTD_DCtx*)> dctx = { ZSTD_createDCtx(), ZSTD_freeDCtx };
+
+    dsp::stream<dsp::complex_t> out;
+    StreamReader<dsp::complex_t> reader;
+
+    std::mutex sendMtx;
+    std::mutex cmdMtx;
+    std::condition_variable cmdCnd;
+    std::deque<PendingCommand> pending;
+    std::map<uint64_t, int> errors;
+    uint64_t lastId = 0;
+    uint64_t completed = 0;
+    std::atomic<bool> disconnected = false;
+    std::atomic<bool> serverBusy = false;
+
+    std::atomic<double> samplerate = 0.0;
+    std::atomic<dsp::compression::PCMType> sampleType = dsp::compression::PCM_TYPE_I16;
+    std::atomic<bool> compression = false;
+
+    std::atomic<uint64_t> bytesReceived = 0;
+    std::atomic<uint64_t> basebandBytes = 0;
+    std::atomic<uint64_t> decompressedBytes = 0;
+    std::atomic<uint64_t> invalidPackets = 0;
+};
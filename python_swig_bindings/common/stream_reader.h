@@ -0,0 +1,133 @@
+#pragma once
+
+// Pull-based reader for dsp::stream
+// Buffers are moved from the stream into a ring buffer by the block's worker thread. When the
+// consumer is too slow, the samples that don't fit are dropped and counted instead of blocking
+// the writer, so a slow consumer never back-pressures the rest of the flowgraph.
+
+#include <algorithm>
+#include <chrono>
+#include <mutex>
+#include <condition_variable>
+#include <atomic>
+#include <stdint.h>
+#include <dsp/sink.h>
+#include <dsp/buffer/ring_buffer.h>
+#include "wakeup.h"
+
+template <class T>
+class StreamReader : public dsp::Sink<T> {
+    using base_type = dsp::Sink<T>;
+public:
+    StreamReader() {}
+
+    StreamReader(dsp::stream<T>* in, int depth) { init(in, depth); }
+
+    ~StreamReader() {
+        if (!base_type::_block_init) { return; }
+        base_type::stop();
+    }
+
+    void init(dsp::stream<T>* in, int depth) {
+        _depth = std::clamp<int>(depth, 1, RING_BUF_SZ);
+        ring.init(_depth);
+        base_type::init(in);
+    }
+
+    int run() {
+        int count = base_type::_in->read();
+        if (count < 0) { return -1; }
+
+        // Write as much as fits without blocking, drop the rest
+        int toWrite = std::min<int>(ring.getWritable(), count);
+        if (toWrite > 0) {
+            ring.write(base_type::_in->readBuf, toWrite);
+        }
+        if (toWrite < count) {
+            overflows++;
+            droppedSamples += count - toWrite;
+        }
+        writtenSamples += toWrite;
+
+        base_type::_in->flush();
+
+        // Notify the consumer
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+        }
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+
+        return count;
+    }
+
+    // Read up to len samples, waiting at most timeoutMs for data (forever if negative).
+    // Returns the number of samples read, 0 on timeout or -1 if the reader was closed.
+    int read(T* data, int len, double timeoutMs) {
+        {
+            std::unique_lock<std::mutex> lck(dataMtx);
+            auto ready = [this]() { return ring.getReadable() > 0 || closed; };
+            if (timeoutMs < 0) {
+                dataCnd.wait(lck, ready);
+            }
+            else if (!dataCnd.wait_for(lck, std::chrono::duration<double, std::milli>(timeoutMs), ready)) {
+                return 0;
+            }
+            if (closed) { return -1; }
+        }
+
+        // Only this thread reads, so the readable count can only grow from here
+        int count = std::min<int>(ring.getReadable(), len);
+        if (ring.read(data, count) < 0) { return -1; }
+        readSamples += count;
+        return count;
+    }
+
+    // Also signal an event loop whenever new data is available (NULL to disable)
+    void setWakeup(Wakeup* wakeup) {
+        this->wakeup = wakeup;
+    }
+
+    // Unblock any pending read() and make all future reads return -1
+    void close() {
+        {
+            std::lock_guard<std::mutex> lck(dataMtx);
+            closed = true;
+        }
+        dataCnd.notify_all();
+        if (wakeup) { wakeup->notify(); }
+    }
+
+    void reopen() {
+        std::lock_guard<std::mutex> lck(dataMtx);
+        closed = false;
+    }
+
+    int getDepth() { return _depth; }
+    int getAvailable() { return ring.getReadable(); }
+    uint64_t getOverflowCount() { return overflows; }
+    uint64_t getDroppedSamples() { return droppedSamples; }
+    uint64_t getWrittenSamples() { return writtenSamples; }
+    uint64_t getReadSamples() { return readSamples; }
+
+    void resetCounters() {
+        overflows = 0;
+        droppedSamples = 0;
+        writtenSamples = 0;
+        readSamples = 0;
+    }
+
+private:
+    dsp::buffer::RingBuffer<T> ring;
+    int _depth;
+
+    std::mutex dataMtx;
+    std::condition_variable dataCnd;
+    bool closed = false;
+    Wakeup* wakeup = NULL;
+
+    std::atomic<uint64_t> overflows = 0;
+    std::atomic<uint64_t> droppedSamples = 0;
+    std::atomic<uint64_t> writtenSamples = 0;
+    std::atomic<uint64_t> readSamples = 0;
+};
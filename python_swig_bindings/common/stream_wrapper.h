@@ -1,102 +1,86 @@
 #pragma once
 
-// Forward declarations and wrapper for SDR++ stream functionality
-// Avoids direct inclusion of VOLK-dependent headers during SWIG processing
-
-// Completely bypass real stream.h since it has VOLK dependency
-#define DSP_STREAM_H
+// Wrapper delivering the buffers of a real SDR++ stream to a C++ callback
+// A handler sink reads the stream on its own worker thread, so the callback is called
+// from that thread for every buffer written to the stream.
 
 #include <functional>
-#include <string>
-#include <stdexcept>
-#include <cstring>
-
-// Define the complex type first so we can use it
-namespace dsp {
-    struct complex_t {
-        float re;
-        float im;
-    };
-
-    // Forward declare the stream class that will be used by our wrappers
-    template <typename T>
-    class stream {
-    public:
-        // Define just enough of the stream class API for our wrappers to compile
-        typedef std::function<void(T*, int, void*)> handler_t;
-        void bindHandler(handler_t handler, void* ctx) {}
-        void unbindHandler() {}
-    };
-}
+#include <memory>
+#include <dsp/stream.h>
+#include <dsp/types.h>
+#include <dsp/sink/handler_sink.h>
 
-// Wrapper for stream functionality that avoids VOLK dependency in SWIG
 class StreamWrapper {
 public:
     // Constructor that takes an existing stream
-    StreamWrapper(dsp::stream<dsp::complex_t>* existingStream = nullptr) 
-        : stream(existingStream), handler(nullptr), handlerCtx(nullptr), connected(false) {}
-    
+    StreamWrapper(dsp::stream<dsp::complex_t>* existingStream = nullptr) : stream(existingStream) {}
+
     // Destructor - automatically disconnects
     ~StreamWrapper() {
         disconnect();
     }
-    
+
     // Connect to an existing stream
     bool connect(dsp::stream<dsp::complex_t>* existingStream) {
         if (!existingStream) return false;
-        
+
         disconnect(); // First disconnect if already connected
         stream = existingStream;
         return true;
     }
-    
-    // Disconnect from current stream
+
+    // Stop reading from the current stream. Once this returns, the callback won't be called anymore.
     void disconnect() {
-        if (stream && connected) {
-            stream->unbindHandler();
-            connected = false;
+        if (sink) {
+            sink->stop();
+            sink.reset();
         }
-        handler = nullptr;
-        handlerCtx = nullptr;
+        userCallback = nullptr;
     }
-    
+
     // Setup a simple callback for receiving samples
     typedef std::function<void(dsp::complex_t*, int)> SampleCallback;
-    
+
     bool setCallback(SampleCallback callback) {
         if (!stream) return false;
-        
-        // Store the callback
-        handler = [](dsp::complex_t* data, int count, void* ctx) {
-            StreamWrapper* wrapper = static_cast<StreamWrapper*>(ctx);
-            if (wrapper && wrapper->userCallback) {
-                wrapper->userCallback(data, count);
-            }
-        };
-        
-        // Bind the handler to the stream
-        stream->bindHandler(handler, this);
-        connected = true;
+
+        // Only one reader may be attached to a stream at a time
+        if (sink) {
+            sink->stop();
+            sink.reset();
+        }
+
         userCallback = callback;
-        
+        sink = std::make_unique<dsp::sink::Handler<dsp::complex_t>>(stream, handler, this);
+        sink->start();
+
         return true;
     }
-    
+
+    bool isConnected() const {
+        return (bool)sink;
+    }
+
     // Get the underlying stream (for C++ code)
     dsp::stream<dsp::complex_t>* getStream() const {
         return stream;
     }
-    
+
 private:
+    static void handler(dsp::complex_t* data, int count, void* ctx) {
+        StreamWrapper* wrapper = static_cast<StreamWrapper*>(ctx);
+        if (wrapper->userCallback) {
+            wrapper->userCallback(data, count);
+        }
+    }
+
     dsp::stream<dsp::complex_t>* stream;
-    std::function<void(dsp::complex_t*, int, void*)> handler;
-    void* handlerCtx;
+    std::unique_ptr<dsp::sink::Handler<dsp::complex_t>> sink;
     SampleCallback userCallback;
-    bool connected;
 };
 
 // Helper function to create a Python-friendly representation of complex samples
-inline void complexToFloatArrays(const dsp::complex_t* samples, int count, 
+inline void complexToFloatArrays(const dsp::complex_t* samples, int count,
                                 float* real_out, float* imag_out) {
     for (int i = 0; i < count; i++) {
         real_out[i] = samples[i].re;
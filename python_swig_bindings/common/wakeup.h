@@ -0,0 +1,50 @@
+#pragma once
+
+// Cross-thread wakeup used to integrate C++ producers with a Python event loop
+// The write end of a socket (usually from socket.socketpair()) is given by Python, whose event
+// loop watches the read end. Notifications are coalesced: only the first notify() after a clear()
+// actually writes to the socket, so the cost per buffer is a single atomic exchange.
+// Many wakeups can write to the same socket, consume() then tells the event loop which ones fired.
+
+#include <atomic>
+
+#ifdef _WIN32
+#include <winsock2.h>
+#else
+#include <sys/socket.h>
+#endif
+
+class Wakeup {
+public:
+    Wakeup(int fd) : _fd(fd) {}
+
+    // Signal the event loop. Safe to call from any thread, never blocks.
+    void notify() {
+        if (pending.exchange(true)) { return; }
+        char b = 1;
+#ifdef _WIN32
+        send((SOCKET)_fd, &b, 1, 0);
+#else
+        // A full socket means a wakeup is already pending, so EAGAIN can safely be ignored
+        send(_fd, &b, 1, MSG_DONTWAIT);
+#endif
+    }
+
+    // Called by the event loop before draining the producers
+    void clear() {
+        pending = false;
+    }
+
+    // Clear and return whether notify() was called since the last clear
+    bool consume() {
+        return pending.exchange(false);
+    }
+
+    int getFd() {
+        return _fd;
+    }
+
+private:
+    int _fd;
+    std::atomic<bool> pending = false;
+};
@@ -0,0 +1,9 @@
+%module sdrpp_wakeup
+
+%{
+#include "common/wakeup.h"
+%}
+
+// Expose the wakeup so that the same socket can be shared by many producers (stream readers,
+// event bridges...). See sdrpp/aio.py for the event loop side.
+%include "../common/wakeup.h"
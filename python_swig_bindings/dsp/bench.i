@@ -0,0 +1,88 @@
+%module sdrpp_dsp_bench
+
+%{
+#include "../core/src/dsp/bench/suite.h"
+#include "common/json_python.h"
+
+namespace bench_python {
+    // Convert a Python object to JSON, None giving an empty object. Must be called without the GIL.
+    inline nlohmann::json toJson(PyObject* obj) {
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        try {
+            nlohmann::json json = (obj && obj != Py_None) ? json_python::fromPython(obj) : nlohmann::json::object();
+            PyGILState_Release(gstate);
+            return json;
+        }
+        catch (...) {
+            PyGILState_Release(gstate);
+            throw;
+        }
+    }
+
+    // Must be called without the GIL
+    inline PyObject* toPython(const nlohmann::json& json) {
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        PyObject* obj = json_python::toPython(json);
+        PyGILState_Release(gstate);
+        return obj;
+    }
+}
+%}
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in DSP benchmarks");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+// DSP throughput benchmarks, the same suite as the sdrpp_dsp_bench program
+//
+//   report = sdrpp.runDSPBenchmarks({"blocks": ["fir", "fm"], "fir_taps": [64, 256]})
+//   regressions = sdrpp.compareDSPBenchmarks(report, json.load(open("baseline.json")), 0.1)
+%inline %{
+// Run all cases of a config and return the report, a dict with the "config" and the "results"
+// of the cases. options overrides fields of the default config (duration_ms, buffer_sizes,
+// samplerate, demod_samplerate, fir_taps, resampler_rates, fft_sizes, demods, chain_counts,
+// schedulers and blocks).
+// Heap allocations aren't counted, only buffers allocated by the DSP blocks.
+PyObject* runDSPBenchmarks(PyObject* options = NULL) {
+    dsp::bench::Config config = dsp::bench::Config::fromJson(bench_python::toJson(options));
+    return bench_python::toPython(dsp::bench::toJson(config, dsp::bench::runAll(config)));
+}
+
+// Names of the cases a config would run
+PyObject* listDSPBenchmarks(PyObject* options = NULL) {
+    dsp::bench::Config config = dsp::bench::Config::fromJson(bench_python::toJson(options));
+    nlohmann::json names = nlohmann::json::array();
+    for (const auto& benchCase : dsp::bench::listCases(config)) {
+        names.push_back(benchCase.name);
+    }
+    return bench_python::toPython(names);
+}
+
+// Compare a report with a baseline report, returns a list of the regressions as dicts with the
+// "name" of the case, the "metric" that regressed and its "baseline" and "current" values
+PyObject* compareDSPBenchmarks(PyObject* report, PyObject* baseline, double threshold = 0.1) {
+    if (threshold < 0.0 || threshold >= 1.0) { throw std::runtime_error("Threshold must be between 0 and 1"); }
+    auto regressions = dsp::bench::compare(bench_python::toJson(report), bench_python::toJson(baseline), threshold);
+    nlohmann::json list = nlohmann::json::array();
+    for (const auto& reg : regressions) {
+        list.push_back({
+            { "name", reg.name },
+            { "metric", reg.metric },
+            { "baseline", reg.baseline },
+            { "current", reg.current }
+        });
+    }
+    return bench_python::toPython(list);
+}
+%}
@@ -0,0 +1,590 @@
+%module sdrpp_dsp_blocks
+
+%{
+#include "../core/src/dsp/filter/fir.h"
+#include "../core/src/dsp/filter/decimating_fir.h"
+#include "../core/src/dsp/multirate/power_decimator.h"
+#include "../core/src/dsp/multirate/rational_resampler.h"
+#include "../core/src/dsp/demod/fm.h"
+#include "../core/src/dsp/demod/am.h"
+#include "../core/src/dsp/demod/ssb.h"
+#include "../core/src/dsp/taps/low_pass.h"
+#include "../core/src/dsp/taps/from_array.h"
+#include "common/sample_view.h"
+#include <math.h>
+#include <mutex>
+#include <vector>
+
+namespace batch {
+    // Largest number of samples handed to process() at once, the internal buffers of the blocks
+    // are STREAM_BUFFER_SIZE samples long
+    const int BLOCK_SIZE = STREAM_BUFFER_SIZE;
+
+    // Run process(count, in, out) over a whole input buffer and write the result to an output buffer
+    // of at least maxOutput(input size) samples. Returns the number of output samples.
+    // Must be called without the GIL.
+    template <class I, class O, class M, class F>
+    size_t run(PyObject* input, PyObject* output, M maxOutput, F process) {
+        Py_buffer inView, outView;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        if (!sample_view::getReadable(input, &inView, sizeof(I))) {
+            PyErr_Clear();
+            PyGILState_Release(gstate);
+            throw std::runtime_error(sizeof(I) == sizeof(float) ? "Input must be a C-contiguous float32 buffer" : "Input must be a C-contiguous complex64 buffer");
+        }
+        if (!sample_view::getWritable(output, &outView, sizeof(O))) {
+            PyErr_Clear();
+            PyBuffer_Release(&inView);
+            PyGILState_Release(gstate);
+            throw std::runtime_error(sizeof(O) == sizeof(float) ? "Output must be a writable C-contiguous float32 buffer" : "Output must be a writable C-contiguous complex64 buffer");
+        }
+        PyGILState_Release(gstate);
+
+        size_t inCount = inView.len / sizeof(I);
+        size_t outCount = 0;
+        if (outView.len / sizeof(O) >= maxOutput(inCount)) {
+            const I* in = (const I*)inView.buf;
+            O* out = (O*)outView.buf;
+            for (size_t i = 0; i < inCount; i += BLOCK_SIZE) {
+                int count = std::min<size_t>(BLOCK_SIZE, inCount - i);
+                outCount += process(count, &in[i], &out[outCount]);
+            }
+        }
+        else {
+            outCount = (size_t)-1;
+        }
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&inView);
+        PyBuffer_Release(&outView);
+        PyGILState_Release(gstate);
+
+        if (outCount == (size_t)-1) { throw std::runtime_error("Output buffer is too small, see getMaxOutputSize()"); }
+        return outCount;
+    }
+
+    const int SSB_USB = dsp::demod::SSB<float>::USB;
+    const int SSB_LSB = dsp::demod::SSB<float>::LSB;
+    const int SSB_DSB = dsp::demod::SSB<float>::DSB;
+
+    // Copy float32 taps from a Python buffer. Must be called without the GIL.
+    inline dsp::tap<float> tapsFromBuffer(PyObject* obj) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getReadable(obj, &view, sizeof(float));
+        if (!ok) { PyErr_Clear(); }
+        PyGILState_Release(gstate);
+        if (!ok) { throw std::runtime_error("Taps must be a C-contiguous float32 buffer"); }
+
+        dsp::tap<float> taps;
+        if (view.len) { taps = dsp::taps::fromArray<float>(view.len / sizeof(float), (const float*)view.buf); }
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        if (!taps.size) { throw std::runtime_error("A filter needs at least one tap"); }
+        if (taps.size > 64000) {
+            dsp::taps::free(taps);
+            throw std::runtime_error("A filter can have at most 64000 taps");
+        }
+        return taps;
+    }
+}
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in DSP block");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(FIRFilter) PythonFIRFilter;
+%rename(RealFIRFilter) PythonRealFIRFilter;
+%rename(DecimatingFIRFilter) PythonDecimatingFIRFilter;
+%rename(PowerDecimator) PythonPowerDecimator;
+%rename(RationalResampler) PythonRationalResampler;
+%rename(FMDemod) PythonFMDemod;
+%rename(AMDemod) PythonAMDemod;
+%rename(SSBDemod) PythonSSBDemod;
+%rename(_lowPassTaps) lowPassTaps;
+
+%constant int SSB_USB = batch::SSB_USB;
+%constant int SSB_LSB = batch::SSB_LSB;
+%constant int SSB_DSB = batch::SSB_DSB;
+
+// Stateful wrappers around the process() functions of the core DSP blocks, to run them offline on
+// numpy arrays. Filter, resampler and demodulator state carries over between calls, so processing
+// a recording in chunks gives the same result as processing it in one call:
+//
+//   resamp = sdrpp.RationalResampler(2.4e6, 250e3)
+//   demod = sdrpp.FMDemod(250e3, 200e3)
+//   for chunk in chunks:
+//       audio = demod(resamp(chunk))
+//
+// The exception is the AGC of the AM and SSB demodulators: when it detects clipping it looks ahead to
+// the end of the samples being processed, as it does for each block of a live stream.
+//
+// Calling a block allocates its output. process(input, output) writes to an existing buffer of at
+// least getMaxOutputSize(len(input)) samples and returns the number of samples written.
+// Inputs and outputs are complex64 unless noted, and the GIL is released while processing.
+%inline %{
+class PythonFIRFilter {
+public:
+    PythonFIRFilter(PyObject* taps) {
+        _taps = batch::tapsFromBuffer(taps);
+        fir.init(NULL, _taps);
+        fir.out.free();
+    }
+
+    ~PythonFIRFilter() { dsp::taps::free(_taps); }
+
+    void setTaps(PyObject* taps) {
+        dsp::tap<float> newTaps = batch::tapsFromBuffer(taps);
+        std::lock_guard<std::mutex> lck(mtx);
+        fir.setTaps(newTaps);
+        dsp::taps::free(_taps);
+        _taps = newTaps;
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        fir.reset();
+    }
+
+    size_t getMaxOutputSize(size_t count) { return count; }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        return batch::run<dsp::complex_t, dsp::complex_t>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const dsp::complex_t* in, dsp::complex_t* out) { return fir.process(n, in, out); });
+    }
+
+private:
+    dsp::filter::FIR<dsp::complex_t, float> fir;
+    dsp::tap<float> _taps;
+    std::mutex mtx;
+};
+
+// Same as FIRFilter for float32 samples
+class PythonRealFIRFilter {
+public:
+    PythonRealFIRFilter(PyObject* taps) {
+        _taps = batch::tapsFromBuffer(taps);
+        fir.init(NULL, _taps);
+        fir.out.free();
+    }
+
+    ~PythonRealFIRFilter() { dsp::taps::free(_taps); }
+
+    void setTaps(PyObject* taps) {
+        dsp::tap<float> newTaps = batch::tapsFromBuffer(taps);
+        std::lock_guard<std::mutex> lck(mtx);
+        fir.setTaps(newTaps);
+        dsp::taps::free(_taps);
+        _taps = newTaps;
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        fir.reset();
+    }
+
+    size_t getMaxOutputSize(size_t count) { return count; }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        return batch::run<float, float>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const float* in, float* out) { return fir.process(n, in, out); });
+    }
+
+private:
+    dsp::filter::FIR<float, float> fir;
+    dsp::tap<float> _taps;
+    std::mutex mtx;
+};
+
+class PythonDecimatingFIRFilter {
+public:
+    PythonDecimatingFIRFilter(PyObject* taps, int decimation) {
+        if (decimation < 1) { throw std::runtime_error("Decimation must be at least 1"); }
+        _taps = batch::tapsFromBuffer(taps);
+        fir.init(NULL, _taps, decimation);
+        fir.out.free();
+        _decimation = decimation;
+    }
+
+    ~PythonDecimatingFIRFilter() { dsp::taps::free(_taps); }
+
+    void setDecimation(int decimation) {
+        if (decimation < 1) { throw std::runtime_error("Decimation must be at least 1"); }
+        std::lock_guard<std::mutex> lck(mtx);
+        fir.setDecimation(decimation);
+        _decimation = decimation;
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        fir.reset();
+    }
+
+    int getDecimation() { return _decimation; }
+
+    size_t getMaxOutputSize(size_t count) { return count / _decimation + 1; }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        return batch::run<dsp::complex_t, dsp::complex_t>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const dsp::complex_t* in, dsp::complex_t* out) { return fir.process(n, in, out); });
+    }
+
+private:
+    dsp::filter::DecimatingFIR<dsp::complex_t, float> fir;
+    dsp::tap<float> _taps;
+    int _decimation;
+    std::mutex mtx;
+};
+
+// Decimation by a power of two using the optimized multistage plans of the DDC
+class PythonPowerDecimator {
+public:
+    PythonPowerDecimator(unsigned int ratio) {
+        checkRatio(ratio);
+        decim.init(NULL, ratio);
+        decim.out.free();
+        _ratio = ratio;
+        work.resize(batch::BLOCK_SIZE);
+    }
+
+    void setRatio(unsigned int ratio) {
+        checkRatio(ratio);
+        std::lock_guard<std::mutex> lck(mtx);
+        decim.setRatio(ratio);
+        _ratio = ratio;
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        decim.reset();
+    }
+
+    unsigned int getRatio() { return _ratio; }
+
+    static unsigned int getMaxRatio() { return dsp::multirate::PowerDecimator<dsp::complex_t>::getMaxRatio(); }
+
+    size_t getMaxOutputSize(size_t count) { return count / _ratio + 1; }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        // The first stages write more samples than the final output, so go through a work buffer
+        return batch::run<dsp::complex_t, dsp::complex_t>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const dsp::complex_t* in, dsp::complex_t* out) {
+                int count = decim.process(n, in, work.data());
+                memcpy(out, work.data(), count * sizeof(dsp::complex_t));
+                return count;
+            });
+    }
+
+private:
+    static void checkRatio(unsigned int ratio) {
+        if (!ratio || (ratio & (ratio - 1)) || ratio > getMaxRatio()) {
+            throw std::runtime_error("Ratio must be a power of two between 1 and getMaxRatio()");
+        }
+    }
+
+    dsp::multirate::PowerDecimator<dsp::complex_t> decim;
+    unsigned int _ratio;
+    std::vector<dsp::complex_t> work;
+    std::mutex mtx;
+};
+
+// Power decimator followed by a polyphase resampler, as used by the VFOs
+class PythonRationalResampler {
+public:
+    PythonRationalResampler(double inSamplerate, double outSamplerate) {
+        checkRates(inSamplerate, outSamplerate);
+        resamp.init(NULL, inSamplerate, outSamplerate);
+        resamp.out.free();
+        _inSamplerate = inSamplerate;
+        _outSamplerate = outSamplerate;
+        updateBlockSize();
+    }
+
+    void setRates(double inSamplerate, double outSamplerate) {
+        checkRates(inSamplerate, outSamplerate);
+        std::lock_guard<std::mutex> lck(mtx);
+        resamp.setRates(inSamplerate, outSamplerate);
+        _inSamplerate = inSamplerate;
+        _outSamplerate = outSamplerate;
+        updateBlockSize();
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        resamp.reset();
+    }
+
+    double getInSampleRate() { return _inSamplerate; }
+    double getOutSampleRate() { return _outSamplerate; }
+
+    // The resampler ratio is rounded to integer rates, allow for 0.1% of error
+    size_t getMaxOutputSize(size_t count) {
+        size_t blocks = (count + blockSize - 1) / blockSize;
+        return (size_t)ceil((double)count * (_outSamplerate / _inSamplerate) * 1.001) + blocks + 1;
+    }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        // The power decimator may write more samples than the final output, so go through a work buffer
+        return batch::run<dsp::complex_t, dsp::complex_t>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const dsp::complex_t* in, dsp::complex_t* out) {
+                int done = 0;
+                for (int i = 0; i < n; i += blockSize) {
+                    int count = resamp.process(std::min<int>(blockSize, n - i), &in[i], work.data());
+                    memcpy(&out[done], work.data(), count * sizeof(dsp::complex_t));
+                    done += count;
+                }
+                return done;
+            });
+    }
+
+private:
+    static void checkRates(double inSamplerate, double outSamplerate) {
+        if (inSamplerate <= 0.0 || outSamplerate <= 0.0) { throw std::runtime_error("Samplerates must be positive"); }
+    }
+
+    void updateBlockSize() {
+        // Keep the output of a block well within the work buffer when interpolating
+        double ratio = std::max<double>(1.0, _outSamplerate / _inSamplerate);
+        blockSize = std::max<int>(1, std::min<double>(batch::BLOCK_SIZE, batch::BLOCK_SIZE / (2.0 * ratio)));
+        work.resize(batch::BLOCK_SIZE);
+    }
+
+    dsp::multirate::RationalResampler<dsp::complex_t> resamp;
+    double _inSamplerate;
+    double _outSamplerate;
+    int blockSize;
+    std::vector<dsp::complex_t> work;
+    std::mutex mtx;
+};
+
+// Quadrature FM demodulator, complex64 in and float32 audio out
+class PythonFMDemod {
+public:
+    PythonFMDemod(double samplerate, double bandwidth, bool lowPass = true, bool highPass = false) {
+        if (samplerate <= 0.0 || bandwidth <= 0.0) { throw std::runtime_error("Samplerate and bandwidth must be positive"); }
+        demod.init(NULL, samplerate, bandwidth, lowPass, highPass);
+        demod.out.free();
+    }
+
+    void setSamplerate(double samplerate) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setSamplerate(samplerate);
+    }
+
+    void setBandwidth(double bandwidth) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setBandwidth(bandwidth);
+    }
+
+    void setLowPass(bool lowPass) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setLowPass(lowPass);
+    }
+
+    void setHighPass(bool highPass) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setHighPass(highPass);
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.reset();
+    }
+
+    size_t getMaxOutputSize(size_t count) { return count; }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        return batch::run<dsp::complex_t, float>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const dsp::complex_t* in, float* out) { return demod.process(n, (dsp::complex_t*)in, out); });
+    }
+
+private:
+    dsp::demod::FM<float> demod;
+    std::mutex mtx;
+};
+
+// AM envelope demodulator, complex64 in and float32 audio out.
+// AGC attack and decay are in the same units as the radio module (per second).
+class PythonAMDemod {
+public:
+    PythonAMDemod(double samplerate, double bandwidth, bool carrierAgc = false, double agcAttack = 50.0, double agcDecay = 5.0) {
+        if (samplerate <= 0.0 || bandwidth <= 0.0) { throw std::runtime_error("Samplerate and bandwidth must be positive"); }
+        _samplerate = samplerate;
+        demod.init(NULL, getMode(carrierAgc), bandwidth, agcAttack / samplerate, agcDecay / samplerate, 100.0 / samplerate, samplerate);
+        demod.out.free();
+    }
+
+    void setCarrierAGC(bool carrierAgc) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setAGCMode(getMode(carrierAgc));
+    }
+
+    void setBandwidth(double bandwidth) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setBandwidth(bandwidth);
+    }
+
+    void setAGCAttack(double attack) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setAGCAttack(attack / _samplerate);
+    }
+
+    void setAGCDecay(double decay) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setAGCDecay(decay / _samplerate);
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.reset();
+    }
+
+    size_t getMaxOutputSize(size_t count) { return count; }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        return batch::run<dsp::complex_t, float>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const dsp::complex_t* in, float* out) { return demod.process(n, (dsp::complex_t*)in, out); });
+    }
+
+private:
+    static dsp::demod::AM<float>::AGCMode getMode(bool carrierAgc) {
+        return carrierAgc ? dsp::demod::AM<float>::AGCMode::CARRIER : dsp::demod::AM<float>::AGCMode::AUDIO;
+    }
+
+    dsp::demod::AM<float> demod;
+    double _samplerate;
+    std::mutex mtx;
+};
+
+// SSB demodulator, complex64 in and float32 audio out. Mode is one of SSB_USB, SSB_LSB or SSB_DSB.
+// AGC attack and decay are in the same units as the radio module (per second).
+class PythonSSBDemod {
+public:
+    PythonSSBDemod(double samplerate, double bandwidth, int mode = dsp::demod::SSB<float>::USB, double agcAttack = 50.0, double agcDecay = 5.0) {
+        if (samplerate <= 0.0 || bandwidth <= 0.0) { throw std::runtime_error("Samplerate and bandwidth must be positive"); }
+        _samplerate = samplerate;
+        demod.init(NULL, checkMode(mode), bandwidth, samplerate, agcAttack / samplerate, agcDecay / samplerate);
+        demod.out.free();
+    }
+
+    void setMode(int mode) {
+        dsp::demod::SSB<float>::Mode m = checkMode(mode);
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setMode(m);
+    }
+
+    void setBandwidth(double bandwidth) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setBandwidth(bandwidth);
+    }
+
+    void setAGCAttack(double attack) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setAGCAttack(attack / _samplerate);
+    }
+
+    void setAGCDecay(double decay) {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.setAGCDecay(decay / _samplerate);
+    }
+
+    void reset() {
+        std::lock_guard<std::mutex> lck(mtx);
+        demod.reset();
+    }
+
+    size_t getMaxOutputSize(size_t count) { return count; }
+
+    size_t process(PyObject* input, PyObject* output) {
+        std::lock_guard<std::mutex> lck(mtx);
+        return batch::run<dsp::complex_t, float>(input, output,
+            [this](size_t n) { return getMaxOutputSize(n); },
+            [this](int n, const dsp::complex_t* in, float* out) { return demod.process(n, in, out); });
+    }
+
+private:
+    static dsp::demod::SSB<float>::Mode checkMode(int mode) {
+        if (mode < dsp::demod::SSB<float>::USB || mode > dsp::demod::SSB<float>::DSB) { throw std::runtime_error("Invalid SSB mode"); }
+        return (dsp::demod::SSB<float>::Mode)mode;
+    }
+
+    dsp::demod::SSB<float> demod;
+    double _samplerate;
+    std::mutex mtx;
+};
+
+// Low pass taps for FIRFilter as float32 bytes, wrapped into an array by lowPassTaps() below
+PyObject* lowPassTaps(double cutoff, double transWidth, double samplerate) {
+    if (cutoff <= 0.0 || transWidth <= 0.0 || samplerate <= 0.0) { throw std::runtime_error("Invalid filter parameters"); }
+    dsp::tap<float> taps = dsp::taps::lowPass(cutoff, transWidth, samplerate);
+    PyGILState_STATE gstate = PyGILState_Ensure();
+    PyObject* bytes = sample_view::makeCopy(taps.taps, taps.size * sizeof(float));
+    PyGILState_Release(gstate);
+    dsp::taps::free(taps);
+    return bytes;
+}
+%}
+
+%pythoncode %{
+def _batchCall(block, samples, inType, outType):
+    import numpy as np
+    samples = np.ascontiguousarray(samples, dtype=inType)
+    out = np.empty(block.getMaxOutputSize(len(samples)), dtype=outType)
+    return out[:block.process(samples, out)]
+
+
+def lowPassTaps(cutoff, transWidth, samplerate):
+    """Windowed sinc low pass taps, as a float32 numpy array"""
+    import numpy as np
+    return np.frombuffer(_lowPassTaps(cutoff, transWidth, samplerate), dtype=np.float32)
+%}
+
+%define BATCH_CALL(cls, inType, outType)
+%extend cls {
+%pythoncode %{
+    def __call__(self, samples):
+        return _batchCall(self, samples, inType, outType)
+%}
+}
+%enddef
+
+BATCH_CALL(PythonFIRFilter, "complex64", "complex64")
+BATCH_CALL(PythonRealFIRFilter, "float32", "float32")
+BATCH_CALL(PythonDecimatingFIRFilter, "complex64", "complex64")
+BATCH_CALL(PythonPowerDecimator, "complex64", "complex64")
+BATCH_CALL(PythonRationalResampler, "complex64", "complex64")
+BATCH_CALL(PythonFMDemod, "complex64", "float32")
+BATCH_CALL(PythonAMDemod, "complex64", "float32")
+BATCH_CALL(PythonSSBDemod, "complex64", "float32")
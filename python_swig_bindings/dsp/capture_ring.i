@@ -0,0 +1,182 @@
+%module sdrpp_dsp_capture_ring
+
+%{
+#include "../core/src/dsp/sink/capture_ring.h"
+#include "../core/src/signal_path/signal_path.h"
+#include "../core/src/utils/ciq.h"
+#include "common/pcm_format.h"
+#include "common/sample_view.h"
+#include <math.h>
+#include <filesystem>
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in capture ring");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(CaptureRing) PythonCaptureRing;
+%rename(_snapshot) PythonCaptureRing::snapshot;
+%rename(snapshot_to_file) PythonCaptureRing::snapshotToFile;
+%feature("compactdefaultargs") PythonCaptureRing::snapshotToFile;
+%feature("kwargs") PythonCaptureRing::snapshotToFile;
+
+// Pre-trigger capture: the last 'seconds' of IQ of the front end (or of any stream, eg. a VFO) are
+// kept in a preallocated ring, and any time range still in it can be extracted afterwards. Times
+// are in seconds since the unix epoch, like time.time():
+//
+//   ring = sdrpp.CaptureRing(10.0)
+//   ring.start()
+//   ...
+//   t = time.time()
+//   iq = ring.snapshot(t - 2.0, t + 3.0)           # Waits until t + 3.0 was received
+//   ring.snapshot_to_file("event.ciq", t - 2.0, t + 3.0, "i16")
+//
+// Snapshots don't stop the capture and any number of them can run at once from several threads,
+// they all read the same ring.
+%inline %{
+class PythonCaptureRing {
+public:
+    // Without a stream, the IQ of the front end is captured at its current samplerate
+    PythonCaptureRing(double seconds, double samplerate = 0.0, dsp::stream<dsp::complex_t>* stream = NULL) {
+        frontEnd = !stream;
+        if (frontEnd && samplerate <= 0.0) { samplerate = sigpath::iqFrontEnd.getEffectiveSamplerate(); }
+        if (samplerate <= 0.0) { throw std::runtime_error("The samplerate must be positive"); }
+        if (seconds <= 0.0) { throw std::runtime_error("The capture must last more than 0 seconds"); }
+        sink.init(frontEnd ? &iqStream : stream, samplerate, (uint64_t)ceil(seconds * samplerate));
+    }
+
+    ~PythonCaptureRing() {
+        close();
+        stop();
+    }
+
+    void start() {
+        if (running) { return; }
+        if (frontEnd) {
+            sink.setSamplerate(sigpath::iqFrontEnd.getEffectiveSamplerate());
+            sigpath::iqFrontEnd.bindIQStream(&iqStream);
+        }
+        sink.start();
+        running = true;
+    }
+
+    void stop() {
+        if (!running) { return; }
+        if (frontEnd) { sigpath::iqFrontEnd.unbindIQStream(&iqStream); }
+        sink.stop();
+        running = false;
+    }
+
+    // Make the pending snapshots return what's in the ring instead of waiting for the end of their range
+    void close() { sink.close(); }
+
+    // Samplerate of the samples captured from now on
+    void setSamplerate(double samplerate) {
+        if (samplerate <= 0.0) { throw std::runtime_error("The samplerate must be positive"); }
+        sink.setSamplerate(samplerate);
+    }
+
+    // Frequency recorded in the files written from now on
+    void setFrequency(double frequency) { this->frequency = frequency; }
+
+    double getSamplerate() { return sink.getSamplerate(); }
+    double getFrequency() { return frequency; }
+    unsigned long long getCapacity() { return sink.getCapacity(); }
+    unsigned long long getWrittenSamples() { return sink.getWrittenSamples(); }
+
+    // Time of the oldest sample in the ring and of the end of the ring, in seconds since the unix epoch (0 if empty)
+    double getStartTime() { return (double)sink.getStartTime() / 1e9; }
+    double getEndTime() { return (double)sink.getEndTime() / 1e9; }
+
+    // Samples between t0 and t1 as (bytearray, number of invalid samples at its start), waiting at most
+    // timeoutMs for t1 to be received (forever if negative)
+    PyObject* snapshot(double t0, double t1, double timeoutMs = -1.0) {
+        dsp::sink::CaptureRing::Range range;
+        if (!sink.find(toNs(t0), toNs(t1), timeoutMs, range)) { range.count = 0; }
+
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        PyObject* data = PyByteArray_FromStringAndSize(NULL, range.count * sizeof(dsp::complex_t));
+        if (!data) { PyErr_Clear(); }
+        PyGILState_Release(gstate);
+        if (!data) { throw std::runtime_error("Could not allocate the snapshot"); }
+
+        // Copy without the GIL, nothing else can see the bytearray yet
+        uint64_t invalid = range.count ? sink.copy(range, (dsp::complex_t*)PyByteArray_AS_STRING(data)) : 0;
+
+        gstate = PyGILState_Ensure();
+        PyObject* res = Py_BuildValue("(NK)", data, (unsigned long long)invalid);
+        PyGILState_Release(gstate);
+        return res;
+    }
+
+    // Write the samples between t0 and t1 to a chunked IQ recording (see CIQWriter) straight from the
+    // ring, waiting at most timeoutMs for t1 to be received. Returns the number of samples written.
+    // If the start of the range was overwritten while it was written, the file is deleted and an error is raised.
+    unsigned long long snapshotToFile(const std::string& path, double t0, double t1, const std::string& format = "i16", double timeoutMs = -1.0) {
+        dsp::compression::PCMType type = pcmTypeFromName(format);
+        dsp::sink::CaptureRing::Range range;
+        if (!sink.find(toNs(t0), toNs(t1), timeoutMs, range)) { range.count = 0; }
+
+        ciq::Writer writer(sink.getSamplerate(), type);
+        writer.setFrequency(frequency);
+        if (!writer.open(path, range.count ? range.startTime : toNs(t0))) { throw std::runtime_error("Could not open file for recording"); }
+        uint64_t invalid = sink.read(range, [&writer](const dsp::complex_t* samples, int count) { writer.write(samples, count); });
+        writer.close();
+
+        if (invalid) {
+            std::error_code ec;
+            std::filesystem::remove(path, ec);
+            throw std::runtime_error("The start of the range was overwritten while it was written, the capture is too short for it");
+        }
+        return writer.getSamplesWritten();
+    }
+
+private:
+    static int64_t toNs(double t) {
+        return (int64_t)llround(t * 1e9);
+    }
+
+    dsp::stream<dsp::complex_t> iqStream;
+    dsp::sink::CaptureRing sink;
+    std::atomic<double> frequency = 0.0;
+    bool frontEnd;
+    bool running = false;
+};
+%}
+
+%extend PythonCaptureRing {
+%pythoncode %{
+    def snapshot(self, t0, t1, timeoutMs=-1.0):
+        """Samples received between t0 and t1 (seconds since the unix epoch) as a complex64 numpy array
+
+        Waits at most timeoutMs for t1 to be received (forever if negative, or until close()).
+        The range is clamped to the samples still in the ring, so the array may be shorter than
+        requested, or empty.
+        """
+        import numpy as np
+        data, invalid = self._snapshot(t0, t1, timeoutMs)
+        return np.frombuffer(data, dtype=np.complex64)[invalid:]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+%}
+}
@@ -0,0 +1,153 @@
+%module sdrpp_dsp_channelizer
+
+%{
+#include "../core/src/signal_path/signal_path.h"
+#include "../core/src/dsp/channel/pfb_channelizer.h"
+#include "../core/src/dsp/channel/rx_vfo.h"
+#include <chrono>
+#include <random>
+#include <vector>
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in channelizer");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+// Polyphase filter bank channelizer attached to the IQ front end.
+// All channels are produced by a single polyphase filter and FFT pass instead of one
+// xlator/resampler/filter chain per VFO. Channel streams are the same kind of stream as
+// VFO outputs and can be used with StreamReader, connectArray() or aiter_stream():
+//
+//   chan = sdrpp.ChannelizerHelper("scanner", 64)
+//   chan.enableChannel(5)
+//   async for block in sdrpp.aiter_stream(chan.getChannelStream(5)): ...
+//
+// Only enabled channels are written, and every enabled channel must be consumed.
+%inline %{
+class ChannelizerHelper {
+public:
+    ChannelizerHelper(const std::string& name, int channelCount, int tapsPerChannel = 16) : name(name) {
+        if (channelCount < 2) { throw std::runtime_error("A channelizer needs at least 2 channels"); }
+        if (tapsPerChannel < 1) { throw std::runtime_error("A channelizer needs at least 1 tap per channel"); }
+        chan = sigpath::iqFrontEnd.addChannelizer(name, channelCount, tapsPerChannel);
+        if (!chan) { throw std::runtime_error("A channelizer with this name already exists"); }
+    }
+
+    ~ChannelizerHelper() {
+        sigpath::iqFrontEnd.removeChannelizer(name);
+    }
+
+    int getChannelCount() { return chan->getChannelCount(); }
+
+    void enableChannel(int channel) {
+        checkChannel(channel);
+        chan->setChannelEnabled(channel, true);
+    }
+
+    void disableChannel(int channel) {
+        checkChannel(channel);
+        chan->setChannelEnabled(channel, false);
+    }
+
+    bool isChannelEnabled(int channel) { return chan->isChannelEnabled(channel); }
+
+    dsp::stream<dsp::complex_t>* getChannelStream(int channel) {
+        checkChannel(channel);
+        return &chan->out[channel];
+    }
+
+    // Offset of the channel center from the tuned frequency, in Hz
+    double getChannelOffset(int channel) {
+        checkChannel(channel);
+        return chan->getChannelOffset(channel) * sigpath::iqFrontEnd.getEffectiveSamplerate();
+    }
+
+    double getChannelSampleRate() {
+        return sigpath::iqFrontEnd.getEffectiveSamplerate() / (double)chan->getChannelCount();
+    }
+
+private:
+    void checkChannel(int channel) {
+        if (channel < 0 || channel >= chan->getChannelCount()) { throw std::runtime_error("Invalid channel"); }
+    }
+
+    std::string name;
+    dsp::channel::PFBChannelizer* chan;
+};
+
+struct ChannelizerBenchmark {
+    int channels;
+    double sampleRate;
+    long long samples;
+    double vfoSeconds;
+    double pfbSeconds;
+    double vfoSamplesPerSecond;
+    double pfbSamplesPerSecond;
+    double speedup;
+};
+
+// Push the same random input through one RxVFO per channel and through a PFBChannelizer,
+// by calling their process() functions directly, and time both paths.
+ChannelizerBenchmark benchmarkChannelizer(int channels, double sampleRate = 2.4e6, int blockSize = 65536, int iterations = 50, int tapsPerChannel = 16) {
+    if (channels < 2 || blockSize < 1 || iterations < 1) { throw std::runtime_error("Invalid benchmark parameters"); }
+
+    std::vector<dsp::complex_t> in(blockSize);
+    std::vector<dsp::complex_t> out(blockSize);
+    std::mt19937 rng(0);
+    std::normal_distribution<float> dist;
+    for (auto& s : in) { s = { dist(rng), dist(rng) }; }
+
+    ChannelizerBenchmark res;
+    res.channels = channels;
+    res.sampleRate = sampleRate;
+    res.samples = (long long)blockSize * iterations;
+    double chanSr = sampleRate / (double)channels;
+
+    // Per-VFO path
+    {
+        std::vector<dsp::channel::RxVFO*> vfos;
+        for (int c = 0; c < channels; c++) {
+            int k = (c > channels / 2) ? (c - channels) : c;
+            vfos.push_back(new dsp::channel::RxVFO(NULL, sampleRate, chanSr, chanSr, (double)k * chanSr));
+        }
+        auto start = std::chrono::high_resolution_clock::now();
+        for (int i = 0; i < iterations; i++) {
+            for (auto& vfo : vfos) { vfo->process(blockSize, in.data(), out.data()); }
+        }
+        res.vfoSeconds = std::chrono::duration<double>(std::chrono::high_resolution_clock::now() - start).count();
+        for (auto& vfo : vfos) { delete vfo; }
+    }
+
+    // Channelizer path, with every channel written out
+    {
+        dsp::channel::PFBChannelizer pfb(NULL, channels, tapsPerChannel);
+        std::vector<std::vector<dsp::complex_t>> chanOut(channels, std::vector<dsp::complex_t>(blockSize / channels + 1));
+        std::vector<dsp::complex_t*> outs;
+        for (auto& o : chanOut) { outs.push_back(o.data()); }
+        auto start = std::chrono::high_resolution_clock::now();
+        for (int i = 0; i < iterations; i++) {
+            pfb.process(blockSize, in.data(), outs.data());
+        }
+        res.pfbSeconds = std::chrono::duration<double>(std::chrono::high_resolution_clock::now() - start).count();
+    }
+
+    res.vfoSamplesPerSecond = (double)res.samples / res.vfoSeconds;
+    res.pfbSamplesPerSecond = (double)res.samples / res.pfbSeconds;
+    res.speedup = res.vfoSeconds / res.pfbSeconds;
+    return res;
+}
+%}
@@ -0,0 +1,185 @@
+%module sdrpp_dsp_detection_tap
+
+%{
+#include "../core/src/signal_path/signal_path.h"
+#include "common/detection_tap.h"
+#include "common/sample_view.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+%include "std_vector.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in CFAR detector");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(CFARDetector) PythonCFARDetector;
+%feature("compactdefaultargs") PythonCFARDetector::PythonCFARDetector;
+%feature("kwargs") PythonCFARDetector::PythonCFARDetector;
+%newobject PythonCFARDetector::read;
+%newobject PythonCFARDetector::process;
+
+// The queued detections, a few structs per frame instead of the whole spectrum
+%ignore DetectionTap;
+%include "../common/detection_tap.h"
+
+%template(CFARDetectionVector) std::vector<CFARDetection>;
+
+// CFAR detector running on the FFT frames of the IQ front end, on the FFT thread. Only the
+// detections of each frame reach Python, with their frequency, bandwidth and SNR:
+//
+//   det = sdrpp.CFARDetector("os", guard=4, training=32, threshold=12.0, average=4)
+//   det.start()
+//   frame = det.read(1000.0)
+//   for d in frame:
+//       print(d.frequency, d.bandwidth, d.snr)
+//
+// Modes are "ca" (cell averaging) and "os" (ordered statistic, the training cell at 'rank').
+// Frequencies follow the retunes of the source manager, setCenterFrequency() gives the initial one.
+%inline %{
+class PythonCFARDetector {
+public:
+    PythonCFARDetector(const std::string& mode = "ca", int guard = 2, int training = 16, float threshold = 10.0f, float rank = 0.75f,
+                       int mergeGap = 1, int minBins = 1, double rate = 0.0, int average = 1, int maxQueued = 16) :
+        tap(&sigpath::iqFrontEnd, &sigpath::sourceManager, rate, average, maxQueued) {
+        setMode(mode);
+        setWindow(guard, training);
+        setThreshold(threshold);
+        setRank(rank);
+        setMerge(mergeGap, minBins);
+    }
+
+    void start() { tap.start(); }
+    void stop() { tap.stop(); }
+    void close() { tap.close(); }
+
+    void setMode(const std::string& mode) {
+        dsp::detector::CFAR::Mode m;
+        if (mode == "ca") {
+            m = dsp::detector::CFAR::CELL_AVERAGING;
+        }
+        else if (mode == "os") {
+            m = dsp::detector::CFAR::ORDERED_STATISTIC;
+        }
+        else {
+            throw std::runtime_error("Unknown CFAR mode '" + mode + "', must be 'ca' or 'os'");
+        }
+        tap.configure([m](dsp::detector::CFAR& cfar) { cfar.setMode(m); });
+    }
+
+    // Guard and training cells on each side of the bin under test
+    void setWindow(int guard, int training) {
+        if (guard < 0 || training < 1) { throw std::runtime_error("The guard must not be negative and at least one training cell is needed"); }
+        tap.configure([=](dsp::detector::CFAR& cfar) { cfar.setWindow(guard, training); });
+    }
+
+    // Margin over the noise estimate in dB
+    void setThreshold(float threshold) {
+        tap.configure([=](dsp::detector::CFAR& cfar) { cfar.setThreshold(threshold); });
+    }
+
+    // Rank of the training cell used as noise estimate in "os" mode, from 0 (lowest) to 1 (highest)
+    void setRank(float rank) {
+        if (rank < 0.0f || rank > 1.0f) { throw std::runtime_error("The rank must be between 0 and 1"); }
+        tap.configure([=](dsp::detector::CFAR& cfar) { cfar.setRank(rank); });
+    }
+
+    // Merge detections separated by at most mergeGap bins, drop those narrower than minBins
+    void setMerge(int mergeGap, int minBins) {
+        if (mergeGap < 0 || minBins < 1) { throw std::runtime_error("The merge gap must not be negative and minBins must be at least 1"); }
+        tap.configure([=](dsp::detector::CFAR& cfar) { cfar.setMerge(mergeGap, minBins); });
+    }
+
+    void setRate(double rate) { tap.setRate(rate); }
+    void setAverage(int average) { tap.setAverage(average); }
+    void setCenterFrequency(double frequency) { tap.setCenterFrequency(frequency); }
+    double getCenterFrequency() { return tap.getCenterFrequency(); }
+
+    // Notify an event loop through the given wakeup when detections are available (None to disable).
+    // The wakeup must outlive the detector or be removed first.
+    void setWakeup(Wakeup* wakeup) { tap.setWakeup(wakeup); }
+
+    // Detections of the next processed frame, waiting at most timeoutMs for one (forever if negative).
+    // Returns None on timeout, raises once the detector is closed.
+    CFARFrame* read(double timeoutMs = -1.0) {
+        CFARFrame* frame = new CFARFrame();
+        try {
+            if (tap.read(*frame, timeoutMs)) { return frame; }
+        }
+        catch (...) {
+            delete frame;
+            throw;
+        }
+        delete frame;
+        return NULL;
+    }
+
+    // Run the detector on a float32 dB frame (DC in the middle, like FFTTap) given by the caller
+    CFARFrame* process(PyObject* buffer, double samplerate, double centerFrequency = 0.0) {
+        if (samplerate <= 0.0) { throw std::runtime_error("The samplerate must be positive"); }
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getReadable(buffer, &view, sizeof(float));
+        if (!ok) { PyErr_Clear(); }
+        PyGILState_Release(gstate);
+        if (!ok) { throw std::runtime_error("process() requires a C-contiguous float32 buffer"); }
+
+        CFARFrame* frame = new CFARFrame();
+        frame->index = processed++;
+        tap.process((const float*)view.buf, view.len / sizeof(float), samplerate, centerFrequency, *frame);
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return frame;
+    }
+
+    int getQueued() { return tap.getQueued(); }
+    unsigned long long getDroppedFrames() { return tap.getDroppedFrames(); }
+    unsigned long long getWrittenFrames() { return tap.getWrittenFrames(); }
+    unsigned long long getReadFrames() { return tap.getReadFrames(); }
+    void resetCounters() { tap.resetCounters(); }
+
+private:
+    DetectionTap tap;
+    unsigned long long processed = 0;
+};
+%}
+
+%extend CFARFrame {
+%pythoncode %{
+    def __len__(self):
+        return len(self.detections)
+
+    def __iter__(self):
+        return iter(self.detections)
+
+    def __getitem__(self, i):
+        return self.detections[i]
+%}
+}
+
+%extend PythonCFARDetector {
+%pythoncode %{
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+%}
+}
@@ -0,0 +1,97 @@
+%module sdrpp_dsp_fft_tap
+
+%{
+#include "../core/src/signal_path/signal_path.h"
+#include "common/fft_tap.h"
+#include "common/sample_view.h"
+%}
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in FFT tap");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(FFTTap) PythonFFTTap;
+%rename(read_into) PythonFFTTap::readInto;
+
+// Power spectrum frames computed by the IQ front end for the waterfall, delivered as float32 dB
+// arrays with DC in the middle. No FFT is computed on the Python side, frames are averaged (in linear
+// power) and rate limited on the FFT thread before being queued.
+//
+//   tap = sdrpp.FFTTap(rate=5.0, average=4)
+//   tap.start()
+//   frame = np.empty(tap.getFFTSize(), dtype=np.float32)
+//   n = tap.read_into(frame, 1000.0)
+//
+// The delivered rate can't exceed the front end's FFT rate (see IQFrontEnd::setFFTRate()).
+%inline %{
+class PythonFFTTap {
+public:
+    PythonFFTTap(double rate = 0.0, int average = 1, int maxQueued = 16) : tap(&sigpath::iqFrontEnd, rate, average, maxQueued) {}
+
+    void start() { tap.start(); }
+    void stop() { tap.stop(); }
+    void close() { tap.close(); }
+
+    void setRate(double rate) { tap.setRate(rate); }
+    void setAverage(int average) { tap.setAverage(average); }
+
+    // Notify an event loop through the given wakeup when a frame is available (None to disable).
+    // The wakeup must outlive the tap or be removed first.
+    void setWakeup(Wakeup* wakeup) { tap.setWakeup(wakeup); }
+
+    // Read the next frame into a writable float32 buffer of at least getFFTSize() elements.
+    // Waits at most timeoutMs for a frame (forever if negative). Returns the number of bins,
+    // 0 on timeout and -1 once the tap is closed.
+    int readInto(PyObject* buffer, double timeoutMs = -1.0) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getWritable(buffer, &view, sizeof(float));
+        PyGILState_Release(gstate);
+        if (!ok) {
+            gstate = PyGILState_Ensure();
+            PyErr_Clear();
+            PyGILState_Release(gstate);
+            throw std::runtime_error("read_into() requires a writable C-contiguous float32 buffer");
+        }
+
+        // Wait and copy without holding the GIL
+        int count;
+        try {
+            count = tap.read((float*)view.buf, view.len / sizeof(float), timeoutMs);
+        }
+        catch (...) {
+            gstate = PyGILState_Ensure();
+            PyBuffer_Release(&view);
+            PyGILState_Release(gstate);
+            throw;
+        }
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return count;
+    }
+
+    int getFFTSize() { return tap.getFFTSize(); }
+    int getQueued() { return tap.getQueued(); }
+    unsigned long long getDroppedFrames() { return tap.getDroppedFrames(); }
+    unsigned long long getWrittenFrames() { return tap.getWrittenFrames(); }
+    unsigned long long getReadFrames() { return tap.getReadFrames(); }
+    void resetCounters() { tap.resetCounters(); }
+
+private:
+    FFTTap tap;
+};
+%}
@@ -0,0 +1,197 @@
+%module sdrpp_dsp_file_source
+
+%{
+#include "../core/src/dsp/source/file_source.h"
+#include "../core/src/signal_path/signal_path.h"
+#include "../core/src/core.h"
+#include "../core/src/utils/wav.h"
+#include "common/sample_view.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in file source");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(FileSource) PythonFileSource;
+%rename(WavReader) PythonWavReader;
+%rename(read_into) PythonWavReader::readInto;
+
+// Replay of a WAV IQ recording, without any hardware. The file is memory mapped and either paced
+// at its samplerate or read as fast as the consumers of the stream can keep up:
+//
+//   src = sdrpp.FileSource("capture_100000000Hz.wav", realtime=False)
+//   reader = sdrpp.StreamReader(src.getStream())
+//   reader.start()
+//   src.start()
+//
+// To run the whole pipeline (IQ front end, VFOs, FFT), register it with the source manager and
+// select it from a headless Runtime:
+//
+//   src.registerSource("Replay")
+//   rt.selectSource("Replay")
+//   rt.start()
+%inline %{
+class PythonFileSource {
+public:
+    PythonFileSource(const std::string& path, bool realtime = true, bool loop = false) {
+        source.init(path, realtime, loop);
+        handler.ctx = this;
+        handler.menuHandler = menuHandler;
+        handler.selectHandler = selectHandler;
+        handler.deselectHandler = deselectHandler;
+        handler.startHandler = startHandler;
+        handler.stopHandler = stopHandler;
+        handler.tuneHandler = tuneHandler;
+        handler.stream = &source.out;
+    }
+
+    ~PythonFileSource() {
+        unregisterSource();
+        source.stop();
+    }
+
+    void start() { source.start(); }
+    void stop() { source.stop(); }
+
+    // Open another recording and go back to its start
+    void open(const std::string& path) { source.open(path); }
+
+    void seek(size_t sample) { source.seek(sample); }
+    void setRealtime(bool realtime) { source.setRealtime(realtime); }
+    void setLoop(bool loop) { source.setLoop(loop); }
+
+    // Wait for the end of the file, at most timeoutMs (forever if negative). Returns False on timeout.
+    bool waitFinished(double timeoutMs = -1.0) { return source.waitFinished(timeoutMs); }
+
+    bool isFinished() { return source.isFinished(); }
+    bool isRealtime() { return source.isRealtime(); }
+    bool isLooping() { return source.isLooping(); }
+    double getSampleRate() { return source.getSamplerate(); }
+    size_t getSampleCount() { return source.getSampleCount(); }
+    size_t getPosition() { return source.getPosition(); }
+    uint64_t getSamplesWritten() { return source.getSamplesWritten(); }
+    void resetCounters() { source.resetCounters(); }
+
+    dsp::stream<dsp::complex_t>* getStream() { return &source.out; }
+
+    // Make the recording available to the source manager under the given name
+    void registerSource(const std::string& name = "File") {
+        if (!registeredName.empty()) { throw std::runtime_error("Source is already registered"); }
+        sigpath::sourceManager.registerSource(name, &handler);
+        registeredName = name;
+    }
+
+    void unregisterSource() {
+        if (registeredName.empty()) { return; }
+        sigpath::sourceManager.unregisterSource(registeredName);
+        registeredName.clear();
+    }
+
+private:
+    static void menuHandler(void* ctx) {}
+
+    static void selectHandler(void* ctx) {
+        PythonFileSource* _this = (PythonFileSource*)ctx;
+        core::setInputSampleRate(_this->source.getSamplerate());
+    }
+
+    static void deselectHandler(void* ctx) {}
+
+    static void startHandler(void* ctx) {
+        PythonFileSource* _this = (PythonFileSource*)ctx;
+        _this->source.start();
+    }
+
+    static void stopHandler(void* ctx) {
+        PythonFileSource* _this = (PythonFileSource*)ctx;
+        _this->source.stop();
+    }
+
+    static void tuneHandler(double freq, void* ctx) {}
+
+    dsp::source::File source;
+    SourceManager::SourceHandler handler;
+    std::string registeredName;
+};
+%}
+
+// Random access to the samples of a WAV IQ recording, the same files as FileSource reads. Used for
+// offline processing, eg. by sdrpp.batch:
+//
+//   wav = sdrpp.WavReader("capture_100000000Hz.wav")
+//   iq = wav.read(1000000, 65536)
+%inline %{
+class PythonWavReader {
+public:
+    PythonWavReader(const std::string& path) {
+        if (!reader.open(path)) { throw std::runtime_error("Could not open WAV file"); }
+        if (reader.getChannels() != 2) {
+            reader.close();
+            throw std::runtime_error("WAV file is not an IQ recording (must have two channels)");
+        }
+    }
+
+    void close() { reader.close(); }
+    bool isOpen() { return reader.isOpen(); }
+
+    double getSampleRate() { return reader.getSamplerate(); }
+    size_t getSampleCount() { return reader.getSampleCount(); }
+
+    // Convert the samples from sample offset to fill a writable complex64 buffer (eg. a numpy array).
+    // Returns the number of samples read, less than len(buffer) at the end of the file.
+    size_t readInto(PyObject* buffer, size_t offset) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getWritable(buffer, &view, sizeof(dsp::complex_t));
+        if (!ok) { PyErr_Clear(); }
+        PyGILState_Release(gstate);
+        if (!ok) { throw std::runtime_error("read_into() requires a writable C-contiguous complex64 buffer"); }
+
+        // Convert without holding the GIL
+        size_t count = reader.isOpen() ? reader.read((float*)view.buf, offset, view.len / sizeof(dsp::complex_t)) : 0;
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return count;
+    }
+
+private:
+    wav::Reader reader;
+};
+%}
+
+%extend PythonWavReader {
+%pythoncode %{
+    def read(self, offset, count):
+        """Up to count samples from sample offset, as a complex64 numpy array"""
+        import numpy as np
+        out = np.empty(max(0, min(count, self.getSampleCount() - offset)), dtype=np.complex64)
+        return out[:self.read_into(out, offset)]
+
+    def __len__(self):
+        return self.getSampleCount()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+%}
+}
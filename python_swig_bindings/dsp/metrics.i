@@ -0,0 +1,136 @@
+%module sdrpp_metrics
+
+%{
+#include "../core/src/dsp/metrics.h"
+#include "../core/src/dsp/buffer/pool.h"
+#include "common/json_python.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in metrics");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+// Counters of all DSP streams and blocks of the process. Streams and blocks show up once they
+// have been used and disappear when they're destroyed. Counts and durations are totals since they
+// showed up (or since the last resetMetrics()), durations are in seconds.
+%inline %{
+// Dict with the monotonic "time" of the snapshot and lists of "streams" and "blocks"
+PyObject* metricsSnapshot() {
+    dsp::metrics::Snapshot snap = dsp::metrics::snapshot();
+
+    nlohmann::json streams = nlohmann::json::array();
+    for (const auto& s : snap.streams) {
+        streams.push_back({
+            { "id", s.id },
+            { "name", s.name },
+            { "type", s.type },
+            { "uptime", s.uptime },
+            { "buffers", s.buffers },
+            { "samples", s.samples },
+            { "swap_wait", s.swapWait },
+            { "swap_wait_max", s.swapWaitMax },
+            { "swap_waiting", s.swapWaiting },
+            { "read_wait", s.readWait },
+            { "read_wait_max", s.readWaitMax },
+            { "read_waiting", s.readWaiting },
+            { "buffer_bytes", s.bufferBytes }
+        });
+    }
+
+    nlohmann::json blocks = nlohmann::json::array();
+    for (const auto& b : snap.blocks) {
+        blocks.push_back({
+            { "id", b.id },
+            { "name", b.name },
+            { "type", b.type },
+            { "uptime", b.uptime },
+            { "runs", b.runs },
+            { "samples", b.samples },
+            { "busy", b.busy },
+            { "busy_max", b.busyMax },
+            { "wait", b.wait },
+            { "inputs", b.inputs },
+            { "outputs", b.outputs },
+            { "buffer_bytes", b.bufferBytes }
+        });
+    }
+
+    nlohmann::json result = {
+        { "time", snap.time },
+        { "streams", streams },
+        { "blocks", blocks }
+    };
+
+    PyGILState_STATE gstate = PyGILState_Ensure();
+    PyObject* obj = json_python::toPython(result);
+    PyGILState_Release(gstate);
+    return obj;
+}
+
+// Snapshot in the Prometheus text exposition format
+std::string metricsPrometheus() {
+    return dsp::metrics::prometheus(dsp::metrics::snapshot());
+}
+
+void resetMetrics() {
+    dsp::metrics::reset();
+}
+
+// Dict with the sizes in bytes of the buffers of the shared stream buffer pool: "in_use", "cached",
+// "peak_in_use", "cache_limit", the "hits" and "misses" of the cache and the "size_classes" in use
+PyObject* bufferPoolStats() {
+    dsp::buffer::pool::Stats stats = dsp::buffer::pool::getStats();
+
+    nlohmann::json classes = nlohmann::json::array();
+    for (const auto& c : stats.classes) {
+        classes.push_back({
+            { "size", c.size },
+            { "in_use", c.inUse },
+            { "cached", c.cached }
+        });
+    }
+
+    nlohmann::json result = {
+        { "in_use", stats.inUseBytes },
+        { "cached", stats.cachedBytes },
+        { "peak_in_use", stats.peakInUseBytes },
+        { "cache_limit", stats.cacheLimit },
+        { "hits", stats.hits },
+        { "misses", stats.misses },
+        { "size_classes", classes }
+    };
+
+    PyGILState_STATE gstate = PyGILState_Ensure();
+    PyObject* obj = json_python::toPython(result);
+    PyGILState_Release(gstate);
+    return obj;
+}
+
+// Maximum total size of the buffers kept for reuse after their stream is destroyed or resized
+void setBufferPoolCacheLimit(unsigned long long bytes) {
+    dsp::buffer::pool::setCacheLimit(bytes);
+}
+
+unsigned long long getBufferPoolCacheLimit() {
+    return dsp::buffer::pool::getCacheLimit();
+}
+
+// Free the buffers kept for reuse
+void trimBufferPool() {
+    dsp::buffer::pool::trim();
+}
+%}
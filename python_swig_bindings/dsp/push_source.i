@@ -0,0 +1,181 @@
+%module sdrpp_dsp_push_source
+
+%{
+#include "../core/src/dsp/source/push_source.h"
+#include "../core/src/signal_path/signal_path.h"
+#include "../core/src/core.h"
+#include "common/sample_view.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in push source");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(PushSource) PythonPushSource;
+%rename(_push) PythonPushSource::push;
+
+// Source fed with complex64 numpy arrays from Python, eg. from another capture stack or synthetic
+// test vectors. The samples are copied once into the stream buffer, without holding the GIL:
+//
+//   src = sdrpp.PushSource(2.4e6)
+//   src.registerSource("Python")
+//   rt.selectSource("Python")
+//   rt.start()
+//   src.push(samples)
+//
+// In blocking mode push() waits for the signal path to take the samples (back-pressure). In
+// non-blocking mode it returns as soon as the signal path is busy, and returns how many samples
+// were taken, the others are counted as dropped.
+%inline %{
+class PythonPushSource {
+public:
+    PythonPushSource(double samplerate, bool blocking = true, int blockSize = 0) {
+        if (samplerate <= 0.0) { throw std::runtime_error("The samplerate must be positive"); }
+        this->samplerate = samplerate;
+        source.init(blocking, blockSize);
+        handler.ctx = this;
+        handler.menuHandler = menuHandler;
+        handler.selectHandler = selectHandler;
+        handler.deselectHandler = deselectHandler;
+        handler.startHandler = startHandler;
+        handler.stopHandler = stopHandler;
+        handler.tuneHandler = tuneHandler;
+        handler.stream = &source.out;
+    }
+
+    ~PythonPushSource() {
+        unregisterSource();
+        source.stop();
+    }
+
+    void start() { source.start(); }
+    void stop() { source.stop(); }
+
+    // Write samples from a C-contiguous complex64 buffer, returns the number of samples written
+    size_t push(PyObject* buffer) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getReadable(buffer, &view, sizeof(dsp::complex_t));
+        if (!ok) { PyErr_Clear(); }
+        PyGILState_Release(gstate);
+        if (!ok) { throw std::runtime_error("push() requires a C-contiguous complex64 buffer"); }
+
+        size_t written = source.push((const dsp::complex_t*)view.buf, view.len / sizeof(dsp::complex_t));
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return written;
+    }
+
+    void setBlocking(bool blocking) { source.setBlocking(blocking); }
+    void setBlockSize(int blockSize) { source.setBlockSize(blockSize); }
+    bool isBlocking() { return source.isBlocking(); }
+    int getBlockSize() { return source.getBlockSize(); }
+
+    // Samplerate of the pushed samples, applied to the signal path right away if the source is selected
+    void setSampleRate(double samplerate) {
+        if (samplerate <= 0.0) { throw std::runtime_error("The samplerate must be positive"); }
+        this->samplerate = samplerate;
+        if (selected) { core::setInputSampleRate(samplerate); }
+    }
+
+    double getSampleRate() { return samplerate; }
+
+    // Last frequency the source manager tuned to, for the caller to follow with its own hardware
+    double getFrequency() { return frequency; }
+
+    unsigned long long getSamplesWritten() { return source.getSamplesWritten(); }
+    unsigned long long getSamplesDropped() { return source.getSamplesDropped(); }
+    void resetCounters() { source.resetCounters(); }
+
+    dsp::stream<dsp::complex_t>* getStream() { return &source.out; }
+
+    // Make the source available to the source manager under the given name
+    void registerSource(const std::string& name = "Python") {
+        if (!registeredName.empty()) { throw std::runtime_error("Source is already registered"); }
+        sigpath::sourceManager.registerSource(name, &handler);
+        registeredName = name;
+    }
+
+    void unregisterSource() {
+        if (registeredName.empty()) { return; }
+        sigpath::sourceManager.unregisterSource(registeredName);
+        registeredName.clear();
+    }
+
+private:
+    static void menuHandler(void* ctx) {}
+
+    static void selectHandler(void* ctx) {
+        PythonPushSource* _this = (PythonPushSource*)ctx;
+        _this->selected = true;
+        core::setInputSampleRate(_this->samplerate);
+    }
+
+    static void deselectHandler(void* ctx) {
+        PythonPushSource* _this = (PythonPushSource*)ctx;
+        _this->selected = false;
+    }
+
+    static void startHandler(void* ctx) {
+        PythonPushSource* _this = (PythonPushSource*)ctx;
+        _this->source.start();
+    }
+
+    static void stopHandler(void* ctx) {
+        PythonPushSource* _this = (PythonPushSource*)ctx;
+        _this->source.stop();
+    }
+
+    static void tuneHandler(double freq, void* ctx) {
+        PythonPushSource* _this = (PythonPushSource*)ctx;
+        _this->frequency = freq;
+    }
+
+    dsp::source::Push source;
+    SourceManager::SourceHandler handler;
+    std::string registeredName;
+    std::atomic<double> samplerate;
+    std::atomic<double> frequency = 0.0;
+    std::atomic<bool> selected = false;
+};
+%}
+
+%extend PythonPushSource {
+%pythoncode %{
+    def push(self, samples):
+        """Write samples to the signal path, returns the number of samples written
+
+        numpy arrays of another dtype or layout are converted to contiguous complex64 first,
+        other objects must expose a contiguous complex64 buffer.
+        """
+        if hasattr(samples, "dtype"):
+            import numpy as np
+            samples = np.ascontiguousarray(samples, dtype=np.complex64)
+        return self._push(samples)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+%}
+}
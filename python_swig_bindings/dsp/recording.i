@@ -0,0 +1,204 @@
+%module sdrpp_dsp_recording
+
+%{
+#include "../core/src/utils/ciq.h"
+#include "../core/src/dsp/sink/handler_sink.h"
+#include "common/sample_view.h"
+#include <memory>
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in recording");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(CIQWriter) PythonCIQWriter;
+%rename(CIQReader) PythonCIQReader;
+%rename(read_into) PythonCIQReader::readInto;
+%rename(index_into) PythonCIQReader::indexInto;
+
+%constant int PCM_TYPE_I8 = dsp::compression::PCM_TYPE_I8;
+%constant int PCM_TYPE_I16 = dsp::compression::PCM_TYPE_I16;
+%constant int PCM_TYPE_F32 = dsp::compression::PCM_TYPE_F32;
+
+// Chunked IQ recordings (.ciq), see core/src/utils/ciq.h for the format. sdrpp.recording wraps
+// the reader to return numpy arrays for time ranges:
+//
+//   w = sdrpp.CIQWriter("capture.ciq", 2.4e6, sdrpp.PCM_TYPE_I16)
+//   w.setFrequency(100e6)
+//   w.record(helper.getVFOStream("capture"))
+//   ...
+//   w.close()
+//
+//   rec = sdrpp.recording.open("capture.ciq")
+//   iq = rec.samples(t0, t0 + 3.0)
+%inline %{
+class PythonCIQWriter {
+public:
+    PythonCIQWriter(const std::string& path, double samplerate, int pcmType = dsp::compression::PCM_TYPE_I16, int chunkSamples = 65536,
+                    double frequency = 0.0, long long startTime = -1) : writer(samplerate, checkType(pcmType), chunkSamples) {
+        writer.setFrequency(frequency);
+        if (!writer.open(path, startTime)) { throw std::runtime_error("Could not open file for recording"); }
+    }
+
+    ~PythonCIQWriter() {
+        close();
+    }
+
+    // Write a complex64 buffer (eg. a numpy array)
+    void write(PyObject* buffer) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getReadable(buffer, &view, sizeof(dsp::complex_t));
+        PyGILState_Release(gstate);
+        if (!ok) {
+            gstate = PyGILState_Ensure();
+            PyErr_Clear();
+            PyGILState_Release(gstate);
+            throw std::runtime_error("write() requires a C-contiguous complex64 buffer");
+        }
+
+        writer.write((const dsp::complex_t*)view.buf, view.len / sizeof(dsp::complex_t));
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+    }
+
+    // Record a stream (eg. a VFO output) from a native thread until stop() or close()
+    void record(dsp::stream<dsp::complex_t>* stream) {
+        if (!stream) { throw std::runtime_error("Stream may not be null"); }
+        stop();
+        sink = std::make_unique<dsp::sink::Handler<dsp::complex_t>>(stream, handler, this);
+        sink->start();
+    }
+
+    void stop() {
+        if (!sink) { return; }
+        sink->stop();
+        sink.reset();
+    }
+
+    // Set the frequency recorded for the chunks started from now on
+    void setFrequency(double frequency) { writer.setFrequency(frequency); }
+
+    unsigned long long getSamplesWritten() { return writer.getSamplesWritten(); }
+    bool isOpen() { return writer.isOpen(); }
+
+    // Write the index and close the file
+    void close() {
+        stop();
+        writer.close();
+    }
+
+private:
+    static dsp::compression::PCMType checkType(int pcmType) {
+        if (pcmType < dsp::compression::PCM_TYPE_I8 || pcmType > dsp::compression::PCM_TYPE_F32) {
+            throw std::runtime_error("Invalid PCM type");
+        }
+        return (dsp::compression::PCMType)pcmType;
+    }
+
+    static void handler(dsp::complex_t* data, int count, void* ctx) {
+        PythonCIQWriter* _this = (PythonCIQWriter*)ctx;
+        _this->writer.write(data, count);
+    }
+
+    ciq::Writer writer;
+    std::unique_ptr<dsp::sink::Handler<dsp::complex_t>> sink;
+};
+
+class PythonCIQReader {
+public:
+    PythonCIQReader(const std::string& path) {
+        if (!reader.open(path)) { throw std::runtime_error("Could not open chunked IQ recording"); }
+    }
+
+    double getSampleRate() { return reader.getSamplerate(); }
+    int getPCMType() { return reader.getPCMType(); }
+    int getChunkSamples() { return reader.getChunkSamples(); }
+    long long getStartTime() { return reader.getStartTime(); }
+    double getFrequency() { return reader.getFrequency(); }
+    unsigned long long getSampleCount() { return reader.getSampleCount(); }
+    size_t getChunkCount() { return reader.getChunkCount(); }
+    bool isRecovered() { return reader.isRecovered(); }
+
+    long long findChunk(long long timestamp) { return reader.findChunk(timestamp); }
+    unsigned long long findSample(long long timestamp) { return reader.findSample(timestamp); }
+
+    // Offset in the file of the first sample of an uncompressed recording, -1 if compressed
+    long long getDataOffset() {
+        const dsp::complex_t* samples = reader.getSamples();
+        return samples ? sizeof(ciq::FileHeader) : -1;
+    }
+
+    // Offset in the file of the data of a chunk, starting with the PCM block header for compressed recordings
+    unsigned long long getChunkOffset(size_t chunk) {
+        if (chunk >= reader.getChunkCount()) { throw std::runtime_error("Chunk index out of range"); }
+        return reader.getChunkOffset(chunk);
+    }
+
+    // Decode samples starting at sample offset into a writable complex64 buffer.
+    // Returns the number of samples decoded.
+    size_t readInto(PyObject* buffer, unsigned long long offset) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getWritable(buffer, &view, sizeof(dsp::complex_t));
+        PyGILState_Release(gstate);
+        if (!ok) {
+            gstate = PyGILState_Ensure();
+            PyErr_Clear();
+            PyGILState_Release(gstate);
+            throw std::runtime_error("read_into() requires a writable C-contiguous complex64 buffer");
+        }
+
+        size_t count = reader.read((dsp::complex_t*)view.buf, offset, view.len / sizeof(dsp::complex_t));
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return count;
+    }
+
+    // Copy the chunk index into a writable buffer of getChunkCount() entries of 32 bytes:
+    // timestamp (int64, ns), frequency (float64), first sample (uint64), sample count (uint32), padding
+    size_t indexInto(PyObject* buffer) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getWritable(buffer, &view, sizeof(ciq::IndexEntry));
+        PyGILState_Release(gstate);
+        if (!ok) {
+            gstate = PyGILState_Ensure();
+            PyErr_Clear();
+            PyGILState_Release(gstate);
+            throw std::runtime_error("index_into() requires a writable C-contiguous buffer of 32 byte entries");
+        }
+
+        size_t count = std::min<size_t>(reader.getChunkCount(), view.len / sizeof(ciq::IndexEntry));
+        if (count) { memcpy(view.buf, &reader.getChunk(0), count * sizeof(ciq::IndexEntry)); }
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return count;
+    }
+
+private:
+    ciq::Reader reader;
+};
+%}
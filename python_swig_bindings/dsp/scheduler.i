@@ -0,0 +1,52 @@
+%module sdrpp_scheduler
+
+%{
+#include "../core/src/dsp/scheduler.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in DSP scheduler");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+// How DSP blocks are run: "threads" (one thread per block, the default) or "pool" (a fixed pool
+// of worker threads running the blocks that have data). The mode only applies to blocks started
+// afterwards, so it should be set before starting the runtime:
+//
+//   sdrpp.setDSPScheduler("pool")
+//   rt.start()
+%inline %{
+// workers is the size of the pool, the number of cores if 0
+void setDSPScheduler(const std::string& mode, int workers = 0) {
+    if (mode == "threads") {
+        dsp::scheduler::setMode(dsp::scheduler::Mode::THREAD_PER_BLOCK, workers);
+    }
+    else if (mode == "pool") {
+        dsp::scheduler::setMode(dsp::scheduler::Mode::POOL, workers);
+    }
+    else {
+        throw std::runtime_error("Unknown DSP scheduler '" + mode + "', must be 'threads' or 'pool'");
+    }
+}
+
+std::string getDSPScheduler() {
+    return (dsp::scheduler::getMode() == dsp::scheduler::Mode::POOL) ? "pool" : "threads";
+}
+
+int getDSPWorkerCount() {
+    return dsp::scheduler::getWorkerCount();
+}
+%}
@@ -0,0 +1,220 @@
+%module sdrpp_dsp_server_client
+
+%{
+#include "common/server_client.h"
+#include "common/pcm_format.h"
+#include "common/sample_view.h"
+#include "../core/src/server.h"
+#include "../core/src/signal_path/signal_path.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in server client");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(ServerClient) PythonServerClient;
+%rename(IQServer) PythonIQServer;
+%rename(read_into) PythonServerClient::readInto;
+
+// Client for an SDR++ server (sdrpp --server, or an IQServer), without any GUI. The baseband is
+// received and decompressed on a worker thread, read_into() only copies samples into numpy:
+//
+//   client = sdrpp.ServerClient("127.0.0.1", 5259)
+//   client.negotiate("i8", True)
+//   client.setFrequency(100e6)
+//   client.start()
+//   buf = np.empty(65536, dtype=np.complex64)
+//   n = client.read_into(buf, 100.0)
+//
+// Commands with wait=False are only sent, sync() then waits for all of them at once instead of
+// doing a round trip per command. Like StreamReader, samples are dropped and counted once more
+// than 'depth' of them are waiting to be read.
+%inline %{
+class PythonServerClient {
+public:
+    PythonServerClient(const std::string& host, int port = 5259, int depth = 1000000, double timeoutMs = 10000.0) :
+        client(host, port, depth, timeoutMs) {}
+
+    ~PythonServerClient() {
+        close();
+    }
+
+    // Disconnect, pending read_into() calls return -1
+    void close() { client.close(); }
+    bool isOpen() { return client.isOpen(); }
+
+    // Ask for a sample type ("i8", "i16" or "f32") and zstd compression in one round trip
+    void negotiate(const std::string& sampleType, bool compression) {
+        uint64_t typeId = client.setSampleType(pcmTypeFromName(sampleType));
+        uint64_t compressionId = client.setCompression(compression);
+        client.wait(typeId);
+        client.wait(compressionId);
+        if (client.getSampleType() != pcmTypeFromName(sampleType) || client.getCompression() != compression) {
+            throw std::runtime_error("The server did not accept the sample type and compression");
+        }
+    }
+
+    void setSampleType(const std::string& sampleType, bool wait = true) { finish(client.setSampleType(pcmTypeFromName(sampleType)), wait); }
+    void setCompression(bool enabled, bool wait = true) { finish(client.setCompression(enabled), wait); }
+    void setFrequency(double frequency, bool wait = true) { finish(client.setFrequency(frequency), wait); }
+    void start(bool wait = true) { finish(client.start(), wait); }
+    void stop(bool wait = true) { finish(client.stop(), wait); }
+
+    // Wait for all the commands sent so far, raises if the server rejected any of them
+    void sync() { client.sync(); }
+
+    // Ask the server for its samplerate
+    double requestSamplerate() {
+        client.wait(client.requestSamplerate());
+        return client.getSamplerate();
+    }
+
+    // As last announced or acknowledged by the server
+    double getSamplerate() { return client.getSamplerate(); }
+    std::string getSampleType() { return pcmTypeName(client.getSampleType()); }
+    bool getCompression() { return client.getCompression(); }
+
+    // Notify an event loop through the given wakeup when samples are available (None to disable)
+    void setWakeup(Wakeup* wakeup) { client.getReader().setWakeup(wakeup); }
+
+    // Read up to len(buffer) samples into a writable complex64 buffer (eg. a numpy array).
+    // Waits at most timeoutMs for data (forever if negative). Returns the number of samples
+    // read, 0 on timeout and -1 once disconnected.
+    int readInto(PyObject* buffer, double timeoutMs = -1.0) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getWritable(buffer, &view, sizeof(dsp::complex_t));
+        PyGILState_Release(gstate);
+        if (!ok) {
+            gstate = PyGILState_Ensure();
+            PyErr_Clear();
+            PyGILState_Release(gstate);
+            throw std::runtime_error("read_into() requires a writable C-contiguous complex64 buffer");
+        }
+
+        // Wait and copy without holding the GIL
+        int count = client.getReader().read((dsp::complex_t*)view.buf, view.len / sizeof(dsp::complex_t), timeoutMs);
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return count;
+    }
+
+    int getAvailable() { return client.getReader().getAvailable(); }
+    unsigned long long getOverflowCount() { return client.getReader().getOverflowCount(); }
+    unsigned long long getDroppedSamples() { return client.getReader().getDroppedSamples(); }
+    unsigned long long getReceivedSamples() { return client.getReader().getWrittenSamples(); }
+    unsigned long long getReadSamples() { return client.getReader().getReadSamples(); }
+    unsigned long long getBytesReceived() { return client.getBytesReceived(); }
+    unsigned long long getInvalidPackets() { return client.getInvalidPackets(); }
+
+    // Size of the PCM frames over the size of the baseband as received, 1 without zstd
+    double getCompressionRatio() {
+        unsigned long long received = client.getBasebandBytes();
+        return received ? (double)client.getDecompressedBytes() / (double)received : 1.0;
+    }
+
+private:
+    void finish(uint64_t id, bool wait) {
+        if (wait) { client.wait(id); }
+    }
+
+    ServerClient client;
+};
+
+// The SDR++ server running inside this process, eg. to serve the front end of a headless runtime
+// to capture workers on other machines, or a recording on loopback. There is only one per process.
+class PythonIQServer {
+public:
+    // Without a stream, the IQ of the front end is served
+    PythonIQServer(const std::string& host = "127.0.0.1", int port = 5259, dsp::stream<dsp::complex_t>* stream = NULL, double samplerate = 0.0) {
+        this->host = host;
+        this->port = port;
+        frontEnd = !stream;
+        input = frontEnd ? &iqStream : stream;
+        this->samplerate = samplerate;
+    }
+
+    ~PythonIQServer() {
+        stop();
+    }
+
+    void start() {
+        if (running) { return; }
+        if (frontEnd) {
+            if (samplerate <= 0.0) { samplerate = sigpath::iqFrontEnd.getEffectiveSamplerate(); }
+            sigpath::iqFrontEnd.bindIQStream(&iqStream);
+        }
+        if (!server::start(host, port)) {
+            if (frontEnd) { sigpath::iqFrontEnd.unbindIQStream(&iqStream); }
+            throw std::runtime_error("Could not start the server on " + host + ":" + std::to_string(port) + " (already running or address in use)");
+        }
+        server::setInput(input);
+        if (samplerate > 0.0) { server::setInputSampleRate(samplerate); }
+        running = true;
+    }
+
+    void stop() {
+        if (!running) { return; }
+        server::stop();
+        if (frontEnd) { sigpath::iqFrontEnd.unbindIQStream(&iqStream); }
+        running = false;
+    }
+
+    // Announced to the clients
+    void setSamplerate(double samplerate) {
+        this->samplerate = samplerate;
+        if (running) { server::setInputSampleRate(samplerate); }
+    }
+
+    bool isListening() { return running && server::isListening(); }
+
+private:
+    std::string host;
+    int port;
+    dsp::stream<dsp::complex_t> iqStream;
+    dsp::stream<dsp::complex_t>* input;
+    bool frontEnd;
+    bool running = false;
+    double samplerate;
+};
+%}
+
+%extend PythonServerClient {
+%pythoncode %{
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+%}
+}
+
+%extend PythonIQServer {
+%pythoncode %{
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+%}
+}
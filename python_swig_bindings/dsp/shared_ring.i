@@ -0,0 +1,218 @@
+%module sdrpp_dsp_shared_ring
+
+%{
+#include "../core/src/dsp/sink/shared_ring.h"
+#include "../core/src/signal_path/signal_path.h"
+#include "common/json_python.h"
+#include "common/sample_view.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in shared IQ ring");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(SharedIQPublisher) PythonSharedIQPublisher;
+%rename(SharedIQReader) PythonSharedIQReader;
+%rename(_acquire) PythonSharedIQReader::acquire;
+%rename(_close) PythonSharedIQReader::close;
+%rename(_buffer) PythonSharedIQReader::buffer;
+
+// IQ fan-out to other local processes through a shared memory ring. One process publishes the
+// IQ of the front end (or any stream), and any number of worker processes map the ring and get
+// numpy views of the samples without copies:
+//
+//   pub = sdrpp.SharedIQPublisher("sdrpp_iq", 1 << 23)
+//   pub.start()
+//
+//   # In each worker process
+//   reader = sdrpp.SharedIQReader("sdrpp_iq")
+//   samples = reader.acquire(65536, 100.0)
+//   ...
+//   if not reader.release():
+//       pass # The publisher overwrote the samples while they were in use, discard the results
+//
+// The publisher never waits for the readers. Each reader has its own cursor, a reader that falls
+// more than the capacity of the ring behind skips ahead and counts an overrun.
+%inline %{
+class PythonSharedIQPublisher {
+public:
+    // Without a stream, the IQ of the front end is published
+    PythonSharedIQPublisher(const std::string& name, unsigned long long capacity = 1 << 23, dsp::stream<dsp::complex_t>* stream = NULL) {
+        if (!capacity) { throw std::runtime_error("Capacity must be at least one sample"); }
+        frontEnd = !stream;
+        sink.init(frontEnd ? &iqStream : stream, name, capacity);
+        if (frontEnd) { sink.ring.setSamplerate(sigpath::iqFrontEnd.getEffectiveSamplerate()); }
+    }
+
+    ~PythonSharedIQPublisher() {
+        stop();
+    }
+
+    void start() {
+        if (running) { return; }
+        if (frontEnd) {
+            sink.ring.setSamplerate(sigpath::iqFrontEnd.getEffectiveSamplerate());
+            sigpath::iqFrontEnd.bindIQStream(&iqStream);
+        }
+        sink.start();
+        running = true;
+    }
+
+    void stop() {
+        if (!running) { return; }
+        if (frontEnd) { sigpath::iqFrontEnd.unbindIQStream(&iqStream); }
+        sink.stop();
+        running = false;
+    }
+
+    // Stop and close the ring, readers get what's left and then see the end of the stream
+    void close() {
+        stop();
+        sink.ring.close();
+    }
+
+    // Published in the ring for the readers
+    void setSamplerate(double samplerate) { sink.ring.setSamplerate(samplerate); }
+    void setFrequency(double frequency) { sink.ring.setFrequency(frequency); }
+
+    std::string getName() { return sink.ring.getName(); }
+    unsigned long long getCapacity() { return sink.ring.getCapacity(); }
+    unsigned long long getWrittenSamples() { return sink.ring.getWrittenSamples(); }
+
+    // Readers attached to the ring, as dicts with their "pid", "lag" in samples, "overruns" and "dropped_samples"
+    PyObject* getReaders() {
+        nlohmann::json list = nlohmann::json::array();
+        for (const auto& reader : sink.ring.getReaders()) {
+            list.push_back({
+                { "slot", reader.slot },
+                { "pid", reader.pid },
+                { "lag", reader.lag },
+                { "overruns", reader.overruns },
+                { "dropped_samples", reader.droppedSamples }
+            });
+        }
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        PyObject* obj = json_python::toPython(list);
+        PyGILState_Release(gstate);
+        return obj;
+    }
+
+private:
+    dsp::stream<dsp::complex_t> iqStream;
+    dsp::sink::SharedRing sink;
+    bool frontEnd;
+    bool running = false;
+};
+
+class PythonSharedIQReader {
+public:
+    PythonSharedIQReader(const std::string& name) {
+        reader.open(name);
+    }
+
+    ~PythonSharedIQReader() {
+        close();
+    }
+
+    // Unmap the ring. If numpy views of it are still alive, it stays mapped for them instead.
+    void close() {
+        if (!reader.isOpen()) { return; }
+        bool released = true;
+        if (view) {
+            PyGILState_STATE gstate = PyGILState_Ensure();
+            released = sample_view::release(view);
+            Py_DECREF(view);
+            view = NULL;
+            PyGILState_Release(gstate);
+        }
+        if (released) {
+            reader.close();
+        }
+        else {
+            reader.leak();
+        }
+    }
+
+    // See dsp::buffer::SharedRingReader::acquire(), wrapped by acquire() below
+    int acquire(int maxCount = 65536, double timeoutMs = -1.0) {
+        if (!reader.isOpen()) { throw std::runtime_error("Reader is closed"); }
+        return reader.acquire(maxCount, timeoutMs);
+    }
+
+    // Done with the acquired samples, returns False if the publisher overwrote them while in use
+    bool release() { return reader.release(); }
+
+    // Read-only complex64 memoryview of the whole ring
+    PyObject* buffer() {
+        if (!reader.isOpen()) { throw std::runtime_error("Reader is closed"); }
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        if (!view) {
+            view = sample_view::makeView(reader.data(), reader.getCapacity(), sizeof(dsp::complex_t), sample_view::COMPLEX64_FORMAT);
+        }
+        Py_XINCREF(view);
+        PyGILState_Release(gstate);
+        return view;
+    }
+
+    unsigned long long getOffset() { return reader.getOffset(); }
+    unsigned long long getCapacity() { return reader.getCapacity(); }
+    unsigned long long getAvailable() { return reader.getAvailable(); }
+    double getSamplerate() { return reader.getSamplerate(); }
+    double getFrequency() { return reader.getFrequency(); }
+    bool isWriterRunning() { return reader.isWriterRunning(); }
+    unsigned long long getOverruns() { return reader.getOverruns(); }
+    unsigned long long getDroppedSamples() { return reader.getDroppedSamples(); }
+    unsigned long long getReadSamples() { return reader.getReadSamples(); }
+
+private:
+    dsp::buffer::SharedRingReader reader;
+    PyObject* view = NULL;
+};
+%}
+
+%extend PythonSharedIQReader {
+%pythoncode %{
+    def acquire(self, max_count=65536, timeout_ms=-1.0):
+        """Wait at most timeout_ms (forever if negative) for samples and return up to max_count
+        of them as a read-only complex64 numpy view of the ring, None on timeout.
+
+        The view stays valid until release() or the next acquire(). Raises EOFError once the
+        publisher closed the ring and all samples were read.
+        """
+        import numpy as np
+        count = self._acquire(max_count, timeout_ms)
+        if count < 0:
+            raise EOFError("The shared IQ ring was closed")
+        if count == 0:
+            return None
+        if self.__dict__.get("_ring") is None:
+            self.__dict__["_ring"] = np.frombuffer(self._buffer(), dtype=np.complex64)
+        offset = self.getOffset()
+        return self._ring[offset:offset + count]
+
+    def close(self):
+        self.__dict__["_ring"] = None
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+%}
+}
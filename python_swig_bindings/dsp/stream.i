@@ -1,12 +1,9 @@
 %module sdrpp_dsp_stream
 
-// Define the DSP_STREAM_H macro to prevent inclusion of the real stream.h
-#define DSP_STREAM_H
-
 %{
-// Use our mock headers and wrappers to completely bypass VOLK
-#define DSP_STREAM_H
-#include "../common/stream_wrapper.h"
+#include "common/stream_wrapper.h"
+#include "common/sample_view.h"
+#include <vector>
 %}
 
 // Thread-safe exception handling
@@ -24,7 +21,9 @@
     PyEval_RestoreThread(_save);
 }
 
-// Process our wrapper header instead of the direct dsp headers
+// Process our wrapper header instead of the direct dsp headers. Callbacks are set through
+// PythonStreamHelper since std::function can't be passed from Python.
+%ignore StreamWrapper::setCallback;
 %include "../common/stream_wrapper.h"
 
 // Handle director callbacks
@@ -40,9 +39,21 @@ public:
 };
 
 // Wrapper to connect Python callbacks to streams
+//
+// Two delivery modes are available:
+//  - connect(): legacy mode, calls StreamCallback::onSamples() with split real/imaginary arrays
+//  - connectArray(): calls a Python callable with a complex64 buffer (zero-copy by default)
+//
+// Lifetime contract of connectArray(): in zero-copy mode the object passed to the callable is a
+// read-only memoryview directly over the stream's read buffer. It is only valid until the callable
+// returns, after which it is released. np.frombuffer(samples, dtype=np.complex64) can be used
+// freely inside the callable, but any array that must outlive the call has to be copied
+// (eg. with .copy()). Views still referenced after the call can't be invalidated and are counted
+// by getRetainedViewCount(). With copy=True, the callable gets a bytes object owning its own copy
+// of the samples instead, which can be kept as long as needed.
 class PythonStreamHelper {
 public:
-    PythonStreamHelper() : streamWrapper(nullptr), callback(nullptr) {}
+    PythonStreamHelper() : streamWrapper(nullptr), callback(nullptr), pyCallable(nullptr), copyMode(false), retainedViews(0) {}
     ~PythonStreamHelper() {
         disconnect();
     }
@@ -50,6 +61,7 @@ public:
     // Connect to a stream and set up a Python callback
     bool connect(dsp::stream<dsp::complex_t>* stream, StreamCallback* pythonCallback) {
         if (!stream || !pythonCallback) return false;
+        disconnect();
         
         // Store Python callback
         callback = pythonCallback;
@@ -61,27 +73,68 @@ public:
         return streamWrapper.setCallback([this](dsp::complex_t* samples, int count) {
             if (!callback) return;
             
+            // Grow the split buffers if needed, they are reused between calls
+            if (realPart.size() < (size_t)count) {
+                realPart.resize(count);
+                imagPart.resize(count);
+            }
+            
+            // Split complex samples into real and imaginary arrays
+            complexToFloatArrays(samples, count, realPart.data(), imagPart.data());
+            
             // Acquire GIL for Python operations
             PyGILState_STATE gstate = PyGILState_Ensure();
             
-            // Allocate temporary arrays for real and imaginary parts
-            float* real_part = new float[count];
-            float* imag_part = new float[count];
+            // Call Python callback
+            callback->onSamples(realPart.data(), imagPart.data(), count);
             
-            // Split complex samples into real and imaginary arrays
-            for (int i = 0; i < count; i++) {
-                real_part[i] = samples[i].re;
-                imag_part[i] = samples[i].im;
+            // Release GIL
+            PyGILState_Release(gstate);
+        });
+    }
+    
+    // Connect to a stream and deliver each buffer as a complex64 buffer to a Python callable
+    bool connectArray(dsp::stream<dsp::complex_t>* stream, PyObject* callable, bool copy = false) {
+        if (!stream || !callable) return false;
+        disconnect();
+        
+        // Keep a reference to the callable for as long as we're connected
+        {
+            PyGILState_STATE gstate = PyGILState_Ensure();
+            if (!PyCallable_Check(callable)) {
+                PyGILState_Release(gstate);
+                return false;
             }
+            Py_INCREF(callable);
+            pyCallable = callable;
+            PyGILState_Release(gstate);
+        }
+        copyMode = copy;
+        
+        streamWrapper.connect(stream);
+        
+        return streamWrapper.setCallback([this](dsp::complex_t* samples, int count) {
+            if (!pyCallable) return;
             
-            // Call Python callback
-            callback->onSamples(real_part, imag_part, count);
+            PyGILState_STATE gstate = PyGILState_Ensure();
+            
+            // Wrap the read buffer (or a copy of it) without converting the samples
+            PyObject* buf = copyMode ? sample_view::makeCopy(samples, count * sizeof(dsp::complex_t))
+                                     : sample_view::makeComplexView(samples, count);
+            if (!buf) {
+                PyErr_Print();
+                PyGILState_Release(gstate);
+                return;
+            }
             
-            // Clean up
-            delete[] real_part;
-            delete[] imag_part;
+            PyObject* res = PyObject_CallFunctionObjArgs(pyCallable, buf, NULL);
+            if (!res) { PyErr_Print(); }
+            Py_XDECREF(res);
+            
+            // The read buffer is about to be flushed, make sure the view can't be used anymore
+            if (!copyMode && !sample_view::release(buf)) { retainedViews++; }
+            Py_DECREF(buf);
             
-            // Release GIL
             PyGILState_Release(gstate);
         });
     }
@@ -90,11 +143,27 @@ public:
     void disconnect() {
         streamWrapper.disconnect();
         callback = nullptr;
+        if (pyCallable) {
+            PyGILState_STATE gstate = PyGILState_Ensure();
+            Py_DECREF(pyCallable);
+            pyCallable = nullptr;
+            PyGILState_Release(gstate);
+        }
+    }
+    
+    // Number of zero-copy views that were still referenced by Python after the callback returned
+    int getRetainedViewCount() {
+        return retainedViews;
     }
     
 private:
     StreamWrapper streamWrapper;
     StreamCallback* callback;
+    PyObject* pyCallable;
+    bool copyMode;
+    int retainedViews;
+    std::vector<float> realPart;
+    std::vector<float> imagPart;
 };
 
 // Helper to create a Python complex list from samples
@@ -0,0 +1,211 @@
+%module sdrpp_dsp_stream_reader
+
+%{
+#include "common/stream_reader.h"
+#include "common/compact_reader.h"
+#include "common/sample_view.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in stream reader");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(StreamReader) PythonStreamReader;
+%rename(read_into) PythonStreamReader::readInto;
+%rename(CompactStreamReader) PythonCompactStreamReader;
+%rename(_readBlock) PythonCompactStreamReader::readBlock;
+
+// Pull-based alternative to the push callbacks. Python calls read_into() whenever it's ready
+// for more data instead of being called on the DSP thread, and the GIL is released while waiting.
+//
+//   reader = sdrpp.StreamReader(vfo.output, 1000000)
+//   reader.start()
+//   buf = np.empty(65536, dtype=np.complex64)
+//   n = reader.read_into(buf, 100.0)
+//
+// When Python falls behind by more than 'depth' samples, new samples are dropped and counted
+// (see getOverflowCount()/getDroppedSamples()) rather than stalling the source.
+%inline %{
+class PythonStreamReader {
+public:
+    PythonStreamReader(dsp::stream<dsp::complex_t>* stream, int depth = 1000000) {
+        if (!stream) { throw std::runtime_error("Stream may not be null"); }
+        reader.init(stream, depth);
+    }
+
+    ~PythonStreamReader() {
+        close();
+        reader.stop();
+    }
+
+    void start() {
+        reader.reopen();
+        reader.start();
+    }
+
+    void stop() {
+        reader.stop();
+    }
+
+    // Notify an event loop through the given wakeup when data is available (None to disable).
+    // The wakeup must outlive the reader or be removed first.
+    void setWakeup(Wakeup* wakeup) {
+        reader.setWakeup(wakeup);
+    }
+
+    // Unblock any pending read_into(), which will then return -1
+    void close() {
+        reader.close();
+    }
+
+    // Read up to len(buffer) samples into a writable complex64 buffer (eg. a numpy array).
+    // Waits at most timeoutMs for data (forever if negative). Returns the number of samples
+    // read, 0 on timeout and -1 once the reader is closed.
+    int readInto(PyObject* buffer, double timeoutMs = -1.0) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getWritable(buffer, &view, sizeof(dsp::complex_t));
+        PyGILState_Release(gstate);
+        if (!ok) {
+            gstate = PyGILState_Ensure();
+            PyErr_Clear();
+            PyGILState_Release(gstate);
+            throw std::runtime_error("read_into() requires a writable C-contiguous complex64 buffer");
+        }
+
+        // Wait and copy without holding the GIL
+        int count = reader.read((dsp::complex_t*)view.buf, view.len / sizeof(dsp::complex_t), timeoutMs);
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+
+        return count;
+    }
+
+    int getDepth() { return reader.getDepth(); }
+    int getAvailable() { return reader.getAvailable(); }
+    unsigned long long getOverflowCount() { return reader.getOverflowCount(); }
+    unsigned long long getDroppedSamples() { return reader.getDroppedSamples(); }
+    unsigned long long getWrittenSamples() { return reader.getWrittenSamples(); }
+    unsigned long long getReadSamples() { return reader.getReadSamples(); }
+    void resetCounters() { reader.resetCounters(); }
+
+private:
+    StreamReader<dsp::complex_t> reader;
+};
+%}
+
+// Same as StreamReader, but samples are delivered as interleaved int8 ("i8") or int16 ("i16") IQ,
+// 2 or 4 bytes per sample instead of 8. Every buffer of the stream is scaled by its own largest
+// magnitude and read as one block with its scale:
+//
+//   reader = sdrpp.CompactStreamReader(vfo.output, "i8")
+//   reader.start()
+//   iq, scale = reader.read(100.0)
+//   samples = iq.astype(np.float32).view(np.complex64) * scale
+%inline %{
+class PythonCompactStreamReader {
+public:
+    PythonCompactStreamReader(dsp::stream<dsp::complex_t>* stream, const std::string& format = "i16", int depth = 1000000) {
+        if (!stream) { throw std::runtime_error("Stream may not be null"); }
+        reader.init(stream, pcmTypeFromName(format), depth);
+    }
+
+    ~PythonCompactStreamReader() {
+        close();
+        reader.stop();
+    }
+
+    void start() {
+        reader.reopen();
+        reader.start();
+    }
+
+    void stop() {
+        reader.stop();
+    }
+
+    // Notify an event loop through the given wakeup when a block is available (None to disable).
+    // The wakeup must outlive the reader or be removed first.
+    void setWakeup(Wakeup* wakeup) {
+        reader.setWakeup(wakeup);
+    }
+
+    // Unblock any pending read(), which will then return None
+    void close() {
+        reader.close();
+    }
+
+    // Format of the blocks read from now on ("i8", "i16" or "f32")
+    void setFormat(const std::string& format) { reader.setPCMType(pcmTypeFromName(format)); }
+    std::string getFormat() { return pcmTypeName(reader.getPCMType()); }
+
+    // Next block as (format, scale, bytes), waiting at most timeoutMs for one (forever if negative).
+    // Returns None on timeout or once closed.
+    PyObject* readBlock(double timeoutMs = -1.0) {
+        std::lock_guard<std::mutex> lck(readMtx);
+        bool ok = reader.read(block, timeoutMs);
+
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        PyObject* res = Py_None;
+        if (ok) {
+            dsp::compression::PCMType type = (dsp::compression::PCMType)*(uint16_t*)&block[2];
+            float scaler = *(float*)&block[4];
+            res = Py_BuildValue("(sdN)", pcmTypeName(type).c_str(), (double)pcmScale(type, scaler),
+                                sample_view::makeCopy(block.data() + 8, block.size() - 8));
+        }
+        else {
+            Py_INCREF(res);
+        }
+        PyGILState_Release(gstate);
+        return res;
+    }
+
+    bool isClosed() { return reader.isClosed(); }
+    int getDepth() { return reader.getDepth(); }
+    int getAvailable() { return reader.getAvailable(); }
+    unsigned long long getOverflowCount() { return reader.getOverflowCount(); }
+    unsigned long long getDroppedSamples() { return reader.getDroppedSamples(); }
+    unsigned long long getWrittenSamples() { return reader.getWrittenSamples(); }
+    unsigned long long getReadSamples() { return reader.getReadSamples(); }
+    void resetCounters() { reader.resetCounters(); }
+
+private:
+    CompactStreamReader reader;
+    CompactStreamReader::Block block;
+    std::mutex readMtx;
+};
+%}
+
+%extend PythonCompactStreamReader {
+%pythoncode %{
+    def read(self, timeoutMs=-1.0):
+        """Next block as (iq, scale), None on timeout or once closed
+
+        iq is an interleaved int8 or int16 numpy array (complex64 for "f32") and scale the factor
+        converting it back to the original amplitude.
+        """
+        import numpy as np
+        res = self._readBlock(timeoutMs)
+        if res is None:
+            return None
+        fmt, scale, data = res
+        dtype = {"i8": np.int8, "i16": np.int16}.get(fmt, np.complex64)
+        return np.frombuffer(data, dtype=dtype), scale
+%}
+}
@@ -0,0 +1,40 @@
+%module sdrpp_dsp_types
+
+%{
+#include "../core/src/dsp/types.h"
+%}
+
+// These use the Python API, so they must run with the GIL held
+%noexception complex_to_python;
+%noexception python_to_complex;
+
+%inline %{
+// Basic SDR++ version information
+const char* getSdrppVersion() {
+    return "SDR++ Python Bindings 1.0.0";
+}
+
+// Convert dsp::complex_t to Python complex
+PyObject* complex_to_python(dsp::complex_t& cpx) {
+    return PyComplex_FromDoubles(cpx.re, cpx.im);
+}
+
+// Convert Python complex to dsp::complex_t
+dsp::complex_t python_to_complex(PyObject* obj) {
+    dsp::complex_t result;
+    if (PyComplex_Check(obj)) {
+        result.re = PyComplex_RealAsDouble(obj);
+        result.im = PyComplex_ImagAsDouble(obj);
+    } else if (PyFloat_Check(obj)) {
+        result.re = PyFloat_AsDouble(obj);
+        result.im = 0.0f;
+    } else if (PyLong_Check(obj)) {
+        result.re = (float)PyLong_AsLong(obj);
+        result.im = 0.0f;
+    }
+    return result;
+}
+%}
+
+// Include core type definitions
+%include "../../core/src/dsp/types.h"
@@ -0,0 +1,216 @@
+%module sdrpp_dsp_wideband_scanner
+
+%{
+#include <deque>
+#include "../core/src/signal_path/signal_path.h"
+#include "../core/src/signal_path/wideband_scanner.h"
+#include "common/sample_view.h"
+#include "common/wakeup.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+%include "std_vector.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in wideband scanner");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(WidebandScanner) PythonWidebandScanner;
+%rename(process_frame) PythonWidebandScanner::processFrame;
+%rename(_channelFrequencies) PythonWidebandScanner::channelFrequencies;
+%rename(_channelLevels) PythonWidebandScanner::channelLevels;
+%rename(_channelOccupancy) PythonWidebandScanner::channelOccupancy;
+
+// Scanner over the FFT frames of the front end, for headless use. Every channel in the usable part
+// of the IQ bandwidth is measured from the same frame and the source is retuned in steps of that
+// bandwidth. Hits are queued like the events of EventBridge and drained with poll():
+//
+//   scanner = sdrpp.WidebandScanner(88e6, 108e6, 100e3, channelWidth=150e3, level=-60.0)
+//   scanner.start()
+//   for ev in scanner.poll():
+//       print(ev.type, ev.frequency, ev.level, ev.duration)
+//
+// Event types are "hit_start", "hit_end" (level is the peak, time the start of the hit), "sweep"
+// (duration is that of the sweep) and "tune". Instead of start(), frames can be fed with
+// process_frame() after setSamplerate(), the source then has to be retuned on "tune" events.
+%inline %{
+struct ScannerEvent {
+    std::string type;
+    double frequency;
+    float level;
+    double time;
+    double duration;
+};
+
+class PythonWidebandScanner {
+public:
+    PythonWidebandScanner(double startFreq, double stopFreq, double spacing, double channelWidth = 10000.0, float level = -50.0f,
+                          double usableRatio = 0.8, int settleTime = 50, int dwellTime = 100, int hangTime = 1000, int maxHoldTime = 0,
+                          int maxQueued = 4096) {
+        this->maxQueued = maxQueued;
+        configure(startFreq, stopFreq, spacing, channelWidth, level, usableRatio, settleTime, dwellTime, hangTime, maxHoldTime);
+        eventHandler.handler = eventHandlerFunc;
+        eventHandler.ctx = this;
+        scanner.onEvent.bindHandler(&eventHandler);
+    }
+
+    ~PythonWidebandScanner() {
+        scanner.stop();
+        scanner.onEvent.unbindHandler(&eventHandler);
+    }
+
+    // Replace the channel plan and timings (ms), the scan starts over
+    void configure(double startFreq, double stopFreq, double spacing, double channelWidth = 10000.0, float level = -50.0f,
+                   double usableRatio = 0.8, int settleTime = 50, int dwellTime = 100, int hangTime = 1000, int maxHoldTime = 0) {
+        WidebandScanner::Config config;
+        config.startFreq = startFreq;
+        config.stopFreq = stopFreq;
+        config.spacing = spacing;
+        config.channelWidth = channelWidth;
+        config.level = level;
+        config.usableRatio = usableRatio;
+        config.settleTime = settleTime;
+        config.dwellTime = dwellTime;
+        config.hangTime = hangTime;
+        config.maxHoldTime = maxHoldTime;
+        scanner.configure(config);
+    }
+
+    void setLevel(float level) {
+        WidebandScanner::Config config = scanner.getConfig();
+        config.level = level;
+        scanner.configure(config);
+    }
+
+    float getLevel() { return scanner.getConfig().level; }
+
+    // Scan the front end, retuning the current source
+    void start() { scanner.start(&sigpath::iqFrontEnd, &sigpath::sourceManager); }
+    void stop() { scanner.stop(); }
+    bool isRunning() { return scanner.isRunning(); }
+
+    // Samplerate of the frames given to process_frame()
+    void setSamplerate(double samplerate) { scanner.setSamplerate(samplerate); }
+
+    // Process a float32 dB frame (DC in the middle, like FFTTap) taken at the given time in seconds
+    void processFrame(PyObject* frame, double time) {
+        Py_buffer view;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        bool ok = sample_view::getReadable(frame, &view, sizeof(float));
+        if (!ok) { PyErr_Clear(); }
+        PyGILState_Release(gstate);
+        if (!ok) { throw std::runtime_error("process_frame() requires a C-contiguous float32 buffer"); }
+
+        scanner.processFrame((const float*)view.buf, view.len / sizeof(float), time);
+
+        gstate = PyGILState_Ensure();
+        PyBuffer_Release(&view);
+        PyGILState_Release(gstate);
+    }
+
+    // Take all queued events, oldest first
+    std::vector<ScannerEvent> poll() {
+        std::lock_guard<std::mutex> lck(queueMtx);
+        std::vector<ScannerEvent> events(queue.begin(), queue.end());
+        queue.clear();
+        return events;
+    }
+
+    // Number of events that were discarded because nobody polled in time
+    int getDroppedCount() {
+        std::lock_guard<std::mutex> lck(queueMtx);
+        return dropped;
+    }
+
+    // Notify an event loop through the given wakeup when events are queued (None to disable).
+    // The wakeup must outlive the scanner or be removed first.
+    void setWakeup(Wakeup* wakeup) {
+        std::lock_guard<std::mutex> lck(queueMtx);
+        this->wakeup = wakeup;
+    }
+
+    int getChannelCount() { return scanner.getChannelCount(); }
+    int getStepCount() { return scanner.getStepCount(); }
+    double getCenterFrequency() { return scanner.getCenterFrequency(); }
+    unsigned long long getSweepCount() { return scanner.getSweepCount(); }
+
+    // Per channel arrays as bytes, wrapped into numpy arrays by the methods below
+    PyObject* channelFrequencies() { return toBytes(scanner.getChannelFrequencies()); }
+    PyObject* channelLevels() { return toBytes(scanner.getChannelLevels()); }
+    PyObject* channelOccupancy() { return toBytes(scanner.getChannelOccupancy()); }
+
+private:
+    template <class T>
+    static PyObject* toBytes(const std::vector<T>& values) {
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        PyObject* bytes = sample_view::makeCopy(values.data(), values.size() * sizeof(T));
+        PyGILState_Release(gstate);
+        return bytes;
+    }
+
+    static void eventHandlerFunc(WidebandScanner::ScanEvent event, void* ctx) {
+        static const char* names[] = { "hit_start", "hit_end", "sweep", "tune" };
+        PythonWidebandScanner* _this = (PythonWidebandScanner*)ctx;
+        Wakeup* wakeup;
+        {
+            std::lock_guard<std::mutex> lck(_this->queueMtx);
+            if (_this->queue.size() >= (size_t)_this->maxQueued) {
+                _this->queue.pop_front();
+                _this->dropped++;
+            }
+            _this->queue.push_back({ names[event.type], event.frequency, event.level, event.time, event.duration });
+            wakeup = _this->wakeup;
+        }
+        if (wakeup) { wakeup->notify(); }
+    }
+
+    WidebandScanner scanner;
+    EventHandler<WidebandScanner::ScanEvent> eventHandler;
+    std::mutex queueMtx;
+    std::deque<ScannerEvent> queue;
+    int maxQueued;
+    int dropped = 0;
+    Wakeup* wakeup = NULL;
+};
+%}
+
+%template(ScannerEventVector) std::vector<ScannerEvent>;
+
+%extend PythonWidebandScanner {
+%pythoncode %{
+    def frequencies(self):
+        """Frequency of each channel, as a float64 numpy array"""
+        import numpy as np
+        return np.frombuffer(self._channelFrequencies(), dtype=np.float64)
+
+    def levels(self):
+        """Last measured level of each channel in dB (-inf if not yet measured), as a float32 numpy array"""
+        import numpy as np
+        return np.frombuffer(self._channelLevels(), dtype=np.float32)
+
+    def occupancy(self):
+        """Fraction of the frames in which each channel was above the level, as a float32 numpy array"""
+        import numpy as np
+        return np.frombuffer(self._channelOccupancy(), dtype=np.float32)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+%}
+}
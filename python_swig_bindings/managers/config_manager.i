@@ -2,8 +2,9 @@
 
 %{
 // Include the necessary headers
-#include "../../core/src/config.h"
-#include "../common/json_helper.h"
+#include "../core/src/config.h"
+#include "common/json_helper.h"
+#include "common/json_python.h"
 %}
 
 // Include standard library support
@@ -66,6 +67,73 @@ public:
         }
     }
     
+    // JSON pointer access (eg. "/moduleInstances/Radio/enable"). Values are converted directly
+    // between JSON and Python objects, without serializing the rest of the config.
+    PyObject* get(const std::string& pointer) {
+        nlohmann::json::json_pointer ptr = parsePointer(pointer);
+        mgr->acquire();
+        try {
+            if (!mgr->conf.contains(ptr)) { throw std::runtime_error("No config value at '" + pointer + "'"); }
+            PyObject* obj = json_python::toPython(mgr->conf.at(ptr));
+            mgr->release(false);
+            if (!obj) {
+                PyErr_Clear();
+                throw std::runtime_error("Could not convert config value at '" + pointer + "'");
+            }
+            return obj;
+        } catch (...) {
+            mgr->release(false);
+            throw;
+        }
+    }
+
+    bool contains(const std::string& pointer) {
+        nlohmann::json::json_pointer ptr = parsePointer(pointer);
+        mgr->acquire();
+        bool found = mgr->conf.contains(ptr);
+        mgr->release(false);
+        return found;
+    }
+
+    // Set a value, creating the missing parent objects. The change is picked up by the auto save.
+    void set(const std::string& pointer, PyObject* value) {
+        nlohmann::json::json_pointer ptr = parsePointer(pointer);
+        nlohmann::json val = json_python::fromPython(value);
+        mgr->acquire();
+        try {
+            mgr->conf[ptr] = std::move(val);
+        } catch (...) {
+            mgr->release(false);
+            throw;
+        }
+        mgr->release(true);
+    }
+
+    // Remove a value, returns false if there was none
+    bool remove(const std::string& pointer) {
+        nlohmann::json::json_pointer ptr = parsePointer(pointer);
+        if (ptr.empty()) { throw std::runtime_error("Cannot remove the root of the config"); }
+        mgr->acquire();
+        try {
+            if (!mgr->conf.contains(ptr)) {
+                mgr->release(false);
+                return false;
+            }
+            nlohmann::json& parent = mgr->conf.at(ptr.parent_pointer());
+            if (parent.is_array()) {
+                parent.erase(std::stoul(ptr.back()));
+            }
+            else {
+                parent.erase(ptr.back());
+            }
+        } catch (...) {
+            mgr->release(false);
+            throw;
+        }
+        mgr->release(true);
+        return true;
+    }
+
     void enableAutoSave() {
         mgr->enableAutoSave();
     }
@@ -77,6 +145,15 @@ public:
     void save() {
         mgr->save();
     }
+
+private:
+    static nlohmann::json::json_pointer parsePointer(const std::string& pointer) {
+        try {
+            return nlohmann::json::json_pointer(pointer);
+        } catch (const std::exception& e) {
+            throw std::runtime_error("Invalid config path '" + pointer + "': " + e.what());
+        }
+    }
 };
 %}
 
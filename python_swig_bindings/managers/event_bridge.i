@@ -0,0 +1,30 @@
+%module sdrpp_event_bridge
+
+%{
+#include "common/event_bridge.h"
+%}
+
+// Include standard library support
+%include "std_string.i"
+%include "std_vector.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in event bridge");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+// Unlike connectSourceCallbacks()/connectVFOCallbacks(), the bridge never calls into Python from
+// the thread that emitted the event. Events are queued and the event loop is woken up instead.
+%include "../common/event_bridge.h"
+
+%template(BridgedEventVector) std::vector<BridgedEvent>;
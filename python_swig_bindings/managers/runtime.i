@@ -0,0 +1,107 @@
+%module sdrpp_runtime
+
+%{
+#include "../core/src/headless.h"
+#include "../core/src/signal_path/signal_path.h"
+#include <chrono>
+%}
+
+// Include standard library support
+%include "std_string.i"
+%include "std_vector.i"
+
+// Thread-safe exception handling
+%exception {
+    PyThreadState *_save = PyEval_SaveThread();
+    try {
+        $action
+    } catch (const std::exception& e) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, e.what());
+    } catch (...) {
+        PyEval_RestoreThread(_save);
+        SWIG_exception(SWIG_RuntimeError, "Unknown exception in runtime");
+    }
+    PyEval_RestoreThread(_save);
+}
+
+%rename(Runtime) HeadlessRuntime;
+
+// Headless SDR++ core: config, source modules, IQ front end and VFO manager, without any
+// GLFW/ImGui initialization. Only one runtime can exist per process since the core is global.
+//
+//   with sdrpp.Runtime("/var/lib/sdrpp") as rt:
+//       rt.selectSource("RTL-SDR")
+//       rt.tune(100e6)
+//       rt.start()
+//       helper = sdrpp.VFOHelper(rt.getVFOManager())
+%inline %{
+class HeadlessRuntime {
+public:
+    HeadlessRuntime(const std::string& root, const std::vector<std::string>& modules = std::vector<std::string>(1, "source"), bool saveConfig = false) {
+        headless::Options opts;
+        opts.root = root;
+        opts.moduleFilter = modules;
+        opts.saveConfig = saveConfig;
+
+        auto start = std::chrono::high_resolution_clock::now();
+        if (headless::init(opts) < 0) {
+            throw std::runtime_error("Could not initialize the SDR++ core (already running or invalid root directory)");
+        }
+        startupMs = std::chrono::duration<double, std::milli>(std::chrono::high_resolution_clock::now() - start).count();
+        running = true;
+    }
+
+    ~HeadlessRuntime() {
+        shutdown();
+    }
+
+    // Stop the source, end all modules and save the config if enabled
+    void shutdown() {
+        if (!running) { return; }
+        headless::end();
+        running = false;
+    }
+
+    bool isRunning() { return running; }
+    double getStartupMs() { return startupMs; }
+
+    std::vector<std::string> getSourceNames() { return sigpath::sourceManager.getSourceNames(); }
+
+    void selectSource(const std::string& name) {
+        auto names = sigpath::sourceManager.getSourceNames();
+        if (std::find(names.begin(), names.end(), name) == names.end()) {
+            throw std::runtime_error("Unknown source '" + name + "'");
+        }
+        sigpath::sourceManager.selectSource(name);
+    }
+
+    void tune(double frequency) { sigpath::sourceManager.tune(frequency); }
+    void start() { sigpath::sourceManager.start(); }
+    void stop() { sigpath::sourceManager.stop(); }
+
+    // Sample rate after decimation, as seen by VFOs
+    double getSampleRate() { return sigpath::iqFrontEnd.getEffectiveSamplerate(); }
+    void setDecimation(int ratio) { sigpath::iqFrontEnd.setDecimation(ratio); }
+    void setFFTSize(int size) { sigpath::iqFrontEnd.setFFTSize(size); }
+    void setFFTRate(double rate) { sigpath::iqFrontEnd.setFFTRate(rate); }
+
+    SourceManager* getSourceManager() { return &sigpath::sourceManager; }
+    VFOManager* getVFOManager() { return &sigpath::vfoManager; }
+
+private:
+    bool running = false;
+    double startupMs = 0.0;
+};
+%}
+
+%extend HeadlessRuntime {
+%pythoncode %{
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+%}
+}
@@ -1,7 +1,8 @@
 %module sdrpp_source_manager
 
 %{
-#include "../../core/src/signal_path/source.h"
+#include "../core/src/signal_path/source.h"
+#include <map>
 %}
 
 // Include standard library support
@@ -26,6 +27,10 @@
     PyEval_RestoreThread(_save);
 }
 
+// Binding internals aren't part of the Python API
+%ignore SourceCallbackBinding;
+%ignore sourceCallbackBindings;
+
 // Define a Python-friendly callback handler for source events
 %inline %{
 class SourceEventHandler {
@@ -36,36 +41,70 @@ public:
     virtual void onRetune(double frequency) {}
 };
 
-// Helper to connect Python callbacks to C++ events
-void connectSourceCallbacks(SourceManager* mgr, SourceEventHandler* handler) {
-    if (!mgr || !handler) return;
-    
-    // Save current PyThreadState
-    PyGILState_STATE gstate;
-    
-    mgr->onSourceRegistered.connect([handler](std::string name) {
-        // Acquire the GIL before calling into Python
-        gstate = PyGILState_Ensure();
-        handler->onSourceRegistered(name);
-        // Release the GIL
+// Event handlers forwarding SourceManager events to a SourceEventHandler
+struct SourceCallbackBinding {
+    SourceManager* mgr;
+    SourceEventHandler* handler;
+    EventHandler<std::string> registeredHandler;
+    EventHandler<std::string> unregisterHandler;
+    EventHandler<double> retuneHandler;
+
+    static void onRegistered(std::string name, void* ctx) {
+        SourceCallbackBinding* _this = (SourceCallbackBinding*)ctx;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        _this->handler->onSourceRegistered(name);
         PyGILState_Release(gstate);
-    });
-    
-    mgr->onSourceUnregister.connect([handler](std::string name) {
-        // Acquire the GIL before calling into Python
-        gstate = PyGILState_Ensure();
-        handler->onSourceUnregistered(name);
-        // Release the GIL
+    }
+
+    static void onUnregister(std::string name, void* ctx) {
+        SourceCallbackBinding* _this = (SourceCallbackBinding*)ctx;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        _this->handler->onSourceUnregistered(name);
         PyGILState_Release(gstate);
-    });
-    
-    mgr->onRetune.connect([handler](double freq) {
-        // Acquire the GIL before calling into Python
-        gstate = PyGILState_Ensure();
-        handler->onRetune(freq);
-        // Release the GIL
+    }
+
+    static void onRetune(double freq, void* ctx) {
+        SourceCallbackBinding* _this = (SourceCallbackBinding*)ctx;
+        PyGILState_STATE gstate = PyGILState_Ensure();
+        _this->handler->onRetune(freq);
         PyGILState_Release(gstate);
-    });
+    }
+};
+
+static std::map<SourceEventHandler*, SourceCallbackBinding*> sourceCallbackBindings;
+
+// Helper to connect Python callbacks to C++ events.
+// Callbacks run on the thread emitting the event, with the GIL held. The handler must stay
+// alive until disconnectSourceCallbacks() is called.
+void connectSourceCallbacks(SourceManager* mgr, SourceEventHandler* handler) {
+    if (!mgr || !handler) return;
+    if (sourceCallbackBindings.find(handler) != sourceCallbackBindings.end()) {
+        throw std::runtime_error("Handler is already connected");
+    }
+
+    SourceCallbackBinding* binding = new SourceCallbackBinding;
+    binding->mgr = mgr;
+    binding->handler = handler;
+    binding->registeredHandler = EventHandler<std::string>(SourceCallbackBinding::onRegistered, binding);
+    binding->unregisterHandler = EventHandler<std::string>(SourceCallbackBinding::onUnregister, binding);
+    binding->retuneHandler = EventHandler<double>(SourceCallbackBinding::onRetune, binding);
+
+    mgr->onSourceRegistered.bindHandler(&binding->registeredHandler);
+    mgr->onSourceUnregister.bindHandler(&binding->unregisterHandler);
+    mgr->onRetune.bindHandler(&binding->retuneHandler);
+    sourceCallbackBindings[handler] = binding;
+}
+
+void disconnectSourceCallbacks(SourceEventHandler* handler) {
+    auto it = sourceCallbackBindings.find(handler);
+    if (it == sourceCallbackBindings.end()) { return; }
+
+    SourceCallbackBinding* binding = it->second;
+    binding->mgr->onSourceRegistered.unbindHandler(&binding->registeredHandler);
+    binding->mgr->onSourceUnregister.unbindHandler(&binding->unregisterHandler);
+    binding->mgr->onRetune.unbindHandler(&binding->retuneHandler);
+    sourceCallbackBindings.erase(it);
+    delete binding;
 }
 
 // Helper class for SDRPlay-specific operations
@@ -1,13 +1,19 @@
 %module sdrpp_vfo_manager
 
 %{
-#include "../../core/src/signal_path/vfo_manager.h"
-#include "../../core/src/dsp/stream.h"
+#include "../core/src/signal_path/vfo_manager.h"
+#include "../core/src/signal_path/signal_path.h"
+#include "../core/src/dsp/stream.h"
+#include "common/stream_wrapper.h"
+#include <chrono>
+#include <cmath>
+#include <map>
 %}
 
 // Include standard library support
 %include "std_string.i"
 %include "std_map.i"
+%include "std_vector.i"
 
 // Thread-safe exception handling
 %exception {
@@ -27,8 +33,29 @@
 // Handle callback mechanisms with directors
 %feature("director") VFOEventHandler;
 
+// Binding internals aren't part of the Python API
+%ignore VFOCallbackBinding;
+%ignore vfoCallbackBindings;
+
+// Keep the GUI side of VFOs out of the Python API, VFOs are placed with the VFO_REF_* constants
+%ignore VFOManager::VFO::wtfVFO;
+%ignore VFOManager::VFO::dspVFO;
+%ignore VFOManager::VFO::setColor;
+%ignore VFOManager::setColor;
+%ignore VFOManager::updateFromWaterfall;
+%ignore VFOManager::onVfoCreated;
+%ignore VFOManager::onVfoDelete;
+%ignore VFOManager::onVfoDeleted;
+
 // Define a Python-friendly callback handler for VFO events
 %inline %{
+// Same values as ImGui::WaterfallVFO's references
+enum {
+    VFO_REF_LOWER,
+    VFO_REF_CENTER,
+    VFO_REF_UPPER
+};
+
 class VFOEventHandler {
 public:
     virtual ~VFOEventHandler() {}
@@ -37,45 +64,73 @@ public:
     virtual void onSamplesReceived(void* complex_samples, int sample_count, void* ctx) {}
 };
 
-// Helper to connect Python callbacks to VFO events
-void connectVFOCallbacks(VFOManager* mgr, const std::string& vfoName, VFOEventHandler* handler) {
-    if (!mgr || !handler) return;
-    
-    // Save current PyThreadState
-    PyGILState_STATE gstate;
-    
-    // Connect to VFO creation event
-    mgr->onVFOCreated.connect([handler](std::string name) {
-        // Acquire the GIL before calling into Python
+// Event handlers and sample reader forwarding a VFO's events and samples to a VFOEventHandler
+struct VFOCallbackBinding {
+    VFOManager* mgr;
+    VFOEventHandler* handler;
+    EventHandler<VFOManager::VFO*> createdHandler;
+    EventHandler<std::string> deletedHandler;
+    StreamWrapper samples;
+
+    static void onCreated(VFOManager::VFO* vfo, void* ctx) {
+        VFOCallbackBinding* _this = (VFOCallbackBinding*)ctx;
         PyGILState_STATE gstate = PyGILState_Ensure();
-        handler->onVFOCreated(name);
-        // Release the GIL
+        _this->handler->onVFOCreated(vfo->getName());
         PyGILState_Release(gstate);
-    });
-    
-    // Connect to VFO deletion event
-    mgr->onVFODelete.connect([handler](std::string name) {
-        // Acquire the GIL before calling into Python
+    }
+
+    static void onDeleted(std::string name, void* ctx) {
+        VFOCallbackBinding* _this = (VFOCallbackBinding*)ctx;
         PyGILState_STATE gstate = PyGILState_Ensure();
-        handler->onVFODeleted(name);
-        // Release the GIL
+        _this->handler->onVFODeleted(name);
         PyGILState_Release(gstate);
-    });
-    
+    }
+};
+
+static std::map<VFOEventHandler*, VFOCallbackBinding*> vfoCallbackBindings;
+
+// Helper to connect Python callbacks to VFO events, and to the samples of a VFO if it exists.
+// Callbacks run on the thread emitting the event (or the sample reader thread) with the GIL
+// held. The handler must stay alive until disconnectVFOCallbacks() is called.
+void connectVFOCallbacks(VFOManager* mgr, const std::string& vfoName, VFOEventHandler* handler) {
+    if (!mgr || !handler) return;
+    if (vfoCallbackBindings.find(handler) != vfoCallbackBindings.end()) {
+        throw std::runtime_error("Handler is already connected");
+    }
+
+    VFOCallbackBinding* binding = new VFOCallbackBinding;
+    binding->mgr = mgr;
+    binding->handler = handler;
+    binding->createdHandler = EventHandler<VFOManager::VFO*>(VFOCallbackBinding::onCreated, binding);
+    binding->deletedHandler = EventHandler<std::string>(VFOCallbackBinding::onDeleted, binding);
+    mgr->onVfoCreated.bindHandler(&binding->createdHandler);
+    mgr->onVfoDeleted.bindHandler(&binding->deletedHandler);
+
     // Connect to data stream from VFO if it exists
-    auto vfo = mgr->getVFO(vfoName);
+    VFOManager::VFO* vfo = mgr->getVFO(vfoName);
     if (vfo) {
-        vfo->output.bindHandler([handler](dsp::complex_t* data, int count, void* ctx) {
-            // Acquire the GIL before calling into Python
+        binding->samples.connect(vfo->output);
+        binding->samples.setCallback([handler](dsp::complex_t* data, int count) {
             PyGILState_STATE gstate = PyGILState_Ensure();
-            
-            // Call the Python callback
-            handler->onSamplesReceived(data, count, ctx);
-            
-            // Release the GIL
+            handler->onSamplesReceived(data, count, NULL);
             PyGILState_Release(gstate);
-        }, nullptr);
+        });
     }
+
+    vfoCallbackBindings[handler] = binding;
+}
+
+// Must be called before deleting the VFO whose samples are delivered to the handler
+void disconnectVFOCallbacks(VFOEventHandler* handler) {
+    auto it = vfoCallbackBindings.find(handler);
+    if (it == vfoCallbackBindings.end()) { return; }
+
+    VFOCallbackBinding* binding = it->second;
+    binding->samples.disconnect();
+    binding->mgr->onVfoCreated.unbindHandler(&binding->createdHandler);
+    binding->mgr->onVfoDeleted.unbindHandler(&binding->deletedHandler);
+    vfoCallbackBindings.erase(it);
+    delete binding;
 }
 
 // Helper to provide numpy-friendly sample handling
@@ -96,108 +151,182 @@ PyObject* getSamplesAsComplex(dsp::complex_t* samples, int count) {
     return result;
 }
 
+// One operation of a VFO plan
+// action is one of "create", "delete" or "update". For updates, negative bandwidth or
+// sample rate values and a NaN offset mean "leave unchanged". Created VFOs without an
+// offset are placed at 0.
+struct VFOPlanEntry {
+    std::string action = "update";
+    std::string name;
+    double offset = NAN;
+    double bandwidth = -1.0;
+    double sampleRate = -1.0;
+    double minBandwidth = 0.0;
+    double maxBandwidth = 0.0;
+    bool bandwidthLocked = false;
+    int reference = VFO_REF_CENTER;
+};
+
+struct VFOPlanEntryResult {
+    std::string name;
+    bool ok;
+    std::string error;
+};
+
+struct VFOPlanResult {
+    std::vector<VFOPlanEntryResult> entries;
+    int applied = 0;
+    int failed = 0;
+    double latencyMs = 0.0;
+};
+
 // Helper class for working with VFOs
 class VFOHelper {
 public:
     VFOHelper(VFOManager* mgr) : vfoMgr(mgr) {}
     
-    // Create a VFO with given parameters
+    // Create a VFO centered on the given offset from the tuned frequency
     bool createVFO(const std::string& name, double frequency, double sampleRate, double bandwidth) {
         if (!vfoMgr) return false;
-        
-        try {
-            vfoMgr->createVFO(name, frequency, sampleRate, bandwidth);
-            return true;
-        } catch (...) {
-            return false;
-        }
+        return vfoMgr->createVFO(name, VFO_REF_CENTER, frequency, bandwidth, sampleRate, bandwidth, bandwidth, false) != NULL;
     }
     
     // Delete a VFO by name
     bool deleteVFO(const std::string& name) {
         if (!vfoMgr) return false;
-        
-        try {
-            vfoMgr->deleteVFO(name);
-            return true;
-        } catch (...) {
-            return false;
-        }
+        VFOManager::VFO* vfo = vfoMgr->getVFO(name);
+        if (!vfo) return false;
+        vfoMgr->deleteVFO(vfo);
+        return true;
     }
     
-    // Set VFO frequency
+    // Set VFO offset from the tuned frequency
     bool setVFOFrequency(const std::string& name, double frequency) {
-        if (!vfoMgr) return false;
-        
-        try {
-            vfoMgr->setVFOFrequency(name, frequency);
-            return true;
-        } catch (...) {
-            return false;
-        }
+        if (!vfoMgr || !vfoMgr->vfoExists(name)) return false;
+        vfoMgr->setOffset(name, frequency);
+        return true;
     }
     
-    // Get VFO frequency
+    // Get VFO offset from the tuned frequency
     double getVFOFrequency(const std::string& name) {
-        if (!vfoMgr) return 0.0;
-        
-        try {
-            return vfoMgr->getVFOFrequency(name);
-        } catch (...) {
-            return 0.0;
-        }
+        if (!vfoMgr || !vfoMgr->vfoExists(name)) return 0.0;
+        return vfoMgr->getOffset(name);
     }
     
-    // Set VFO sample rate
+    // Set VFO sample rate, keeping its bandwidth
     bool setVFOSampleRate(const std::string& name, double sampleRate) {
-        if (!vfoMgr) return false;
-        
-        try {
-            vfoMgr->setVFOSampleRate(name, sampleRate);
-            return true;
-        } catch (...) {
-            return false;
-        }
+        if (!vfoMgr || !vfoMgr->vfoExists(name)) return false;
+        vfoMgr->setSampleRate(name, sampleRate, vfoMgr->getBandwidth(name));
+        return true;
     }
     
     // Get VFO sample rate
     double getVFOSampleRate(const std::string& name) {
-        if (!vfoMgr) return 0.0;
-        
-        try {
-            return vfoMgr->getVFOSampleRate(name);
-        } catch (...) {
-            return 0.0;
-        }
+        if (!vfoMgr || !vfoMgr->vfoExists(name)) return 0.0;
+        return vfoMgr->getSampleRate(name);
     }
     
     // Set VFO bandwidth
     bool setVFOBandwidth(const std::string& name, double bandwidth) {
-        if (!vfoMgr) return false;
-        
-        try {
-            vfoMgr->setVFOBandwidth(name, bandwidth);
-            return true;
-        } catch (...) {
-            return false;
-        }
+        if (!vfoMgr || !vfoMgr->vfoExists(name)) return false;
+        vfoMgr->setBandwidth(name, bandwidth);
+        return true;
     }
     
     // Get VFO bandwidth
     double getVFOBandwidth(const std::string& name) {
-        if (!vfoMgr) return 0.0;
-        
-        try {
-            return vfoMgr->getVFOBandwidth(name);
-        } catch (...) {
-            return 0.0;
+        if (!vfoMgr || !vfoMgr->vfoExists(name)) return 0.0;
+        return vfoMgr->getBandwidth(name);
+    }
+    
+    // Get the sample stream of a VFO, for use with StreamReader or PythonStreamHelper
+    dsp::stream<dsp::complex_t>* getVFOStream(const std::string& name) {
+        if (!vfoMgr) return NULL;
+        VFOManager::VFO* vfo = vfoMgr->getVFO(name);
+        return vfo ? vfo->output : NULL;
+    }
+    
+    // Create, delete and retune many VFOs in a single call. The whole plan is applied under the
+    // IQ front end's VFO lock with a single pause of the IQ splitter, instead of one per VFO.
+    VFOPlanResult applyVFOPlan(const std::vector<VFOPlanEntry>& plan) {
+        VFOPlanResult result;
+        if (!vfoMgr) { throw std::runtime_error("VFOHelper has no VFO manager"); }
+        result.entries.reserve(plan.size());
+
+        // Ends the batch even if applying the plan throws
+        struct BatchGuard {
+            BatchGuard() { sigpath::iqFrontEnd.beginVFOBatch(); }
+            ~BatchGuard() { sigpath::iqFrontEnd.endVFOBatch(); }
+        };
+
+        auto start = std::chrono::high_resolution_clock::now();
+        {
+            BatchGuard batch;
+            for (const auto& entry : plan) {
+                VFOPlanEntryResult res = { entry.name, true, "" };
+                try {
+                    applyEntry(entry);
+                }
+                catch (const std::exception& e) {
+                    res.ok = false;
+                    res.error = e.what();
+                }
+                if (res.ok) { result.applied++; } else { result.failed++; }
+                result.entries.push_back(res);
+            }
         }
+        auto end = std::chrono::high_resolution_clock::now();
+
+        result.latencyMs = std::chrono::duration<double, std::milli>(end - start).count();
+        return result;
     }
     
 private:
+    void applyEntry(const VFOPlanEntry& entry) {
+        if (entry.action == "create") {
+            if (entry.bandwidth <= 0 || entry.sampleRate <= 0) {
+                throw std::runtime_error("create requires a bandwidth and a sample rate");
+            }
+            double minBw = (entry.minBandwidth > 0) ? entry.minBandwidth : entry.bandwidth;
+            double maxBw = (entry.maxBandwidth > 0) ? entry.maxBandwidth : entry.bandwidth;
+            double offset = std::isnan(entry.offset) ? 0.0 : entry.offset;
+            if (!vfoMgr->createVFO(entry.name, entry.reference, offset, entry.bandwidth, entry.sampleRate, minBw, maxBw, entry.bandwidthLocked)) {
+                throw std::runtime_error("VFO already exists or has an invalid name");
+            }
+            return;
+        }
+
+        // Delete and update require an existing VFO
+        VFOManager::VFO* vfo = vfoMgr->getVFO(entry.name);
+        if (!vfo) {
+            throw std::runtime_error("VFO does not exist");
+        }
+
+        if (entry.action == "delete") {
+            vfoMgr->deleteVFO(vfo);
+        }
+        else if (entry.action == "update") {
+            if (entry.sampleRate > 0) {
+                vfo->setSampleRate(entry.sampleRate, (entry.bandwidth > 0) ? entry.bandwidth : vfo->getBandwidth());
+            }
+            else if (entry.bandwidth > 0) {
+                vfo->setBandwidth(entry.bandwidth);
+            }
+            if (!std::isnan(entry.offset)) {
+                vfo->setOffset(entry.offset);
+            }
+        }
+        else {
+            throw std::runtime_error("Unknown action '" + entry.action + "'");
+        }
+    }
+
     VFOManager* vfoMgr;
 };
 %}
 
+%template(VFOPlanEntryVector) std::vector<VFOPlanEntry>;
+%template(VFOPlanEntryResultVector) std::vector<VFOPlanEntryResult>;
+
 // Process the VFO manager header
 %include "../../core/src/signal_path/vfo_manager.h"
@@ -0,0 +1,8 @@
+%module sdrpp_config
+
+// Config manager bindings
+// Loaded on first use of sdrpp.config, see sdrpp/__init__.py
+
+%include "../common/module_base.i"
+
+%include "../managers/config_manager.i"
@@ -0,0 +1,9 @@
+%module sdrpp_dsp
+
+// Batch DSP blocks for numpy arrays and DSP benchmarks
+// Loaded on first use of sdrpp.dsp, see sdrpp/__init__.py
+
+%include "../common/module_base.i"
+
+%include "../dsp/blocks.i"
+%include "../dsp/bench.i"
@@ -0,0 +1,8 @@
+%module sdrpp_recording
+
+// Chunked IQ recordings
+// Loaded on first use of sdrpp.recording, see sdrpp/__init__.py
+
+%include "../common/module_base.i"
+
+%include "../dsp/recording.i"
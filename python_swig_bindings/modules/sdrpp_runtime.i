@@ -0,0 +1,10 @@
+%module sdrpp_runtime
+
+// Headless core runtime, DSP metrics and scheduler
+// Loaded on first use of sdrpp.runtime, see sdrpp/__init__.py
+
+%include "../common/module_base.i"
+
+%include "../managers/runtime.i"
+%include "../dsp/metrics.i"
+%include "../dsp/scheduler.i"
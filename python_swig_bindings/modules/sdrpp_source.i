@@ -0,0 +1,10 @@
+%module sdrpp_source
+
+// Source manager, file source and push source bindings
+// Loaded on first use of sdrpp.source, see sdrpp/__init__.py
+
+%include "../common/module_base.i"
+
+%include "../managers/source_manager.i"
+%include "../dsp/file_source.i"
+%include "../dsp/push_source.i"
@@ -0,0 +1,19 @@
+%module sdrpp_stream
+
+// DSP streams, stream readers, FFT tap and CFAR detector, shared memory IQ, pre-trigger capture ring, the server protocol client, the wideband scanner and the event loop plumbing used by sdrpp.aio
+// Loaded on first use of sdrpp.stream, see sdrpp/__init__.py
+
+%include "../common/module_base.i"
+
+%include "../common/wakeup.i"
+%include "../managers/event_bridge.i"
+%include "../dsp/stream.i"
+%include "../dsp/stream_reader.i"
+%include "../dsp/channelizer.i"
+%include "../dsp/fft_tap.i"
+%include "../dsp/detection_tap.i"
+%include "../dsp/shared_ring.i"
+%include "../dsp/capture_ring.i"
+%include "../dsp/server_client.i"
+%include "../dsp/wideband_scanner.i"
+%include "../dsp/types.i"
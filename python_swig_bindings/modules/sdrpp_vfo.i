@@ -0,0 +1,8 @@
+%module sdrpp_vfo
+
+// VFO manager bindings
+// Loaded on first use of sdrpp.vfo, see sdrpp/__init__.py
+
+%include "../common/module_base.i"
+
+%include "../managers/vfo_manager.i"
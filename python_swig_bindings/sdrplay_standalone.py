@@ -3,8 +3,9 @@
 SDRPlay Standalone Test Module
 
 This module provides a direct Python interface to test SDRPlay functionality
-without requiring the full SDR++ Python bindings. It uses subprocess to
-communicate with SDR++ for controlling the SDRPlay device.
+without requiring the full SDR++ Python bindings. It talks to a long-lived
+headless SDR++ controller (see sdrpp.controller) for controlling the SDRPlay
+device, started once and queried over a local socket afterwards.
 
 This aligns with the test-driven development approach by letting us verify
 SDRPlay functionality while the full Python bindings are being developed.
@@ -12,12 +13,16 @@ SDRPlay functionality while the full Python bindings are being developed.
 
 import os
 import sys
-import time
-import json
 import subprocess
 import threading
 from typing import List, Dict, Any, Optional, Tuple, Callable
 
+from sdrpp.config_file import read_config
+from sdrpp.controller import Controller, ControllerError, shared_controller, release_shared_controller
+
+# Name the SDRplay source module registers with the source manager
+SDRPLAY_SOURCE = "SDRplay"
+
 class SDRPlayDevice:
     """Class to control SDRPlay devices through SDR++"""
     
@@ -25,13 +30,14 @@ class SDRPlayDevice:
         """Initialize the SDRPlay device controller
         
         Args:
-            sdrpp_path: Path to SDR++ executable, if None will search in common locations
+            sdrpp_path: Path to SDR++ executable, if None will search in common locations.
+                Only informative, the device is controlled through a headless controller.
         """
         self.sdrpp_path = sdrpp_path
         if not self.sdrpp_path:
             self.sdrpp_path = self._find_sdrpp()
             
-        self.process = None
+        self.controller: Optional[Controller] = None
         self.config_path = None
         self.running = False
         self.device_info = {}
@@ -78,24 +84,34 @@ class SDRPlayDevice:
     def is_sdrplay_available(self) -> bool:
         """Check if SDRPlay device is available on the system
         
-        This reads the SDR++ config to see if SDRPlay devices are detected
+        When the controller is running, it is asked which sources were registered.
+        Otherwise this reads the SDR++ config to see if SDRPlay devices are detected
         
         Returns:
             True if SDRPlay device is available, False otherwise
         """
+        if self.controller is not None and self.controller.is_alive():
+            try:
+                if SDRPLAY_SOURCE not in self.controller.call("sources"):
+                    return False
+                self.device_info = self._controller_info()
+                return True
+            except ControllerError as e:
+                print(f"Error querying the controller: {e}")
+                return False
+
         # Get default config path
         config_path = self._get_config_path()
         if not config_path or not os.path.exists(config_path):
             return False
             
-        # Read config
+        # Read config, only parsed again when the file changed
         try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            config = read_config(config_path)
                 
             # Check if SDRPlay source is listed in available sources
             if 'sources' in config and 'sdrplay' in config['sources']:
-                self.device_info = config['sources']['sdrplay']
+                self.device_info = dict(config['sources']['sdrplay'])
                 return True
                 
         except Exception as e:
@@ -128,56 +144,60 @@ class SDRPlayDevice:
                     return path
                     
         return None
+
+    def _get_root(self) -> str:
+        """Get the SDR++ root directory, the one holding config.json"""
+        config_path = self._get_config_path()
+        if config_path:
+            return os.path.dirname(config_path)
+        if sys.platform == 'win32':
+            return os.path.join(os.environ.get('APPDATA', ''), 'sdrpp')
+        return os.path.join(os.path.expanduser('~'), '.config', 'sdrpp')
+
+    def _controller_info(self) -> Dict[str, Any]:
+        """Device information from the running controller and the SDRplay module config"""
+        status = self.controller.call("status")
+        info = {
+            "source": SDRPLAY_SOURCE,
+            "samplerate": status["samplerate"],
+            "startup_ms": status["startupMs"],
+        }
+        module_config = os.path.join(self._get_root(), 'sdrplay_config.json')
+        if os.path.exists(module_config):
+            config = read_config(module_config)
+            if config.get('device'):
+                info["device"] = config['device']
+        return info
+        
+    def start_sdrpp(self, timeout: float = 30.0) -> bool:
+        """Start the headless SDR++ controller with the SDRplay source module, or attach to it
         
-    def start_sdrpp(self) -> bool:
-        """Start SDR++ application
+        Returns as soon as the controller is ready. The controller is shared by all devices using
+        the same config directory, so starting it again is immediate.
         
         Returns:
-            True if SDR++ was started successfully, False otherwise
+            True if the controller is running, False otherwise
         """
-        if not self.sdrpp_path:
-            print("SDR++ executable not found")
-            return False
-            
         try:
-            # Start SDR++ process
-            self.process = subprocess.Popen([self.sdrpp_path],
-                                          stdout=subprocess.PIPE,
-                                          stderr=subprocess.PIPE)
+            self.controller = shared_controller(self._get_root(), ["sdrplay"], timeout=timeout)
             self.running = True
-            
-            # Give SDR++ time to start
-            time.sleep(2)
-            
             return True
-        except Exception as e:
+        except ControllerError as e:
             print(f"Error starting SDR++: {e}")
             return False
             
     def stop_sdrpp(self) -> bool:
-        """Stop SDR++ application
+        """Shut the SDR++ controller down
         
         Returns:
             True if SDR++ was stopped successfully, False otherwise
         """
-        if self.process:
-            try:
-                # On Windows, terminate should work
-                self.process.terminate()
-                
-                # Give it time to shut down gracefully
-                try:
-                    self.process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    # Force kill if it doesn't terminate
-                    self.process.kill()
-                    
-                self.running = False
-                return True
-            except Exception as e:
-                print(f"Error stopping SDR++: {e}")
-                
-        return False
+        if self.controller is None:
+            return False
+        release_shared_controller(self._get_root())
+        self.controller = None
+        self.running = False
+        return True
         
     def get_sdrplay_info(self) -> Dict[str, Any]:
         """Get information about the SDRPlay device
@@ -193,7 +213,9 @@ class SDRPlayDevice:
     def run_basic_test(self) -> bool:
         """Run a basic test with the SDRPlay device
         
-        This starts SDR++, checks if SDRPlay device is available, and then stops SDR++
+        This starts the SDR++ controller if needed and checks if SDRPlay device is available. The
+        controller is left running so that later checks reuse it, it's shut down by stop_sdrpp()
+        or on exit.
         
         Returns:
             True if test was successful, False otherwise
@@ -212,24 +234,16 @@ class SDRPlayDevice:
                 print("Failed to start SDR++")
                 return False
                 
-            print("SDR++ started successfully")
+            print(f"SDR++ started successfully in {self.controller.info.get('startupMs', 0):.0f} ms")
             
-            # Wait a moment for SDR++ to detect devices
-            time.sleep(5)
-            
-            # Check again after starting
+            # Devices were enumerated by the time the controller is ready, check again
             sdrplay_available = self.is_sdrplay_available()
             print(f"SDRPlay device {'available' if sdrplay_available else 'not available'} after starting SDR++")
             
-            # Stop SDR++
-            self.stop_sdrpp()
-            print("SDR++ stopped")
-            
         # If device is available, print info
         if sdrplay_available:
             print("SDRPlay device information:")
-            info = self.get_sdrplay_info()
-            for key, value in info.items():
+            for key, value in self.device_info.items():
                 print(f"  {key}: {value}")
                 
         return sdrplay_available
@@ -241,12 +255,7 @@ if __name__ == "__main__":
     # Create device controller
     sdrplay = SDRPlayDevice()
     
-    # Check if SDR++ was found
-    if not sdrplay.sdrpp_path:
-        print("ERROR: SDR++ executable not found! Please specify the path manually.")
-        sys.exit(1)
-    
-    print(f"Using SDR++ at: {sdrplay.sdrpp_path}")
+    print(f"Using SDR++ config directory: {sdrplay._get_root()}")
     
     # Run basic test
     success = sdrplay.run_basic_test()
@@ -0,0 +1,160 @@
+"""
+SDR++ Python bindings
+
+Thin Python layer over the SWIG extensions. The bindings are split into submodules
+which are only imported on first use, so importing the package itself is cheap:
+
+    sdrpp.config       ConfigManager
+    sdrpp.config_file  Cached reads of config files, without the native extensions
+    sdrpp.source       SourceManager, source callbacks, file replay, WAV reader and push source
+    sdrpp.vfo          VFOManager, VFOHelper and VFO plans
+    sdrpp.stream       Stream readers, FFT tap, CFAR detector, wideband scanner, shared memory IQ, capture ring, server client, channelizer and event bridge
+    sdrpp.runtime      Headless core runtime, DSP metrics, memory report and scheduler
+    sdrpp.controller   Headless runtime in a long-lived child process, without the native extensions
+    sdrpp.recording    Chunked IQ recordings
+    sdrpp.dsp          Filters, resamplers and demodulators for numpy arrays, DSP benchmarks
+    sdrpp.batch        Parallel offline processing of directories of recordings
+    sdrpp.aio          asyncio integration
+
+The names exported by the submodules are also available from the package itself
+(eg. sdrpp.VFOHelper), which imports the submodule providing them on first access.
+"""
+
+import importlib
+
+_SUBMODULES = ("config", "config_file", "source", "vfo", "stream", "runtime", "controller", "recording", "dsp", "batch", "aio")
+
+# Package level names and the submodule providing them
+_EXPORTS = {
+    # sdrpp.config
+    "ConfigManager": "config",
+    "JsonHelper": "config",
+    # sdrpp.config_file
+    "read_config": "config_file",
+    "config_value": "config_file",
+    # sdrpp.source
+    "SourceManager": "source",
+    "SourceEventHandler": "source",
+    "SDRPlayHelper": "source",
+    "connectSourceCallbacks": "source",
+    "disconnectSourceCallbacks": "source",
+    "FileSource": "source",
+    "WavReader": "source",
+    "PushSource": "source",
+    # sdrpp.vfo
+    "VFOManager": "vfo",
+    "VFOHelper": "vfo",
+    "VFOEventHandler": "vfo",
+    "VFOPlanEntry": "vfo",
+    "VFOPlanEntryResult": "vfo",
+    "VFOPlanResult": "vfo",
+    "VFOPlanEntryVector": "vfo",
+    "VFOPlanEntryResultVector": "vfo",
+    "VFO_REF_LOWER": "vfo",
+    "VFO_REF_CENTER": "vfo",
+    "VFO_REF_UPPER": "vfo",
+    "connectVFOCallbacks": "vfo",
+    "disconnectVFOCallbacks": "vfo",
+    "getSamplesAsComplex": "vfo",
+    "apply_vfo_plan": "vfo",
+    # sdrpp.stream
+    "StreamWrapper": "stream",
+    "StreamCallback": "stream",
+    "PythonStreamHelper": "stream",
+    "StreamReader": "stream",
+    "CompactStreamReader": "stream",
+    "FFTTap": "stream",
+    "CFARDetector": "stream",
+    "CFARFrame": "stream",
+    "CFARDetection": "stream",
+    "SharedIQPublisher": "stream",
+    "SharedIQReader": "stream",
+    "CaptureRing": "stream",
+    "ServerClient": "stream",
+    "IQServer": "stream",
+    "WidebandScanner": "stream",
+    "ScannerEvent": "stream",
+    "Wakeup": "stream",
+    "EventBridge": "stream",
+    "BridgedEvent": "stream",
+    "ChannelizerHelper": "stream",
+    "ChannelizerBenchmark": "stream",
+    "benchmarkChannelizer": "stream",
+    "complexToFloatArrays": "stream",
+    "complexSamplesToList": "stream",
+    "complex_to_python": "stream",
+    "python_to_complex": "stream",
+    "complex_t": "stream",
+    "stereo_t": "stream",
+    "getSdrppVersion": "stream",
+    # sdrpp.runtime
+    "Runtime": "runtime",
+    "metrics": "runtime",
+    "metricsSnapshot": "runtime",
+    "metricsPrometheus": "runtime",
+    "resetMetrics": "runtime",
+    "memory_report": "runtime",
+    "bufferPoolStats": "runtime",
+    "setBufferPoolCacheLimit": "runtime",
+    "getBufferPoolCacheLimit": "runtime",
+    "trimBufferPool": "runtime",
+    "setDSPScheduler": "runtime",
+    "getDSPScheduler": "runtime",
+    "getDSPWorkerCount": "runtime",
+    # sdrpp.controller
+    "Controller": "controller",
+    "ControllerError": "controller",
+    "shared_controller": "controller",
+    "release_shared_controller": "controller",
+    # sdrpp.recording
+    "CIQWriter": "recording",
+    "CIQReader": "recording",
+    "PCM_TYPE_I8": "recording",
+    "PCM_TYPE_I16": "recording",
+    "PCM_TYPE_F32": "recording",
+    "Recording": "recording",
+    # sdrpp.dsp
+    "FIRFilter": "dsp",
+    "RealFIRFilter": "dsp",
+    "DecimatingFIRFilter": "dsp",
+    "PowerDecimator": "dsp",
+    "RationalResampler": "dsp",
+    "FMDemod": "dsp",
+    "AMDemod": "dsp",
+    "SSBDemod": "dsp",
+    "SSB_USB": "dsp",
+    "SSB_LSB": "dsp",
+    "SSB_DSB": "dsp",
+    "lowPassTaps": "dsp",
+    "runDSPBenchmarks": "dsp",
+    "listDSPBenchmarks": "dsp",
+    "compareDSPBenchmarks": "dsp",
+    # sdrpp.batch
+    "run_batch": "batch",
+    "iter_batch": "batch",
+    # sdrpp.aio
+    "aiter_stream": "aio",
+    "aiter_spectrum": "aio",
+    "EventWatcher": "aio",
+}
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+
+    submodule = _EXPORTS.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Cache the value so that later accesses don't go through __getattr__
+    value = getattr(importlib.import_module("." + submodule, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
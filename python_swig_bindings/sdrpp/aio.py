@@ -0,0 +1,226 @@
+"""
+asyncio integration for the SDR++ Python bindings
+
+All consumers attached to an event loop share a single socket pair. The C++ side
+(StreamReader, FFTTap, EventBridge) only writes a byte to the socket when new data is
+available, through a wakeup of its own, and the loop only wakes up the consumers whose
+wakeup fired. No Python thread is created per stream, and no director is ever called
+from a DSP thread.
+
+Example:
+    async for block in sdrpp.aiter_stream(vfo):
+        process(block)
+
+    async for power_db in sdrpp.aiter_spectrum(rate=10.0, average=4):
+        plot(power_db)
+
+    events = sdrpp.EventWatcher(source_manager=mgr)
+    freq = (await events.wait_for("retune")).value
+"""
+
+import asyncio
+import socket
+import weakref
+from typing import Any, Optional
+
+import numpy as np
+
+import _sdrpp_stream
+
+# One bridge per event loop
+_bridges = weakref.WeakKeyDictionary()
+
+
+class _LoopBridge:
+    """Socket pair watched by an event loop and shared by all of its consumers
+
+    The loop stops watching the socket and closes it once the last consumer is unregistered.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._rsock, self._wsock = socket.socketpair()
+        self._rsock.setblocking(False)
+        self._wsock.setblocking(False)
+        self._consumers = set()
+        loop.add_reader(self._rsock.fileno(), self._on_wakeup)
+
+    def new_wakeup(self) -> "_sdrpp_stream.Wakeup":
+        """Wakeup writing to the socket of this bridge, one per consumer"""
+        return _sdrpp_stream.Wakeup(self._wsock.fileno())
+
+    def register(self, consumer) -> None:
+        self._consumers.add(consumer)
+
+    def unregister(self, consumer) -> None:
+        """Unregister a consumer, whose producers must not notify its wakeup anymore"""
+        if consumer not in self._consumers:
+            return
+        self._consumers.discard(consumer)
+        if not self._consumers:
+            self._close()
+
+    def _close(self) -> None:
+        if _bridges.get(self.loop) is self:
+            del _bridges[self.loop]
+        self.loop.remove_reader(self._rsock.fileno())
+        self._rsock.close()
+        self._wsock.close()
+
+    def _on_wakeup(self) -> None:
+        try:
+            while self._rsock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        # Clear before draining so that anything arriving now triggers a new wakeup
+        for consumer in list(self._consumers):
+            if consumer.wakeup.consume():
+                consumer.wake()
+
+
+def _get_bridge(loop: Optional[asyncio.AbstractEventLoop] = None) -> _LoopBridge:
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    bridge = _bridges.get(loop)
+    if bridge is None:
+        bridge = _LoopBridge(loop)
+        _bridges[loop] = bridge
+    return bridge
+
+
+class _Consumer:
+    """Waitable flag set by the loop bridge when the wakeup of the consumer fired"""
+
+    def __init__(self, bridge: _LoopBridge):
+        self._event = asyncio.Event()
+        self.wakeup = bridge.new_wakeup()
+
+    def wake(self) -> None:
+        self._event.set()
+
+    async def wait(self) -> None:
+        await self._event.wait()
+        self._event.clear()
+
+
+async def aiter_stream(stream: Any, block_size: int = 65536, depth: int = 1000000):
+    """Asynchronously iterate over the samples of a stream
+
+    Args:
+        stream: A dsp stream or any object with an 'output' stream (eg. a VFO)
+        block_size: Maximum number of samples per yielded block
+        depth: Number of samples buffered before dropping (see StreamReader)
+
+    Yields:
+        numpy.complex64 arrays of at most block_size samples
+    """
+    stream = getattr(stream, "output", stream)
+    bridge = _get_bridge()
+    consumer = _Consumer(bridge)
+    reader = _sdrpp_stream.StreamReader(stream, depth)
+    reader.setWakeup(consumer.wakeup)
+    bridge.register(consumer)
+    reader.start()
+    try:
+        block = None
+        while True:
+            if block is None:
+                block = np.empty(block_size, dtype=np.complex64)
+            count = reader.read_into(block, 0.0)
+            if count < 0:
+                return
+            if count > 0:
+                out, block = block[:count], None
+                yield out
+                continue
+            await consumer.wait()
+    finally:
+        reader.stop()
+        reader.setWakeup(None)
+        bridge.unregister(consumer)
+
+
+async def aiter_spectrum(rate: float = 0.0, average: int = 1, max_queued: int = 16):
+    """Asynchronously iterate over the FFT frames computed by the IQ front end
+
+    Args:
+        rate: Maximum number of frames per second (unlimited if 0)
+        average: Minimum number of FFT frames averaged into each yielded frame, in linear power
+        max_queued: Number of frames buffered before dropping the oldest ones
+
+    Yields:
+        numpy.float32 arrays of power in dB, with DC in the middle
+    """
+    bridge = _get_bridge()
+    consumer = _Consumer(bridge)
+    tap = _sdrpp_stream.FFTTap(rate, average, max_queued)
+    tap.setWakeup(consumer.wakeup)
+    bridge.register(consumer)
+    tap.start()
+    try:
+        while True:
+            frame = np.empty(tap.getFFTSize(), dtype=np.float32)
+            count = tap.read_into(frame, 0.0)
+            if count < 0:
+                return
+            if count > 0:
+                yield frame[:count]
+                continue
+            await consumer.wait()
+    finally:
+        tap.stop()
+        tap.setWakeup(None)
+        bridge.unregister(consumer)
+
+
+class EventWatcher:
+    """Awaitable source and VFO manager events
+
+    Event types are "source_registered", "source_unregistered", "retune",
+    "vfo_created" and "vfo_deleted". Each event has 'type', 'name' and 'value'
+    attributes ('value' is the frequency for retune events).
+    """
+
+    def __init__(self, source_manager=None, vfo_manager=None, max_queued: int = 4096):
+        self._bridge = _get_bridge()
+        self._consumer = _Consumer(self._bridge)
+        self._events = _sdrpp_stream.EventBridge(self._consumer.wakeup, max_queued)
+        self._pending = []
+        if source_manager is not None:
+            self._events.attachSourceManager(source_manager)
+        if vfo_manager is not None:
+            self._events.attachVFOManager(vfo_manager)
+        self._bridge.register(self._consumer)
+
+    def close(self) -> None:
+        self._events.detach()
+        self._bridge.unregister(self._consumer)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.next()
+
+    async def next(self):
+        """Wait for the next event of any type"""
+        while not self._pending:
+            self._pending.extend(self._events.poll())
+            if not self._pending:
+                await self._consumer.wait()
+        return self._pending.pop(0)
+
+    async def wait_for(self, event_type: str, name: Optional[str] = None, timeout: Optional[float] = None):
+        """Wait for the next event of a given type (and name if given)
+
+        Other events received in the meantime are discarded.
+        """
+        async def _wait():
+            while True:
+                event = await self.next()
+                if event.type == event_type and (name is None or event.name == name):
+                    return event
+
+        return await asyncio.wait_for(_wait(), timeout)
@@ -0,0 +1,9 @@
+"""
+Config manager bindings
+
+Loaded on first use of sdrpp.config (or of one of its names from the sdrpp package).
+"""
+
+from _sdrpp_config import *
+
+from .config_file import config_value, read_config
@@ -0,0 +1,80 @@
+"""
+Cached reads of SDR++ config files
+
+Pure Python, so it can be used without the native extensions (eg. by sdrplay_standalone.py).
+A file is only parsed again when its modification time, size or inode changed. SDR++ replaces
+its config files with a rename when saving, so every save is picked up.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+_MISSING = object()
+
+_cache: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+_lock = threading.Lock()
+
+
+def read_config(path: str) -> Any:
+    """Parsed contents of a JSON config file
+
+    The returned object is shared by all callers and must not be modified.
+
+    Raises:
+        OSError: The file can't be read
+        ValueError: The file isn't valid JSON
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        conf = json.load(f)
+
+    with _lock:
+        _cache[path] = (key, conf)
+    return conf
+
+
+def config_value(path: str, pointer: str, default: Any = None) -> Any:
+    """Value at a JSON pointer (eg. "/sources/sdrplay") of a config file, or default if missing
+
+    Like read_config(), the returned value is shared and must not be modified.
+    """
+    try:
+        value = read_config(path)
+    except (OSError, ValueError):
+        return default
+
+    if pointer == "":
+        return value
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid config path '{pointer}'")
+
+    for token in pointer[1:].split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        if isinstance(value, dict):
+            value = value.get(token, _MISSING)
+        elif isinstance(value, list) and token.isdigit() and int(token) < len(value):
+            value = value[int(token)]
+        else:
+            value = _MISSING
+        if value is _MISSING:
+            return default
+    return value
+
+
+def invalidate(path: Optional[str] = None):
+    """Drop the cached contents of a file, or of all files"""
+    with _lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
@@ -0,0 +1,396 @@
+"""
+Long-lived headless SDR++ controller process
+
+Starting SDR++ to look at a device costs seconds each time. A controller instead runs a headless
+sdrpp.Runtime in a child process once and answers requests over a local socket, so every query
+after the first one takes milliseconds. The client side is pure Python, it can be used without
+the native extensions (eg. by sdrplay_standalone.py):
+
+    with Controller.start("/home/user/.config/sdrpp", modules=["sdrplay"]) as ctrl:
+        print(ctrl.call("sources"))
+        ctrl.call("tune", frequency=100e6)
+
+The child announces itself on its stdout once the runtime is initialized and the socket is
+listening, so starting never waits longer than needed. Requests are JSON lines
+{"id", "method", "params"} answered by {"id", "result"} or {"id", "error"}. Idle connections
+are kept in a pool and reused by the following calls.
+
+Run as `python -m sdrpp.controller --root DIR` to start a controller by hand.
+"""
+
+import argparse
+import atexit
+import itertools
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+# Prefix of the line announcing that the controller is ready, the rest of the output is the log
+_READY_PREFIX = "SDRPP_CONTROLLER "
+
+
+class ControllerError(RuntimeError):
+    """Error returned by the controller, or the controller couldn't be reached"""
+
+
+class Controller:
+    """Client of a controller process, with a pool of open connections"""
+
+    def __init__(self, host: str, port: int, process: Optional[subprocess.Popen] = None,
+                 info: Optional[Dict[str, Any]] = None, max_idle: int = 4, timeout: float = 10.0):
+        """Connect to a controller listening on host:port
+
+        Args:
+            process: The controller process, shut down by close() if given
+            info: Contents of the readiness announcement
+            max_idle: Number of idle connections kept open for reuse
+            timeout: Default time allowed for a request in seconds
+        """
+        self.host = host
+        self.port = port
+        self.process = process
+        self.info = info or {}
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[socket.socket]" = queue.LifoQueue(max_idle)
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    @classmethod
+    def start(cls, root: str, modules: Sequence[str] = ("source",), save_config: bool = False,
+              python: Optional[str] = None, timeout: float = 30.0, **kwargs) -> "Controller":
+        """Start a controller process on the given SDR++ root directory
+
+        Returns as soon as the controller announces it is ready.
+
+        Args:
+            modules: Only load the modules whose filename contains one of these strings
+            python: Interpreter running the controller, the current one by default
+            timeout: Time allowed for the runtime to start in seconds
+
+        Raises:
+            ControllerError: The controller failed or didn't become ready in time
+        """
+        cmd = [python or sys.executable, "-m", "sdrpp.controller", "--root", root, "--port", "0"]
+        cmd += ["--modules", ",".join(modules)]
+        if save_config:
+            cmd.append("--save-config")
+
+        # The child needs to find this package and the native modules next to it
+        env = dict(os.environ)
+        package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (package_dir, env.get("PYTHONPATH")) if p)
+
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, env=env, text=True, bufsize=1)
+
+        # Wait for the announcement on a thread, pipes can't be waited on with a timeout on Windows.
+        # The thread keeps draining the log afterwards so that the child never blocks on it.
+        announcement: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        log: List[str] = []
+
+        def read_output():
+            announced = False
+            for line in process.stdout:
+                if not announced and line.startswith(_READY_PREFIX):
+                    announced = True
+                    try:
+                        announcement.put(json.loads(line[len(_READY_PREFIX):]))
+                    except ValueError:
+                        announcement.put({"ready": False, "error": "Invalid announcement"})
+                elif not announced:
+                    log.append(line.rstrip())
+                    del log[:-20]
+            if not announced:
+                announcement.put(None)
+
+        threading.Thread(target=read_output, name="sdrpp-controller-output", daemon=True).start()
+
+        try:
+            info = announcement.get(timeout=timeout)
+        except queue.Empty:
+            info = {"ready": False, "error": f"Not ready after {timeout} s"}
+        if not info or not info.get("ready"):
+            _terminate(process, 1.0)
+            error = (info or {}).get("error", f"Exited with code {process.returncode}")
+            raise ControllerError(f"Controller failed to start: {error}\n" + "\n".join(log))
+
+        return cls("127.0.0.1", info["port"], process=process, info=info, **kwargs)
+
+    def call(self, method: str, timeout: Optional[float] = None, **params) -> Any:
+        """Run a method on the controller and return its result
+
+        Raises:
+            ControllerError: The method failed or the controller can't be reached
+        """
+        if self._closed:
+            raise ControllerError("The controller is closed")
+
+        request = json.dumps({"id": next(self._ids), "method": method, "params": params}) + "\n"
+        sock = self._checkout()
+        try:
+            sock.settimeout(self.timeout if timeout is None else timeout)
+            sock.sendall(request.encode("utf-8"))
+            response = json.loads(_read_line(sock))
+        except (OSError, ValueError) as e:
+            sock.close()
+            raise ControllerError(f"Request '{method}' failed: {e}") from None
+        self._checkin(sock)
+
+        if "error" in response:
+            raise ControllerError(response["error"])
+        return response.get("result")
+
+    def ping(self, timeout: Optional[float] = None) -> bool:
+        """Check that the controller answers"""
+        try:
+            return self.call("ping", timeout=timeout) == "pong"
+        except ControllerError:
+            return False
+
+    def is_alive(self) -> bool:
+        """The controller process is still running (always True for a controller not started here)"""
+        return self.process is None or self.process.poll() is None
+
+    def close(self, timeout: float = 5.0):
+        """Close the pooled connections and shut down the controller process if started here"""
+        if self._closed:
+            return
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.call("shutdown", timeout=timeout)
+            except ControllerError:
+                pass
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if self.process is not None:
+            _terminate(self.process, timeout)
+
+    def _checkout(self) -> socket.socket:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise ControllerError(f"Could not connect to the controller on {self.host}:{self.port}: {e}") from None
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _checkin(self, sock: socket.socket):
+        try:
+            self._idle.put_nowait(sock)
+        except queue.Full:
+            sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# Controllers shared by everything in this process, per root directory
+_shared: Dict[str, Controller] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_controller(root: str, modules: Sequence[str] = ("source",), **kwargs) -> Controller:
+    """Controller for a root directory, started on first use and reused afterwards
+
+    A controller whose process died is started again. All of them are shut down on exit.
+    """
+    root = os.path.abspath(root)
+    with _shared_lock:
+        ctrl = _shared.get(root)
+        if ctrl is not None and ctrl.is_alive():
+            return ctrl
+        ctrl = Controller.start(root, modules, **kwargs)
+        _shared[root] = ctrl
+        return ctrl
+
+
+def release_shared_controller(root: str):
+    """Shut down the shared controller of a root directory, if any"""
+    with _shared_lock:
+        ctrl = _shared.pop(os.path.abspath(root), None)
+    if ctrl is not None:
+        ctrl.close()
+
+
+@atexit.register
+def _close_shared():
+    with _shared_lock:
+        controllers = list(_shared.values())
+        _shared.clear()
+    for ctrl in controllers:
+        ctrl.close(timeout=2.0)
+
+
+def _read_line(sock: socket.socket) -> str:
+    # Responses are single lines and a connection only ever has one request in flight
+    data = bytearray()
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise OSError("Connection closed by the controller")
+        data += chunk
+    return data.decode("utf-8")
+
+
+def _terminate(process: subprocess.Popen, timeout: float):
+    try:
+        process.wait(timeout=timeout)
+        return
+    except subprocess.TimeoutExpired:
+        pass
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# Controller process side
+
+
+class _Service:
+    """Requests answered by the controller, run one at a time on the runtime"""
+
+    def __init__(self, runtime):
+        self.runtime = runtime
+        self.lock = threading.Lock()
+        self.shutdown_requested = threading.Event()
+
+    def handle(self, method: str, params: Dict[str, Any]) -> Any:
+        handler = getattr(self, "rpc_" + method, None)
+        if handler is None:
+            raise ValueError(f"Unknown method '{method}'")
+        with self.lock:
+            return handler(**params)
+
+    def rpc_ping(self):
+        return "pong"
+
+    def rpc_status(self):
+        return {
+            "pid": os.getpid(),
+            "sources": list(self.runtime.getSourceNames()),
+            "samplerate": self.runtime.getSampleRate(),
+            "startupMs": self.runtime.getStartupMs(),
+        }
+
+    def rpc_sources(self):
+        return list(self.runtime.getSourceNames())
+
+    def rpc_select_source(self, name: str):
+        self.runtime.selectSource(name)
+
+    def rpc_tune(self, frequency: float):
+        self.runtime.tune(float(frequency))
+
+    def rpc_start(self):
+        self.runtime.start()
+
+    def rpc_stop(self):
+        self.runtime.stop()
+
+    def rpc_samplerate(self):
+        return self.runtime.getSampleRate()
+
+    def rpc_shutdown(self):
+        self.shutdown_requested.set()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        service: _Service = self.server.service
+        for line in self.rfile:
+            # Malformed lines are answered with a null id
+            request = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+                response = {"id": request.get("id"), "result": service.handle(request["method"], request.get("params") or {})}
+            except Exception as e:
+                response = {"id": request.get("id") if isinstance(request, dict) else None, "error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if service.shutdown_requested.is_set():
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(root: str, host: str = "127.0.0.1", port: int = 0, modules: Sequence[str] = ("source",), save_config: bool = False):
+    """Run a controller until it is asked to shut down or its parent closes stdin"""
+    def announce(info):
+        sys.stdout.write(_READY_PREFIX + json.dumps(info) + "\n")
+        sys.stdout.flush()
+
+    try:
+        from .runtime import Runtime
+        runtime = Runtime(root, list(modules), save_config)
+        server = _Server((host, port), _Handler)
+    except Exception as e:
+        announce({"ready": False, "error": str(e)})
+        return 1
+
+    server.service = _Service(runtime)
+
+    # Also stop when the parent goes away, its end of stdin is closed then
+    def watch_parent():
+        try:
+            sys.stdin.read()
+        except (OSError, ValueError):
+            pass
+        server.service.shutdown_requested.set()
+        server.shutdown()
+
+    if not sys.stdin.isatty():
+        threading.Thread(target=watch_parent, name="sdrpp-controller-parent", daemon=True).start()
+
+    announce({"ready": True, "port": server.server_address[1], "pid": os.getpid(), "startupMs": runtime.getStartupMs()})
+    try:
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+        runtime.shutdown()
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless SDR++ controller")
+    parser.add_argument("--root", required=True, help="SDR++ root directory holding config.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="Port to listen on, any free one if 0")
+    parser.add_argument("--modules", default="source", help="Comma separated module filename filters")
+    parser.add_argument("--save-config", action="store_true", help="Save config changes to the root directory")
+    args = parser.parse_args(argv)
+    modules = [m for m in args.modules.split(",") if m]
+    return serve(args.root, args.host, args.port, modules, args.save_config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
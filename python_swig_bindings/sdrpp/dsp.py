@@ -0,0 +1,7 @@
+"""
+Batch DSP blocks for numpy arrays and DSP benchmarks
+
+Loaded on first use of sdrpp.dsp (or of one of its names from the sdrpp package).
+"""
+
+from _sdrpp_dsp import *
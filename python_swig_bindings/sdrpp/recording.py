@@ -0,0 +1,169 @@
+"""
+Chunked IQ recordings
+
+Loaded on first use of sdrpp.recording (or of one of its names from the sdrpp package).
+
+Recordings written by CIQWriter or by the recorder module in "Chunked IQ" mode can be read
+back by time range. The chunk index is searched in O(log n) and uncompressed (PCM_TYPE_F32)
+recordings are returned as read-only numpy views of the memory mapped file, without any copy:
+
+    with sdrpp.recording.open("capture.ciq") as rec:
+        iq = rec.samples(rec.start_time + 1.0, rec.start_time + 1.5)
+
+The chunks of int8/int16 recordings can also be read without widening them to complex64, as
+views of the interleaved integers with the scale of their chunk:
+
+    iq, scale = rec.compact_chunk(0)
+"""
+
+import io
+import mmap
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+import _sdrpp_recording
+from _sdrpp_recording import *
+
+# Layout of the chunk index entries, see core/src/utils/ciq.h
+INDEX_DTYPE = np.dtype([
+    ("timestamp", "<i8"),
+    ("frequency", "<f8"),
+    ("first_sample", "<u8"),
+    ("sample_count", "<u4"),
+    ("reserved", "<u4"),
+])
+
+
+# PCM block header of the compressed chunks, the type and scaler follow a 16 bit compression field
+_COMPACT_HEADER = struct.Struct("<Hf")
+_COMPACT_HEADER_SIZE = 8
+_COMPACT_TYPES = {
+    PCM_TYPE_I8: (np.int8, 128.0),
+    PCM_TYPE_I16: (np.int16, 32768.0),
+}
+
+
+class Recording:
+    """Random access reader of a chunked IQ recording
+
+    Times are in seconds since the unix epoch, as floats.
+
+    Args:
+        path: Path of the .ciq file
+    """
+
+    def __init__(self, path: str):
+        self._reader = _sdrpp_recording.CIQReader(path)
+        self._mmap: Optional[mmap.mmap] = None
+        self._samples: Optional[np.ndarray] = None
+
+        # Uncompressed samples are contiguous in the file, map them directly. Compressed chunks are
+        # mapped for compact_chunk().
+        if self._reader.getSampleCount():
+            with io.open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offset = self._reader.getDataOffset()
+        if offset >= 0 and self._mmap is not None:
+            self._samples = np.frombuffer(self._mmap, dtype=np.complex64,
+                                          count=self._reader.getSampleCount(), offset=offset)
+
+        self.index = np.zeros(self._reader.getChunkCount(), dtype=INDEX_DTYPE)
+        self._reader.index_into(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the file. Views returned by samples() must not be used afterwards."""
+        self._samples = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views are still referenced, the mapping is released with them
+                pass
+            self._mmap = None
+
+    @property
+    def sample_rate(self) -> float:
+        return self._reader.getSampleRate()
+
+    @property
+    def start_time(self) -> float:
+        return self._reader.getStartTime() / 1e9
+
+    @property
+    def end_time(self) -> float:
+        return self.start_time + len(self) / self.sample_rate
+
+    @property
+    def frequency(self) -> float:
+        """Frequency when the recording was started"""
+        return self._reader.getFrequency()
+
+    @property
+    def pcm_type(self) -> int:
+        return self._reader.getPCMType()
+
+    @property
+    def recovered(self) -> bool:
+        """True if the recording wasn't closed and its index was rebuilt"""
+        return self._reader.isRecovered()
+
+    def __len__(self) -> int:
+        return self._reader.getSampleCount()
+
+    def sample_index(self, t: float) -> int:
+        """Index of the sample recorded at time t, clamped to the recording"""
+        return self._reader.findSample(int(round(t * 1e9)))
+
+    def frequency_at(self, t: float) -> float:
+        """Frequency the recording was tuned to at time t"""
+        if not len(self.index):
+            return self.frequency
+        return float(self.index["frequency"][self._reader.findChunk(int(round(t * 1e9)))])
+
+    def read(self, offset: int, count: int) -> np.ndarray:
+        """Samples offset to offset + count, a view for uncompressed recordings and a copy otherwise"""
+        offset = max(0, min(offset, len(self)))
+        count = max(0, min(count, len(self) - offset))
+        if self._samples is not None:
+            return self._samples[offset:offset + count]
+        out = np.empty(count, dtype=np.complex64)
+        read = self._reader.read_into(out, offset)
+        return out[:read]
+
+    def compact_chunk(self, chunk: int) -> Tuple[np.ndarray, float]:
+        """Samples of a chunk as stored, without any copy, and the factor scaling them back
+
+        Returns an interleaved int8 or int16 view for compressed recordings (complex64 for
+        uncompressed ones, with a scale of 1.0). The view is only valid until close().
+        """
+        if not 0 <= chunk < len(self.index):
+            raise IndexError("Chunk index out of range")
+        count = int(self.index["sample_count"][chunk])
+        offset = self._reader.getChunkOffset(chunk)
+        if self._samples is not None:
+            first = int(self.index["first_sample"][chunk])
+            return self._samples[first:first + count], 1.0
+
+        pcm_type, scaler = _COMPACT_HEADER.unpack_from(self._mmap, offset + 2)
+        dtype, full_scale = _COMPACT_TYPES[pcm_type]
+        data = np.frombuffer(self._mmap, dtype=dtype, count=2 * count, offset=offset + _COMPACT_HEADER_SIZE)
+        return data, scaler / full_scale
+
+    def samples(self, t0: float, t1: float) -> np.ndarray:
+        """Samples recorded between times t0 and t1"""
+        first = self.sample_index(t0)
+        last = self.sample_index(t1)
+        return self.read(first, max(0, last - first))
+
+
+def open(path: str) -> Recording:
+    """Open a chunked IQ recording for random access"""
+    return Recording(path)
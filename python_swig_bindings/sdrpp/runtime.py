@@ -0,0 +1,97 @@
+"""
+Headless SDR++ core runtime, DSP metrics, memory report and scheduler
+
+Loaded on first use of sdrpp.runtime (or of one of its names from the sdrpp package).
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from _sdrpp_runtime import *
+
+# Totals and the rates computed from them
+_STREAM_RATES = {
+    "samples": "samples_per_second",
+    "buffers": "buffers_per_second",
+    "swap_wait": "swap_wait_ratio",
+    "read_wait": "read_wait_ratio",
+}
+_BLOCK_RATES = {
+    "samples": "samples_per_second",
+    "runs": "runs_per_second",
+    "busy": "load",
+    "wait": "wait_ratio",
+}
+
+
+def _add_rates(entries: List[Dict[str, Any]], previous: List[Dict[str, Any]], rates: Dict[str, str], interval: float):
+    before = {entry["id"]: entry for entry in previous}
+    for entry in entries:
+        prev = before.get(entry["id"])
+        elapsed = interval
+
+        # Use the totals of streams and blocks that showed up or were reset during the interval
+        if prev is None or entry["uptime"] < interval:
+            prev = None
+            elapsed = entry["uptime"]
+
+        for total, rate in rates.items():
+            delta = entry[total] - (prev[total] if prev else 0)
+            entry[rate] = delta / elapsed if elapsed > 0 else 0.0
+
+
+def metrics(interval: Optional[float] = None) -> Dict[str, Any]:
+    """Snapshot of the counters of all DSP streams and blocks, with rates
+
+    Streams get 'samples_per_second', 'buffers_per_second' and the fraction of time the writer
+    and reader spent waiting ('swap_wait_ratio' and 'read_wait_ratio'). Blocks get
+    'samples_per_second', 'runs_per_second', 'load' (fraction of time spent processing)
+    and 'wait_ratio'. The block with the highest load is usually the bottleneck.
+
+    Args:
+        interval: Compute the rates over this many seconds instead of since each stream and
+            block showed up. Blocks the calling thread for the interval.
+    """
+    if interval is None:
+        snap = metricsSnapshot()
+        _add_rates(snap["streams"], [], _STREAM_RATES, 0.0)
+        _add_rates(snap["blocks"], [], _BLOCK_RATES, 0.0)
+        return snap
+
+    first = metricsSnapshot()
+    time.sleep(interval)
+    snap = metricsSnapshot()
+    elapsed = snap["time"] - first["time"]
+    _add_rates(snap["streams"], first["streams"], _STREAM_RATES, elapsed)
+    _add_rates(snap["blocks"], first["blocks"], _BLOCK_RATES, elapsed)
+    return snap
+
+
+def memory_report() -> Dict[str, Any]:
+    """Breakdown of the memory taken by the buffers of the DSP streams, in bytes
+
+    Stream buffers come from a shared pool of power of two size classes, and are sized from the
+    largest buffer their writer has written (STREAM_BUFFER_SIZE samples until it first writes).
+    Returns the totals of the pool ('in_use', 'cached' for reuse, 'peak_in_use', 'cache_limit')
+    with its 'size_classes', and the 'streams' and 'blocks' sorted by decreasing 'bytes'. The
+    bytes of a block are those of its output streams. 'unattributed' is the part of 'in_use'
+    taken by streams which haven't been used yet, and by the internal streams of blocks.
+    """
+    snap = metricsSnapshot()
+    pool = bufferPoolStats()
+
+    streams = [{"id": s["id"], "name": s["name"], "type": s["type"], "bytes": s["buffer_bytes"]}
+               for s in snap["streams"]]
+    blocks = [{"id": b["id"], "name": b["name"], "type": b["type"], "outputs": b["outputs"], "bytes": b["buffer_bytes"]}
+              for b in snap["blocks"]]
+
+    streams.sort(key=lambda entry: entry["bytes"], reverse=True)
+    blocks.sort(key=lambda entry: entry["bytes"], reverse=True)
+    attributed = sum(entry["bytes"] for entry in streams)
+
+    report = dict(pool)
+    report["total"] = pool["in_use"] + pool["cached"]
+    report["unattributed"] = max(pool["in_use"] - attributed, 0)
+    report["streams"] = streams
+    report["blocks"] = blocks
+    return report
@@ -0,0 +1,7 @@
+"""
+Source manager bindings, file replay, WAV reader and push source
+
+Loaded on first use of sdrpp.source (or of one of its names from the sdrpp package).
+"""
+
+from _sdrpp_source import *
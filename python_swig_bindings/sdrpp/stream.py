@@ -0,0 +1,7 @@
+"""
+DSP stream bindings: stream readers, FFT tap, CFAR detector, wideband scanner, shared memory IQ, capture ring, server client, channelizer and event bridge
+
+Loaded on first use of sdrpp.stream (or of one of its names from the sdrpp package).
+"""
+
+from _sdrpp_stream import *
@@ -0,0 +1,50 @@
+"""
+VFO manager bindings and helpers
+
+Loaded on first use of sdrpp.vfo (or of one of its names from the sdrpp package).
+"""
+
+from typing import Any, Dict, Iterable, List
+
+import _sdrpp_vfo
+from _sdrpp_vfo import *
+
+_PLAN_FIELDS = ("action", "name", "offset", "bandwidth", "sampleRate",
+                "minBandwidth", "maxBandwidth", "bandwidthLocked", "reference")
+
+
+def apply_vfo_plan(helper: Any, plan: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create, delete and retune many VFOs in a single native call
+
+    Args:
+        helper: A VFOHelper instance
+        plan: Dicts with an 'action' ("create", "delete" or "update"), a 'name' and
+            any of 'offset', 'bandwidth', 'sampleRate', 'minBandwidth', 'maxBandwidth',
+            'bandwidthLocked' and 'reference'. Updates leave the offset, bandwidth and
+            sample rate of the VFO unchanged unless they are given.
+
+    Returns:
+        Dictionary with the per-VFO 'results', the 'applied' and 'failed' counts
+        and the total 'latency_ms' of the native apply
+    """
+    entries = _sdrpp_vfo.VFOPlanEntryVector()
+    for step in plan:
+        unknown = set(step) - set(_PLAN_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown VFO plan field(s): {', '.join(sorted(unknown))}")
+        entry = _sdrpp_vfo.VFOPlanEntry()
+        for key, value in step.items():
+            setattr(entry, key, value)
+        entries.append(entry)
+
+    result = helper.applyVFOPlan(entries)
+
+    results: List[Dict[str, Any]] = [
+        {"name": r.name, "ok": r.ok, "error": r.error} for r in result.entries
+    ]
+    return {
+        "results": results,
+        "applied": result.applied,
+        "failed": result.failed,
+        "latency_ms": result.latencyMs,
+    }
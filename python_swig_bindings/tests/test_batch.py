@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline batch processing of the SDR++ Python bindings
+This script processes generated WAV IQ recordings, so no hardware is required
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_DIR)
+
+from wav_recordings import temp_dir, write_wav
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp import batch
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 250000
+SAMPLE_COUNT = 600000
+CENTER = 100000000
+TONE_OFFSET = 20000
+
+def make_recordings(count=2):
+    """Directory of recordings with a tone TONE_OFFSET above the center over some noise"""
+    directory = temp_dir("sdrpp_batch_")
+    rng = np.random.default_rng(1)
+    t = np.arange(SAMPLE_COUNT) / SAMPLE_RATE
+    files = {}
+    for i in range(count):
+        noise = 0.01 * (rng.standard_normal(SAMPLE_COUNT) + 1j * rng.standard_normal(SAMPLE_COUNT))
+        iq = 0.3 * np.exp(2j * np.pi * TONE_OFFSET * t) + noise
+        path = os.path.join(directory, f"capture{i}_{CENTER}Hz.wav")
+        files[path] = write_wav(path, iq, SAMPLE_RATE)
+    return directory, files
+
+def strongest_sample(iq, chunk):
+    """Plain function processor, picklable since it's defined at module level"""
+    owned = np.abs(iq[chunk.lead:])
+    return [{"index": chunk.start + int(np.argmax(owned)), "magnitude": float(np.max(owned))}]
+
+def test_wav_reader():
+    """Test random access reads of a recording"""
+    try:
+        directory, files = make_recordings(1)
+        path, expected = next(iter(files.items()))
+        with sdrpp.WavReader(path) as reader:
+            if reader.getSampleRate() != SAMPLE_RATE or len(reader) != SAMPLE_COUNT:
+                print(f"Wrong format: {reader.getSampleRate()} Hz, {len(reader)} samples")
+                return False
+            middle = reader.read(123456, 1000)
+            end = reader.read(SAMPLE_COUNT - 10, 1000)
+            past = reader.read(SAMPLE_COUNT + 10, 1000)
+        if not np.allclose(middle, expected[123456:124456]) or not np.allclose(end, expected[-10:]) or len(past):
+            print("Samples don't match the file")
+            return False
+
+        mono = os.path.join(directory, "mono.wav")
+        write_wav(mono, np.zeros(100, dtype=np.complex64), SAMPLE_RATE, channels=1)
+        try:
+            sdrpp.WavReader(mono)
+            print("Single channel file should be refused")
+            return False
+        except RuntimeError:
+            pass
+        return True
+    except Exception as e:
+        print(f"Error in WAV reader test: {e}")
+        return False
+
+def test_chunk_plan():
+    """Test that the chunks cover the whole file once, with the overlap before them"""
+    try:
+        directory, files = make_recordings(1)
+        path = next(iter(files))
+        chunks = batch.plan_chunks(path, chunk_seconds=1.0, overlap_seconds=0.01)
+        print(f"{len(chunks)} chunks: {[(c.start, c.count, c.lead) for c in chunks]}")
+        if sum(c.count for c in chunks) != SAMPLE_COUNT or len(chunks) != 3:
+            return False
+        if any(c.start != i * SAMPLE_RATE for i, c in enumerate(chunks)):
+            return False
+        if chunks[0].lead != 0 or any(c.lead != 2500 for c in chunks[1:]):
+            return False
+        return all(c.frequency == CENTER for c in chunks)
+    except Exception as e:
+        print(f"Error in chunk plan test: {e}")
+        return False
+
+def test_parallel_batch():
+    """Test a chain on two files with several workers, streamed to JSON lines"""
+    try:
+        directory, files = make_recordings(2)
+        output = os.path.join(directory, "results.jsonl")
+        summaries = batch.run_batch(directory, ["power", "spectrum", "detect:threshold_db=20,fft_size=2048"],
+                                    output=output, workers=2, chunk_seconds=0.5)
+        with open(output) as f:
+            records = [json.loads(line) for line in f]
+
+        by_type = {}
+        for record in records:
+            by_type.setdefault(record["type"], []).append(record)
+        print({t: len(r) for t, r in by_type.items()})
+        if "error" in by_type or len(by_type["power"]) != 10 or len(by_type["spectrum"]) != 10:
+            return False
+        detections = by_type["detect"]
+        if len(detections) != 10 or any(abs(d["frequency"] - (CENTER + TONE_OFFSET)) > 250 for d in detections):
+            print(f"Tone not detected: {detections[:2]}")
+            return False
+        if any(abs(r["power_db"] - 10 * np.log10(0.09)) > 0.1 for r in by_type["power"]):
+            return False
+        if sorted(set((r["file"], r["time"]) for r in by_type["power"])) != sorted((p, t) for p in files for t in (0.0, 0.5, 1.0, 1.5, 2.0)):
+            return False
+
+        # The throughput of each file follows its records
+        for path in files:
+            last = max(i for i, r in enumerate(records) if r.get("file") == path and r["type"] != "file")
+            summary = [r for r in records if r["type"] == "file" and r["file"] == path]
+            if len(summary) != 1 or records.index(summary[0]) < last:
+                print("File summary missing or out of order")
+                return False
+        for s in summaries[:-1]:
+            print(f"{os.path.basename(s['file'])}: {s['samples_per_second'] / 1e6:.1f} MS/s, {s['realtime_factor']:.1f}x realtime")
+        return (len(summaries) == 3 and summaries[-1]["type"] == "batch" and summaries[-1]["samples"] == 2 * SAMPLE_COUNT
+                and all(s["samples"] == SAMPLE_COUNT and s["chunks"] == 5 and s["samples_per_second"] > 0 for s in summaries[:-1]))
+    except Exception as e:
+        print(f"Error in parallel batch test: {e}")
+        return False
+
+def test_overlap():
+    """Test that chunked demodulation drops the overlap and matches in-process processing"""
+    try:
+        directory, files = make_recordings(1)
+        chain = [batch.Demod("fm", bandwidth=12500, offset=TONE_OFFSET)]
+        parallel = [r for r in batch.iter_batch(directory, chain, workers=2, chunk_seconds=0.4, overlap_seconds=0.02)
+                    if r["type"] == "demod"]
+        serial = [r for r in batch.iter_batch(directory, chain, workers=0, chunk_seconds=0.4, overlap_seconds=0.02)
+                  if r["type"] == "demod"]
+
+        audio = sum(r["audio_samples"] for r in serial)
+        expected = SAMPLE_COUNT / SAMPLE_RATE * 25000
+        print(f"{len(serial)} chunks, {audio} audio samples instead of {expected:.0f}")
+        if len(serial) != 6 or abs(audio - expected) > 2 * len(serial):
+            return False
+        if any(r["frequency"] != CENTER + TONE_OFFSET for r in serial):
+            return False
+        key = lambda r: r["chunk"]
+        return [r["audio_samples"] for r in sorted(parallel, key=key)] == [r["audio_samples"] for r in sorted(serial, key=key)]
+    except Exception as e:
+        print(f"Error in overlap test: {e}")
+        return False
+
+def test_columnar_output():
+    """Test the .npz columns output"""
+    try:
+        directory, files = make_recordings(2)
+        output = os.path.join(directory, "results.npz")
+        batch.run_batch(os.path.join(directory, "*.wav"), ["power", "detect"], output=output, workers=2, chunk_seconds=1.0)
+        columns = batch.load_columns(output)
+        print(sorted(columns))
+        if len(columns["power.power_db"]) != 6 or columns["power.power_db"].dtype != np.float64:
+            return False
+        if len(columns["detect.frequency"]) != 6 or columns["detect.chunk"].dtype != np.int64:
+            return False
+        return set(columns["file.file"]) == set(files) and np.all(columns["file.samples_per_second"] > 0)
+    except Exception as e:
+        print(f"Error in columnar output test: {e}")
+        return False
+
+def test_function_processor():
+    """Test plain functions as processors, next to the built-in ones"""
+    try:
+        directory, files = make_recordings(1)
+        for workers in (0, 2):
+            records = list(batch.iter_batch(directory, [strongest_sample, "power"], workers=workers, chunk_seconds=1.0))
+            found = [r for r in records if r["type"] == "strongest_sample"]
+            print(f"{workers} workers: {[r['index'] for r in found]}")
+            if any(r["type"] == "error" for r in records) or len(found) != 3:
+                return False
+            if any(not (r["time"] * SAMPLE_RATE <= r["index"] < r["time"] * SAMPLE_RATE + SAMPLE_RATE) for r in found):
+                return False
+        try:
+            batch.Processor()
+            print("Processor should be abstract")
+            return False
+        except TypeError:
+            pass
+        return True
+    except Exception as e:
+        print(f"Error in function processor test: {e}")
+        return False
+
+def test_errors():
+    """Test that unreadable files and unknown processors are reported"""
+    try:
+        directory, files = make_recordings(1)
+        with open(os.path.join(directory, "broken.wav"), "wb") as f:
+            f.write(b"not a wav file")
+        records = list(batch.iter_batch(directory, ["power"], workers=0))
+        errors = [r for r in records if r["type"] == "error"]
+        if len(errors) != 1 or not errors[0]["file"].endswith("broken.wav"):
+            return False
+        try:
+            batch.parse_processor("unknown:x=1")
+            return False
+        except ValueError:
+            pass
+        if records[-1]["type"] != "batch" or records[-1]["failed_files"] != 1 or records[-1]["errors"] != 1:
+            return False
+        detect = batch.parse_processor("detect:threshold_db=6.5,fft_size=512")
+        return detect.threshold_db == 6.5 and detect.fft_size == 512
+    except Exception as e:
+        print(f"Error in errors test: {e}")
+        return False
+
+def test_command_line():
+    """Test python -m sdrpp.batch"""
+    try:
+        directory, files = make_recordings(1)
+        output = os.path.join(directory, "cli.jsonl")
+        env = dict(os.environ, PYTHONPATH=PACKAGE_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        proc = subprocess.run([sys.executable, "-m", "sdrpp.batch", directory, "--chain", "power",
+                               "--chunk", "1", "--workers", "2", "-o", output],
+                              env=env, capture_output=True, text=True, timeout=120)
+        print(proc.stderr.strip())
+        with open(output) as f:
+            types = [json.loads(line)["type"] for line in f]
+        if proc.returncode != 0 or types.count("power") != 3 or types[-2:] != ["file", "batch"]:
+            return False
+
+        # Files that can't be opened make the command fail
+        with open(os.path.join(directory, "broken.wav"), "wb") as f:
+            f.write(b"not a wav file")
+        proc = subprocess.run([sys.executable, "-m", "sdrpp.batch", directory, "--chain", "power", "--workers", "0", "-o", output],
+                              env=env, capture_output=True, text=True, timeout=120)
+        print(proc.stderr.strip())
+        return proc.returncode != 0
+    except Exception as e:
+        print(f"Error in command line test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ batch processing tests ===")
+
+    tests = [
+        ("WAV Reader", test_wav_reader),
+        ("Chunk Plan", test_chunk_plan),
+        ("Parallel Batch", test_parallel_batch),
+        ("Overlap", test_overlap),
+        ("Columnar Output", test_columnar_output),
+        ("Function Processor", test_function_processor),
+        ("Errors", test_errors),
+        ("Command Line", test_command_line),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test script for the pre-trigger capture ring of the SDR++ Python bindings
+This script captures synthetic IQ samples pushed at their samplerate, so no hardware is required
+"""
+
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import temp_dir
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp import recording
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 100000.0
+BLOCK_SIZE = 1000
+RING_SECONDS = 1.0
+
+class Feeder:
+    """Push a counter (sample i has the value i) at the samplerate from a thread"""
+
+    def __init__(self):
+        self.source = sdrpp.PushSource(SAMPLE_RATE, blockSize=BLOCK_SIZE)
+        self.ring = sdrpp.CaptureRing(RING_SECONDS, SAMPLE_RATE, self.source.getStream())
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+
+    def run(self):
+        start = time.time()
+        sent = 0
+        while self.running:
+            block = (np.arange(sent, sent + BLOCK_SIZE) + 0j).astype(np.complex64)
+            self.source.push(block)
+            sent += BLOCK_SIZE
+            delay = start + sent / SAMPLE_RATE - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+    def __enter__(self):
+        self.ring.start()
+        self.source.start()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.source.stop()
+        self.thread.join()
+        self.ring.stop()
+
+def is_contiguous(samples):
+    return len(samples) > 0 and np.array_equal(np.diff(samples.real), np.ones(len(samples) - 1))
+
+def test_pre_and_post_trigger():
+    """Test a snapshot from before a trigger to after it"""
+    try:
+        with Feeder() as feeder:
+            time.sleep(1.5)
+            trigger = time.time()
+            start = time.perf_counter()
+            iq = feeder.ring.snapshot(trigger - 0.5, trigger + 0.3)
+            waited = time.perf_counter() - start
+
+            print(f"Snapshot of {len(iq)} samples after waiting {waited * 1000.0:.0f} ms for the post-trigger part")
+            if abs(len(iq) - 0.8 * SAMPLE_RATE) > 2 * BLOCK_SIZE or not is_contiguous(iq) or waited < 0.25:
+                return False
+
+            print(f"Ring from {feeder.ring.getStartTime():.3f} to {feeder.ring.getEndTime():.3f}, capacity {feeder.ring.getCapacity()}")
+            return iq.flags.writeable and feeder.ring.getCapacity() == RING_SECONDS * SAMPLE_RATE
+    except Exception as e:
+        print(f"Error in pre and post trigger test: {e}")
+        return False
+
+def test_concurrent_snapshots():
+    """Test that concurrent snapshots of the same range get the same samples"""
+    try:
+        with Feeder() as feeder:
+            time.sleep(0.5)
+            trigger = time.time()
+            results = [None] * 4
+
+            def take(i):
+                results[i] = feeder.ring.snapshot(trigger - 0.3, trigger + 0.2)
+
+            threads = [threading.Thread(target=take, args=(i,)) for i in range(len(results))]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        if any(r is None or not np.array_equal(r, results[0]) for r in results) or not is_contiguous(results[0]):
+            print("Snapshots differ")
+            return False
+        print(f"{len(results)} snapshots of {len(results[0])} samples")
+        return True
+    except Exception as e:
+        print(f"Error in concurrent snapshot test: {e}")
+        return False
+
+def test_clamping():
+    """Test that ranges are clamped to the samples still in the ring"""
+    try:
+        with Feeder() as feeder:
+            time.sleep(1.5)
+            now = time.time()
+            iq = feeder.ring.snapshot(now - 10.0, now, 1000.0)
+            old = feeder.ring.snapshot(now - 20.0, now - 10.0, 0.0)
+            written = feeder.ring.getWrittenSamples()
+
+        print(f"Clamped snapshot of {len(iq)} samples, {written} written")
+        if len(old) != 0 or not is_contiguous(iq):
+            return False
+        return abs(len(iq) - RING_SECONDS * SAMPLE_RATE) <= 2 * BLOCK_SIZE and iq[0].real >= written - RING_SECONDS * SAMPLE_RATE
+    except Exception as e:
+        print(f"Error in clamping test: {e}")
+        return False
+
+def test_snapshot_to_file():
+    """Test writing a snapshot straight to a chunked IQ recording"""
+    try:
+        path = os.path.join(temp_dir("sdrpp_capture_"), "event.ciq")
+        with Feeder() as feeder:
+            feeder.ring.setFrequency(100e6)
+            time.sleep(0.8)
+            trigger = time.time()
+            count = feeder.ring.snapshot_to_file(path, trigger - 0.4, trigger + 0.1, "f32")
+            iq = feeder.ring.snapshot(trigger - 0.4, trigger + 0.1)
+
+        with recording.open(path) as rec:
+            samples = rec.read(0, len(rec))
+            ok = (count == len(rec) and rec.frequency == 100e6 and rec.sample_rate == SAMPLE_RATE
+                  and abs(rec.start_time - (trigger - 0.4)) < 2 * BLOCK_SIZE / SAMPLE_RATE
+                  and np.array_equal(samples, iq))
+            del samples
+        print(f"Wrote {count} samples to {path}")
+        return ok
+    except Exception as e:
+        print(f"Error in snapshot to file test: {e}")
+        return False
+
+def test_close_and_errors():
+    """Test that close() releases waiting snapshots and the errors raised on invalid parameters"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE)
+        ring = sdrpp.CaptureRing(RING_SECONDS, SAMPLE_RATE, source.getStream())
+        ring.start()
+        threading.Timer(0.2, ring.close).start()
+        now = time.time()
+        if len(ring.snapshot(now, now + 60.0)) != 0:
+            print("A snapshot of an empty ring returned samples")
+            return False
+        ring.stop()
+
+        for args in [(0.0, SAMPLE_RATE, source.getStream()), (RING_SECONDS, 0.0, source.getStream())]:
+            try:
+                sdrpp.CaptureRing(*args)
+                print(f"Invalid parameters were accepted: {args[:2]}")
+                return False
+            except RuntimeError:
+                pass
+        try:
+            ring.snapshot_to_file(os.path.join(temp_dir("sdrpp_capture_"), "x.ciq"), now, now + 1.0, "u8", 0.0)
+            print("An invalid format was accepted")
+            return False
+        except RuntimeError:
+            pass
+        return True
+    except Exception as e:
+        print(f"Error in close test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ capture ring tests ===")
+
+    tests = [
+        ("Pre and Post Trigger", test_pre_and_post_trigger),
+        ("Concurrent Snapshots", test_concurrent_snapshots),
+        ("Clamping", test_clamping),
+        ("Snapshot to File", test_snapshot_to_file),
+        ("Close and Errors", test_close_and_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
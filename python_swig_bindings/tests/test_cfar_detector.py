@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test script for the CFAR detector of the SDR++ Python bindings
+This script runs the detector on synthetic FFT frames, so no hardware is required
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 2048000.0
+CENTER_FREQ = 100e6
+FFT_SIZE = 2048
+NOISE_LEVEL = -100.0
+
+def make_frame(signals, seed=0):
+    """dB frame of noise with (first bin, last bin, level above noise) signals"""
+    frame = NOISE_LEVEL + np.random.default_rng(seed).normal(0.0, 1.0, FFT_SIZE)
+    for first, last, level in signals:
+        frame[first:last + 1] = NOISE_LEVEL + level
+    return frame.astype(np.float32)
+
+def bin_freq(bin):
+    return CENTER_FREQ + (bin - FFT_SIZE // 2) * SAMPLE_RATE / FFT_SIZE
+
+def test_detections():
+    """Test that carriers are found with their frequency, bandwidth and SNR"""
+    try:
+        det = sdrpp.CFARDetector("ca", guard=2, training=16, threshold=10.0)
+        frame = det.process(make_frame([(300, 300, 30.0), (1500, 1504, 20.0)]), SAMPLE_RATE, CENTER_FREQ)
+        if len(frame) != 2:
+            print(f"Expected 2 detections, got {len(frame)}")
+            return False
+        narrow, wide = frame[0], frame[1]
+        bin_width = SAMPLE_RATE / FFT_SIZE
+        if abs(narrow.frequency - bin_freq(300)) > 1.0 or abs(narrow.bandwidth - bin_width) > 1.0:
+            print(f"Unexpected narrow detection: {narrow.frequency} Hz, {narrow.bandwidth} Hz wide")
+            return False
+        if abs(wide.frequency - bin_freq(1502)) > bin_width or abs(wide.bandwidth - 5 * bin_width) > 1.0:
+            print(f"Unexpected wide detection: {wide.frequency} Hz, {wide.bandwidth} Hz wide")
+            return False
+        if abs(narrow.snr - 30.0) > 3.0 or abs(narrow.noise - NOISE_LEVEL) > 1.0 or narrow.level != narrow.snr + narrow.noise:
+            print(f"Unexpected levels: {narrow.level} dB, noise {narrow.noise} dB, SNR {narrow.snr} dB")
+            return False
+        if abs(narrow.offset - (narrow.frequency - CENTER_FREQ)) > 1e-3 or frame.fftSize != FFT_SIZE:
+            print("Unexpected offset or FFT size")
+            return False
+        print(f"{len(frame)} detections, {[round(d.frequency) for d in frame]}")
+        return True
+    except Exception as e:
+        print(f"Error in detections test: {e}")
+        return False
+
+def test_noise_only():
+    """Test that noise alone isn't detected"""
+    try:
+        det = sdrpp.CFARDetector("ca", guard=2, training=32, threshold=8.0)
+        for seed in range(10):
+            frame = det.process(make_frame([], seed), SAMPLE_RATE, CENTER_FREQ)
+            if len(frame):
+                print(f"False alarms on frame {seed}: {[d.firstBin for d in frame]}")
+                return False
+        return frame.index == 9
+    except Exception as e:
+        print(f"Error in noise only test: {e}")
+        return False
+
+def test_ordered_statistic():
+    """Test that OS-CFAR finds a weak signal next to a strong one that masks it with CA-CFAR"""
+    try:
+        signals = [(1000, 1010, 40.0), (1016, 1016, 15.0)]
+        ca = sdrpp.CFARDetector("ca", guard=2, training=16, threshold=10.0)
+        os_ = sdrpp.CFARDetector("os", guard=2, training=16, threshold=10.0, rank=0.5)
+        ca_bins = [d.firstBin for d in ca.process(make_frame(signals), SAMPLE_RATE)]
+        os_bins = [d.firstBin for d in os_.process(make_frame(signals), SAMPLE_RATE)]
+        if 1016 in ca_bins or 1000 not in ca_bins:
+            print(f"Expected CA-CFAR to only find the strong signal, got {ca_bins}")
+            return False
+        if os_bins != [1000, 1016]:
+            print(f"Expected OS-CFAR to find both signals, got {os_bins}")
+            return False
+
+        # The mode can also be changed afterwards
+        ca.setMode("os")
+        ca.setRank(0.5)
+        return [d.firstBin for d in ca.process(make_frame(signals), SAMPLE_RATE)] == os_bins
+    except Exception as e:
+        print(f"Error in ordered statistic test: {e}")
+        return False
+
+def test_merge():
+    """Test that adjacent bins are merged across small gaps and narrow detections dropped"""
+    try:
+        signals = [(500, 504, 20.0), (506, 510, 20.0), (900, 900, 20.0)]
+        det = sdrpp.CFARDetector("os", guard=2, training=16, threshold=10.0, mergeGap=0)
+        split = [(d.firstBin, d.lastBin) for d in det.process(make_frame(signals), SAMPLE_RATE)]
+        det.setMerge(1, 1)
+        merged = [(d.firstBin, d.lastBin) for d in det.process(make_frame(signals), SAMPLE_RATE)]
+        det.setMerge(1, 3)
+        wide = [(d.firstBin, d.lastBin) for d in det.process(make_frame(signals), SAMPLE_RATE)]
+        if split != [(500, 504), (506, 510), (900, 900)] or merged != [(500, 510), (900, 900)] or wide != [(500, 510)]:
+            print(f"Unexpected merges: {split}, {merged}, {wide}")
+            return False
+        return True
+    except Exception as e:
+        print(f"Error in merge test: {e}")
+        return False
+
+def test_queue():
+    """Test reading from the front end queue without frames and after closing"""
+    try:
+        det = sdrpp.CFARDetector()
+        det.setCenterFrequency(CENTER_FREQ)
+        if det.read(10.0) is not None or det.getCenterFrequency() != CENTER_FREQ:
+            print("A frame was read without a front end")
+            return False
+        det.close()
+        try:
+            det.read(10.0)
+            print("Reading a closed detector should raise")
+            return False
+        except RuntimeError:
+            pass
+        return det.getWrittenFrames() == 0 and det.getDroppedFrames() == 0
+    except Exception as e:
+        print(f"Error in queue test: {e}")
+        return False
+
+def test_errors():
+    """Test the errors raised on invalid parameters"""
+    try:
+        for args, kwargs in [(("xx",), {}), (("ca",), {"training": 0}), (("ca",), {"guard": -1}), (("os",), {"rank": 1.5}), (("ca",), {"minBins": 0})]:
+            try:
+                sdrpp.CFARDetector(*args, **kwargs)
+                print(f"Invalid parameters were accepted: {args} {kwargs}")
+                return False
+            except RuntimeError:
+                pass
+
+        det = sdrpp.CFARDetector()
+        for args in [(make_frame([]), 0.0), ([0.0] * 16, SAMPLE_RATE)]:
+            try:
+                det.process(*args)
+                print("Invalid frame was accepted")
+                return False
+            except RuntimeError:
+                pass
+        return True
+    except Exception as e:
+        print(f"Error in error test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ CFAR detector tests ===")
+
+    tests = [
+        ("Detections", test_detections),
+        ("Noise only", test_noise_only),
+        ("Ordered statistic", test_ordered_statistic),
+        ("Merge", test_merge),
+        ("Queue", test_queue),
+        ("Errors", test_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
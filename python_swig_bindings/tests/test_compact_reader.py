@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for the int8/int16 stream reader of the SDR++ Python bindings
+This script pushes synthetic IQ samples through a stream, so no hardware is required
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 1000000.0
+BLOCK_SIZE = 10000
+SAMPLE_COUNT = 200000
+
+def make_samples(count):
+    """Complex tone with an amplitude changing from block to block"""
+    t = np.arange(count) / SAMPLE_RATE
+    amplitude = np.repeat(np.linspace(0.01, 2.0, count // BLOCK_SIZE), BLOCK_SIZE)
+    return (amplitude * np.exp(2j * np.pi * 10000 * t)).astype(np.complex64)
+
+def read_blocks(reader, count):
+    """Read blocks until count samples were received"""
+    blocks = []
+    received = 0
+    while received < count:
+        res = reader.read(1000.0)
+        if res is None:
+            break
+        blocks.append(res)
+        received += len(res[0]) // 2
+    return blocks
+
+def test_formats():
+    """Test that i8 and i16 blocks decode to the pushed samples with their own scale"""
+    try:
+        samples = make_samples(SAMPLE_COUNT)
+        for fmt, dtype, rtol in [("i16", np.int16, 1e-4), ("i8", np.int8, 1e-2)]:
+            source = sdrpp.PushSource(SAMPLE_RATE, blockSize=BLOCK_SIZE)
+            reader = sdrpp.CompactStreamReader(source.getStream(), fmt)
+            reader.start()
+            source.start()
+            source.push(samples)
+            blocks = read_blocks(reader, SAMPLE_COUNT)
+            source.stop()
+            reader.stop()
+
+            if any(iq.dtype != dtype for iq, _ in blocks) or len(blocks) != SAMPLE_COUNT // BLOCK_SIZE:
+                print(f"Unexpected {fmt} blocks: {len(blocks)}")
+                return False
+            decoded = np.concatenate([iq.astype(np.float32).view(np.complex64) * scale for iq, scale in blocks])
+
+            # The error is relative to the amplitude of each block, thanks to the per block scale
+            amplitude = np.repeat(np.abs(samples).reshape(-1, BLOCK_SIZE).max(axis=1), BLOCK_SIZE)
+            error = (np.abs(decoded - samples) / amplitude).max()
+            nbytes = sum(iq.nbytes for iq, _ in blocks)
+            print(f"{fmt}: {nbytes / (SAMPLE_COUNT * 8):.2f} of the complex64 size, max relative error {error:.2e}")
+            if error > rtol or nbytes != SAMPLE_COUNT * np.dtype(dtype).itemsize * 2:
+                return False
+        return True
+    except Exception as e:
+        print(f"Error in format test: {e}")
+        return False
+
+def test_overflow():
+    """Test that blocks which don't fit are dropped and counted"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE, blockSize=BLOCK_SIZE)
+        reader = sdrpp.CompactStreamReader(source.getStream(), "i8", 3 * BLOCK_SIZE)
+        reader.start()
+        source.start()
+        source.push(make_samples(10 * BLOCK_SIZE))
+        source.stop()
+
+        blocks = read_blocks(reader, 3 * BLOCK_SIZE)
+        reader.stop()
+        print(f"Read {len(blocks)} blocks, {reader.getOverflowCount()} overflows, {reader.getDroppedSamples()} samples dropped")
+        if len(blocks) != 3 or reader.getDroppedSamples() != 7 * BLOCK_SIZE or reader.getAvailable() != 0:
+            return False
+        return reader.getReadSamples() == 3 * BLOCK_SIZE and reader.getWrittenSamples() == 3 * BLOCK_SIZE
+    except Exception as e:
+        print(f"Error in overflow test: {e}")
+        return False
+
+def test_close_and_errors():
+    """Test reading after closing and invalid formats"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE)
+        reader = sdrpp.CompactStreamReader(source.getStream(), "i16")
+        reader.setFormat("i8")
+        if reader.getFormat() != "i8" or reader.read(10.0) is not None:
+            print("Unexpected format or block")
+            return False
+        reader.close()
+        if reader.read() is not None or not reader.isClosed():
+            print("Reading a closed reader should return None")
+            return False
+
+        try:
+            sdrpp.CompactStreamReader(source.getStream(), "u8")
+            print("An invalid format was accepted")
+            return False
+        except RuntimeError:
+            pass
+        return True
+    except Exception as e:
+        print(f"Error in close test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ compact stream reader tests ===")
+
+    tests = [
+        ("Formats", test_formats),
+        ("Overflow", test_overflow),
+        ("Close and Errors", test_close_and_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for the config manager of the SDR++ Python bindings
+This script uses a temporary config file, so no hardware is required
+"""
+
+import sys
+import os
+import json
+import time
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import temp_dir
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp import config_file
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+DEFAULT_CONFIG = {
+    "moduleInstances": {"Radio": {"module": "radio", "enabled": True}},
+    "frequency": 100000000,
+    "sources": {"sdrplay": {"device": "RSPdx", "gains": [20, 30.5]}},
+}
+
+def make_config():
+    """Config manager on a new file in a temporary directory"""
+    path = os.path.join(temp_dir("sdrpp_config_"), "config.json")
+    config = sdrpp.ConfigManager()
+    config.setPath(path)
+    config.loadFromString(json.dumps(DEFAULT_CONFIG))
+    return config, path
+
+def test_paths():
+    """Test reading and writing values by JSON pointer"""
+    try:
+        config, path = make_config()
+        if config.get("/moduleInstances/Radio/enabled") is not True or config.get("/sources/sdrplay/gains/1") != 30.5:
+            print("Wrong values read")
+            return False
+
+        config.set("/moduleInstances/Radio/enabled", False)
+        config.set("/vfos/a/offset", -12500.0)
+        if config.get("/moduleInstances/Radio") != {"module": "radio", "enabled": False}:
+            print("Value was not set")
+            return False
+        if config.get("/vfos") != {"a": {"offset": -12500.0}}:
+            print("Missing parents were not created")
+            return False
+
+        if not config.remove("/sources/sdrplay/gains/0") or config.get("/sources/sdrplay/gains") != [30.5]:
+            print("Array value was not removed")
+            return False
+        if config.remove("/nothing") or config.contains("/nothing"):
+            print("Missing value was found")
+            return False
+
+        try:
+            config.get("/nothing")
+            print("Missing value was read")
+            return False
+        except RuntimeError:
+            pass
+
+        config.save()
+        with open(path) as f:
+            saved = json.load(f)
+        return saved == json.loads(config.saveToString())
+    except Exception as e:
+        print(f"Error in path test: {e}")
+        return False
+
+def test_save():
+    """Test that saves are atomic and that the auto save skips unchanged configs"""
+    try:
+        config, path = make_config()
+        config.save()
+        with open(path) as f:
+            if f.read() != json.dumps(DEFAULT_CONFIG, indent=4, sort_keys=True):
+                print("Saved config differs from a full dump")
+                return False
+        if os.path.exists(path + ".tmp"):
+            print("Temporary file was left behind")
+            return False
+
+        # Setting a value to what it already is doesn't rewrite the file
+        stat = os.stat(path)
+        config.enableAutoSave()
+        config.set("/frequency", 100000000)
+        time.sleep(1.5)
+        if os.stat(path).st_ino != stat.st_ino:
+            print("Unchanged config was rewritten")
+            return False
+
+        config.set("/frequency", 101000000)
+        time.sleep(1.5)
+        config.disableAutoSave()
+        with open(path) as f:
+            return json.load(f)["frequency"] == 101000000
+    except Exception as e:
+        print(f"Error in save test: {e}")
+        return False
+
+def test_file_cache():
+    """Test that config files are only parsed again when they change"""
+    try:
+        config, path = make_config()
+        config.save()
+        first = config_file.read_config(path)
+        if config_file.read_config(path) is not first:
+            print("Unchanged config was parsed again")
+            return False
+        if config_file.config_value(path, "/sources/sdrplay/device") != "RSPdx":
+            print("Wrong cached value")
+            return False
+
+        config.set("/sources/sdrplay/device", "RSP1A")
+        config.save()
+        return config_file.config_value(path, "/sources/sdrplay/device") == "RSP1A"
+    except Exception as e:
+        print(f"Error in file cache test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ config tests ===")
+
+    tests = [
+        ("Paths", test_paths),
+        ("Save", test_save),
+        ("File Cache", test_file_cache),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless SDR++ controller
+This script starts a controller process on an empty root directory and queries it over its socket
+"""
+
+import sys
+import os
+import json
+import socket
+import time
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import temp_dir
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp.controller import Controller, ControllerError
+    from sdrplay_standalone import SDRPlayDevice
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+# Root directory used by the controller, an empty one gets the default config
+ROOT = os.environ.get("SDRPP_ROOT") or temp_dir("sdrpp_controller_")
+
+controller = None
+
+def test_startup():
+    """Test that the controller announces itself once ready"""
+    global controller
+    try:
+        start = time.monotonic()
+        controller = Controller.start(ROOT, modules=["source"])
+        print(f"Controller ready in {(time.monotonic() - start) * 1000.0:.0f} ms, runtime started in {controller.info['startupMs']:.1f} ms")
+        return controller.info["ready"] and controller.info["port"] > 0 and controller.is_alive()
+    except Exception as e:
+        print(f"Error starting controller: {e}")
+        return False
+
+def test_queries():
+    """Test status queries and the time they take on pooled connections"""
+    if controller is None:
+        return False
+    try:
+        status = controller.call("status")
+        print(f"Controller status: {status}")
+        if status["pid"] != controller.process.pid or status["sources"] != controller.call("sources"):
+            print("Unexpected status")
+            return False
+
+        count = 100
+        start = time.monotonic()
+        for _ in range(count):
+            if not controller.ping():
+                print("Ping failed")
+                return False
+        per_call = (time.monotonic() - start) * 1000.0 / count
+        print(f"{per_call:.3f} ms per query")
+        return per_call < 50.0
+    except Exception as e:
+        print(f"Error in query test: {e}")
+        return False
+
+def test_errors():
+    """Test the errors returned by the controller"""
+    if controller is None:
+        return False
+    try:
+        for method, params in [("xx", {}), ("select_source", {"name": "Nonexistent source"}), ("tune", {})]:
+            try:
+                controller.call(method, **params)
+                print(f"Invalid request '{method}' was accepted")
+                return False
+            except ControllerError as e:
+                print(f"'{method}' raised: {e}")
+
+        # The connection is still usable after errors
+        return controller.ping()
+    except Exception as e:
+        print(f"Error in error test: {e}")
+        return False
+
+def test_malformed_requests():
+    """Test that malformed request lines get an error with a null id"""
+    if controller is None:
+        return False
+    try:
+        with socket.create_connection((controller.host, controller.port), timeout=10.0) as sock:
+            replies = sock.makefile("rb")
+            responses = []
+            for line in [b"not json\n", b'{"id": 1, "method": "ping"}\n', b"{\n", b"[1, 2]\n"]:
+                sock.sendall(line)
+                responses.append(json.loads(replies.readline()))
+        print(responses)
+        if responses[1] != {"id": 1, "result": "pong"}:
+            return False
+        return all(r["id"] is None and r.get("error") for r in responses[0:1] + responses[2:])
+    except Exception as e:
+        print(f"Error in malformed request test: {e}")
+        return False
+
+def test_shared_controller():
+    """Test that SDRplay device checks leave the shared controller running and reuse it"""
+    device = SDRPlayDevice()
+    device.config_path = os.path.join(ROOT, "config.json")
+    try:
+        device.run_basic_test()
+        shared = device.controller
+        if shared is None or not shared.is_alive():
+            print("The controller was stopped after the check")
+            return False
+
+        device.is_sdrplay_available()
+        device.is_sdrplay_available()
+        device.run_basic_test()
+        print(f"Shared controller pid {shared.process.pid}")
+        if device.controller is not shared or not shared.is_alive():
+            print("A new controller was started for a later check")
+            return False
+        return True
+    except Exception as e:
+        print(f"Error in shared controller test: {e}")
+        return False
+    finally:
+        device.stop_sdrpp()
+
+def test_shutdown():
+    """Test shutting the controller down over its socket"""
+    if controller is None:
+        return False
+    try:
+        controller.close()
+        if controller.is_alive() or controller.process.returncode != 0:
+            print(f"Controller exited with code {controller.process.returncode}")
+            return False
+        try:
+            controller.call("ping")
+            print("Calling a closed controller should raise")
+            return False
+        except ControllerError:
+            pass
+        return True
+    except Exception as e:
+        print(f"Error stopping controller: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ controller tests ===")
+
+    tests = [
+        ("Startup", test_startup),
+        ("Queries", test_queries),
+        ("Errors", test_errors),
+        ("Malformed Requests", test_malformed_requests),
+        ("Shared Controller", test_shared_controller),
+        ("Shutdown", test_shutdown),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the DSP benchmark suite of the SDR++ Python bindings
+This script runs short benchmarks of the core blocks, so no hardware is required
+"""
+
+import sys
+import os
+import copy
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+OPTIONS = {
+    "duration_ms": 50,
+    "buffer_sizes": [4096],
+    "fir_taps": [32, 256],
+    "fft_sizes": [2048],
+    "demods": ["fm", "usb"],
+    "blocks": ["fir", "fft", "fm", "usb"],
+}
+
+def test_list():
+    """Test that the cases cover the parameter matrix"""
+    try:
+        names = sdrpp.listDSPBenchmarks(OPTIONS)
+        expected = ["fir/taps=32/buffer=4096", "fir/taps=256/buffer=4096", "fft/size=2048/buffer=4096",
+                    "fm/buffer=4096", "usb/buffer=4096"]
+        if names != expected:
+            print(f"Wrong cases: {names}")
+            return False
+
+        all_names = sdrpp.listDSPBenchmarks()
+        print(f"{len(all_names)} cases in the default config")
+        return len(all_names) > len(names)
+    except Exception as e:
+        print(f"Error in list test: {e}")
+        return False
+
+def test_run():
+    """Test running the cases and the contents of the report"""
+    try:
+        report = sdrpp.runDSPBenchmarks(OPTIONS)
+        if report["config"]["fir_taps"] != OPTIONS["fir_taps"] or len(report["results"]) != 5:
+            print("Wrong report")
+            return False
+
+        for r in report["results"]:
+            print(f"{r['name']}: {r['samples_per_second'] / 1e6:.2f} MS/s, {r['cpu_percent']:.0f}% CPU, "
+                  f"{r['buffer_allocations']} buffer allocations")
+            if r["samples_per_second"] <= 0 or r["buffers"] <= 0 or r["heap_allocations"] is not None:
+                print("Invalid result")
+                return False
+        return True
+    except Exception as e:
+        print(f"Error in run test: {e}")
+        return False
+
+def test_compare():
+    """Test that slower cases are reported as regressions"""
+    try:
+        report = sdrpp.runDSPBenchmarks(dict(OPTIONS, blocks=["fir"]))
+        if sdrpp.compareDSPBenchmarks(report, report, 0.1):
+            print("Report regressed compared to itself")
+            return False
+
+        baseline = copy.deepcopy(report)
+        baseline["results"][0]["samples_per_second"] *= 2
+        baseline["results"].append(dict(baseline["results"][1], name="removed"))
+        regressions = sdrpp.compareDSPBenchmarks(report, baseline, 0.1)
+        if [(r["name"], r["metric"]) for r in regressions] != [(report["results"][0]["name"], "samples_per_second")]:
+            print(f"Wrong regressions: {regressions}")
+            return False
+
+        slower = copy.deepcopy(report)
+        slower["results"][1]["buffer_allocations"] = slower["results"][1]["buffers"]
+        regressions = sdrpp.compareDSPBenchmarks(slower, report, 0.1)
+        return [r["metric"] for r in regressions] == ["allocations_per_buffer"]
+    except Exception as e:
+        print(f"Error in compare test: {e}")
+        return False
+
+def test_errors():
+    """Test that invalid options are rejected"""
+    try:
+        for options in ({"fir_tap": [32]}, {"demods": ["nbfm"]}, {"buffer_sizes": "1024"}):
+            try:
+                sdrpp.listDSPBenchmarks(options)
+                print(f"Invalid options were accepted: {options}")
+                return False
+            except RuntimeError:
+                pass
+        try:
+            sdrpp.runDSPBenchmarks({"blocks": ["fir"], "buffer_sizes": [0], "duration_ms": 10})
+            print("Invalid buffer size was accepted")
+            return False
+        except RuntimeError:
+            pass
+        return True
+    except Exception as e:
+        print(f"Error in error test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ DSP benchmark tests ===")
+
+    tests = [
+        ("List", test_list),
+        ("Run", test_run),
+        ("Compare", test_compare),
+        ("Errors", test_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
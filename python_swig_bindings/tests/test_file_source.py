@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the file source of the SDR++ Python bindings
+This script replays a generated WAV IQ recording, so no hardware is required
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import tone_recording
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 250000
+SAMPLE_COUNT = 500000
+
+def make_recording():
+    """Write a two channel int16 WAV file containing a complex tone"""
+    return tone_recording(SAMPLE_RATE, SAMPLE_COUNT, "sdrpp_file_source_")
+
+def read_all(source, count):
+    """Read count samples from the output of a file source"""
+    reader = sdrpp.StreamReader(source.getStream(), count)
+    reader.start()
+    source.start()
+    out = np.empty(count, dtype=np.complex64)
+    pos = 0
+    while pos < count:
+        n = reader.read_into(out[pos:], 1000.0)
+        if n <= 0:
+            break
+        pos += n
+    source.stop()
+    reader.stop()
+    return out[:pos]
+
+def test_max_speed():
+    """Test replaying a recording as fast as possible"""
+    try:
+        path, expected = make_recording()
+        source = sdrpp.FileSource(path, False)
+        if source.getSampleRate() != SAMPLE_RATE or source.getSampleCount() != SAMPLE_COUNT:
+            print(f"Wrong format: {source.getSampleRate()} Hz, {source.getSampleCount()} samples")
+            return False
+
+        start = time.perf_counter()
+        samples = read_all(source, SAMPLE_COUNT)
+        elapsed = time.perf_counter() - start
+        print(f"Replayed {len(samples)} samples at {len(samples) / elapsed / 1e6:.1f} MS/s")
+
+        if len(samples) != SAMPLE_COUNT:
+            return False
+        return np.allclose(samples, expected, atol=1e-6)
+    except Exception as e:
+        print(f"Error in max speed test: {e}")
+        return False
+
+def test_realtime():
+    """Test that a recording is paced at its samplerate in realtime mode"""
+    try:
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, True)
+
+        start = time.perf_counter()
+        samples = read_all(source, SAMPLE_COUNT)
+        elapsed = time.perf_counter() - start
+        duration = SAMPLE_COUNT / SAMPLE_RATE
+        print(f"Replayed {duration:.2f}s of samples in {elapsed:.2f}s")
+
+        return len(samples) == SAMPLE_COUNT and abs(elapsed - duration) < 0.2 * duration
+    except Exception as e:
+        print(f"Error in realtime test: {e}")
+        return False
+
+def test_end_of_file():
+    """Test that the end of the file is reported and that seeking restarts the replay"""
+    try:
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, False)
+        reader = sdrpp.StreamReader(source.getStream(), SAMPLE_COUNT * 2)
+        reader.start()
+        source.start()
+        if not source.waitFinished(5000.0):
+            print("End of file not reached")
+            return False
+
+        source.seek(SAMPLE_COUNT // 2)
+        if not source.waitFinished(5000.0):
+            print("End of file not reached after seeking")
+            return False
+        source.stop()
+        reader.stop()
+
+        written = source.getSamplesWritten()
+        print(f"Samples written: {written}")
+        return written == SAMPLE_COUNT + SAMPLE_COUNT // 2
+    except Exception as e:
+        print(f"Error in end of file test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ file source tests ===")
+
+    tests = [
+        ("Max Speed", test_max_speed),
+        ("Realtime", test_realtime),
+        ("End of File", test_end_of_file),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for the stream buffer pool and memory report of the SDR++ Python bindings
+This script pushes synthetic IQ samples through a stream, so no hardware is required
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp import runtime
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 1000000.0
+COMPLEX_BYTES = 8
+MIN_CLASS_SIZE = 4096
+
+def class_size(nbytes):
+    """Size of the pool buffers holding nbytes"""
+    size = MIN_CLASS_SIZE
+    while size < nbytes:
+        size *= 2
+    return size
+
+def push_and_read(source, reader, samples):
+    """Push samples and read them back from the reader"""
+    source.push(samples)
+    out = np.empty(len(samples), dtype=np.complex64)
+    pos = 0
+    while pos < len(samples):
+        n = reader.read_into(out[pos:], 1000.0)
+        if n <= 0:
+            break
+        pos += n
+    return out[:pos]
+
+def find_stream(report, samples):
+    """Stream of the memory report that received a given number of samples"""
+    ids = [s["id"] for s in runtime.metricsSnapshot()["streams"] if s["samples"] == samples]
+    streams = [s for s in report["streams"] if s["id"] in ids]
+    return streams[0] if len(streams) == 1 else None
+
+def test_right_sized_streams():
+    """Test that the buffers of a stream are sized from the blocks its writer writes"""
+    try:
+        count = 123000
+        source = sdrpp.PushSource(SAMPLE_RATE, blockSize=1000)
+        reader = sdrpp.StreamReader(source.getStream(), count)
+        reader.start()
+        source.start()
+        samples = (np.arange(count) + 0j).astype(np.complex64)
+        out = push_and_read(source, reader, samples)
+
+        report = runtime.memory_report()
+        stream = find_stream(report, count)
+        writers = [b for b in report["blocks"] if stream and stream["id"] in b["outputs"]]
+        source.stop()
+        reader.stop()
+
+        if stream is None or not writers:
+            print("The stream or its writer isn't in the report")
+            return False
+        expected = 2 * class_size(1000 * COMPLEX_BYTES)
+        print(f"Stream of {stream['type']}: {stream['bytes']} bytes instead of {2 * class_size(1000000 * COMPLEX_BYTES)}")
+        return np.array_equal(out, samples) and stream["bytes"] == expected and writers[0]["bytes"] == expected
+    except Exception as e:
+        print(f"Error in right sized stream test: {e}")
+        return False
+
+def test_growth():
+    """Test that the buffers grow with larger blocks without losing samples"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE, blockSize=1000)
+        reader = sdrpp.StreamReader(source.getStream(), 1000000)
+        reader.start()
+        source.start()
+
+        first = (np.arange(50000) + 0j).astype(np.complex64)
+        second = (np.arange(50000, 456000) + 0j).astype(np.complex64)
+        out = push_and_read(source, reader, first)
+        source.setBlockSize(100000)
+        out = np.concatenate([out, push_and_read(source, reader, second)])
+
+        stream = find_stream(runtime.memory_report(), 456000)
+        source.stop()
+        reader.stop()
+
+        expected = 2 * class_size(100000 * COMPLEX_BYTES)
+        print(f"Stream grown to {stream['bytes'] if stream else 0} bytes")
+        return stream is not None and stream["bytes"] == expected and np.array_equal(out, np.concatenate([first, second]))
+    except Exception as e:
+        print(f"Error in growth test: {e}")
+        return False
+
+def test_pool_reuse():
+    """Test that the buffers of destroyed streams are reused, and the cache limit and trimming"""
+    try:
+        limit = sdrpp.getBufferPoolCacheLimit()
+        before = sdrpp.bufferPoolStats()
+        for _ in range(5):
+            source = sdrpp.PushSource(SAMPLE_RATE)
+            del source
+        after = sdrpp.bufferPoolStats()
+        print(f"{after['hits'] - before['hits']} hits, {after['misses'] - before['misses']} misses, "
+              f"{after['cached']} bytes cached, {len(after['size_classes'])} size classes")
+        if after["hits"] - before["hits"] < 8 or after["cached"] == 0 or after["cached"] > limit:
+            return False
+        if any(c["size"] < MIN_CLASS_SIZE or c["size"] & (c["size"] - 1) for c in after["size_classes"]):
+            print("Size classes should be powers of two")
+            return False
+
+        sdrpp.trimBufferPool()
+        if sdrpp.bufferPoolStats()["cached"] != 0:
+            print("Trimming didn't free the cached buffers")
+            return False
+        sdrpp.setBufferPoolCacheLimit(0)
+        source = sdrpp.PushSource(SAMPLE_RATE)
+        del source
+        cached = sdrpp.bufferPoolStats()["cached"]
+        sdrpp.setBufferPoolCacheLimit(limit)
+        return cached == 0 and sdrpp.getBufferPoolCacheLimit() == limit
+    except Exception as e:
+        print(f"Error in pool reuse test: {e}")
+        return False
+
+def test_report():
+    """Test the totals of the memory report"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE)
+        report = runtime.memory_report()
+        del source
+
+        print(f"{report['in_use']} bytes in use, {report['cached']} cached, {report['unattributed']} unattributed")
+        if report["total"] != report["in_use"] + report["cached"] or report["peak_in_use"] < report["in_use"]:
+            return False
+        attributed = sum(s["bytes"] for s in report["streams"])
+        if report["unattributed"] != report["in_use"] - attributed:
+            return False
+
+        # The new source hasn't been used, so its stream isn't in the metrics yet
+        if report["unattributed"] < 2 * class_size(1000000 * COMPLEX_BYTES):
+            return False
+        sizes = [s["bytes"] for s in report["streams"]]
+        return sizes == sorted(sizes, reverse=True)
+    except Exception as e:
+        print(f"Error in report test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ memory tests ===")
+
+    tests = [
+        ("Right Sized Streams", test_right_sized_streams),
+        ("Growth", test_growth),
+        ("Pool Reuse", test_pool_reuse),
+        ("Report", test_report),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
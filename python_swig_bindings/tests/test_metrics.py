@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the DSP metrics of the SDR++ Python bindings
+This script replays a generated WAV IQ recording, so no hardware is required
+"""
+
+import sys
+import os
+import re
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import noise_recording
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp import runtime
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 250000
+SAMPLE_COUNT = 500000
+
+def make_recording():
+    """Write a two channel int16 WAV file of noise"""
+    return noise_recording(SAMPLE_RATE, SAMPLE_COUNT, "sdrpp_metrics_")[0]
+
+def replay(realtime, measure):
+    """Replay a recording into a stream reader and return the result of measure()
+
+    The streams and blocks are removed from the metrics once destroyed, so measure() is called
+    while the replay is running in realtime mode and at the end of the file otherwise.
+    """
+    source = sdrpp.FileSource(make_recording(), realtime)
+    reader = sdrpp.StreamReader(source.getStream(), SAMPLE_COUNT)
+    reader.start()
+    source.start()
+    if not realtime:
+        source.waitFinished(5000.0)
+    result = measure()
+    source.stop()
+    reader.stop()
+    return result
+
+def find_stream(snap):
+    """Stream that received the whole recording"""
+    for stream in snap["streams"]:
+        if stream["samples"] == SAMPLE_COUNT:
+            return stream
+    return None
+
+def test_snapshot():
+    """Test that the samples going through a stream and the block writing them are counted"""
+    try:
+        snap = replay(False, sdrpp.metricsSnapshot)
+
+        stream = find_stream(snap)
+        if stream is None:
+            print("No stream received the recording")
+            return False
+        print(f"Stream {stream['id']} ({stream['type']}): {stream['buffers']} buffers, "
+              f"{stream['swap_wait']:.3f}s swap wait, {stream['read_wait']:.3f}s read wait")
+        if stream["buffers"] <= 0 or stream["swap_wait_max"] > stream["swap_wait"]:
+            print("Wrong stream counters")
+            return False
+
+        writers = [b for b in snap["blocks"] if stream["id"] in b["outputs"]]
+        if not writers:
+            print("No block writes to the stream")
+            return False
+        block = writers[0]
+        print(f"Block {block['id']} ({block['type']}): {block['runs']} runs, {block['busy']:.3f}s busy")
+        return block["runs"] > 0 and block["busy"] > 0
+    except Exception as e:
+        print(f"Error in snapshot test: {e}")
+        return False
+
+def test_rates():
+    """Test that the rates over an interval match the samplerate of a realtime replay"""
+    try:
+        snap = replay(True, lambda: runtime.metrics(0.5))
+        rates = [s["samples_per_second"] for s in snap["streams"]]
+        print(f"Stream rates: {', '.join(f'{r:.0f}' for r in rates)}")
+        return any(abs(r - SAMPLE_RATE) < 0.2 * SAMPLE_RATE for r in rates)
+    except Exception as e:
+        print(f"Error in rate test: {e}")
+        return False
+
+def test_prometheus():
+    """Test the Prometheus text export"""
+    try:
+        text = replay(False, sdrpp.metricsPrometheus)
+        for family in ("sdrpp_stream_samples_total", "sdrpp_stream_read_wait_seconds_total", "sdrpp_block_busy_seconds_total"):
+            if f"# TYPE {family} " not in text:
+                print(f"Missing metric {family}")
+                return False
+
+        sample = re.compile(r'^sdrpp_[a-z_]+\{id="\d+",name="[^"]*",type="[^"]*"\} [-+0-9.e]+$')
+        for line in text.splitlines():
+            if not line.startswith("#") and not sample.match(line):
+                print(f"Invalid line: {line}")
+                return False
+        return True
+    except Exception as e:
+        print(f"Error in Prometheus test: {e}")
+        return False
+
+def test_reset():
+    """Test that resetting clears the counters"""
+    try:
+        def reset():
+            sdrpp.resetMetrics()
+            return sdrpp.metricsSnapshot()
+
+        snap = replay(False, reset)
+        if not snap["streams"]:
+            print("No streams in the metrics")
+            return False
+        return all(s["samples"] == 0 for s in snap["streams"]) and all(b["runs"] == 0 for b in snap["blocks"])
+    except Exception as e:
+        print(f"Error in reset test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ metrics tests ===")
+
+    tests = [
+        ("Snapshot", test_snapshot),
+        ("Rates", test_rates),
+        ("Prometheus", test_prometheus),
+        ("Reset", test_reset),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for the push source of the SDR++ Python bindings
+This script pushes synthetic IQ samples from Python, so no hardware is required
+"""
+
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 1000000.0
+SAMPLE_COUNT = 500000
+
+def make_samples(count, offset=0):
+    """Complex tone with a phase continuing from offset"""
+    t = (np.arange(count) + offset) / SAMPLE_RATE
+    return (0.5 * np.exp(2j * np.pi * 10000 * t)).astype(np.complex64)
+
+def test_push_and_read():
+    """Test that pushed samples come out of the stream unchanged"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE, blockSize=10000)
+        reader = sdrpp.StreamReader(source.getStream(), SAMPLE_COUNT)
+        reader.start()
+        source.start()
+
+        expected = make_samples(SAMPLE_COUNT)
+        start = time.perf_counter()
+        written = 0
+        for chunk in np.array_split(expected, 7):
+            written += source.push(chunk)
+        elapsed = time.perf_counter() - start
+        print(f"Pushed {written} samples at {written / elapsed / 1e6:.1f} MS/s")
+
+        out = np.empty(SAMPLE_COUNT, dtype=np.complex64)
+        pos = 0
+        while pos < SAMPLE_COUNT:
+            n = reader.read_into(out[pos:], 1000.0)
+            if n <= 0:
+                break
+            pos += n
+        source.stop()
+        reader.stop()
+
+        if written != SAMPLE_COUNT or pos != SAMPLE_COUNT or source.getSamplesDropped() != 0:
+            print(f"Written {written}, read {pos}, dropped {source.getSamplesDropped()}")
+            return False
+        return np.array_equal(out, expected) and source.getSamplesWritten() == SAMPLE_COUNT
+    except Exception as e:
+        print(f"Error in push and read test: {e}")
+        return False
+
+def test_back_pressure():
+    """Test that a blocking push waits for the stream and is released by stop()"""
+    try:
+        # Nothing reads the stream, only the first block can be swapped
+        source = sdrpp.PushSource(SAMPLE_RATE, blocking=True, blockSize=1000)
+        source.start()
+        threading.Timer(0.2, source.stop).start()
+
+        start = time.perf_counter()
+        written = source.push(make_samples(5000))
+        elapsed = time.perf_counter() - start
+        print(f"Push returned after {elapsed * 1000.0:.0f} ms with {written} samples written")
+        if written != 1000 or elapsed < 0.15 or source.getSamplesDropped() != 4000:
+            return False
+
+        # Nothing is accepted while stopped
+        return source.push(make_samples(1000)) == 0
+    except Exception as e:
+        print(f"Error in back pressure test: {e}")
+        return False
+
+def test_non_blocking():
+    """Test that a non-blocking push returns instead of waiting for the stream"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE, blocking=False, blockSize=1000)
+        source.start()
+        start = time.perf_counter()
+        first = source.push(make_samples(5000))
+        second = source.push(make_samples(1000))
+        elapsed = time.perf_counter() - start
+        source.stop()
+        print(f"Non-blocking pushes wrote {first} and {second} samples in {elapsed * 1000.0:.1f} ms")
+        if first != 1000 or second != 0 or elapsed > 0.1:
+            return False
+        if source.getSamplesWritten() != 1000 or source.getSamplesDropped() != 5000:
+            print(f"Unexpected counters: {source.getSamplesWritten()} written, {source.getSamplesDropped()} dropped")
+            return False
+
+        # Switching to blocking mode later
+        source.setBlocking(True)
+        return source.isBlocking() and source.getBlockSize() == 1000
+    except Exception as e:
+        print(f"Error in non blocking test: {e}")
+        return False
+
+def test_conversion_and_errors():
+    """Test the conversion of other dtypes and the errors raised on invalid input"""
+    try:
+        source = sdrpp.PushSource(SAMPLE_RATE, blocking=False)
+        reader = sdrpp.StreamReader(source.getStream(), 4096)
+        reader.start()
+        source.start()
+
+        # complex128 and strided arrays are converted
+        samples = make_samples(2048).astype(np.complex128)
+        if source.push(samples[::2]) != 1024:
+            print("Converted samples were not written")
+            return False
+        out = np.empty(1024, dtype=np.complex64)
+        if reader.read_into(out, 1000.0) != 1024 or not np.allclose(out, samples[::2]):
+            print("Converted samples differ")
+            return False
+
+        try:
+            source.push(b"\x00" * 12)
+            print("A partial sample was accepted")
+            return False
+        except RuntimeError:
+            pass
+        source.stop()
+        reader.stop()
+
+        try:
+            sdrpp.PushSource(0.0)
+            print("A zero samplerate was accepted")
+            return False
+        except RuntimeError:
+            pass
+
+        source.setSampleRate(2 * SAMPLE_RATE)
+        return source.getSampleRate() == 2 * SAMPLE_RATE
+    except Exception as e:
+        print(f"Error in conversion test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ push source tests ===")
+
+    tests = [
+        ("Push and Read", test_push_and_read),
+        ("Back Pressure", test_back_pressure),
+        ("Non Blocking", test_non_blocking),
+        ("Conversion and Errors", test_conversion_and_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test script for the chunked IQ recordings of the SDR++ Python bindings
+This script writes generated samples and reads them back by time range, so no hardware is required
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import temp_dir
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp import recording
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 1000000
+SAMPLE_COUNT = 1000000
+CHUNK_SAMPLES = 10000
+START_TIME = 1700000000 * 1000000000
+
+def make_samples():
+    """Complex tone with an amplitude below full scale"""
+    t = np.arange(SAMPLE_COUNT) / SAMPLE_RATE
+    return (0.5 * np.exp(2j * np.pi * 10000 * t)).astype(np.complex64)
+
+def write_recording(pcm_type, samples, close=True):
+    """Write the samples in blocks, retuning half way through"""
+    path = os.path.join(temp_dir("sdrpp_recording_"), "test.ciq")
+    writer = sdrpp.CIQWriter(path, SAMPLE_RATE, pcm_type, CHUNK_SAMPLES, 100e6, START_TIME)
+    for i in range(0, SAMPLE_COUNT, 4096):
+        if i >= SAMPLE_COUNT // 2 and i - 4096 < SAMPLE_COUNT // 2:
+            writer.setFrequency(101e6)
+        writer.write(samples[i:i + 4096])
+    if writer.getSamplesWritten() != SAMPLE_COUNT:
+        print(f"Wrong number of samples written: {writer.getSamplesWritten()}")
+    if close:
+        writer.close()
+    return path, writer
+
+def check_range(rec, samples, atol):
+    """Read 100ms from the middle of the recording by time"""
+    t0 = rec.start_time + 0.3
+    iq = rec.samples(t0, t0 + 0.1)
+    expected = samples[300000:400000]
+    if len(iq) != len(expected):
+        print(f"Wrong number of samples read: {len(iq)}")
+        return False
+    return np.allclose(iq, expected, atol=atol)
+
+def test_uncompressed():
+    """Test that float32 recordings are read back as views of the file"""
+    try:
+        samples = make_samples()
+        path, _ = write_recording(sdrpp.PCM_TYPE_F32, samples)
+        with recording.open(path) as rec:
+            if len(rec) != SAMPLE_COUNT or rec.sample_rate != SAMPLE_RATE:
+                print(f"Wrong format: {rec.sample_rate} Hz, {len(rec)} samples")
+                return False
+            iq = rec.samples(rec.start_time, rec.end_time)
+            if iq.flags.writeable or iq.flags.owndata:
+                print("Uncompressed samples were copied")
+                return False
+            ok = np.array_equal(iq, samples) and check_range(rec, samples, 0)
+            del iq
+        return ok
+    except Exception as e:
+        print(f"Error in uncompressed test: {e}")
+        return False
+
+def test_compressed():
+    """Test int8 and int16 chunk compression"""
+    try:
+        samples = make_samples()
+        for pcm_type, atol in [(sdrpp.PCM_TYPE_I16, 1e-4), (sdrpp.PCM_TYPE_I8, 1e-2)]:
+            path, _ = write_recording(pcm_type, samples)
+            size = os.path.getsize(path)
+            print(f"PCM type {pcm_type}: {size / (SAMPLE_COUNT * 8):.2f} of the float32 size")
+            with recording.open(path) as rec:
+                if not check_range(rec, samples, atol):
+                    return False
+        return True
+    except Exception as e:
+        print(f"Error in compressed test: {e}")
+        return False
+
+def test_compact_chunks():
+    """Test reading compressed chunks as stored, without widening them to complex64"""
+    try:
+        samples = make_samples()
+        for pcm_type, dtype, atol in [(sdrpp.PCM_TYPE_I16, np.int16, 1e-4), (sdrpp.PCM_TYPE_I8, np.int8, 1e-2)]:
+            path, _ = write_recording(pcm_type, samples)
+            with recording.open(path) as rec:
+                iq, scale = rec.compact_chunk(3)
+                if iq.dtype != dtype or len(iq) != 2 * CHUNK_SAMPLES or iq.flags.owndata:
+                    print(f"Unexpected chunk: {iq.dtype}, {len(iq)} values")
+                    return False
+                decoded = iq.astype(np.float32).view(np.complex64) * scale
+                ok = np.allclose(decoded, samples[3 * CHUNK_SAMPLES:4 * CHUNK_SAMPLES], atol=atol)
+                del iq
+            if not ok:
+                print(f"Chunk of PCM type {pcm_type} differs from the samples")
+                return False
+        return True
+    except Exception as e:
+        print(f"Error in compact chunk test: {e}")
+        return False
+
+def test_index():
+    """Test the chunk timestamps and frequencies"""
+    try:
+        path, _ = write_recording(sdrpp.PCM_TYPE_I16, make_samples())
+        with recording.open(path) as rec:
+            if len(rec.index) != SAMPLE_COUNT // CHUNK_SAMPLES:
+                print(f"Wrong number of chunks: {len(rec.index)}")
+                return False
+            expected = START_TIME + np.arange(len(rec.index)) * CHUNK_SAMPLES * 1000000000 // SAMPLE_RATE
+            if not np.array_equal(rec.index["timestamp"], expected):
+                print("Wrong chunk timestamps")
+                return False
+            if rec.frequency_at(rec.start_time) != 100e6 or rec.frequency_at(rec.end_time) != 101e6:
+                print("Wrong chunk frequencies")
+                return False
+            return rec.sample_index(rec.start_time + 0.25) == 250000
+    except Exception as e:
+        print(f"Error in index test: {e}")
+        return False
+
+def test_recovery():
+    """Test reading a recording that wasn't closed"""
+    try:
+        samples = make_samples()
+        path, writer = write_recording(sdrpp.PCM_TYPE_I16, samples, close=False)
+        with recording.open(path) as rec:
+            ok = rec.recovered and check_range(rec, samples, 1e-4)
+        writer.close()
+        return ok
+    except Exception as e:
+        print(f"Error in recovery test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ recording tests ===")
+
+    tests = [
+        ("Uncompressed", test_uncompressed),
+        ("Compressed", test_compressed),
+        ("Compact Chunks", test_compact_chunks),
+        ("Index", test_index),
+        ("Recovery", test_recovery),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the DSP worker pool scheduler of the SDR++ Python bindings
+This script runs flowgraphs fed by a generated WAV IQ recording, so no hardware is required
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import noise_recording
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 250000
+SAMPLE_COUNT = 500000
+
+def make_recording():
+    """Write a two channel int16 WAV file of noise, returns its path and the expected samples"""
+    return noise_recording(SAMPLE_RATE, SAMPLE_COUNT, "sdrpp_scheduler_")
+
+def read_all(path, count):
+    """Replay a recording as fast as possible and read all of its samples"""
+    source = sdrpp.FileSource(path, False)
+    reader = sdrpp.StreamReader(source.getStream(), count)
+    reader.start()
+    source.start()
+    out = np.empty(count, dtype=np.complex64)
+    pos = 0
+    while pos < count:
+        n = reader.read_into(out[pos:], 2000.0)
+        if n <= 0:
+            break
+        pos += n
+    source.stop()
+    reader.stop()
+    return out[:pos]
+
+def test_mode():
+    """Test switching between the schedulers"""
+    try:
+        if sdrpp.getDSPScheduler() != "threads":
+            print("The default scheduler should be one thread per block")
+            return False
+        sdrpp.setDSPScheduler("pool", 3)
+        ok = sdrpp.getDSPScheduler() == "pool" and sdrpp.getDSPWorkerCount() == 3
+        sdrpp.setDSPScheduler("threads")
+        print(f"{sdrpp.getDSPWorkerCount()} workers by default")
+        return ok and sdrpp.getDSPScheduler() == "threads" and sdrpp.getDSPWorkerCount() >= 1
+    except Exception as e:
+        print(f"Error in mode test: {e}")
+        return False
+
+def test_pool():
+    """Test that pooled blocks get all the samples, in order"""
+    try:
+        path, expected = make_recording()
+        sdrpp.setDSPScheduler("pool", 2)
+        try:
+            # Run it twice to also cover stopping and restarting the pooled blocks
+            for _ in range(2):
+                out = read_all(path, SAMPLE_COUNT)
+                print(f"Read {len(out)} samples")
+                if len(out) != SAMPLE_COUNT or not np.allclose(out, expected, atol=1e-6):
+                    return False
+        finally:
+            sdrpp.setDSPScheduler("threads")
+        return True
+    except Exception as e:
+        print(f"Error in pool test: {e}")
+        return False
+
+def test_benchmark():
+    """Test the chain benchmark cases in both modes"""
+    try:
+        options = {"blocks": ["chains"], "chain_counts": [4], "schedulers": ["threads", "pool"],
+                   "buffer_sizes": [4096], "duration_ms": 100}
+        report = sdrpp.runDSPBenchmarks(options)
+        for r in report["results"]:
+            print(f"{r['name']}: {r['samples_per_second'] / 1e6:.2f} MS/s, {r['cpu_percent']:.0f}% CPU")
+            if r["samples_per_second"] <= 0:
+                return False
+        if [r["scheduler"] for r in report["results"]] != ["threads", "pool"]:
+            print("Wrong cases")
+            return False
+        return sdrpp.getDSPScheduler() == "threads"
+    except Exception as e:
+        print(f"Error in benchmark test: {e}")
+        return False
+
+def test_errors():
+    """Test that unknown schedulers are rejected"""
+    try:
+        try:
+            sdrpp.setDSPScheduler("fibers")
+            print("Unknown scheduler was accepted")
+            return False
+        except RuntimeError:
+            pass
+        try:
+            sdrpp.listDSPBenchmarks({"blocks": ["chains"], "schedulers": ["fibers"]})
+            print("Unknown benchmark scheduler was accepted")
+            return False
+        except RuntimeError:
+            pass
+        return sdrpp.getDSPScheduler() == "threads"
+    except Exception as e:
+        print(f"Error in error test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ DSP scheduler tests ===")
+
+    tests = [
+        ("Mode", test_mode),
+        ("Pool", test_pool),
+        ("Benchmark", test_benchmark),
+        ("Errors", test_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
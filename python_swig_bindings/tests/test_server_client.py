@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script for the SDR++ server protocol client of the Python bindings
+This script serves a generated WAV IQ recording on loopback with an in-process server, so no hardware is required
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import tone_recording
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+HOST = "127.0.0.1"
+PORT = int(os.environ.get("SDRPP_TEST_PORT", "15259"))
+SAMPLE_RATE = 250000
+SAMPLE_COUNT = 500000
+
+# Worst case quantization error of each sample type, relative to the largest magnitude in a buffer
+TOLERANCES = {"f32": 1e-6, "i16": 1e-4, "i8": 2e-2}
+
+def make_recording():
+    """Write a two channel int16 WAV file of a tone, returns its path and the expected samples"""
+    return tone_recording(SAMPLE_RATE, SAMPLE_COUNT, "sdrpp_server_")
+
+def receive(sample_type, compression):
+    """Replay the recording through a loopback server and return the received samples"""
+    path, expected = make_recording()
+    source = sdrpp.FileSource(path, False)
+    with sdrpp.IQServer(HOST, PORT, source.getStream(), SAMPLE_RATE):
+        with sdrpp.ServerClient(HOST, PORT, SAMPLE_COUNT) as client:
+            client.negotiate(sample_type, compression)
+            client.start()
+            source.start()
+
+            out = np.empty(SAMPLE_COUNT, dtype=np.complex64)
+            pos = 0
+            while pos < SAMPLE_COUNT:
+                n = client.read_into(out[pos:], 2000.0)
+                if n <= 0:
+                    break
+                pos += n
+            source.stop()
+            print(f"{sample_type}, compression {compression}: {pos} samples, {client.getBytesReceived()} bytes, "
+                  f"compression ratio {client.getCompressionRatio():.2f}")
+            return out[:pos], expected, client
+
+def test_sample_types():
+    """Test receiving the samples with each sample type"""
+    try:
+        for sample_type, tolerance in TOLERANCES.items():
+            out, expected, client = receive(sample_type, False)
+            if len(out) != SAMPLE_COUNT or client.getDroppedSamples() != 0:
+                return False
+            error = np.max(np.abs(out - expected))
+            print(f"Max error {error:.2e}")
+            if error > tolerance or client.getSampleType() != sample_type:
+                return False
+        return True
+    except Exception as e:
+        print(f"Error in sample type test: {e}")
+        return False
+
+def test_compression():
+    """Test that zstd compressed baseband is decompressed to the same samples"""
+    try:
+        out, expected, client = receive("i16", True)
+        if len(out) != SAMPLE_COUNT or not client.getCompression():
+            return False
+        return np.max(np.abs(out - expected)) <= TOLERANCES["i16"] and client.getCompressionRatio() > 1.0
+    except Exception as e:
+        print(f"Error in compression test: {e}")
+        return False
+
+def test_commands():
+    """Test pipelined commands and the samplerate announced by the server"""
+    try:
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, False)
+        with sdrpp.IQServer(HOST, PORT, source.getStream(), SAMPLE_RATE) as srv:
+            with sdrpp.ServerClient(HOST, PORT) as client:
+                client.setSampleType("i8", False)
+                client.setCompression(True, False)
+                client.setFrequency(100e6, False)
+                client.sync()
+                print(f"Sample type {client.getSampleType()}, compression {client.getCompression()}")
+                if client.getSampleType() != "i8" or not client.getCompression():
+                    return False
+
+                srv.setSamplerate(2 * SAMPLE_RATE)
+                samplerate = client.requestSamplerate()
+                print(f"Samplerate {samplerate}")
+                return samplerate == 2 * SAMPLE_RATE
+    except Exception as e:
+        print(f"Error in command test: {e}")
+        return False
+
+def test_busy():
+    """Test that a second client is turned away while the first one is connected"""
+    try:
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, False)
+        with sdrpp.IQServer(HOST, PORT, source.getStream(), SAMPLE_RATE):
+            with sdrpp.ServerClient(HOST, PORT):
+                try:
+                    sdrpp.ServerClient(HOST, PORT, 1000, 2000.0)
+                    print("Second client was accepted")
+                    return False
+                except RuntimeError as e:
+                    print(f"Second client rejected: {e}")
+                    return "busy" in str(e)
+    except Exception as e:
+        print(f"Error in busy test: {e}")
+        return False
+
+def test_errors():
+    """Test invalid sample types and connecting without a server"""
+    try:
+        try:
+            sdrpp.ServerClient(HOST, PORT, 1000, 1000.0)
+            print("Connected without a server")
+            return False
+        except RuntimeError:
+            pass
+
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, False)
+        with sdrpp.IQServer(HOST, PORT, source.getStream(), SAMPLE_RATE):
+            with sdrpp.ServerClient(HOST, PORT) as client:
+                try:
+                    client.negotiate("i4", False)
+                    print("Invalid sample type was accepted")
+                    return False
+                except RuntimeError:
+                    pass
+                client.close()
+                buf = np.empty(16, dtype=np.complex64)
+                return client.read_into(buf, 100.0) == -1 and not client.isOpen()
+    except Exception as e:
+        print(f"Error in error test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ server client tests ===")
+
+    tests = [
+        ("Sample types", test_sample_types),
+        ("Compression", test_compression),
+        ("Commands", test_commands),
+        ("Busy server", test_busy),
+        ("Errors", test_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared memory IQ fan-out of the SDR++ Python bindings
+This script publishes a generated WAV IQ recording to reader processes, so no hardware is required
+"""
+
+import sys
+import os
+import time
+import multiprocessing
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wav_recordings import noise_recording
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 250000
+SAMPLE_COUNT = 500000
+READER_COUNT = 3
+
+def make_recording():
+    """Write a two channel int16 WAV file of noise, returns its path and the expected samples"""
+    return noise_recording(SAMPLE_RATE, SAMPLE_COUNT, "sdrpp_shm_")
+
+def ring_name(suffix):
+    return f"sdrpp_test_{os.getpid()}_{suffix}"
+
+def publish(source, pub, timeout=10.0):
+    """Replay a recording as fast as possible into a publisher, then close the ring"""
+    pub.start()
+    source.start()
+    source.waitFinished(timeout * 1000.0)
+    deadline = time.monotonic() + timeout
+    while pub.getWrittenSamples() < SAMPLE_COUNT and time.monotonic() < deadline:
+        time.sleep(0.01)
+    source.stop()
+    pub.close()
+
+def reader_process(name, ready, results):
+    """Read the ring until it's closed and send back the sample count, a checksum and the overruns"""
+    try:
+        with sdrpp.SharedIQReader(name) as reader:
+            ready.set()
+            count = 0
+            total = 0j
+            while True:
+                try:
+                    samples = reader.acquire(65536, 5000.0)
+                except EOFError:
+                    break
+                if samples is None:
+                    continue
+                count += len(samples)
+                total += complex(np.sum(samples, dtype=np.complex128))
+                reader.release()
+            results.put((count, total, reader.getOverruns()))
+    except Exception as e:
+        ready.set()
+        results.put((-1, 0j, str(e)))
+
+def test_fan_out():
+    """Test that several processes each get all the samples of one publisher"""
+    try:
+        path, expected = make_recording()
+        name = ring_name("fanout")
+        source = sdrpp.FileSource(path, False)
+
+        # The ring holds the whole recording, so that no reader can overrun
+        pub = sdrpp.SharedIQPublisher(name, 1 << 20, source.getStream())
+        pub.setSamplerate(SAMPLE_RATE)
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        procs = []
+        for _ in range(READER_COUNT):
+            ready = ctx.Event()
+            proc = ctx.Process(target=reader_process, args=(name, ready, results))
+            proc.start()
+            ready.wait(30.0)
+            procs.append(proc)
+
+        readers = pub.getReaders()
+        print(f"{len(readers)} readers attached: {[r['pid'] for r in readers]}")
+        if len(readers) != READER_COUNT:
+            return False
+
+        publish(source, pub)
+        outputs = [results.get(timeout=30.0) for _ in procs]
+        for proc in procs:
+            proc.join(10.0)
+
+        checksum = complex(np.sum(expected, dtype=np.complex128))
+        for count, total, overruns in outputs:
+            print(f"Reader got {count} samples, {overruns} overruns")
+            if count != SAMPLE_COUNT or overruns != 0 or abs(total - checksum) > 1e-3 * SAMPLE_COUNT:
+                return False
+        return True
+    except Exception as e:
+        print(f"Error in fan-out test: {e}")
+        return False
+
+def test_metadata():
+    """Test the samplerate and frequency published in the ring"""
+    try:
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, False)
+        name = ring_name("meta")
+        pub = sdrpp.SharedIQPublisher(name, 4096, source.getStream())
+        pub.setSamplerate(SAMPLE_RATE)
+        pub.setFrequency(100e6)
+
+        with sdrpp.SharedIQReader(name) as reader:
+            print(f"Capacity {reader.getCapacity()}, samplerate {reader.getSamplerate()}, frequency {reader.getFrequency()}")
+            if reader.getCapacity() != 4096 or reader.getSamplerate() != SAMPLE_RATE or reader.getFrequency() != 100e6:
+                return False
+            if not reader.isWriterRunning():
+                return False
+            pub.close()
+            return not reader.isWriterRunning()
+    except Exception as e:
+        print(f"Error in metadata test: {e}")
+        return False
+
+def test_overrun():
+    """Test that a reader falling behind detects overwritten samples and skips ahead"""
+    try:
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, True)
+        name = ring_name("overrun")
+        pub = sdrpp.SharedIQPublisher(name, 8192, source.getStream())
+
+        reader = sdrpp.SharedIQReader(name)
+        pub.start()
+        source.start()
+
+        # Hold on to the first samples while more than the ring is written
+        first = reader.acquire(1024, 5000.0)
+        if first is None:
+            print("No samples were published")
+            return False
+        time.sleep(0.2)
+        if reader.release():
+            print("Overwritten samples were not detected")
+            return False
+
+        # The next samples come from the recent part of the ring
+        samples = reader.acquire(65536, 0.0)
+        ok = samples is not None and reader.release()
+        print(f"{reader.getOverruns()} overruns, {reader.getDroppedSamples()} dropped samples")
+        ok = ok and reader.getOverruns() == 2 and reader.getDroppedSamples() > 8192
+
+        lag = pub.getReaders()[0]["lag"]
+        print(f"Reader lag {lag}")
+        source.stop()
+        pub.close()
+        reader.close()
+        return ok and lag <= 8192
+    except Exception as e:
+        print(f"Error in overrun test: {e}")
+        return False
+
+def test_end_of_stream():
+    """Test that readers drain the ring once the publisher closed it"""
+    try:
+        path, _ = make_recording()
+        source = sdrpp.FileSource(path, False)
+        name = ring_name("eos")
+        pub = sdrpp.SharedIQPublisher(name, 1 << 20, source.getStream())
+        reader = sdrpp.SharedIQReader(name)
+        publish(source, pub)
+
+        count = 0
+        while True:
+            try:
+                samples = reader.acquire(1 << 20, 0.0)
+            except EOFError:
+                break
+            count += len(samples)
+            reader.release()
+        reader.close()
+        print(f"Drained {count} samples after close")
+        return count == SAMPLE_COUNT
+    except Exception as e:
+        print(f"Error in end of stream test: {e}")
+        return False
+
+def test_errors():
+    """Test opening a ring that doesn't exist and using a closed reader"""
+    try:
+        try:
+            sdrpp.SharedIQReader(ring_name("missing"))
+            print("Opening a missing ring should fail")
+            return False
+        except RuntimeError:
+            pass
+
+        source = sdrpp.FileSource(make_recording()[0], False)
+        name = ring_name("closed")
+        pub = sdrpp.SharedIQPublisher(name, 4096, source.getStream())
+        reader = sdrpp.SharedIQReader(name)
+        reader.close()
+        pub.close()
+        try:
+            reader.acquire(1024, 0.0)
+            print("Acquiring from a closed reader should fail")
+            return False
+        except RuntimeError:
+            return True
+    except Exception as e:
+        print(f"Error in error handling test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ shared memory IQ tests ===")
+
+    tests = [
+        ("Fan-out", test_fan_out),
+        ("Metadata", test_metadata),
+        ("Overrun", test_overrun),
+        ("End of stream", test_end_of_stream),
+        ("Errors", test_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
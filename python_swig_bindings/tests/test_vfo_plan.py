@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for VFO plans of the SDR++ Python bindings
+This script creates, retunes and deletes VFOs on a headless runtime, so no hardware is required
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+    from sdrpp import vfo
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+# Root directory used by the runtime, an empty one gets the default config
+ROOT = tempfile.mkdtemp(prefix="sdrpp_vfo_plan_")
+
+runtime = None
+helper = None
+
+def state(name):
+    """Offset, bandwidth and sample rate of a VFO"""
+    return (helper.getVFOFrequency(name), helper.getVFOBandwidth(name), helper.getVFOSampleRate(name))
+
+def test_startup():
+    """Test starting the headless runtime the plans are applied to"""
+    global runtime, helper
+    try:
+        runtime = sdrpp.Runtime(ROOT)
+        helper = sdrpp.VFOHelper(runtime.getVFOManager())
+        return runtime.isRunning()
+    except Exception as e:
+        print(f"Error starting runtime: {e}")
+        return False
+
+def test_create():
+    """Test creating VFOs, with and without an offset"""
+    if helper is None:
+        return False
+    try:
+        result = vfo.apply_vfo_plan(helper, [
+            {"action": "create", "name": "plan_a", "offset": 100000.0, "bandwidth": 12500.0, "sampleRate": 50000.0},
+            {"action": "create", "name": "plan_b", "bandwidth": 200000.0, "sampleRate": 250000.0},
+            {"action": "create", "name": "plan_a", "bandwidth": 12500.0, "sampleRate": 50000.0},
+            {"action": "create", "name": "plan_c", "offset": 5000.0},
+        ])
+        print(f"Applied {result['applied']}, failed {result['failed']} in {result['latency_ms']:.2f} ms")
+        print(f"plan_a: {state('plan_a')}, plan_b: {state('plan_b')}")
+        if result["applied"] != 2 or [r["ok"] for r in result["results"]] != [True, True, False, False]:
+            return False
+        return state("plan_a") == (100000.0, 12500.0, 50000.0) and state("plan_b") == (0.0, 200000.0, 250000.0)
+    except Exception as e:
+        print(f"Error in create test: {e}")
+        return False
+
+def test_update():
+    """Test that updates only change the given fields"""
+    if helper is None:
+        return False
+    try:
+        result = vfo.apply_vfo_plan(helper, [{"action": "update", "name": "plan_a", "bandwidth": 10000.0}])
+        print(f"After bandwidth update: {state('plan_a')}")
+        if result["failed"] or state("plan_a") != (100000.0, 10000.0, 50000.0):
+            return False
+
+        result = vfo.apply_vfo_plan(helper, [
+            {"action": "update", "name": "plan_a", "offset": -50000.0},
+            {"action": "update", "name": "plan_b", "sampleRate": 500000.0},
+            {"action": "update", "name": "missing", "offset": 0.0},
+        ])
+        print(f"After offset and sample rate updates: {state('plan_a')}, {state('plan_b')}")
+        if [r["ok"] for r in result["results"]] != [True, True, False]:
+            return False
+        return state("plan_a") == (-50000.0, 10000.0, 50000.0) and state("plan_b") == (0.0, 200000.0, 500000.0)
+    except Exception as e:
+        print(f"Error in update test: {e}")
+        return False
+
+def test_delete():
+    """Test deleting VFOs, and that failed entries don't stop the plan"""
+    if helper is None:
+        return False
+    try:
+        result = vfo.apply_vfo_plan(helper, [
+            {"action": "delete", "name": "plan_a"},
+            {"action": "rename", "name": "plan_b"},
+            {"action": "delete", "name": "plan_b"},
+            {"action": "delete", "name": "plan_b"},
+        ])
+        print([r["error"] for r in result["results"]])
+        if [r["ok"] for r in result["results"]] != [True, False, True, False]:
+            return False
+        return helper.getVFOStream("plan_a") is None and helper.getVFOStream("plan_b") is None
+    except Exception as e:
+        print(f"Error in delete test: {e}")
+        return False
+
+def test_batch_released():
+    """Test that the VFO lock is released after a plan, so other threads can create VFOs"""
+    if helper is None:
+        return False
+    try:
+        vfo.apply_vfo_plan(helper, [{"action": "update", "name": "missing"}])
+        thread = threading.Thread(target=helper.createVFO, args=("plan_thread", 0.0, 50000.0, 12500.0))
+        thread.start()
+        thread.join(5.0)
+        if thread.is_alive():
+            print("VFO lock still held after the plan")
+            return False
+        return helper.deleteVFO("plan_thread")
+    except Exception as e:
+        print(f"Error in batch release test: {e}")
+        return False
+
+def test_shutdown():
+    """Test stopping the runtime"""
+    if runtime is None:
+        return False
+    try:
+        runtime.shutdown()
+        return not runtime.isRunning()
+    except Exception as e:
+        print(f"Error stopping runtime: {e}")
+        return False
+    finally:
+        shutil.rmtree(ROOT, ignore_errors=True)
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ VFO plan tests ===")
+
+    tests = [
+        ("Startup", test_startup),
+        ("Create", test_create),
+        ("Update", test_update),
+        ("Delete", test_delete),
+        ("Batch Released", test_batch_released),
+        ("Shutdown", test_shutdown),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
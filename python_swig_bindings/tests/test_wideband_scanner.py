@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Test script for the wideband scanner of the SDR++ Python bindings
+This script feeds synthetic FFT frames to the scanner, so no hardware is required
+"""
+
+import sys
+import os
+import socket
+
+import numpy as np
+
+# Add the parent directory to the Python path to find the sdrpp module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import _sdrpp as sdrpp
+    print("Successfully imported SDR++ Python bindings")
+except ImportError as e:
+    print(f"Failed to import SDR++ Python bindings: {e}")
+    sys.exit(1)
+
+SAMPLE_RATE = 500000.0
+FFT_SIZE = 1024
+FRAME_INTERVAL = 0.01
+NOISE_LEVEL = -100.0
+SIGNAL_LEVEL = -20.0
+
+def make_frame(center, signals):
+    """dB frame with DC in the middle, with a carrier on each of the given frequencies within the band"""
+    frame = np.full(FFT_SIZE, NOISE_LEVEL, dtype=np.float32)
+    if center is None:
+        return frame
+    for freq in signals:
+        bin = int((freq - (center - SAMPLE_RATE / 2.0)) * FFT_SIZE / SAMPLE_RATE)
+        if 0 <= bin < FFT_SIZE:
+            frame[bin] = SIGNAL_LEVEL
+    return frame
+
+def make_scanner(**kwargs):
+    """Scanner over 100 to 101 MHz in 100 kHz channels, three steps at SAMPLE_RATE"""
+    params = dict(channelWidth=10e3, level=-50.0, usableRatio=0.8, settleTime=20, dwellTime=50, hangTime=100, maxHoldTime=0)
+    params.update(kwargs)
+    scanner = sdrpp.WidebandScanner(100e6, 101e6, 100e3, **params)
+    scanner.setSamplerate(SAMPLE_RATE)
+    return scanner
+
+def run(scanner, signals, duration):
+    """Feed frames for duration seconds, retuning on tune events. signals(t) gives the active frequencies."""
+    center = None
+    events = []
+    t = 0.0
+    while t < duration:
+        scanner.process_frame(make_frame(center, signals(t)), t)
+        for ev in scanner.poll():
+            events.append(ev)
+            if ev.type == "tune":
+                center = ev.frequency
+        t += FRAME_INTERVAL
+    return events
+
+def test_plan():
+    """Test the channels and steps planned for the samplerate"""
+    try:
+        scanner = make_scanner()
+        freqs = scanner.frequencies()
+        if scanner.getChannelCount() != 11 or len(freqs) != 11 or freqs[0] != 100e6 or freqs[-1] != 101e6:
+            print(f"Unexpected channels: {freqs}")
+            return False
+        if scanner.getStepCount() != 3:
+            print(f"Expected 3 steps, got {scanner.getStepCount()}")
+            return False
+
+        # The whole range fits at a higher samplerate
+        scanner.setSamplerate(2e6)
+        if scanner.getStepCount() != 1 or abs(scanner.getCenterFrequency() - 100.5e6) > 1.0:
+            print(f"Expected a single step on 100.5 MHz, got {scanner.getStepCount()} on {scanner.getCenterFrequency()}")
+            return False
+        print(f"{scanner.getChannelCount()} channels")
+        return True
+    except Exception as e:
+        print(f"Error in plan test: {e}")
+        return False
+
+def test_sweep():
+    """Test that an empty band is swept one step per dwell"""
+    try:
+        scanner = make_scanner()
+        events = run(scanner, lambda t: [], 1.0)
+        tunes = [ev.frequency for ev in events if ev.type == "tune"]
+        sweeps = [ev for ev in events if ev.type == "sweep"]
+        if any(ev.type.startswith("hit") for ev in events):
+            print("Hits were reported on an empty band")
+            return False
+        if len(set(tunes)) != 3 or tunes[:4] != tunes[3:7]:
+            print(f"Unexpected tune sequence: {tunes}")
+            return False
+        if not sweeps or scanner.getSweepCount() != len(sweeps):
+            print(f"Expected sweeps, got {len(sweeps)} events and a count of {scanner.getSweepCount()}")
+            return False
+
+        # Each step needs the settle and dwell time, plus the frame of the retune itself
+        if not all(0.2 <= ev.duration <= 0.3 for ev in sweeps[1:]):
+            print(f"Unexpected sweep durations: {[ev.duration for ev in sweeps]}")
+            return False
+        if not np.all(scanner.occupancy() == 0.0) or not np.all(scanner.levels() == NOISE_LEVEL):
+            print("Unexpected channel levels")
+            return False
+        print(f"{len(sweeps)} sweeps, {len(tunes)} tunes")
+        return True
+    except Exception as e:
+        print(f"Error in sweep test: {e}")
+        return False
+
+def test_hits():
+    """Test that a transmission holds its step and ends after the hang time"""
+    try:
+        scanner = make_scanner()
+        events = run(scanner, lambda t: [100.5e6] if 0.3 <= t < 0.8 else [], 2.0)
+        starts = [ev for ev in events if ev.type == "hit_start"]
+        ends = [ev for ev in events if ev.type == "hit_end"]
+        if len(starts) != 1 or len(ends) != 1 or starts[0].frequency != 100.5e6 or ends[0].frequency != 100.5e6:
+            print(f"Expected one hit on 100.5 MHz, got {[(ev.type, ev.frequency) for ev in events if ev.type.startswith('hit')]}")
+            return False
+        if ends[0].level != SIGNAL_LEVEL or ends[0].time != starts[0].time:
+            print("The end of the hit should have its peak level and start time")
+            return False
+
+        # Once seen, the step is held until the end of the transmission and the hang time
+        if ends[0].duration < 0.3 or starts[0].time + ends[0].duration > 0.8:
+            print(f"Unexpected hit from {starts[0].time} for {ends[0].duration}")
+            return False
+        hang_end = starts[0].time + ends[0].duration + 0.1 - FRAME_INTERVAL / 2
+        retunes = [ev for ev in events if ev.type == "tune" and starts[0].time < ev.time < hang_end]
+        if retunes:
+            print("The scanner left the step during the hit")
+            return False
+        print(f"Hit from {starts[0].time:.2f}s for {ends[0].duration:.2f}s")
+        return True
+    except Exception as e:
+        print(f"Error in hits test: {e}")
+        return False
+
+def test_max_hold():
+    """Test that a continuous carrier only holds its step for the max hold time"""
+    try:
+        scanner = make_scanner(maxHoldTime=100)
+        events = run(scanner, lambda t: [100.1e6], 2.0)
+        starts = [ev for ev in events if ev.type == "hit_start"]
+        ends = [ev for ev in events if ev.type == "hit_end"]
+        if len(starts) < 2 or len(ends) < 1 or any(ev.frequency != 100.1e6 for ev in starts + ends):
+            print(f"Expected the hit to be reported on each sweep, got {len(starts)} starts and {len(ends)} ends")
+            return False
+        if scanner.getSweepCount() < 2:
+            print("The scanner should have kept sweeping")
+            return False
+
+        # The occupied channel is measured once per sweep as well
+        occupancy = scanner.occupancy()
+        if occupancy[1] != 1.0 or occupancy[0] != 0.0:
+            print(f"Unexpected occupancy: {occupancy}")
+            return False
+        print(f"{len(starts)} hits over {scanner.getSweepCount()} sweeps")
+        return True
+    except Exception as e:
+        print(f"Error in max hold test: {e}")
+        return False
+
+def test_single_step():
+    """Test that the scanner never retunes when the range fits in the bandwidth"""
+    try:
+        scanner = make_scanner()
+        scanner.configure(100.1e6, 100.3e6, 100e3, 10e3, -50.0, 0.8, 20, 50, 100, 0)
+        scanner.setSamplerate(SAMPLE_RATE)
+        events = run(scanner, lambda t: [100.2e6] if t >= 0.5 else [], 1.0)
+        tunes = [ev for ev in events if ev.type == "tune"]
+        starts = [ev for ev in events if ev.type == "hit_start"]
+        if scanner.getStepCount() != 1 or len(tunes) != 1:
+            print(f"Expected a single tune, got {len(tunes)}")
+            return False
+        if len(starts) != 1 or starts[0].frequency != 100.2e6 or any(ev.type == "hit_end" for ev in events):
+            print("Expected a single hit still going on")
+            return False
+        if scanner.getSweepCount() < 5:
+            print(f"Expected a sweep per dwell, got {scanner.getSweepCount()}")
+            return False
+        return True
+    except Exception as e:
+        print(f"Error in single step test: {e}")
+        return False
+
+def test_wakeup():
+    """Test that events wake up the event loop"""
+    try:
+        rsock, wsock = socket.socketpair()
+        rsock.settimeout(1.0)
+        wakeup = sdrpp.Wakeup(wsock.fileno())
+        scanner = make_scanner()
+        scanner.setWakeup(wakeup)
+        scanner.process_frame(make_frame(None, []), 0.0)
+        try:
+            rsock.recv(16)
+        except socket.timeout:
+            print("The wakeup was not notified")
+            return False
+        scanner.setWakeup(None)
+        events = scanner.poll()
+        rsock.close()
+        wsock.close()
+        return len(events) == 1 and events[0].type == "tune" and scanner.getDroppedCount() == 0
+    except Exception as e:
+        print(f"Error in wakeup test: {e}")
+        return False
+
+def test_errors():
+    """Test the errors raised on invalid parameters"""
+    try:
+        for args in [(101e6, 100e6, 100e3), (100e6, 101e6, 0.0), (100e6, 101e6, 100e3, -1.0), (100e6, 101e6, 100e3, 10e3, -50.0, 1.5)]:
+            try:
+                sdrpp.WidebandScanner(*args)
+                print(f"Invalid parameters were accepted: {args}")
+                return False
+            except RuntimeError:
+                pass
+
+        scanner = make_scanner()
+        try:
+            scanner.configure(100e6, 101e6, 100e3, 10e3, -50.0, 0.8, -1)
+            print("A negative settle time was accepted")
+            return False
+        except RuntimeError:
+            pass
+        try:
+            scanner.process_frame([0.0] * FFT_SIZE, 0.0)
+            print("A list was accepted as a frame")
+            return False
+        except RuntimeError:
+            pass
+
+        # The previous configuration is kept
+        return scanner.getChannelCount() == 11 and scanner.getStepCount() == 3
+    except Exception as e:
+        print(f"Error in error test: {e}")
+        return False
+
+def run_all_tests():
+    """Run all tests in sequence"""
+    print("=== Starting SDR++ wideband scanner tests ===")
+
+    tests = [
+        ("Plan", test_plan),
+        ("Sweep", test_sweep),
+        ("Hits", test_hits),
+        ("Max hold", test_max_hold),
+        ("Single step", test_single_step),
+        ("Wakeup", test_wakeup),
+        ("Errors", test_errors),
+    ]
+
+    results = []
+    for name, test_func in tests:
+        print(f"\n--- Testing {name} ---")
+        result = test_func()
+        results.append((name, result))
+
+    print("\n=== Test Results ===")
+    all_passed = True
+    for name, result in results:
+        status = "PASSED" if result else "FAILED"
+        if not result:
+            all_passed = False
+        print(f"{name}: {status}")
+
+    print("\nOverall status:", "PASSED" if all_passed else "FAILED")
+    return all_passed
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,55 @@
+"""
+WAV IQ recordings for the tests that replay a file instead of using hardware
+
+The files are written to a temporary directory, created on first use and removed when the test
+process exits. The other tests writing files get their directories from temp_dir() too.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+import wave
+
+import numpy as np
+
+_root = None
+
+
+def temp_dir(prefix="sdrpp_test_"):
+    """New empty directory, removed with the others at exit"""
+    global _root
+    if _root is None:
+        _root = tempfile.mkdtemp(prefix="sdrpp_tests_")
+        atexit.register(shutil.rmtree, _root, True)
+    return tempfile.mkdtemp(prefix=prefix, dir=_root)
+
+
+def write_wav(path, iq, samplerate, channels=2):
+    """Write complex samples in [-1, 1] as an int16 WAV file
+
+    Returns the samples as they're read back from the file, as complex64.
+    """
+    pcm = np.empty(len(iq) * 2, dtype=np.int16)
+    pcm[0::2] = np.round(np.clip(np.real(iq), -1.0, 1.0) * 32767)
+    pcm[1::2] = np.round(np.clip(np.imag(iq), -1.0, 1.0) * 32767)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(samplerate)
+        f.writeframes(pcm.tobytes())
+    return ((pcm[0::2].astype(np.float32) + 1j * pcm[1::2].astype(np.float32)) / 32768.0).astype(np.complex64)
+
+
+def tone_recording(samplerate, count, prefix="sdrpp_test_", frequency=10000.0, amplitude=0.5):
+    """Recording of a complex tone, returns its path and the expected samples"""
+    t = np.arange(count) / samplerate
+    path = os.path.join(temp_dir(prefix), "tone_100000000Hz.wav")
+    return path, write_wav(path, amplitude * np.exp(2j * np.pi * frequency * t), samplerate)
+
+
+def noise_recording(samplerate, count, prefix="sdrpp_test_", seed=0):
+    """Recording of uniform noise, returns its path and the expected samples"""
+    pcm = np.random.default_rng(seed).integers(-10000, 10000, count * 2)
+    path = os.path.join(temp_dir(prefix), "noise_100000000Hz.wav")
+    return path, write_wav(path, (pcm[0::2] + 1j * pcm[1::2]) / 32767.0, samplerate)
@@ -4,7 +4,7 @@
 #include <module.h>
 #include <gui/gui.h>
 #include <signal_path/signal_path.h>
-#include <wavreader.h>
+#include <dsp/source/file_source.h>
 #include <core.h>
 #include <gui/widgets/file_select.h>
 #include <filesystem>
@@ -34,8 +34,14 @@ public:
 
         config.acquire();
         fileSelect.setPath(config.conf["path"], true);
+        if (config.conf.contains("realtime")) {
+            realtime = config.conf["realtime"];
+        }
         config.release();
 
+        // Loop the recording, like a source that never runs out of samples
+        source.init("", realtime, true);
+
         handler.ctx = this;
         handler.selectHandler = menuSelected;
         handler.deselectHandler = menuDeselected;
@@ -43,7 +49,7 @@ public:
         handler.startHandler = start;
         handler.stopHandler = stop;
         handler.tuneHandler = tune;
-        handler.stream = &stream;
+        handler.stream = &source.out;
         sigpath::sourceManager.registerSource("File", &handler);
     }
 
@@ -90,21 +96,18 @@ private:
     static void start(void* ctx) {
         FileSourceModule* _this = (FileSourceModule*)ctx;
         if (_this->running) { return; }
-        if (_this->reader == NULL) { return; }
+        if (!_this->source.isOpen()) { return; }
         _this->running = true;
-        _this->workerThread = _this->float32Mode ? std::thread(floatWorker, _this) : std::thread(worker, _this);
+        _this->source.start();
         flog::info("FileSourceModule '{0}': Start!", _this->name);
     }
 
     static void stop(void* ctx) {
         FileSourceModule* _this = (FileSourceModule*)ctx;
         if (!_this->running) { return; }
-        if (_this->reader == NULL) { return; }
-        _this->stream.stopWriter();
-        _this->workerThread.join();
-        _this->stream.clearWriteStop();
+        _this->source.stop();
         _this->running = false;
-        _this->reader->rewind();
+        _this->source.seek(0);
         flog::info("FileSourceModule '{0}': Stop!", _this->name);
     }
 
@@ -118,19 +121,9 @@ private:
 
         if (_this->fileSelect.render("##file_source_" + _this->name)) {
             if (_this->fileSelect.pathIsValid()) {
-                if (_this->reader != NULL) {
-                    _this->reader->close();
-                    delete _this->reader;
-                }
                 try {
-                    _this->reader = new WavReader(_this->fileSelect.path);
-                    if (_this->reader->getSampleRate() == 0) {
-                        _this->reader->close();
-                        delete _this->reader;
-                        _this->reader = NULL;
-                        throw std::runtime_error("Sample rate may not be zero");
-                    }
-                    _this->sampleRate = _this->reader->getSampleRate();
+                    _this->source.open(_this->fileSelect.path);
+                    _this->sampleRate = _this->source.getSamplerate();
                     core::setInputSampleRate(_this->sampleRate);
                     std::string filename = std::filesystem::path(_this->fileSelect.path).filename().string();
                     _this->centerFreq = _this->getFrequency(filename);
@@ -148,36 +141,13 @@ private:
             }
         }
 
-        ImGui::Checkbox("Float32 Mode##_file_source", &_this->float32Mode);
-    }
-
-    static void worker(void* ctx) {
-        FileSourceModule* _this = (FileSourceModule*)ctx;
-        double sampleRate = std::max(_this->reader->getSampleRate(), (uint32_t)1);
-        int blockSize = std::min((int)(sampleRate / 200.0f), (int)STREAM_BUFFER_SIZE);
-        int16_t* inBuf = new int16_t[blockSize * 2];
-
-        while (true) {
-            _this->reader->readSamples(inBuf, blockSize * 2 * sizeof(int16_t));
-            volk_16i_s32f_convert_32f((float*)_this->stream.writeBuf, inBuf, 32768.0f, blockSize * 2);
-            if (!_this->stream.swap(blockSize)) { break; };
+        // Without real-time pacing, the file is read as fast as the DSP can process it
+        if (ImGui::Checkbox("Real-time##_file_source", &_this->realtime)) {
+            _this->source.setRealtime(_this->realtime);
+            config.acquire();
+            config.conf["realtime"] = _this->realtime;
+            config.release(true);
         }
-
-        delete[] inBuf;
-    }
-
-    static void floatWorker(void* ctx) {
-        FileSourceModule* _this = (FileSourceModule*)ctx;
-        double sampleRate = std::max(_this->reader->getSampleRate(), (uint32_t)1);
-        int blockSize = std::min((int)(sampleRate / 200.0f), (int)STREAM_BUFFER_SIZE);
-        dsp::complex_t* inBuf = new dsp::complex_t[blockSize];
-
-        while (true) {
-            _this->reader->readSamples(_this->stream.writeBuf, blockSize * sizeof(dsp::complex_t));
-            if (!_this->stream.swap(blockSize)) { break; };
-        }
-
-        delete[] inBuf;
     }
 
     double getFrequency(std::string filename) {
@@ -191,22 +161,21 @@ private:
 
     FileSelect fileSelect;
     std::string name;
-    dsp::stream<dsp::complex_t> stream;
+    dsp::source::File source;
     SourceManager::SourceHandler handler;
-    WavReader* reader = NULL;
     bool running = false;
     bool enabled = true;
     float sampleRate = 1000000;
-    std::thread workerThread;
 
     double centerFreq = 100000000;
 
-    bool float32Mode = false;
+    bool realtime = false;
 };
 
 MOD_EXPORT void _INIT_() {
     json def = json({});
     def["path"] = "";
+    def["realtime"] = false;
     config.setPath(core::args["root"].s() + "/file_source_config.json");
     config.load(def);
     config.enableAutoSave();
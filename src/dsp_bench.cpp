@@ -0,0 +1,143 @@
+// Headless DSP benchmark runner, see core/src/dsp/bench/suite.h
+//
+//   sdrpp_dsp_bench --output results.json
+//   sdrpp_dsp_bench --blocks fir,fm --baseline results.json --threshold 0.1
+//
+// Returns 1 if a case regressed compared to the baseline.
+
+#include <dsp/bench/suite.h>
+#include <command_args.h>
+#include <atomic>
+#include <fstream>
+#include <new>
+#include <sstream>
+#include <stdio.h>
+#include <stdlib.h>
+
+static std::atomic<uint64_t> heapAllocations(0);
+
+void* operator new(size_t size) {
+    heapAllocations.fetch_add(1, std::memory_order_relaxed);
+    void* ptr = malloc(size ? size : 1);
+    if (!ptr) { throw std::bad_alloc(); }
+    return ptr;
+}
+
+void operator delete(void* ptr) noexcept {
+    free(ptr);
+}
+
+void operator delete(void* ptr, size_t size) noexcept {
+    free(ptr);
+}
+
+static uint64_t getHeapAllocations() {
+    return heapAllocations.load(std::memory_order_relaxed);
+}
+
+static std::vector<std::string> splitList(const std::string& str) {
+    std::vector<std::string> items;
+    std::stringstream ss(str);
+    std::string item;
+    while (std::getline(ss, item, ',')) {
+        if (!item.empty()) { items.push_back(item); }
+    }
+    return items;
+}
+
+static bool readJson(const std::string& path, nlohmann::json& json) {
+    std::ifstream file(path);
+    if (!file.is_open()) {
+        fprintf(stderr, "Could not open %s\n", path.c_str());
+        return false;
+    }
+    try {
+        file >> json;
+    }
+    catch (const std::exception& e) {
+        fprintf(stderr, "Could not parse %s: %s\n", path.c_str(), e.what());
+        return false;
+    }
+    return true;
+}
+
+int main(int argc, char* argv[]) {
+    CommandArgsParser args;
+    args.define('h', "help", "Show help");
+    args.define('c', "config", "JSON file with the benchmark options, see dsp::bench::Config", "");
+    args.define('b', "blocks", "Comma separated blocks to run (fir, resampler, fft, chains, fm, wfm, am, usb, lsb)", "");
+    args.define('d', "duration", "Duration of each case in milliseconds", 0);
+    args.define('o', "output", "Write the results to this JSON file", "");
+    args.define('r', "baseline", "Compare the results with this JSON file", "");
+    args.define('t', "threshold", "Relative throughput drop reported as a regression", 0.1);
+    if (args.parse(argc, argv) < 0) { return -1; }
+    if (args["help"].b()) {
+        args.showHelp();
+        return 0;
+    }
+
+    dsp::bench::Config config;
+    try {
+        std::string configPath = args["config"];
+        if (!configPath.empty()) {
+            nlohmann::json json;
+            if (!readJson(configPath, json)) { return -1; }
+            config = dsp::bench::Config::fromJson(json);
+        }
+    }
+    catch (const std::exception& e) {
+        fprintf(stderr, "%s\n", e.what());
+        return -1;
+    }
+    std::string blocks = args["blocks"];
+    if (!blocks.empty()) { config.blocks = splitList(blocks); }
+    int duration = args["duration"];
+    if (duration > 0) { config.durationMs = duration; }
+
+    nlohmann::json baseline;
+    std::string baselinePath = args["baseline"];
+    if (!baselinePath.empty() && !readJson(baselinePath, baseline)) { return -1; }
+
+    dsp::bench::setHeapCounter(getHeapAllocations);
+
+    printf("%-48s %12s %8s %10s %10s\n", "case", "MS/s", "CPU %", "buf alloc", "heap alloc");
+    std::vector<dsp::bench::Result> results;
+    try {
+        results = dsp::bench::runAll(config, [](const dsp::bench::Result& res) {
+            printf("%-48s %12.2f %8.1f %10llu %10lld\n", res.benchCase.name.c_str(), res.samplesPerSecond / 1e6, res.cpuPercent,
+                   (unsigned long long)res.bufferAllocations, (long long)res.heapAllocations);
+            fflush(stdout);
+        });
+    }
+    catch (const std::exception& e) {
+        fprintf(stderr, "%s\n", e.what());
+        return -1;
+    }
+
+    nlohmann::json report = dsp::bench::toJson(config, results);
+    std::string outputPath = args["output"];
+    if (!outputPath.empty()) {
+        std::ofstream file(outputPath);
+        file << report.dump(4);
+        if (!file.good()) {
+            fprintf(stderr, "Could not write %s\n", outputPath.c_str());
+            return -1;
+        }
+    }
+
+    if (baselinePath.empty()) { return 0; }
+
+    std::vector<dsp::bench::Regression> regressions;
+    try {
+        regressions = dsp::bench::compare(report, baseline, args["threshold"]);
+    }
+    catch (const std::exception& e) {
+        fprintf(stderr, "%s\n", e.what());
+        return -1;
+    }
+    for (const auto& reg : regressions) {
+        printf("REGRESSION %s: %s %g -> %g\n", reg.name.c_str(), reg.metric.c_str(), reg.baseline, reg.current);
+    }
+    printf("%d regression(s) compared to %s\n", (int)regressions.size(), baselinePath.c_str());
+    return regressions.empty() ? 0 : 1;
+}